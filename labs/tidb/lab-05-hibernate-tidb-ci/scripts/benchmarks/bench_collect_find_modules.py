@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark junit_local_collect.find_modules: pruned os.scandir walk vs the original glob.
+
+Builds a synthetic workspace shaped like hibernate-orm (many modules with deep
+src/ trees, a populated .gradle cache, build/tmp scratch space and a few
+target/test-results directories) and times module discovery over it.
+
+Usage examples:
+  python scripts/benchmarks/bench_collect_find_modules.py
+  python scripts/benchmarks/bench_collect_find_modules.py --modules 60 --src-files 2000 --workers 8
+  python scripts/benchmarks/bench_collect_find_modules.py --root /path/to/hibernate-orm --workers 8
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import junit_local_collect  # noqa: E402
+
+
+def touch(path: Path, content: str = "") -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding="utf-8")
+
+
+def build_tree(root: Path, modules: int, src_files: int, results: int, cache_files: int) -> int:
+    """Write the synthetic workspace and return the number of files created."""
+    created = 0
+    for idx in range(modules):
+        module = root / f"hibernate-module-{idx:03d}"
+        for n in range(src_files):
+            touch(module / "src" / "test" / "java" / "org" / "hibernate" / f"pkg{n % 40}" / f"Test{n}.java")
+        for n in range(results if idx % 2 == 0 else 0):
+            touch(module / "target" / "test-results" / "test" / f"TEST-org.hibernate.Test{n}.xml", "<testsuite/>")
+        for n in range(src_files // 4):
+            touch(module / "target" / "classes" / f"pkg{n % 40}" / f"Test{n}.class")
+            touch(module / "build" / "tmp" / "compileJava" / f"f{n}.bin")
+        created += src_files + results + (src_files // 4) * 2
+    for n in range(cache_files):
+        touch(root / ".gradle" / "caches" / f"dir{n % 200}" / f"entry{n}.bin")
+    created += cache_files
+    return created
+
+
+def timed(label: str, func) -> set:
+    start = time.perf_counter()
+    modules = func()
+    print(f"  {label:22} {time.perf_counter() - start:8.3f}s  modules={len(modules)}")
+    return modules
+
+
+def parse_args() -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="Benchmark module discovery in junit_local_collect.")
+    ap.add_argument("--root", help="Existing workspace to scan instead of a synthetic tree")
+    ap.add_argument("--modules", type=int, default=40, help="Synthetic modules (default: 40)")
+    ap.add_argument("--src-files", type=int, default=1000, help="Source files per module (default: 1000)")
+    ap.add_argument("--results", type=int, default=50, help="XML files per module with results (default: 50)")
+    ap.add_argument("--cache-files", type=int, default=20000, help="Files under .gradle (default: 20000)")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Threads for the parallel walk")
+    return ap.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    synthetic = args.root is None
+    root = Path(args.root) if args.root else Path(tempfile.mkdtemp(prefix="find-modules-bench-"))
+    try:
+        if synthetic:
+            print(f"Building synthetic workspace under {root}…")
+            print(f"  Created {build_tree(root, args.modules, args.src_files, args.results, args.cache_files)} files")
+
+        expected = timed("glob", lambda: junit_local_collect.find_modules_glob(root))
+        walked = timed("scandir", lambda: junit_local_collect.find_modules(root))
+        parallel = timed(f"scandir x{args.workers}", lambda: junit_local_collect.find_modules(root, args.workers))
+
+        if walked != parallel:
+            print("ERROR: serial and parallel walks disagree", file=sys.stderr)
+            sys.exit(1)
+        if synthetic and walked != expected:
+            print("ERROR: scandir walk and glob disagree", file=sys.stderr)
+            sys.exit(1)
+        if not synthetic and walked != expected:
+            print(f"NOTE: glob also matched {len(expected - walked)} module(s) under pruned directories")
+    finally:
+        if synthetic:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
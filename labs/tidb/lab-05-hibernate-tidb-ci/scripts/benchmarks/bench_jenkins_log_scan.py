@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Benchmark Gradle task extraction over a node console log: the pre-filtered
+single-pass TaskLogScanner vs the original per-line regex scan.
+
+The log is streamed from disk in chunks and decoded with jenkins_http.iter_lines,
+exactly as wfapi_log_lines feeds it from Jenkins. Point --log at a recorded
+Hibernate branch log (multi-GB logs work; memory stays bounded), or let the
+benchmark synthesize one shaped like a ciCheck run: mostly test progress and
+stack-trace noise, with a few hundred `> Task` headers, UP-TO-DATE/SKIPPED
+markers and an RDBMS/-Pdb hint.
+
+Usage examples:
+  python scripts/benchmarks/bench_jenkins_log_scan.py
+  python scripts/benchmarks/bench_jenkins_log_scan.py --size-mb 2048
+  python scripts/benchmarks/bench_jenkins_log_scan.py --log tmp/mysql_8_0-node-1234.log
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import jenkins_http  # noqa: E402
+import jenkins_pipeline_tasks_summary as tasks_summary  # noqa: E402
+
+NOISE = [
+    "    at org.hibernate.orm.test.SomeTest.testSomething(SomeTest.java:{n})",
+    "org.hibernate.orm.test.mapping.Test{n} > testCase{n}() PASSED",
+    "2025-11-03 14:30:22 DEBUG SQL:{n} - select e1_0.id,e1_0.name from Entity{n} e1_0 where e1_0.id=?",
+    "&gt;<b class=\"gradle-task\"> Task :hibernate-core:compileTestJava</b> UP-TO-DATE",
+    "Hibernate: insert into Entity{n} (name,id) values (?,?)",
+]
+
+
+def legacy_scan(lines) -> Tuple[Optional[str], List[Tuple[str, int, int]]]:
+    """The pre-dispatcher scan: a database pass plus three regexes per line."""
+    lines = list(lines)
+    database = None
+    for ln in lines:
+        m = tasks_summary.DB_PARAM_RE.search(ln) or tasks_summary.RDBMS_RE.search(ln)
+        if m:
+            database = m.group(1)
+            break
+    out: List[Tuple[str, int, int]] = []
+    current, uptodate, skipped = None, 0, 0
+    for ln in lines:
+        m = tasks_summary.TASK_RE.match(ln)
+        if m:
+            if current is not None:
+                out.append((current, uptodate, skipped))
+            current, uptodate, skipped = m.group(1), 0, 0
+            continue
+        if current is not None:
+            if tasks_summary.UPTODATE_RE.search(ln):
+                uptodate += 1
+            elif tasks_summary.SKIPPED_RE.match(ln):
+                skipped += 1
+    if current is not None:
+        out.append((current, uptodate, skipped))
+    return database, out
+
+
+def write_synthetic_log(path: Path, size_mb: int, seed: int = 7) -> int:
+    """Write a synthetic branch log of roughly size_mb MiB and return its size in bytes."""
+    rng = random.Random(seed)
+    target = size_mb * 1024 * 1024
+    written = 0
+    task = 0
+    with open(path, "w", encoding="utf-8", newline="\n") as fh:
+        header = "+ export RDBMS=mysql_8_0\nExecuting: ./gradlew ciCheck -Pdb=mysql_ci -Plog-test-progress=true\n"
+        fh.write(header)
+        written += len(header)
+        while written < target:
+            block = []
+            if rng.random() < 0.002:
+                task += 1
+                block.append(f"> Task :hibernate-module-{task % 40}:test")
+                if rng.random() < 0.3:
+                    block.append("UP-TO-DATE" if rng.random() < 0.5 else "SKIPPED")
+            for _ in range(200):
+                block.append(rng.choice(NOISE).format(n=rng.randrange(10_000)))
+            text = "\n".join(block) + "\n"
+            fh.write(text)
+            written += len(text)
+    return path.stat().st_size
+
+
+def file_lines(path: Path, chunk_size: int) -> Iterator[str]:
+    def chunks() -> Iterator[bytes]:
+        with open(path, "rb") as fh:
+            while True:
+                chunk = fh.read(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+
+    return jenkins_http.iter_lines(chunks())
+
+
+def timed(label: str, func, size: int):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:28} {elapsed:8.2f}s  {size / (1024 * 1024) / elapsed:8.1f} MiB/s")
+    return result
+
+
+def parse_args() -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="Benchmark Gradle task extraction over a node console log.")
+    ap.add_argument("--log", help="Recorded node log to scan instead of a synthetic one")
+    ap.add_argument("--size-mb", type=int, default=256, help="Synthetic log size in MiB (default: 256)")
+    ap.add_argument("--chunk-size", type=int, default=jenkins_http.STREAM_CHUNK_SIZE, help="Read size in bytes")
+    ap.add_argument("--skip-legacy", action="store_true", help="Only time the single-pass scanner (legacy buffers the log)")
+    return ap.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    synthetic = args.log is None
+    if synthetic:
+        fd, name = tempfile.mkstemp(prefix="jenkins-log-bench-", suffix=".log")
+        os.close(fd)
+        path = Path(name)
+        print(f"Writing synthetic {args.size_mb} MiB log to {path}…")
+        size = write_synthetic_log(path, args.size_mb)
+    else:
+        path = Path(args.log)
+        size = path.stat().st_size
+    try:
+        print(f"Scanning {size / (1024 * 1024):.1f} MiB")
+        timed("decode only", lambda: sum(1 for _ in file_lines(path, args.chunk_size)), size)
+        fast = timed("TaskLogScanner (1 pass)", lambda: tasks_summary.scan_logs_for_tasks(file_lines(path, args.chunk_size)), size)
+        print(f"  database={fast[0]}  task scopes={len(fast[1])}")
+        if not args.skip_legacy:
+            legacy = timed("legacy regex scan", lambda: legacy_scan(file_lines(path, args.chunk_size)), size)
+            if legacy != fast:
+                print("ERROR: scanners disagree", file=sys.stderr)
+                sys.exit(1)
+    finally:
+        if synthetic:
+            path.unlink(missing_ok=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark junit_local_summary.aggregate: streaming root-only reads vs full ElementTree parses.
+
+Builds a synthetic collection (default: 10k TEST-*.xml files spread over a handful of
+modules, with a few oversized <system-out> payloads mimicking captured SQL logging)
+and times both parse paths over the same tree.
+
+Usage examples:
+  python scripts/benchmarks/bench_junit_summary_parse.py
+  python scripts/benchmarks/bench_junit_summary_parse.py --files 2000 --large-every 50 --large-mb 16
+  python scripts/benchmarks/bench_junit_summary_parse.py --keep --root /tmp/junit-bench
+  python scripts/benchmarks/bench_junit_summary_parse.py --files 20000 --large-every 0 --jobs 0
+"""
+
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import junit_local_summary  # noqa: E402
+
+MODULES = ("hibernate-core", "hibernate-envers", "hibernate-spatial", "hibernate-jcache", "hibernate-community-dialects")
+SQL_LINE = "Hibernate: select e1_0.id,e1_0.name,e1_0.version from Entity e1_0 where e1_0.id=?\n"
+
+
+def build_tree(root: Path, files: int, cases: int, large_every: int, large_mb: int) -> int:
+    """Write the synthetic collection and return the number of bytes written."""
+    written = 0
+    large_body = SQL_LINE * ((large_mb * 1024 * 1024) // len(SQL_LINE))
+    small_body = SQL_LINE * 20
+    for idx in range(files):
+        module = MODULES[idx % len(MODULES)]
+        suite_dir = root / module / "target" / "test-results" / "test"
+        suite_dir.mkdir(parents=True, exist_ok=True)
+        classname = f"org.hibernate.orm.test.bench.Bench{idx}Test"
+        body = large_body if large_every and idx % large_every == 0 else small_body
+        testcases = "".join(
+            f'  <testcase name="test{n}" classname="{classname}" time="0.01"/>\n' for n in range(cases)
+        )
+        xml = (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            f'<testsuite name="{classname}" tests="{cases}" skipped="0" failures="0" errors="0" time="{cases * 0.01:.2f}">\n'
+            f"{testcases}"
+            f"  <system-out><![CDATA[{body}]]></system-out>\n"
+            "  <system-err><![CDATA[]]></system-err>\n"
+            "</testsuite>\n"
+        )
+        path = suite_dir / f"TEST-{classname}.xml"
+        path.write_text(xml, encoding="utf-8")
+        written += len(xml)
+    return written
+
+
+def time_aggregate(root: Path, streaming: bool, trace_memory: bool, jobs: int = 1) -> tuple:
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    overall, _ = junit_local_summary.aggregate(root, streaming=streaming, jobs=jobs)
+    elapsed = time.perf_counter() - start
+    peak = 0
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return overall, elapsed, peak
+
+
+def parse_args() -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="Benchmark streaming vs full JUnit XML parsing.")
+    ap.add_argument("--root", help="Directory for the synthetic tree (default: a temporary directory)")
+    ap.add_argument("--files", type=int, default=10000, help="Number of TEST-*.xml files (default: 10000)")
+    ap.add_argument("--cases", type=int, default=10, help="Testcases per suite (default: 10)")
+    ap.add_argument("--large-every", type=int, default=500, help="Every Nth file gets a large system-out (0 disables)")
+    ap.add_argument("--large-mb", type=int, default=8, help="Size of the large system-out payloads in MB (default: 8)")
+    ap.add_argument("--jobs", type=int, default=1, help="Worker processes passed to aggregate (0 = one per CPU)")
+    ap.add_argument("--trace-memory", action="store_true", help="Also report tracemalloc peak (slows both runs)")
+    ap.add_argument("--keep", action="store_true", help="Keep the synthetic tree after the run")
+    return ap.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    root = Path(args.root) if args.root else Path(tempfile.mkdtemp(prefix="junit-bench-"))
+    try:
+        print(f"Building synthetic tree under {root} ({args.files} files)…")
+        written = build_tree(root, args.files, args.cases, args.large_every, args.large_mb)
+        print(f"  Wrote {written / (1024 * 1024):.1f} MB")
+
+        results = {}
+        for label, streaming in (("full-parse", False), ("streaming", True)):
+            overall, elapsed, peak = time_aggregate(root, streaming, args.trace_memory, args.jobs)
+            results[label] = overall
+            line = f"  {label:12} {elapsed:8.2f}s  files={overall['files']}  tests={overall['tests']}"
+            if args.trace_memory:
+                line += f"  peak={peak / (1024 * 1024):.1f} MB"
+            print(line)
+
+        if results["full-parse"] != results["streaming"]:
+            print("ERROR: streaming and full-parse totals differ", file=sys.stderr)
+            sys.exit(1)
+    finally:
+        if not args.keep and not args.root:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,7 @@ from pathlib import Path
 from typing import Iterable, Sequence
 
 from env_utils import load_lab_env, resolve_workspace_dir
+from gradle_cache import volume_name
 
 
 def _print_section(title: str) -> None:
@@ -65,6 +66,13 @@ def _purge_gradle_cache() -> None:
     else:
         print(f"\n=== Gradle cache {cache_dir} not found; skipping ===")
 
+    # run_comparison.py runners keep their Gradle home in a Docker volume (gradle_cache.py)
+    volume = volume_name()
+    _print_section(f"Removing Gradle cache volume {volume}")
+    rm = subprocess.run(["docker", "volume", "rm", "-f", volume], text=True, capture_output=True)
+    if rm.returncode != 0:
+        print(f"- {volume}: failed to remove (exit {rm.returncode})")
+
 
 def _remove_patterns(root: Path, patterns: Sequence[str]) -> int:
     if not root.exists():
@@ -130,7 +138,7 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--purge-gradle-cache",
         action="store_true",
-        help="Delete ~/.gradle/caches after running gradle clean",
+        help="Delete ~/.gradle/caches and the runners' Gradle cache volume after running gradle clean",
     )
     parser.add_argument("--skip-temp-clean", action="store_true", help="Skip deleting logs/json inside TEMP_DIR")
     parser.add_argument(
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Persistent Gradle caches for the runner containers.
+
+run_comparison.py used to run `./gradlew clean` and delete ~/.gradle/caches
+before every matrix cell, while each runner container started with an empty
+GRADLE_USER_HOME, so every cell downloaded all dependencies and recompiled
+hibernate-orm. With the cache manager:
+
+  - a named Docker volume (GRADLE_CACHE_VOLUME, default
+    hibernate-orm-gradle-home) is the GRADLE_USER_HOME of every runner. It holds
+    Gradle's dependency cache (files addressed by their SHA-1) and the local
+    build cache (entries addressed by the hash of the task inputs), so reusing
+    it can only skip work whose inputs are unchanged;
+  - runners pass --build-cache and templates/gradle-cache.init.gradle, which
+    keeps Test tasks out of the build cache and never up-to-date: tests always
+    execute against the live database;
+  - between cells only test outputs (test-results/ and reports under
+    target/ or build/) are removed; compiled classes stay, so the compile tasks
+    of the next cell are up-to-date;
+  - runners that share the volume concurrently (--parallel cells, --shards)
+    mount it read-only as GRADLE_RO_DEP_CACHE, because Gradle's cross-process
+    cache locks do not work across container network namespaces;
+  - compare_collections() checks that a cached run reproduced a clean run
+    testcase by testcase (run_comparison.py --verify-cache).
+
+Usage examples:
+  python scripts/gradle_cache.py --invalidate
+  python scripts/gradle_cache.py --compare tmp/mysql-results-20251103-143022 tmp/mysql-clean-results-20251103-160000
+  python scripts/gradle_cache.py --purge
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Sequence
+
+from env_utils import load_lab_env, resolve_workspace_dir
+from junit_testcase_diff import diff_paths, format_key, resolve_index_path
+from junit_testcase_index import TestcaseIndex
+
+DEFAULT_VOLUME = "hibernate-orm-gradle-home"
+GRADLE_HOME_MOUNT = "/gradle-home"
+READ_ONLY_MOUNT = "/gradle-ro"
+CACHE_MODES = ("reuse", "clean")
+CACHE_INIT_SCRIPT = Path(__file__).resolve().parent / "templates" / "gradle-cache.init.gradle"
+
+# Directories never descended into while invalidating test outputs.
+PRUNED_DIR_NAMES = frozenset((".git", ".gradle", ".idea", "node_modules"))
+BUILD_DIR_NAMES = frozenset(("target", "build"))
+
+RunCommand = Callable[..., subprocess.CompletedProcess]
+
+
+def volume_name() -> str:
+    return os.environ.get("GRADLE_CACHE_VOLUME", DEFAULT_VOLUME)
+
+
+def runner_args(volume: str, shared: bool = False) -> List[str]:
+    """docker run arguments mounting the cache volume (read-only dependency cache when shared)."""
+    if shared:
+        return ["-v", f"{volume}:{READ_ONLY_MOUNT}:ro", "-e", f"GRADLE_RO_DEP_CACHE={READ_ONLY_MOUNT}/caches"]
+    return ["-v", f"{volume}:{GRADLE_HOME_MOUNT}", "-e", f"GRADLE_USER_HOME={GRADLE_HOME_MOUNT}"]
+
+
+def find_test_outputs(workspace: Path, skip: Iterable[Path] = ()) -> List[Path]:
+    """test-results/ anywhere below a build directory plus the build directory's reports/."""
+    skipped = {str(path) for path in skip}
+    found: List[Path] = []
+    stack = [str(workspace)]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as entries:
+                children = [entry for entry in entries if entry.is_dir(follow_symlinks=False)]
+        except OSError:
+            continue
+        for entry in children:
+            if entry.name in PRUNED_DIR_NAMES or entry.path in skipped:
+                continue
+            if entry.name in BUILD_DIR_NAMES:
+                for name in ("test-results", "reports"):
+                    if os.path.isdir(os.path.join(entry.path, name)):
+                        found.append(Path(entry.path, name))
+                continue
+            stack.append(entry.path)
+    return sorted(found)
+
+
+def invalidate_test_outputs(workspace: Path, skip: Iterable[Path] = ()) -> List[Path]:
+    """Remove test outputs but keep compiled classes, jars and Gradle's task history."""
+    removed = find_test_outputs(workspace, skip)
+    for path in removed:
+        shutil.rmtree(path, ignore_errors=True)
+    return removed
+
+
+def overlay_ignore(directory: str, names: List[str]) -> List[str]:
+    """shutil.copytree filter for reuse mode: keep build outputs, drop test outputs, scratch tmp/ and .git."""
+    # The build does not need Git history, and hibernate-orm's is several hundred MB per copy.
+    skipped = [name for name in names if name == ".git"]
+    if os.path.basename(directory) in BUILD_DIR_NAMES:
+        skipped.extend(name for name in names if name in ("test-results", "reports"))
+    if "build.gradle" in names or "build.gradle.kts" in names:
+        skipped.extend(name for name in names if name == "tmp")
+    return skipped
+
+
+def purge_volume(volume: str, run: RunCommand = subprocess.run) -> None:
+    """Drop the cache volume; the next runner starts from an empty GRADLE_USER_HOME."""
+    run(["docker", "volume", "rm", "-f", volume], check=True, stdout=subprocess.DEVNULL)
+
+
+def compare_collections(cached: Path, clean: Path, limit: int = 20) -> List[str]:
+    """
+    Differences between a cached run and a clean run of the same cell (empty when identical).
+
+    Every testcase must exist on both sides with the same status; timings are ignored.
+    """
+    diff = diff_paths(clean, cached)
+    problems: List[str] = []
+    for label, keys in (
+        ("fails only with the cache", diff.newly_failing),
+        ("passes only with the cache", diff.newly_passing),
+        ("missing with the cache", diff.missing),
+        ("only with the cache", diff.new),
+    ):
+        problems.extend(f"{label}: {format_key(key)}" for key in keys[:limit])
+    with TestcaseIndex(resolve_index_path(clean)) as clean_index, TestcaseIndex(resolve_index_path(cached)) as cached_index:
+        clean_counts, cached_counts = clean_index.status_counts(), cached_index.status_counts()
+    if clean_counts != cached_counts:
+        problems.append(f"status counts differ: clean {clean_counts} vs cached {cached_counts}")
+    return problems
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="Manage the persistent Gradle cache used by the runner containers.")
+    ap.add_argument("--workspace", help="hibernate-orm workspace for --invalidate (default: WORKSPACE_DIR)")
+    ap.add_argument("--invalidate", action="store_true", help="Remove test outputs only (compiled classes are kept)")
+    ap.add_argument("--purge", action="store_true", help="Remove the Gradle cache volume")
+    ap.add_argument("--volume", default=volume_name(), help="Docker volume used as GRADLE_USER_HOME")
+    ap.add_argument(
+        "--compare",
+        nargs=2,
+        metavar=("CACHED", "CLEAN"),
+        help="Check that a cached-run collection matches a clean-run collection testcase by testcase",
+    )
+    return ap.parse_args(argv)
+
+
+def run(args: argparse.Namespace) -> List[str]:
+    problems: List[str] = []
+    if args.invalidate:
+        load_lab_env(required=() if args.workspace else ("WORKSPACE_DIR",))
+        workspace = Path(args.workspace).resolve() if args.workspace else resolve_workspace_dir()
+        removed = invalidate_test_outputs(workspace)
+        print(f"Removed {len(removed)} test output directories under {workspace}")
+    if args.purge:
+        purge_volume(args.volume)
+        print(f"Removed Gradle cache volume {args.volume}")
+    if args.compare:
+        cached, clean = (Path(path).resolve() for path in args.compare)
+        for path in (cached, clean):
+            if not resolve_index_path(path).exists():
+                raise FileNotFoundError(f"testcase index not found: {resolve_index_path(path)}")
+        problems = compare_collections(cached, clean)
+        if problems:
+            print(f"Cached run differs from the clean run ({len(problems)} difference(s)):")
+            for line in problems:
+                print(f"  {line}")
+        else:
+            print("Cached run matches the clean run testcase by testcase")
+    return problems
+
+
+def main() -> None:
+    args = parse_args()
+    try:
+        problems = run(args)
+    except (FileNotFoundError, subprocess.CalledProcessError) as exc:
+        print(f"ERROR: {exc}", file=sys.stderr)
+        sys.exit(1)
+    if problems:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+Track JUnit (and optionally Gradle task) trends across a Jenkins job's build history.
+
+- Resolves a build range (--from/--to, or the job's --last N builds).
+- Fetches each finished build concurrently (--concurrency) using the same
+  paged testReport requests as junit_pipeline_label_summary.py (and, with --with-tasks, the
+  WFAPI walk of jenkins_pipeline_tasks_summary.py).
+- Appends one JSON line per build to a local time-series store
+  ($TEMP_DIR/jenkins-trends/<job>.jsonl by default); builds already stored are
+  never refetched, so re-running over hundreds of builds only costs the new ones.
+- Prints a per-label series (--metric cases|duration|failed) for the most
+  recent builds and flags labels whose latest duration regressed against the
+  median of the preceding builds.
+
+Usage examples:
+  ./jenkins_build_trends.py https://ci.hibernate.org/job/hibernate-orm-nightly/job/main --last 30
+  ./jenkins_build_trends.py https://ci.hibernate.org/job/hibernate-orm-nightly/job/main --from 950 --to 1002 --metric failed
+  ./jenkins_build_trends.py https://ci.hibernate.org/job/hibernate-orm-nightly/job/main --last 20 --with-tasks --json-out tmp/trends.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import collections
+import json
+import re
+import statistics
+import sys
+import urllib.error
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import jenkins_http
+import jenkins_pipeline_tasks_summary as tasks_summary
+import junit_pipeline_label_summary as label_summary
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_REGRESSION_RATIO = 1.25
+METRICS = ("cases", "duration", "failed")
+FAILING_STATUSES = ("FAILED", "REGRESSION")
+STORE_DIRNAME = "jenkins-trends"
+
+
+# -------- Store --------
+
+def default_store_path(job_url: str) -> Optional[Path]:
+    """Return $TEMP_DIR/jenkins-trends/<job slug>.jsonl (None when TEMP_DIR is unknown)."""
+    cache_dir = jenkins_http.default_cache_dir()
+    if cache_dir is None:
+        return None
+    path = urllib.parse.urlsplit(job_url).path
+    slug = "-".join(part for part in path.split("/") if part and part != "job") or "job"
+    return cache_dir.parent / STORE_DIRNAME / f"{re.sub(r'[^A-Za-z0-9_.-]', '_', slug)}.jsonl"
+
+
+def load_store(path: Path) -> Dict[int, dict]:
+    """Read build records keyed by number (a later line for the same build wins)."""
+    records: Dict[int, dict] = {}
+    if not path.exists():
+        return records
+    with path.open("r", encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(record.get("build"), int):
+                records[record["build"]] = record
+    return records
+
+
+def append_store(path: Path, records: Iterable[dict]) -> int:
+    records = list(records)
+    if not records:
+        return 0
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a", encoding="utf-8") as fh:
+        for record in records:
+            fh.write(json.dumps(record, sort_keys=True) + "\n")
+    return len(records)
+
+
+def needs_fetch(record: Optional[dict], label_index: int, with_tasks: bool) -> bool:
+    if record is None:
+        return True
+    if record.get("label_index") != label_index:
+        return True
+    return with_tasks and "tasks" not in record
+
+
+# -------- Fetching --------
+
+def list_job_builds(job_url: str, last: int) -> List[int]:
+    """Return the numbers of the job's `last` most recent builds (newest first)."""
+    url = f"{job_url.rstrip('/')}/api/json?tree=builds[number]%7B0,{last}%7D"
+    data = label_summary.http_get(url, expect_json=True) or {}
+    return [int(b["number"]) for b in data.get("builds", []) if isinstance(b.get("number"), int)]
+
+
+def task_counts(build_url: str, stage_name: str, max_depth: int) -> Dict[str, Dict[str, int]]:
+    """Aggregate executed :*:test tasks over the stage graph (as jenkins_pipeline_tasks_summary does)."""
+    counts: Dict[str, tasks_summary.TaskCounters] = collections.defaultdict(tasks_summary.TaskCounters)
+    for sid in tasks_summary.find_stage_ids(build_url, stage_name):
+        nodes = tasks_summary.walk_descendants(build_url, sid, max_depth)
+        for scanned in tasks_summary.scan_nodes(build_url, nodes):
+            if not scanned:
+                continue
+            for task, upt, sk in scanned[1]:
+                counter = counts[task]
+                counter.seen += 1
+                counter.up_to_date += upt
+                counter.skipped += sk
+    return {task: counter.to_dict() for task, counter in sorted(counts.items())}
+
+
+def fetch_build_record(
+    job_url: str,
+    number: int,
+    label_index: int,
+    with_tasks: bool = False,
+    stage_name: str = "Test",
+    max_depth: int = 3,
+    page_size: int = label_summary.PAGE_SIZE,
+) -> Optional[dict]:
+    """Return the trend record for one finished build, or None if it is running, gone or has no report."""
+    build_url = f"{job_url.rstrip('/')}/{number}"
+    try:
+        info = label_summary.fetch_build_info(build_url)
+    except urllib.error.HTTPError as exc:
+        if exc.code == 404:
+            return None
+        raise
+    if not info or info.get("building") is not False:
+        return None
+    jenkins_http.register_finished_build(build_url, number)
+
+    if page_size > 0:
+        # Builds are already fetched in parallel, so pages are read one at a time
+        aggregator, _ = label_summary.fetch_test_report_paged(build_url, label_index, page_size=page_size, concurrency=1)
+    else:
+        aggregator = None
+        report = label_summary.fetch_test_report(build_url)
+        if report and "suites" in report:
+            aggregator = label_summary.LabelAggregator(label_index)
+            aggregator.overall["duration"] = float(report.get("duration", 0.0))
+            aggregator.add_suites(report.get("suites", []))
+    if aggregator is None:
+        aggregator = label_summary.LabelAggregator(label_index)
+    record = {
+        "build": number,
+        "timestamp": info.get("timestamp"),
+        "result": info.get("result"),
+        "label_index": label_index,
+        "has_report": aggregator.overall["suites"] > 0,
+        "overall": aggregator.overall,
+        "labels": aggregator.labels,
+    }
+    if with_tasks:
+        record["tasks"] = task_counts(build_url, stage_name, max_depth)
+    return record
+
+
+def fetch_records(
+    job_url: str,
+    numbers: List[int],
+    label_index: int,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    with_tasks: bool = False,
+    stage_name: str = "Test",
+    max_depth: int = 3,
+    page_size: int = label_summary.PAGE_SIZE,
+) -> List[dict]:
+    """Fetch build records with at most `concurrency` builds in flight; failures are reported and skipped."""
+
+    def _one(number: int) -> Optional[dict]:
+        try:
+            return fetch_build_record(job_url, number, label_index, with_tasks, stage_name, max_depth, page_size)
+        except Exception as exc:  # pylint: disable=broad-except
+            print(f"WARNING: build #{number}: {exc}", file=sys.stderr)
+            return None
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        return [record for record in pool.map(_one, numbers) if record is not None]
+
+
+# -------- Series --------
+
+def label_metric(bucket: dict, metric: str) -> float:
+    if metric == "failed":
+        return sum(bucket.get(status, 0) for status in FAILING_STATUSES)
+    return bucket.get(metric, 0)
+
+
+def build_series(records: List[dict], metric: str) -> Dict[str, List[Optional[float]]]:
+    """Return label -> values aligned with `records` (None where a build has no such label)."""
+    labels = sorted({label for record in records for label in record.get("labels", {})})
+    return {
+        label: [
+            label_metric(record["labels"][label], metric) if label in record.get("labels", {}) else None
+            for record in records
+        ]
+        for label in labels
+    }
+
+
+def task_series(records: List[dict]) -> Dict[str, List[Optional[int]]]:
+    tasks = sorted({task for record in records for task in record.get("tasks", {})})
+    return {
+        task: [record.get("tasks", {}).get(task, {}).get("seen") if "tasks" in record else None for record in records]
+        for task in tasks
+    }
+
+
+def duration_regressions(
+    records: List[dict], ratio: float = DEFAULT_REGRESSION_RATIO, window: int = 10
+) -> List[dict]:
+    """Labels whose duration in the latest build is at least `ratio` x the median of up to `window` prior builds."""
+    if len(records) < 2:
+        return []
+    latest = records[-1]
+    found = []
+    for label, values in build_series(records, "duration").items():
+        current = values[-1]
+        history = [value for value in values[:-1][-window:] if value]
+        if not current or not history:
+            continue
+        baseline = statistics.median(history)
+        if baseline > 0 and current >= baseline * ratio:
+            found.append({"label": label, "build": latest["build"], "baseline": baseline, "latest": current})
+    return sorted(found, key=lambda item: item["latest"] / item["baseline"], reverse=True)
+
+
+def format_value(value: Optional[float], metric: str) -> str:
+    if value is None:
+        return "-"
+    if metric == "duration":
+        return label_summary.format_duration(value)
+    return str(int(value))
+
+
+def print_series(records: List[dict], metric: str, show: int) -> None:
+    shown = records[-show:] if show else records
+    series = build_series(shown, metric)
+    print(f"\nPer-label {metric} (builds #{shown[0]['build']}..#{shown[-1]['build']}):")
+    header = f"{'Pipeline label':25}" + "".join(f" {'#' + str(r['build']):>10}" for r in shown)
+    print(header)
+    for label, values in series.items():
+        print(f"{label:25}" + "".join(f" {format_value(v, metric):>10}" for v in values))
+
+
+# -------- CLI --------
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="Aggregate per-label/per-task trends across a Jenkins job's builds.")
+    ap.add_argument("url", help="Job URL, e.g. https://ci.hibernate.org/job/hibernate-orm-nightly/job/main")
+    rng = ap.add_mutually_exclusive_group(required=True)
+    rng.add_argument("--last", type=int, metavar="N", help="Use the job's N most recent builds")
+    rng.add_argument("--from", dest="from_build", type=int, metavar="N", help="First build number (with --to)")
+    ap.add_argument("--to", dest="to_build", type=int, metavar="M", help="Last build number (default: --from)")
+    ap.add_argument("--label-index", type=int, default=-2,
+                    help="Index into enclosingBlockNames used as the pipeline label (default: -2)")
+    ap.add_argument("--with-tasks", action="store_true",
+                    help="Also record executed Gradle :*:test tasks per build (walks WFAPI logs; slower)")
+    ap.add_argument("--stage-name", default="Test", help="Stage scanned by --with-tasks (default: Test)")
+    ap.add_argument("--max-depth", type=int, default=3, help="WFAPI depth for --with-tasks (default: 3)")
+    ap.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                    help=f"Builds fetched in parallel (default: {DEFAULT_CONCURRENCY})")
+    ap.add_argument("--page-size", type=int, default=label_summary.PAGE_SIZE,
+                    help=f"Suites per testReport request (default: {label_summary.PAGE_SIZE}; 0 = whole report in one request)")
+    ap.add_argument("--store", help="Time-series JSONL file (default: $TEMP_DIR/jenkins-trends/<job>.jsonl)")
+    ap.add_argument("--metric", choices=METRICS, default="duration", help="Series printed per label (default: duration)")
+    ap.add_argument("--show", type=int, default=10, help="Most recent builds shown in the table (default: 10; 0 = all)")
+    ap.add_argument("--regression-ratio", type=float, default=DEFAULT_REGRESSION_RATIO,
+                    help=f"Flag labels whose latest duration is this many times the median (default: {DEFAULT_REGRESSION_RATIO})")
+    ap.add_argument("--json-out", help="Write the series and regressions to this path")
+    ap.add_argument("--no-cache", action="store_true", help="Bypass the on-disk HTTP response cache")
+    ap.add_argument("--cache-dir", help="HTTP cache directory (default: $TEMP_DIR/jenkins-http-cache)")
+    return ap.parse_args(argv)
+
+
+def resolve_build_numbers(args: argparse.Namespace, job_url: str) -> List[int]:
+    if args.last:
+        return sorted(list_job_builds(job_url, args.last))
+    to_build = args.to_build if args.to_build is not None else args.from_build
+    if to_build < args.from_build:
+        raise ValueError(f"--to {to_build} is before --from {args.from_build}")
+    return list(range(args.from_build, to_build + 1))
+
+
+def run(args: argparse.Namespace) -> dict:
+    """Fetch missing builds into the store, then print and return the trend series."""
+    job_url = label_summary.normalize_job_or_build_url(args.url)
+    store = Path(args.store).expanduser() if args.store else default_store_path(job_url)
+    if store is None:
+        raise RuntimeError("TEMP_DIR is not configured; pass --store PATH")
+    prev_cache = jenkins_http.configure_cache(
+        jenkins_http.resolve_cache_dir(getattr(args, "no_cache", False), getattr(args, "cache_dir", None))
+    )
+    try:
+        numbers = resolve_build_numbers(args, job_url)
+        stored = load_store(store)
+        missing = [n for n in numbers if needs_fetch(stored.get(n), args.label_index, args.with_tasks)]
+        print(f"Job:    {job_url}")
+        print(f"Builds: {len(numbers)} requested, {len(numbers) - len(missing)} already in {store}, fetching {len(missing)}")
+
+        fetched = fetch_records(
+            job_url,
+            missing,
+            args.label_index,
+            concurrency=args.concurrency,
+            with_tasks=args.with_tasks,
+            stage_name=args.stage_name,
+            max_depth=args.max_depth,
+            page_size=getattr(args, "page_size", label_summary.PAGE_SIZE),
+        )
+        append_store(store, fetched)
+        for record in fetched:
+            stored[record["build"]] = record
+
+        records = [stored[n] for n in numbers if n in stored and stored[n].get("label_index") == args.label_index]
+        if not records:
+            raise RuntimeError("No finished builds with results in the requested range.")
+
+        print_series(records, args.metric, args.show)
+        regressions = duration_regressions(records, args.regression_ratio)
+        if regressions:
+            print(f"\nDuration regressions in #{records[-1]['build']} (>= {args.regression_ratio:g}x median of prior builds):")
+            for item in regressions:
+                change = 100.0 * (item["latest"] / item["baseline"] - 1)
+                print(
+                    f"  {item['label']:25} {label_summary.format_duration(item['baseline']):>10} -> "
+                    f"{label_summary.format_duration(item['latest']):>10}  (+{change:.0f}%)"
+                )
+
+        result = {
+            "job_url": job_url,
+            "store": str(store),
+            "builds": [record["build"] for record in records],
+            "fetched": [record["build"] for record in fetched],
+            "series": {metric: build_series(records, metric) for metric in METRICS},
+            "tasks": task_series(records) if args.with_tasks else {},
+            "regressions": regressions,
+        }
+        if args.json_out:
+            Path(args.json_out).write_text(json.dumps(result, indent=2), encoding="utf-8")
+            print(f"\nWrote JSON trends to: {args.json_out}")
+        return result
+    finally:
+        jenkins_http.restore_cache(prev_cache)
+
+
+def main() -> None:
+    args = parse_args()
+    try:
+        run(args)
+    except Exception as exc:  # pylint: disable=broad-except
+        print(f"ERROR: trend aggregation failed: {exc}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,752 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP transport for the Jenkins/WFAPI scrapers (stdlib only).
+
+Each thread keeps one persistent (keep-alive) connection per host, so the
+thread pools in jenkins_pipeline_tasks_summary.py reuse TLS sessions instead of
+reconnecting for every describe/log request. HTTP errors surface as
+urllib.error.HTTPError, matching what the scripts caught when they used urlopen
+directly. When a proxy is configured in the environment we defer to urlopen,
+which knows how to tunnel.
+
+Requests advertise Accept-Encoding: gzip and compressed bodies are inflated as
+they stream (Jenkins gzips JSON and console text well, typically 5-10x).
+Timeouts, dropped connections and 429/5xx responses are retried up to RETRIES
+times with jittered exponential backoff (honouring Retry-After), before any
+body byte reaches the caller. Every network request is timed: request_summary()
+reports counts, retries, bytes and latency percentiles, and configure_trace()
+prints one line per request to stderr (the scripts enable both with --verbose).
+
+Responses can be kept in an on-disk cache (TEMP_DIR/jenkins-http-cache by
+default, one file per URL hash):
+  - entries with an ETag/Last-Modified are revalidated with a conditional GET;
+  - once a script learns that a numbered build has finished
+    (register_finished_build), everything under that build URL is immutable and
+    is served from disk without contacting Jenkins, now and in later runs.
+    lastBuild/lastSuccessfulBuild URLs are rewritten to the build number so
+    they share those entries;
+  - the cache is capped in size, evicting the least recently used entries.
+
+Bodies are streamed: open_url()/stream() yield chunks, iter_lines() decodes them
+incrementally and ProgressiveText reads a log from a byte offset, so node logs
+of any size are scanned in bounded memory.
+"""
+
+from __future__ import annotations
+
+import codecs
+import hashlib
+import http.client
+import io
+import json
+import os
+import random
+import ssl
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from env_utils import resolve_lab_env_map
+
+TIMEOUT = 30
+MAX_REDIRECTS = 5
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+# Errors raised when the server closed an idle keep-alive connection; retried once.
+STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.CannotSendRequest,
+    http.client.BadStatusLine,
+    ConnectionResetError,
+    BrokenPipeError,
+)
+CACHE_DIRNAME = "jenkins-http-cache"
+DEFAULT_CACHE_MAX_BYTES = 512 * 1024 * 1024
+BUILD_ALIASES = ("lastBuild", "lastSuccessfulBuild", "lastCompletedBuild")
+# Response headers replayed for cached entries (progressiveText resume offsets)
+CACHED_HEADERS = ("Content-Type", "X-Text-Size", "X-More-Data")
+STREAM_CHUNK_SIZE = 256 * 1024
+RETRIES = 3
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+BACKOFF_BASE = 0.5  # seconds; attempt n sleeps uniformly in [0, min(BACKOFF_CAP, BASE * 2**n)]
+BACKOFF_CAP = 8.0
+RETRY_AFTER_CAP = 60.0
+
+_local = threading.local()
+_cache: Optional["ResponseCache"] = None
+_finished_builds: Dict[str, str] = {}  # alias or numbered build URL -> numbered build URL
+_finished_lock = threading.Lock()
+_trace = False
+_timings: List[Tuple[float, int, int]] = []  # (seconds, wire bytes, retries) per completed request
+_failures = 0
+_timings_lock = threading.Lock()
+
+
+def _connections() -> Dict[Tuple[str, str], http.client.HTTPConnection]:
+    conns = getattr(_local, "connections", None)
+    if conns is None:
+        conns = _local.connections = {}
+    return conns
+
+
+def _connection(scheme: str, netloc: str, timeout: float) -> http.client.HTTPConnection:
+    key = (scheme, netloc)
+    conns = _connections()
+    conn = conns.get(key)
+    if conn is None:
+        cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        conn = conns[key] = cls(netloc, timeout=timeout)
+    return conn
+
+
+def _drop_connection(scheme: str, netloc: str) -> None:
+    conn = _connections().pop((scheme, netloc), None)
+    if conn is not None:
+        conn.close()
+
+
+def close_connections() -> None:
+    """Close the calling thread's persistent connections."""
+    conns = _connections()
+    for conn in conns.values():
+        conn.close()
+    conns.clear()
+
+
+# -------- Response cache --------
+
+class ResponseCache:
+    """
+    URL-keyed response store: ROOT/<sha256[:2]>/<sha256> holds the raw body and
+    <sha256>.json its metadata (validators, permanence, selected headers). The
+    body's mtime is the entry's LRU timestamp (refreshed on every hit).
+    """
+
+    def __init__(self, root: Path, max_bytes: int = DEFAULT_CACHE_MAX_BYTES) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self._size: Optional[int] = None
+        self._lock = threading.Lock()
+        # Counters are bumped from worker threads; kept apart from _lock, which is held during eviction.
+        self._stats_lock = threading.Lock()
+
+    def _path(self, url: str) -> Path:
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.root / digest[:2] / digest
+
+    def lookup(self, url: str) -> Optional[dict]:
+        """Return the metadata of a complete entry for `url` (marking it recently used), or None."""
+        path = self._path(url)
+        try:
+            meta = json.loads(path.with_suffix(".json").read_text(encoding="utf-8"))
+            size = path.stat().st_size
+        except (OSError, ValueError):
+            return None
+        if meta.get("url") != url or meta.get("size") != size:
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return meta
+
+    def iter_body(self, url: str, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+        with open(self._path(url), "rb") as fh:
+            while True:
+                chunk = fh.read(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+
+    def get(self, url: str) -> Optional[Tuple[dict, bytes]]:
+        meta = self.lookup(url)
+        if meta is None:
+            return None
+        try:
+            return meta, self._path(url).read_bytes()
+        except OSError:
+            return None
+
+    def _write_meta(self, url: str, meta: dict) -> int:
+        data = json.dumps(meta, separators=(",", ":")).encode("utf-8")
+        meta_path = self._path(url).with_suffix(".json")
+        tmp_path = meta_path.with_name(f"{meta_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, meta_path)
+        return len(data)
+
+    def store(self, url: str, chunks: Iterable[bytes], meta: dict) -> Iterator[bytes]:
+        """
+        Pass `chunks` through while writing them to the entry for `url`.
+
+        The entry is committed only if the stream is consumed completely; an
+        abandoned or failed stream leaves any previous entry untouched.
+        """
+        path = self._path(url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        size = 0
+        complete = False
+        try:
+            with open(tmp_path, "wb") as fh:
+                for chunk in chunks:
+                    fh.write(chunk)
+                    size += len(chunk)
+                    yield chunk
+            complete = True
+        finally:
+            if not complete:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+        try:
+            previous = self._entry_size(path)
+            os.replace(tmp_path, path)
+            written = size + self._write_meta(url, dict(meta, url=url, size=size, stored=int(time.time())))
+        except OSError:
+            return
+        self._account(written - previous)
+
+    def put(self, url: str, body: bytes, meta: dict) -> None:
+        for _chunk in self.store(url, (body,), meta):
+            pass
+
+    def mark_permanent(self, url: str, meta: dict) -> None:
+        try:
+            self._write_meta(url, dict(meta, permanent=True))
+        except OSError:
+            pass
+
+    @staticmethod
+    def _entry_size(path: Path) -> int:
+        total = 0
+        for item in (path, path.with_suffix(".json")):
+            try:
+                total += item.stat().st_size
+            except OSError:
+                pass
+        return total
+
+    def _account(self, delta: int) -> None:
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _mtime, size, _path in self._entries())
+            else:
+                self._size += delta
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _entries(self) -> List[Tuple[int, int, Path]]:
+        """Return (mtime_ns, size of body + metadata, body path) for every stored entry."""
+        entries = []
+        if not self.root.is_dir():
+            return entries
+        for bucket in os.scandir(self.root):
+            if not bucket.is_dir():
+                continue
+            for entry in os.scandir(bucket.path):
+                if not entry.is_file() or "." in entry.name:
+                    continue
+                path = Path(entry.path)
+                try:
+                    entries.append((entry.stat().st_mtime_ns, self._entry_size(path), path))
+                except OSError:
+                    continue
+        return entries
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until the cache is back under 90% of the cap."""
+        entries = sorted(self._entries())
+        size = sum(item[1] for item in entries)
+        target = int(self.max_bytes * 0.9)
+        for _mtime, entry_size, path in entries:
+            if size <= target:
+                break
+            for item in (path.with_suffix(".json"), path):
+                try:
+                    os.unlink(item)
+                except OSError:
+                    pass
+            size -= entry_size
+        self._size = size
+
+    def record(self, outcome: str) -> None:
+        """Count a lookup outcome: "hits", "revalidated" or "misses"."""
+        with self._stats_lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return {"hits": self.hits, "revalidated": self.revalidated, "misses": self.misses}
+
+
+def default_cache_dir() -> Optional[Path]:
+    """Return TEMP_DIR/jenkins-http-cache (TEMP_DIR from the environment or the lab .env)."""
+    temp_dir = os.environ.get("TEMP_DIR")
+    if not temp_dir:
+        try:
+            temp_dir = resolve_lab_env_map()[0].get("TEMP_DIR")
+        except SystemExit:
+            temp_dir = None
+    return Path(temp_dir).expanduser() / CACHE_DIRNAME if temp_dir else None
+
+
+def resolve_cache_dir(no_cache: bool = False, cache_dir: Optional[str] = None) -> Optional[Path]:
+    """Map the scripts' --no-cache/--cache-dir flags to a cache directory (None = disabled)."""
+    if no_cache:
+        return None
+    return Path(cache_dir).expanduser() if cache_dir else default_cache_dir()
+
+
+def configure_cache(
+    cache_dir: Optional[Path], max_bytes: int = DEFAULT_CACHE_MAX_BYTES
+) -> Optional[ResponseCache]:
+    """Install (or, with None, disable) the process-wide cache; returns the previous one."""
+    global _cache
+    previous = _cache
+    _cache = ResponseCache(cache_dir, max_bytes) if cache_dir is not None else None
+    return previous
+
+
+def restore_cache(previous: Optional[ResponseCache]) -> None:
+    global _cache
+    _cache = previous
+    with _finished_lock:
+        _finished_builds.clear()
+
+
+def cache_stats() -> Optional[Dict[str, int]]:
+    return _cache.stats() if _cache is not None else None
+
+
+def register_finished_build(build_url: str, number) -> Optional[str]:
+    """
+    Record that `build_url` (numbered or lastBuild-style) is the finished build `number`.
+
+    Returns the numbered build URL whose responses are now cached permanently,
+    or None when `number` is not a build number.
+    """
+    number = str(number)
+    if not number.isdigit():
+        return None
+    base = build_url.rstrip("/")
+    head, _, tail = base.rpartition("/")
+    if tail == number:
+        numbered = base
+    elif tail in BUILD_ALIASES:
+        numbered = f"{head}/{number}"
+    else:
+        return None
+    with _finished_lock:
+        _finished_builds[base] = numbered
+        _finished_builds[numbered] = numbered
+    return numbered
+
+
+def _canonical(url: str) -> Tuple[str, bool]:
+    """Rewrite alias build URLs to their number; report whether url is under a finished build."""
+    with _finished_lock:
+        if not _finished_builds:
+            return url, False
+        for prefix, numbered in _finished_builds.items():
+            if url == prefix or url.startswith(prefix + "/"):
+                return numbered + url[len(prefix):], True
+    return url, False
+
+
+class Response:
+    """A GET response whose body is streamed in chunks (from the network or the cache)."""
+
+    def __init__(self, headers: Mapping[str, str], chunks: Iterator[bytes]) -> None:
+        self.headers = headers
+        self._chunks = chunks
+
+    def __iter__(self) -> Iterator[bytes]:
+        return self._chunks
+
+    def read(self) -> bytes:
+        return b"".join(self._chunks)
+
+    def close(self) -> None:
+        close = getattr(self._chunks, "close", None)
+        if close is not None:
+            close()
+
+    def __enter__(self) -> "Response":
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.close()
+
+
+# -------- Request timing --------
+
+def configure_trace(enabled: bool) -> bool:
+    """Print one timing line per network request to stderr; returns the previous setting."""
+    global _trace
+    previous = _trace
+    _trace = enabled
+    return previous
+
+
+def reset_request_stats() -> None:
+    global _failures
+    with _timings_lock:
+        _timings.clear()
+        _failures = 0
+
+
+def _record(url: str, status, started: float, size: int, retries: int, gzipped: bool = False) -> None:
+    global _failures
+    elapsed = time.perf_counter() - started
+    with _timings_lock:
+        if status is None:
+            _failures += 1
+        else:
+            _timings.append((elapsed, size, retries))
+    if _trace:
+        notes = (" gzip" if gzipped else "") + (f" retries={retries}" if retries else "")
+        print(f"  [http] {status or 'ERR'} {elapsed:7.3f}s {size / 1024:9.1f} KiB{notes}  {url}", file=sys.stderr)
+
+
+def request_stats() -> Dict[str, float]:
+    """Aggregate timings of the network requests made since the last reset (cache hits excluded)."""
+    with _timings_lock:
+        timings = sorted(_timings)
+        failures = _failures
+    stats: Dict[str, float] = {
+        "requests": len(timings),
+        "failed": failures,
+        "retries": sum(item[2] for item in timings),
+        "bytes": sum(item[1] for item in timings),
+        "seconds": sum(item[0] for item in timings),
+    }
+    if timings:
+        stats["p50"] = timings[len(timings) // 2][0]
+        stats["p95"] = timings[min(len(timings) - 1, int(len(timings) * 0.95))][0]
+        stats["max"] = timings[-1][0]
+    return stats
+
+
+def request_summary() -> Optional[str]:
+    """One-line summary of request_stats() for --verbose output, or None if nothing was fetched."""
+    stats = request_stats()
+    if not stats["requests"] and not stats["failed"]:
+        return None
+    line = (
+        f"HTTP requests: {stats['requests']} ok, {stats['failed']} failed, {stats['retries']} retried, "
+        f"{stats['bytes'] / (1024 * 1024):.1f} MiB on the wire"
+    )
+    if stats["requests"]:
+        line += f"; latency p50 {stats['p50']:.3f}s, p95 {stats['p95']:.3f}s, max {stats['max']:.3f}s"
+    return line
+
+
+# -------- Transport --------
+
+def _read_chunks(resp, conn: Optional[http.client.HTTPConnection], chunk_size: int) -> Iterator[bytes]:
+    """Yield the body of `resp`; a connection abandoned mid-body is closed (it reopens on next use)."""
+    complete = False
+    try:
+        while True:
+            chunk = resp.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+        complete = True
+    finally:
+        if conn is None:
+            resp.close()
+        elif not complete:
+            conn.close()
+
+
+def _timed(
+    url: str, status: int, chunks: Iterator[bytes], started: float, retries: int, gzipped: bool
+) -> Iterator[bytes]:
+    """Pass the wire chunks through and record the request once the body is read (or abandoned)."""
+    size = 0
+    failed = False
+    try:
+        for chunk in chunks:
+            size += len(chunk)
+            yield chunk
+    except Exception:
+        failed = True
+        raise
+    finally:
+        chunks.close()
+        _record(url, None if failed else status, started, size, retries, gzipped)
+
+
+def _gunzip(chunks: Iterator[bytes], chunk_size: int) -> Iterator[bytes]:
+    """Inflate a gzip-encoded body incrementally, yielding at most chunk_size bytes at a time."""
+    inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    try:
+        for chunk in chunks:
+            while chunk:
+                data = inflater.decompress(chunk, chunk_size)
+                if data:
+                    yield data
+                chunk = inflater.unconsumed_tail
+        tail = inflater.flush()
+        if tail:
+            yield tail
+    finally:
+        chunks.close()
+
+
+def _is_gzip(headers) -> bool:
+    return (headers.get("Content-Encoding") or "").strip().lower() == "gzip"
+
+
+def _urlopen(url: str, headers: Dict[str, str], timeout: float, chunk_size: int):
+    req = urllib.request.Request(url, headers=headers)
+    try:
+        resp = urllib.request.urlopen(req, timeout=timeout)
+    except urllib.error.HTTPError as exc:
+        if exc.code == 304:
+            return 304, exc.headers, iter(())
+        raise
+    return resp.status, resp.headers, _read_chunks(resp, None, chunk_size)
+
+
+def _open_once(url: str, headers: Dict[str, str], timeout: float, chunk_size: int):
+    """GET `url` (following redirects); return (status, headers, raw body chunks) for 2xx/304."""
+    if urllib.request.getproxies():
+        return _urlopen(url, headers, timeout, chunk_size)
+
+    for _ in range(MAX_REDIRECTS + 1):
+        parts = urllib.parse.urlsplit(url)
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        for attempt in range(2):
+            conn = _connection(parts.scheme, parts.netloc, timeout)
+            try:
+                conn.request("GET", target, headers=headers)
+                resp = conn.getresponse()
+                break
+            except STALE_CONNECTION_ERRORS:
+                _drop_connection(parts.scheme, parts.netloc)
+                if attempt:
+                    raise
+            except OSError:
+                _drop_connection(parts.scheme, parts.netloc)
+                raise
+
+        location = resp.getheader("Location")
+        if resp.status in REDIRECT_STATUSES and location:
+            resp.read()
+            url = urllib.parse.urljoin(url, location)
+            continue
+        if resp.status >= 400:
+            body = resp.read()
+            if _is_gzip(resp.headers):
+                try:
+                    body = zlib.decompress(body, 16 + zlib.MAX_WBITS)
+                except zlib.error:
+                    pass
+            raise urllib.error.HTTPError(url, resp.status, resp.reason, resp.headers, io.BytesIO(body))
+        if resp.status == 304:
+            resp.read()
+            return 304, resp.headers, iter(())
+        return resp.status, resp.headers, _read_chunks(resp, conn, chunk_size)
+
+    raise urllib.error.HTTPError(url, 310, "Too many redirects", None, None)
+
+
+def _retry_delay(exc: BaseException, attempt: int) -> Optional[float]:
+    """Seconds to wait before retrying after `exc`, or None if it is not transient."""
+    if isinstance(exc, urllib.error.HTTPError):
+        if exc.code not in RETRY_STATUSES:
+            return None
+        retry_after = (exc.headers.get("Retry-After") or "").strip() if exc.headers else ""
+        if retry_after.isdigit():
+            return min(float(retry_after), RETRY_AFTER_CAP)
+    elif isinstance(exc, ssl.SSLCertVerificationError):
+        return None
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+def _open(url: str, headers: Dict[str, str], timeout: float, chunk_size: int):
+    """
+    GET `url` with retries; return (status, headers, decoded body chunks) for 2xx/304.
+
+    Only the request and response headers are retried: once chunks are handed
+    out, a failure mid-body propagates to the caller.
+    """
+    headers = dict(headers)
+    headers.setdefault("Accept-Encoding", "gzip")
+    started = time.perf_counter()
+    attempt = 0
+    while True:
+        try:
+            status, resp_headers, chunks = _open_once(url, headers, timeout, chunk_size)
+            break
+        except (OSError, http.client.HTTPException) as exc:
+            delay = _retry_delay(exc, attempt) if attempt < RETRIES else None
+            if delay is None:
+                _record(url, None, started, 0, attempt)
+                raise
+            if _trace:
+                print(f"  [http] retry {attempt + 1}/{RETRIES} in {delay:.1f}s after {exc}: {url}", file=sys.stderr)
+            time.sleep(delay)
+            attempt += 1
+
+    if status == 304:
+        _record(url, 304, started, 0, attempt)
+        return status, resp_headers, chunks
+    gzipped = _is_gzip(resp_headers)
+    chunks = _timed(url, status, chunks, started, attempt, gzipped)
+    if gzipped:
+        chunks = _gunzip(chunks, chunk_size)
+    return status, resp_headers, chunks
+
+
+def open_url(
+    url: str,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: float = TIMEOUT,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+) -> Response:
+    """
+    GET `url` over a keep-alive connection and return a streamed Response.
+
+    Follows redirects; raises urllib.error.HTTPError for 4xx/5xx responses.
+    Goes through the response cache when one is configured; bodies are written
+    to the cache as they stream, so large logs never sit in memory.
+    """
+    headers = dict(headers or {})
+    cache = _cache
+    if cache is None:
+        _status, resp_headers, chunks = _open(url, headers, timeout, chunk_size)
+        return Response(resp_headers, chunks)
+
+    url, permanent = _canonical(url)
+    meta = cache.lookup(url)
+    if meta is not None:
+        if meta.get("permanent"):
+            cache.record("hits")
+            return Response(meta.get("headers") or {}, cache.iter_body(url, chunk_size))
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    status, resp_headers, chunks = _open(url, headers, timeout, chunk_size)
+    if status == 304 and meta is not None:
+        cache.record("revalidated")
+        if permanent:
+            cache.mark_permanent(url, meta)
+        return Response(meta.get("headers") or {}, cache.iter_body(url, chunk_size))
+
+    cache.record("misses")
+    etag = resp_headers.get("ETag")
+    last_modified = resp_headers.get("Last-Modified")
+    if status == 200 and (permanent or etag or last_modified):
+        kept = {name: resp_headers[name] for name in CACHED_HEADERS if resp_headers.get(name) is not None}
+        meta = {"etag": etag, "last_modified": last_modified, "permanent": permanent, "headers": kept}
+        chunks = cache.store(url, chunks, meta)
+    return Response(resp_headers, chunks)
+
+
+def fetch(url: str, headers: Optional[Dict[str, str]] = None, timeout: float = TIMEOUT) -> bytes:
+    """GET `url` and return the whole response body (see open_url)."""
+    with open_url(url, headers=headers, timeout=timeout) as resp:
+        return resp.read()
+
+
+def stream(
+    url: str,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: float = TIMEOUT,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """Yield the response body of `url` in chunks of at most `chunk_size` bytes."""
+    with open_url(url, headers=headers, timeout=timeout, chunk_size=chunk_size) as resp:
+        yield from resp
+
+
+class ProgressiveText:
+    """
+    Iterate the chunks of a Jenkins log from byte offset `start` via
+    LOG_URL/progressiveText?start=N.
+
+    Once the iteration completes, `offset` holds the X-Text-Size reported by
+    Jenkins (where the next read should resume) and `more` tells whether the
+    log was still growing (X-More-Data). Iterating again reads the bytes added
+    since. With whole_lines=True, a trailing partial line of a growing log is
+    held back and prepended to the next read, so a line is never split across
+    polls.
+    """
+
+    def __init__(
+        self,
+        log_url: str,
+        start: int = 0,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: float = TIMEOUT,
+        chunk_size: int = STREAM_CHUNK_SIZE,
+        whole_lines: bool = False,
+    ) -> None:
+        self.log_url = log_url.rstrip("/")
+        self.offset = start
+        self.more = False
+        self.whole_lines = whole_lines
+        self._partial = b""
+        self._headers = headers
+        self._timeout = timeout
+        self._chunk_size = chunk_size
+
+    def __iter__(self) -> Iterator[bytes]:
+        url = f"{self.log_url}/progressiveText?start={self.offset}"
+        with open_url(url, headers=self._headers, timeout=self._timeout, chunk_size=self._chunk_size) as resp:
+            size = self.offset
+            carry = self._partial
+            for chunk in resp:
+                size += len(chunk)
+                if not self.whole_lines:
+                    yield chunk
+                    continue
+                data = carry + chunk if carry else chunk
+                cut = data.rfind(b"\n") + 1
+                carry = data[cut:]
+                if cut:
+                    yield data[:cut]
+            text_size = resp.headers.get("X-Text-Size")
+            self.offset = int(text_size) if text_size and text_size.isdigit() else size
+            self.more = (resp.headers.get("X-More-Data") or "").lower() == "true"
+            self._partial = carry if self.more else b""
+            if carry and not self.more:
+                yield carry
+
+
+def iter_lines(chunks: Iterable[bytes], encoding: str = "utf-8") -> Iterator[str]:
+    """
+    Decode byte chunks incrementally and yield lines without terminators.
+
+    Produces the same lines as body.decode(encoding, "replace").splitlines()
+    while holding at most one chunk plus a partial line in memory.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    pending = ""
+    for chunk in chunks:
+        text = pending + decoder.decode(chunk)
+        if not text:
+            continue
+        # The last piece may be incomplete (or a "\r" whose "\n" is in the next chunk).
+        last = text.splitlines(True)[-1]
+        pending = last
+        if len(last) < len(text):
+            yield from text[: len(text) - len(last)].splitlines()
+    tail = pending + decoder.decode(b"", final=True)
+    if tail:
+        yield from tail.splitlines()
@@ -6,8 +6,11 @@ Summarize Jenkins Pipeline (WFAPI) logs to list executed Gradle :*:test tasks.
 What it does
 ------------
 - Pins a job URL to a concrete build (:lastBuild, :lastSuccessfulBuild, or a number).
-- Walks the Pipeline "Test" stage (configurable) via WFAPI.
-- Fetches step logs (node logs) and scans for Gradle task execution lines:
+- Walks the Pipeline "Test" stage (configurable) via WFAPI, breadth-first with a
+  bounded pool of keep-alive connections; every node is described only once.
+- Caches responses on disk (TEMP_DIR/jenkins-http-cache); a finished build is
+  served from the cache on repeat runs (--no-cache to bypass).
+- Fetches step logs (node logs) in parallel and scans for Gradle task execution lines:
     > Task :hibernate-core:test
 - Counts occurrences, and flags "UP-TO-DATE" / "SKIPPED" markers near those tasks.
 - Reconstructs a best-effort Pipeline context path (Stage → Parallel branch → ...).
@@ -18,7 +21,8 @@ Usage
     jenkins_pipeline_tasks_summary.py https://ci.hibernate.org/job/hibernate-orm-nightly/job/main --last-success
     jenkins_pipeline_tasks_summary.py <job-or-build-url> [--last | --last-success | --build N]
                                       [--stage-name Test] [--label-filter mysql_8_0]
-                                      [--modules-per-label] [--json-out scope_tasks.json] [-v]
+                                      [--modules-per-label] [--json-out scope_tasks.json]
+                                      [--concurrency 8] [--no-cache] [-v]
 """
 
 import argparse
@@ -29,14 +33,19 @@ import re
 import sys
 import time
 import urllib.error
-import urllib.request
-from typing import Dict, List, Tuple, Optional, Set
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Tuple, Optional, Set
 
-UA = "jenkins-pipeline-tasks-summary/1.0"
+import jenkins_http
+
+UA = "jenkins-pipeline-tasks-summary/1.3"
 TIMEOUT = 30
 VERBOSE = False
 FILTER_LABEL = None
 MODULES_PER_LABEL = False
+CONCURRENCY = 8
+# WFAPI run statuses after which a build's graph and logs no longer change
+FINISHED_STATUSES = {"SUCCESS", "FAILED", "ABORTED", "UNSTABLE", "NOT_BUILT"}
 
 # Match both plain text and HTML-encoded task lines
 # Plain: "> Task :module:test"
@@ -58,10 +67,8 @@ def http_get_json(url: str, ignore_404: bool = False) -> Optional[dict]:
     Fetch JSON from a URL. Returns None on error.
     If ignore_404=True, will log and return None on 404 instead of raising.
     """
-    req = urllib.request.Request(url, headers={"User-Agent": UA})
     try:
-        with urllib.request.urlopen(req, timeout=TIMEOUT) as r:
-            data = r.read()
+        data = jenkins_http.fetch(url, headers={"User-Agent": UA}, timeout=TIMEOUT)
         return json.loads(data.decode("utf-8", "replace"))
     except urllib.error.HTTPError as e:
         if e.code == 404:
@@ -113,55 +120,63 @@ def wfapi_describe_node(build_url: str, node_id: str) -> Optional[dict]:
         print(f"  Fetching node description: {url}", file=sys.stderr)
     return http_get_json(url, ignore_404=True)
 
-def wfapi_children(build_url: str, node_id: str) -> List[dict]:
+def wfapi_log_lines(build_url: str, node_id: str, start: Optional[int] = None) -> Iterator[str]:
     """
-    Get children of a node from its stageFlowNodes. Returns empty list if not found.
-    """
-    desc = wfapi_describe_node(build_url, node_id)
-    if not desc:
-        return []
-    # Children are in the stageFlowNodes array
-    return desc.get("stageFlowNodes", [])
-
-def wfapi_log_lines(build_url: str, node_id: str) -> List[str]:
-    """
-    Get log lines for a node. Returns empty list if endpoint fails.
-    Uses the console log endpoint to get complete logs (WFAPI log is truncated).
+    Stream log lines for a node; stops quietly if the endpoint fails before the first
+    line, and warns on stderr if the log breaks off after some lines were read.
+    Uses the console log endpoint to get complete logs (WFAPI log is truncated), decoding it
+    chunk by chunk so memory stays bounded however large the log is.
+    With `start`, reads log/progressiveText from that byte offset instead.
     """
     # Use console log endpoint which returns full text, not truncated like wfapi/log
     url = build_url.rstrip("/") + f"/execution/node/{node_id}/log"
     if VERBOSE:
         print(f"  Fetching logs: {url}", file=sys.stderr)
-    
-    req = urllib.request.Request(url, headers={"User-Agent": UA})
+
+    headers = {"User-Agent": UA}
+    if start is None:
+        chunks = jenkins_http.stream(url, headers=headers, timeout=TIMEOUT)
+    else:
+        chunks = jenkins_http.ProgressiveText(url, start, headers=headers, timeout=TIMEOUT)
+    read = 0
     try:
-        with urllib.request.urlopen(req, timeout=TIMEOUT) as r:
-            data = r.read()
-        text = data.decode("utf-8", "replace")
-        return text.splitlines()
+        for line in jenkins_http.iter_lines(chunks):
+            read += 1
+            yield line
     except urllib.error.HTTPError as e:
-        if e.code == 404:
+        if read:
+            _warn_truncated_log(node_id, read, f"HTTP {e.code}")
+        elif e.code == 404:
             if VERBOSE:
                 print(f"  [404] {url}", file=sys.stderr)
-            return []
-        if VERBOSE:
+        elif VERBOSE:
             print(f"  [HTTP {e.code}] {url}", file=sys.stderr)
-        return []
     except Exception as e:
-        if VERBOSE:
+        if read:
+            _warn_truncated_log(node_id, read, str(e))
+        elif VERBOSE:
             print(f"  [ERROR] {url}: {e}", file=sys.stderr)
-        return []
 
-def node_display_name(build_url: str, node_id: str) -> str:
-    """
-    Get display name for a node. Returns node_id if lookup fails.
-    """
-    desc = wfapi_describe_node(build_url, node_id)
+def _warn_truncated_log(node_id: str, lines: int, reason: str) -> None:
+    """A log that broke off mid-stream is still scanned, so say its node may be undercounted."""
+    print(
+        f"WARNING: log of node {node_id} truncated after {lines} lines ({reason}); its Gradle tasks may be undercounted",
+        file=sys.stderr,
+    )
+
+def display_name_from(desc: Optional[dict], node_id: str) -> str:
+    """Pick a node's display name from its describe payload (node_id if unavailable)."""
     if isinstance(desc, dict):
         # Prefer parameterDescription (for parameterized steps), then name, fallback to id
         return desc.get("parameterDescription") or desc.get("name") or str(node_id)
     return str(node_id)
 
+def node_display_name(build_url: str, node_id: str) -> str:
+    """
+    Get display name for a node. Returns node_id if lookup fails.
+    """
+    return display_name_from(wfapi_describe_node(build_url, node_id), node_id)
+
 # -------- Graph traversal --------
 
 def find_stage_ids(build_url: str, stage_name: str) -> List[str]:
@@ -171,6 +186,8 @@ def find_stage_ids(build_url: str, stage_name: str) -> List[str]:
     d = wfapi_describe(build_url)
     if not d:
         return []
+    if d.get("status") in FINISHED_STATUSES:
+        jenkins_http.register_finished_build(build_url, d.get("id"))
     stages = d.get("stages") or []
     ids = []
     for st in stages:
@@ -181,40 +198,69 @@ def find_stage_ids(build_url: str, stage_name: str) -> List[str]:
                 ids.append(str(sid))
     return ids
 
+def _describe_many(build_url: str, node_ids: Iterable[str],
+                   cache: Dict[str, Optional[dict]], pool: ThreadPoolExecutor) -> None:
+    """Fill `cache` with describes for node_ids not fetched yet (one parallel batch)."""
+    pending = list(dict.fromkeys(nid for nid in node_ids if nid not in cache))
+    for nid, desc in zip(pending, pool.map(lambda nid: _safe_describe(build_url, nid), pending)):
+        cache[nid] = desc
+
+def _safe_describe(build_url: str, node_id: str) -> Optional[dict]:
+    try:
+        return wfapi_describe_node(build_url, node_id)
+    except Exception as exc:
+        if VERBOSE:
+            print(f"  [ERROR] describe {node_id}: {exc}", file=sys.stderr)
+        return None
+
+def _child_ids(desc: Optional[dict]) -> List[str]:
+    if not desc:
+        return []
+    return [str(kid.get("id")) for kid in desc.get("stageFlowNodes", [])]
+
 def walk_descendants(build_url: str, root_id: str, max_depth: int = 3) -> List[Tuple[str, List[str]]]:
     """
-    DFS walk from a stage root (root_id), up to max_depth levels,
+    Walk from a stage root (root_id), up to max_depth levels,
     returning (node_id, context_path[]) for each node that has logs.
 
     context_path is a list of display names: [Stage, Branch, ... , Node]
+
+    Describes are fetched breadth-first, one parallel batch per level (CONCURRENCY
+    threads) and memoized, so each node is described once even though it supplies
+    both its display name and its children. The result is then assembled in the
+    same DFS order as a sequential walk.
     """
+    cache: Dict[str, Optional[dict]] = {}
+    with ThreadPoolExecutor(max_workers=max(1, CONCURRENCY)) as pool:
+        _describe_many(build_url, [root_id], cache, pool)
+        frontier = [root_id]
+        for depth in range(max_depth + 1):
+            kids = [cid for nid in frontier for cid in _child_ids(cache.get(nid))]
+            # Kids need a describe for their display name; below max_depth it also
+            # yields their own children for the next level.
+            _describe_many(build_url, kids, cache, pool)
+            if depth == max_depth:
+                break
+            frontier = kids
+
     results: List[Tuple[str, List[str]]] = []
 
     def _walk(node_id: str, path: List[str], depth: int):
-        # Get children
-        kids = wfapi_children(build_url, node_id)
+        kids = _child_ids(cache.get(node_id))
         if not kids:
             # Leaf (or unknown); still record this node
             results.append((node_id, path))
             return
 
-        for kid in kids:
-            cid = str(kid.get("id"))
-            # fetch a name for context path
-            try:
-                nm = node_display_name(build_url, cid)
-            except Exception:
-                nm = cid
-
-            new_path = path + [nm]
+        for cid in kids:
+            new_path = path + [display_name_from(cache.get(cid), cid)]
             if depth < max_depth:
                 _walk(cid, new_path, depth + 1)
             else:
                 results.append((cid, new_path))
 
     # Seed path with root stage display name
-    root_name = node_display_name(build_url, root_id)
-    _walk(root_id, [root_name], 0)
+    _walk(root_id, [display_name_from(cache.get(root_id), root_id)], 0)
     return results
 
 # -------- Log parsing & aggregation --------
@@ -234,20 +280,20 @@ class TaskCounters:
             "skipped": self.skipped,
         }
 
-def extract_database_from_logs(lines: List[str]) -> Optional[str]:
+def _database_hint(line: str) -> Optional[str]:
+    # Try -Pdb= parameter first, then RDBMS= export
+    m = DB_PARAM_RE.search(line) or RDBMS_RE.search(line)
+    return m.group(1) if m else None
+
+def extract_database_from_logs(lines: Iterable[str]) -> Optional[str]:
     """
     Extract the database being tested from the logs.
     Looks for -Pdb= parameter or RDBMS= export.
     """
     for ln in lines:
-        # Try -Pdb= parameter first
-        m = DB_PARAM_RE.search(ln)
-        if m:
-            return m.group(1)
-        # Try RDBMS= export
-        m = RDBMS_RE.search(ln)
-        if m:
-            return m.group(1)
+        database = _database_hint(ln)
+        if database:
+            return database
     return None
 
 
@@ -260,43 +306,103 @@ def derive_label_from_context(context_path: List[str]) -> Optional[str]:
         return context_path[1]
     return None
 
-def scan_logs_for_tasks(lines: List[str]) -> Tuple[Optional[str], List[Tuple[str, int, int]]]:
+class TaskLogScanner:
+    """
+    Single-pass matcher for Gradle task scopes and the database hint.
+
+    Every line goes through cheap string checks before any regex runs: task
+    headers must start with ">" or "&gt;" and contain ":test" (TASK_RE only
+    accepts :*:test paths), UP-TO-DATE is a plain substring, SKIPPED must start
+    the line, and (until a hint is found) the database regexes only see lines
+    containing "-Pdb=" or "rdbms=". Lines can be fed in several batches, e.g.
+    as a followed log grows.
     """
-    From a list of log lines, return database and list of task triples:
+
+    def __init__(self) -> None:
+        self.database: Optional[str] = None
+        self.tasks: List[Tuple[str, int, int]] = []
+        self._current: Optional[str] = None
+        self._uptodate = 0
+        self._skipped = 0
+
+    def feed(self, lines: Iterable[str]) -> "TaskLogScanner":
+        task_match = TASK_RE.match
+        skipped_match = SKIPPED_RE.match
+        tasks = self.tasks
+        database = self.database
+        current, uptodate, skipped = self._current, self._uptodate, self._skipped
+        try:
+            for ln in lines:
+                if database is None and "=" in ln and ("-Pdb=" in ln or "rdbms=" in ln.lower()):
+                    database = _database_hint(ln)
+
+                if ln.startswith((">", "&gt;")) and ":test" in ln:
+                    m = task_match(ln)
+                    if m:
+                        # If we were tracking a previous task, flush it
+                        if current is not None:
+                            tasks.append((current, uptodate, skipped))
+                        # Start a new task scope
+                        current, uptodate, skipped = m.group(1), 0, 0
+                        continue
+
+                # Only count markers in the immediate vicinity of a task
+                if current is not None:
+                    if "UP-TO-DATE" in ln:
+                        uptodate += 1
+                    elif ln.startswith("SKIPPED") and skipped_match(ln):
+                        skipped += 1
+        finally:
+            self.database = database
+            self._current, self._uptodate, self._skipped = current, uptodate, skipped
+        return self
+
+    def result(self) -> Tuple[Optional[str], List[Tuple[str, int, int]]]:
+        """Return (database, [(task_path, uptodate_hits, skipped_hits), ...]) for the lines fed so far."""
+        tasks = list(self.tasks)
+        # Flush the open task scope
+        if self._current is not None:
+            tasks.append((self._current, self._uptodate, self._skipped))
+        return self.database, tasks
+
+def scan_logs_for_tasks(lines: Iterable[str]) -> Tuple[Optional[str], List[Tuple[str, int, int]]]:
+    """
+    From log lines, return database and list of task triples:
       (database, [(task_path, uptodate_hits, skipped_hits), ...])
+
+    Single pass, so `lines` may be a stream (see wfapi_log_lines); the database
+    is the first -Pdb=/RDBMS= hint, as in extract_database_from_logs().
     """
-    # Extract database first
-    database = extract_database_from_logs(lines)
-    
-    out: List[Tuple[str, int, int]] = []
-    current_task: Optional[str] = None
-    uptodate_hits = 0
-    skipped_hits = 0
+    return TaskLogScanner().feed(lines).result()
 
-    for ln in lines:
-        m = TASK_RE.match(ln)
-        if m:
-            # If we were tracking a previous task, flush it
-            if current_task is not None:
-                out.append((current_task, uptodate_hits, skipped_hits))
-            # Start a new task scope
-            current_task = m.group(1)
-            uptodate_hits = 0
-            skipped_hits = 0
-            continue
-
-        # Only count markers in the immediate vicinity of a task
-        if current_task is not None:
-            if UPTODATE_RE.search(ln):
-                uptodate_hits += 1
-            elif SKIPPED_RE.match(ln):
-                skipped_hits += 1
-
-    # Flush tail
-    if current_task is not None:
-        out.append((current_task, uptodate_hits, skipped_hits))
-
-    return (database, out)
+def scan_node_logs(build_url: str, node_id: str) -> Optional[Tuple[Optional[str], List[Tuple[str, int, int]]]]:
+    """Stream one node's log through the scanner; None when it yields nothing useful."""
+    try:
+        database, hits = scan_logs_for_tasks(wfapi_log_lines(build_url, node_id))
+    except Exception as exc:
+        if VERBOSE:
+            print(f"WARNING: Failed to get logs for node {node_id}: {exc}", file=sys.stderr)
+        return None
+    if database is None and not hits:
+        return None
+    return database, hits
+
+def scan_nodes(build_url: str, nodes: List[Tuple[str, List[str]]]):
+    """
+    Yield scan_node_logs() results for `nodes` in order, CONCURRENCY at a time.
+
+    Only a window of CONCURRENCY logs is in flight, and each worker streams
+    its log into task counts, so memory stays bounded by the window and the
+    chunk size rather than by the size of the build's logs.
+    """
+    with ThreadPoolExecutor(max_workers=max(1, CONCURRENCY)) as pool:
+        window: "collections.deque[Future]" = collections.deque()
+        for node_id, _ in nodes:
+            window.append(pool.submit(scan_node_logs, build_url, node_id))
+            if len(window) >= CONCURRENCY:
+                yield window.popleft().result()
+        while window:
+            yield window.popleft().result()
 
 # -------- Pretty printing --------
 
@@ -349,6 +455,14 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
         help="Only include contexts whose label (first branch under the stage) matches this string",
     )
     ap.add_argument("--modules-per-label", action="store_true", help="Also list unique Gradle modules observed per label")
+    ap.add_argument(
+        "--concurrency",
+        type=int,
+        default=CONCURRENCY,
+        help=f"Parallel WFAPI requests for node describes and logs (default: {CONCURRENCY})",
+    )
+    ap.add_argument("--no-cache", action="store_true", help="Bypass the on-disk HTTP response cache")
+    ap.add_argument("--cache-dir", help="HTTP cache directory (default: $TEMP_DIR/jenkins-http-cache)")
     ap.add_argument("--verbose", "-v", action="store_true", help="Enable verbose output for debugging")
     return ap.parse_args(argv)
 
@@ -362,15 +476,23 @@ def run(args: argparse.Namespace) -> dict:
     global VERBOSE
     global FILTER_LABEL
     global MODULES_PER_LABEL
+    global CONCURRENCY
 
     prev_verbose = VERBOSE
     prev_filter = FILTER_LABEL
     prev_modules = MODULES_PER_LABEL
+    prev_concurrency = CONCURRENCY
+    prev_cache = jenkins_http.configure_cache(
+        jenkins_http.resolve_cache_dir(getattr(args, "no_cache", False), getattr(args, "cache_dir", None))
+    )
+    prev_trace = jenkins_http.configure_trace(args.verbose)
+    jenkins_http.reset_request_stats()
 
     try:
         VERBOSE = args.verbose
         FILTER_LABEL = args.label_filter.lower() if args.label_filter else None
         MODULES_PER_LABEL = args.modules_per_label
+        CONCURRENCY = max(1, getattr(args, "concurrency", CONCURRENCY) or 1)
 
         base = normalize_job_or_build_url(args.url)
         if base.split("/")[-1].isdigit():
@@ -422,19 +544,12 @@ def run(args: argparse.Namespace) -> dict:
             if VERBOSE:
                 print(f"Found {len(descendants)} descendant nodes", file=sys.stderr)
 
-            for node_id, ctx_path in descendants:
+            for (node_id, ctx_path), scanned in zip(descendants, scan_nodes(build_url, descendants)):
                 label = derive_label_from_context(ctx_path)
-                try:
-                    lines = wfapi_log_lines(build_url, node_id)
-                except Exception as exc:
-                    if VERBOSE:
-                        print(f"WARNING: Failed to get logs for node {node_id}: {exc}", file=sys.stderr)
-                    continue
-
-                if not lines:
+                if scanned is None:
                     continue
 
-                database, hits = scan_logs_for_tasks(lines)
+                database, hits = scanned
                 if not hits:
                     continue
 
@@ -529,9 +644,21 @@ def run(args: argparse.Namespace) -> dict:
             "json_path": json_path,
         }
     finally:
+        stats = jenkins_http.cache_stats()
+        if stats and VERBOSE:
+            print(
+                f"HTTP cache: {stats['hits']} hit(s), {stats['revalidated']} revalidated, {stats['misses']} fetched",
+                file=sys.stderr,
+            )
+        timing = jenkins_http.request_summary()
+        if timing and VERBOSE:
+            print(timing, file=sys.stderr)
         VERBOSE = prev_verbose
         FILTER_LABEL = prev_filter
         MODULES_PER_LABEL = prev_modules
+        CONCURRENCY = prev_concurrency
+        jenkins_http.configure_trace(prev_trace)
+        jenkins_http.restore_cache(prev_cache)
 
 
 def main() -> None:
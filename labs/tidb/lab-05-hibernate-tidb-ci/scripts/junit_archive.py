@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Single-file archive support for collected JUnit runs.
+
+junit_local_collect.py can pack a collection into one zip or tar archive
+(`--format`). Member names are relative to the collection root, so
+`hibernate-core/target/test-results/test/TEST-x.xml` inside
+`mysql-results-20251103-143022.zip` maps one-to-one onto the directory layout.
+Readers stream members straight out of the archive without extracting it.
+
+tar.zst is offered when the interpreter's tarfile supports zstd (Python 3.14+).
+"""
+
+from __future__ import annotations
+
+import os
+import tarfile
+import zipfile
+from pathlib import Path, PurePosixPath
+from typing import IO, Callable, Iterator, List, Optional, Tuple
+
+ARCHIVE_SUFFIXES = {"zip": ".zip", "tar.gz": ".tar.gz"}
+if "zst" in getattr(tarfile.TarFile, "OPEN_METH", {}):
+    ARCHIVE_SUFFIXES["tar.zst"] = ".tar.zst"
+OUTPUT_FORMATS = ("dir",) + tuple(ARCHIVE_SUFFIXES)
+TAR_WRITE_MODES = {"tar.gz": "w:gz", "tar.zst": "w:zst"}
+
+
+def archive_format(path: Path) -> Optional[str]:
+    """Return the archive format implied by the file name, or None."""
+    name = path.name
+    for fmt, suffix in ARCHIVE_SUFFIXES.items():
+        if name.endswith(suffix):
+            return fmt
+    if name.endswith(".tgz"):
+        return "tar.gz"
+    return None
+
+
+def is_archive(path: Path) -> bool:
+    return archive_format(path) is not None and path.is_file()
+
+
+def archive_path_for(base: Path, fmt: str) -> Path:
+    """Return the archive path for a collection directory path (DEST-{timestamp} + suffix)."""
+    return Path(f"{base}{ARCHIVE_SUFFIXES[fmt]}")
+
+
+def sidecar_path(archive: Path, filename: str) -> Path:
+    """Return the path of a file stored next to an archive (e.g. NAME.testcases.idx)."""
+    fmt = archive_format(archive)
+    name = archive.name
+    if fmt is not None:
+        suffix = ".tgz" if name.endswith(".tgz") else ARCHIVE_SUFFIXES[fmt]
+        name = name[: -len(suffix)]
+    return archive.with_name(f"{name}.{filename}")
+
+
+def write_archive(src_dir: Path, dest: Path, fmt: str) -> int:
+    """
+    Stream every file under src_dir into a new archive and return the member count.
+
+    Members are added in sorted order with names relative to src_dir; the archive
+    is written to a temporary name and moved into place once complete.
+    """
+    files: List[Path] = sorted(path for path in src_dir.rglob("*") if path.is_file())
+    tmp_path = dest.with_name(f"{dest.name}.tmp")
+    if fmt == "zip":
+        with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=6) as zf:
+            for path in files:
+                zf.write(path, path.relative_to(src_dir).as_posix())
+    else:
+        with tarfile.open(tmp_path, TAR_WRITE_MODES[fmt]) as tf:
+            for path in files:
+                tf.add(path, path.relative_to(src_dir).as_posix(), recursive=False)
+    os.replace(tmp_path, dest)
+    return len(files)
+
+
+def iter_members(
+    archive: Path, predicate: Callable[[PurePosixPath], bool]
+) -> Iterator[Tuple[PurePosixPath, IO[bytes]]]:
+    """
+    Yield (member name, binary stream) for regular files accepted by predicate.
+
+    Tar archives are read in streaming mode, so each stream is only valid until
+    the next member is requested.
+    """
+    if archive_format(archive) == "zip":
+        with zipfile.ZipFile(archive) as zf:
+            for info in zf.infolist():
+                name = PurePosixPath(info.filename)
+                if info.is_dir() or not predicate(name):
+                    continue
+                with zf.open(info) as fh:
+                    yield name, fh
+        return
+    with tarfile.open(archive, "r|*") as tf:
+        for member in tf:
+            name = PurePosixPath(member.name)
+            if not member.isfile() or not predicate(name):
+                continue
+            fh = tf.extractfile(member)
+            if fh is not None:
+                yield name, fh
+
+
+def read_member(archive: Path, member: str) -> Optional[bytes]:
+    """Return the bytes of one member, or None when it is absent."""
+    wanted = PurePosixPath(member)
+    for _name, fh in iter_members(archive, lambda name: name == wanted):
+        return fh.read()
+    return None
+
+
+def is_junit_member(name: PurePosixPath) -> bool:
+    """Match the same files as the `**/test-results/**/*.xml` glob on a directory."""
+    return name.suffix == ".xml" and "test-results" in name.parts[:-1]
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Rolling per-class duration and failure history for the comparison cells.
+
+Every collection recorded here contributes one entry per test class: the summed
+`time` and the tests/failed counts of its <testsuite> elements, read with the
+same scan junit_local_summary.aggregate uses. Only the last WINDOW entries per
+class are kept, in RESULTS_RUNS_DIR/history/<cell>.json. The history remembers
+the newest collection it recorded (by the timestamp in its name), so
+re-recording a collection, or one that aged out of the window, is a no-op.
+
+run_comparison.py records each new collection and, with --failing-first, runs
+the classes that failed recently before the rest of the suite.
+repro_test.py only reads the history, to annotate --list with each class's
+record.
+
+Usage examples:
+  python scripts/junit_history.py --cell tidb-tidbdialect --update tmp/tidb-tidbdialect-results-20251103-143022
+  python scripts/junit_history.py --cell tidb-tidbdialect --top 20
+  python scripts/junit_history.py --cell mysql --filter-out tmp/mysql-first.txt
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from env_utils import load_lab_env, require_path
+from junit_local_summary import find_test_suites, friendly_duration, module_name_for
+from junit_shards import TestClass, class_filter_lines, write_filter
+
+HISTORY_DIRNAME = "history"
+HISTORY_VERSION = 1
+DEFAULT_WINDOW = 10
+# Collection names end in the run timestamp (e.g. tidb-tidbdialect-results-20251103-143022.zip)
+RUN_TIMESTAMP = re.compile(r"\d{8}-\d{6}")
+
+# (seconds, tests, failed) of one class in one collection
+ClassRun = Tuple[float, int, int]
+
+
+@dataclass
+class ClassRecord:
+    module: str
+    classname: str
+    runs: int
+    failed_runs: int
+    last_failed: bool
+    mean_seconds: float
+
+    @property
+    def key(self) -> TestClass:
+        return (self.module, self.classname)
+
+    def describe(self) -> str:
+        return f"failed {self.failed_runs}/{self.runs} runs, ~{friendly_duration(self.mean_seconds)}"
+
+
+def history_path(results_runs: Path, cell: str) -> Path:
+    return results_runs / HISTORY_DIRNAME / f"{cell}.json"
+
+
+def empty_history(cell: str, window: int = DEFAULT_WINDOW) -> dict:
+    return {"version": HISTORY_VERSION, "cell": cell, "window": window, "runs": [], "newest": None, "classes": {}}
+
+
+def run_order_key(run_id: str) -> str:
+    """Sortable key of a run: the timestamp in its collection name, else the name itself."""
+    match = RUN_TIMESTAMP.search(run_id)
+    return match.group(0) if match else run_id
+
+
+def load_history(path: Path, cell: str, window: Optional[int] = None) -> dict:
+    """
+    Read a history file; a missing, unreadable or outdated file starts a new history.
+
+    window replaces the stored window (applied on the next record_run); None keeps it.
+    """
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return empty_history(cell, window or DEFAULT_WINDOW)
+    if not isinstance(data, dict) or data.get("version") != HISTORY_VERSION:
+        return empty_history(cell, window or DEFAULT_WINDOW)
+    if window:
+        data["window"] = window
+    return data
+
+
+def save_history(path: Path, history: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    tmp_path.write_text(json.dumps(history, indent=1, sort_keys=True), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def suite_stats(root: Path, jobs: Optional[int] = 1) -> Dict[TestClass, ClassRun]:
+    """Sum time, tests and failures+errors per (module, class) over the <testsuite> headers under root."""
+    stats: Dict[TestClass, ClassRun] = {}
+    for xml_path, attrs in find_test_suites(root, jobs=jobs):
+        name = attrs.get("name")
+        if not name:
+            continue
+        key = (module_name_for(xml_path, root), name)
+        seconds, tests, failed = stats.get(key, (0.0, 0, 0))
+        stats[key] = (
+            seconds + float(attrs.get("time", 0.0) or 0.0),
+            tests + int(attrs.get("tests", 0) or 0),
+            failed + int(attrs.get("failures", 0) or 0) + int(attrs.get("errors", 0) or 0),
+        )
+    return stats
+
+
+def record_run(history: dict, run_id: str, stats: Dict[TestClass, ClassRun]) -> bool:
+    """
+    Append one collection's per-class stats.
+
+    Returns False (and records nothing) unless run_id is newer than every run
+    recorded so far, so a collection that already aged out of the window cannot
+    come back as the latest run.
+    """
+    key = run_order_key(run_id)
+    newest = history.get("newest")
+    if newest is None and history["runs"]:
+        # Histories written before the newest run was stored
+        newest = max(run_order_key(run) for run in history["runs"])
+    if run_id in history["runs"] or (newest is not None and key <= newest):
+        return False
+    window = history["window"]
+    history["runs"] = (history["runs"] + [run_id])[-window:]
+    history["newest"] = key
+    classes = history["classes"]
+    for (module, classname), (seconds, tests, failed) in stats.items():
+        entries = classes.setdefault(module, {}).setdefault(classname, [])
+        entries.append([round(seconds, 3), tests, failed])
+        del entries[:-window]
+    return True
+
+
+def class_records(history: dict) -> List[ClassRecord]:
+    records = []
+    for module, classes in history["classes"].items():
+        for classname, entries in classes.items():
+            if not entries:
+                continue
+            records.append(
+                ClassRecord(
+                    module=module,
+                    classname=classname,
+                    runs=len(entries),
+                    failed_runs=sum(1 for _seconds, _tests, failed in entries if failed),
+                    last_failed=bool(entries[-1][2]),
+                    mean_seconds=sum(seconds for seconds, _tests, _failed in entries) / len(entries),
+                )
+            )
+    return records
+
+
+def failing_first(history: dict) -> List[ClassRecord]:
+    """
+    Classes that failed in the window, in the order they should run.
+
+    Classes that failed last time come first, then by failure rate; within the
+    same rank the fastest class runs first so the first failures show up soonest.
+    """
+    failing = [record for record in class_records(history) if record.failed_runs]
+    return sorted(
+        failing,
+        key=lambda record: (
+            not record.last_failed,
+            -record.failed_runs / record.runs,
+            record.mean_seconds,
+            record.key,
+        ),
+    )
+
+
+def update_from_collection(
+    results_runs: Path, cell: str, collection: Path, window: Optional[int] = None, jobs: Optional[int] = 1
+) -> Tuple[Path, int]:
+    """Record a collection (directory or archive) into the cell's history; returns (path, classes recorded)."""
+    path = history_path(results_runs, cell)
+    history = load_history(path, cell, window)
+    stats = suite_stats(collection, jobs=jobs)
+    if not stats or not record_run(history, collection.name, stats):
+        return path, 0
+    save_history(path, history)
+    return path, len(stats)
+
+
+def write_failing_first_filter(records: Iterable[ClassRecord], path: Path) -> Path:
+    """Gradle filter (see templates/test-shard.init.gradle) that runs only `records`."""
+    return write_filter(path, class_filter_lines("include", (record.key for record in records)))
+
+
+def parse_args(argv: Optional[Iterable[str]] = None) -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="Maintain and inspect the per-class test history of a comparison cell.")
+    ap.add_argument("--cell", required=True, help="Cell identifier (mysql, tidb-tidbdialect, tidb-mysqldialect, ...)")
+    ap.add_argument("--update", action="append", default=[], help="Collection directory or archive to record (repeatable)")
+    ap.add_argument("--window", type=int, help=f"Runs kept per class (default: the stored window, else {DEFAULT_WINDOW})")
+    ap.add_argument("--top", type=int, default=10, help="Print the N classes that run first (default: 10)")
+    ap.add_argument("--filter-out", help="Write a failing-first include filter for templates/test-shard.init.gradle")
+    ap.add_argument("--jobs", type=int, default=1, help="Worker processes used to scan JUnit XML files (0 = one per CPU)")
+    return ap.parse_args(argv)
+
+
+def run(args: argparse.Namespace) -> List[ClassRecord]:
+    load_lab_env(required=("RESULTS_RUNS_DIR",))
+    results_runs = require_path("RESULTS_RUNS_DIR", must_exist=False, create=True)
+    for collection in args.update:
+        collection_path = Path(collection).resolve()
+        if not collection_path.exists():
+            raise FileNotFoundError(f"collection not found: {collection_path}")
+        path, recorded = update_from_collection(results_runs, args.cell, collection_path, args.window, args.jobs)
+        if recorded:
+            print(f"Recorded {recorded} classes from {collection_path.name} into {path}")
+        else:
+            print(f"Skipped {collection_path.name} (already recorded or no test results)")
+
+    path = history_path(results_runs, args.cell)
+    history = load_history(path, args.cell, args.window)
+    records = failing_first(history)
+    print(f"History: {path} ({len(history['runs'])} runs, {len(records)} classes failed in the window)")
+    for record in records[: args.top]:
+        print(f"  {record.module}:{record.classname}  {record.describe()}")
+    if args.filter_out:
+        print(f"Wrote {write_failing_first_filter(records, Path(args.filter_out))}")
+    return records
+
+
+def main() -> None:
+    args = parse_args()
+    try:
+        run(args)
+    except FileNotFoundError as exc:
+        print(f"ERROR: {exc}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
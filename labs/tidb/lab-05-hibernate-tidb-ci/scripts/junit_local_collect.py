@@ -4,30 +4,80 @@ Collect local Hibernate test artifacts into a timestamped directory.
 
 This tool copies `target/test-results` and `target/reports` trees for every
 module that produced JUnit XML output, optionally copies a build log, writes a
-collection manifest, and (optionally) removes the source artifacts.
+per-testcase index and a collection manifest, and (optionally) removes the
+source artifacts.
+
+Results of a sharded run (run_comparison.py --shards) are merged by passing
+each extra shard workspace with --shard-root; its modules land under
+shard-<n>/<module>/target so the index and summaries still attribute every
+testcase to its module.
+
+Artifacts are renamed, reflinked or hardlinked into place when the filesystem
+allows it and copied by a thread pool otherwise; the manifest records the files,
+bytes and throughput of the transfer.
+
+Usage examples:
+  ./junit_local_collect.py --dest tmp/mysql-results --remove-source
+  ./junit_local_collect.py --dest tmp/mysql-results --mode hardlink
+  ./junit_local_collect.py --dest /mnt/backup/mysql-results --mode copy --copy-workers 16
+  ./junit_local_collect.py --dest tmp/mysql-results --remove-source --format tar.gz
+  ./junit_local_collect.py --dest tmp/mysql-results --shard-root tmp/shards/2/workspace --shard-root tmp/shards/3/workspace
 """
 
 from __future__ import annotations
 
 import argparse
 import datetime as dt
+import errno
 import json
 import os
 import shutil
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Set
+from typing import Dict, List, Set, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
 
 from env_utils import load_lab_env, require_path, resolve_workspace_dir
+from junit_archive import OUTPUT_FORMATS, archive_path_for, sidecar_path, write_archive
+from junit_testcase_index import INDEX_FILENAME, build_index
 
 SCRIPT_DIR = Path(__file__).resolve().parent
 LAB_ENV = load_lab_env(required=("WORKSPACE_DIR", "LOG_DIR", "TEMP_DIR"))
 DEFAULT_WORKSPACE = resolve_workspace_dir()
 DEFAULT_LOG_DIR = require_path("LOG_DIR", must_exist=False, create=True)
 
-
-def find_modules(root: Path) -> Set[Path]:
-    """Return module directories that produced test-results XML files."""
+TRANSFER_MODES = ("auto", "copy", "hardlink", "reflink", "move")
+DEFAULT_COPY_WORKERS = 8
+FICLONE = 0x40049409  # linux/fs.h: _IOW(0x94, 9, int)
+# errnos that mean "this filesystem/device can't do it", so we fall back to copying
+FALLBACK_ERRNOS = {
+    errno.EXDEV,
+    errno.EPERM,
+    errno.EINVAL,
+    errno.ENOTTY,
+    errno.EMLINK,
+    errno.ENOSYS,
+    errno.EOPNOTSUPP,
+    getattr(errno, "ENOTSUP", errno.EOPNOTSUPP),
+}
+
+
+# Directory names never descended into while looking for module results.
+PRUNED_DIR_NAMES = frozenset((".git", ".gradle", ".idea", "node_modules"))
+# (parent, child) pairs pruned as a unit, e.g. Gradle's build/tmp scratch space.
+PRUNED_DIR_PAIRS = frozenset((("build", "tmp"),))
+
+
+def find_modules_glob(root: Path) -> Set[Path]:
+    """Reference implementation: glob every XML file (visits the whole workspace)."""
     modules: Set[Path] = set()
     pattern = "**/target/test-results/**/*.xml"
     for xml_path in root.glob(pattern):
@@ -47,13 +97,208 @@ def find_modules(root: Path) -> Set[Path]:
     return modules
 
 
-def copy_subdir(src: Path, dest: Path) -> None:
-    """Copy a directory tree, replacing the destination if needed."""
+def _contains_xml(directory: str) -> bool:
+    """Return True as soon as any *.xml file is found below directory."""
+    stack = [directory]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.endswith(".xml"):
+                        return True
+        except OSError:
+            continue
+    return False
+
+
+def _child_dirs(directory: str) -> List[os.DirEntry]:
+    parent_name = os.path.basename(directory)
+    try:
+        with os.scandir(directory) as entries:
+            return [
+                entry
+                for entry in entries
+                if entry.is_dir(follow_symlinks=False)
+                and entry.name not in PRUNED_DIR_NAMES
+                and (parent_name, entry.name) not in PRUNED_DIR_PAIRS
+            ]
+    except OSError:
+        return []
+
+
+def _walk_modules(top: str) -> Set[Path]:
+    """Find module directories at or below top whose target/test-results holds XML."""
+    modules: Set[Path] = set()
+    stack = [top]
+    while stack:
+        current = stack.pop()
+        for entry in _child_dirs(current):
+            if entry.name == "target":
+                # Everything under the first target/ belongs to `current`, so stop here.
+                if _contains_xml(os.path.join(entry.path, "test-results")):
+                    modules.add(Path(current))
+                continue
+            stack.append(entry.path)
+    return modules
+
+
+def find_modules(root: Path, workers: int = 1) -> Set[Path]:
+    """
+    Return module directories that produced test-results XML files.
+
+    Matches find_modules_glob, but walks with os.scandir, skips PRUNED_DIR_NAMES /
+    PRUNED_DIR_PAIRS, and stops descending at each module's target/ directory.
+    With workers > 1 every top-level directory is walked on its own thread.
+    """
+    # root/target itself is not a module (same as the glob's target_idx <= 0 rule).
+    tops = [entry.path for entry in _child_dirs(str(root)) if entry.name != "target"]
+    modules: Set[Path] = set()
+    if workers > 1 and len(tops) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for found in pool.map(_walk_modules, tops):
+                modules |= found
+    else:
+        for top in tops:
+            modules |= _walk_modules(top)
+    return modules
+
+
+@dataclass
+class TransferStats:
+    """Files/bytes moved into a collection, split by the mechanism actually used."""
+
+    files: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+    methods: Dict[str, int] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record(self, method: str, size: int, files: int = 1) -> None:
+        with self._lock:
+            self.files += files
+            self.bytes += size
+            self.methods[method] = self.methods.get(method, 0) + files
+
+    def to_manifest(self, mode: str) -> dict:
+        throughput = (self.bytes / (1024 * 1024)) / self.seconds if self.seconds > 0 else None
+        return {
+            "mode": mode,
+            "files": self.files,
+            "bytes": self.bytes,
+            "seconds": round(self.seconds, 3),
+            "throughput_mb_s": round(throughput, 1) if throughput is not None else None,
+            "methods": dict(sorted(self.methods.items())),
+        }
+
+
+def reflink_file(src: Path, dest: Path) -> None:
+    """Clone src into dest with the FICLONE ioctl (btrfs/XFS/overlayfs); raises OSError if unsupported."""
+    if fcntl is None:
+        raise OSError(errno.ENOSYS, "reflink requires fcntl")
+    try:
+        with open(src, "rb") as src_fh, open(dest, "wb") as dest_fh:
+            fcntl.ioctl(dest_fh.fileno(), FICLONE, src_fh.fileno())
+    except OSError:
+        dest.unlink(missing_ok=True)
+        raise
+    shutil.copystat(src, dest)
+
+
+def transfer_file(src: Path, dest: Path, mode: str) -> str:
+    """Hardlink/reflink/copy one file and return the mechanism that succeeded."""
+    if mode in ("hardlink", "reflink"):
+        try:
+            if mode == "hardlink":
+                os.link(src, dest)
+            else:
+                reflink_file(src, dest)
+            return mode
+        except OSError as exc:
+            if exc.errno not in FALLBACK_ERRNOS:
+                raise
+    shutil.copy2(src, dest)
+    return "copy"
+
+
+def _tree_files(src: Path, dest: Path) -> Tuple[List[Tuple[Path, Path, int]], List[Path]]:
+    """Return (src_file, dest_file, size) triples and the destination directories to create."""
+    files: List[Tuple[Path, Path, int]] = []
+    dirs: List[Path] = [dest]
+    for dirpath, dirnames, filenames in os.walk(src):
+        rel = Path(dirpath).relative_to(src)
+        dirs.extend(dest / rel / name for name in dirnames)
+        for name in filenames:
+            file_src = Path(dirpath) / name
+            files.append((file_src, dest / rel / name, file_src.stat().st_size))
+    return files, dirs
+
+
+def same_filesystem(src: Path, dest_parent: Path) -> bool:
+    try:
+        return os.stat(src).st_dev == os.stat(dest_parent).st_dev
+    except OSError:
+        return False
+
+
+def copy_subdir(
+    src: Path,
+    dest: Path,
+    mode: str = "copy",
+    workers: int = 1,
+    stats: TransferStats | None = None,
+) -> None:
+    """
+    Transfer a directory tree, replacing the destination if needed.
+
+    mode=move renames the tree when src and dest share a filesystem (falling back
+    to copy-then-delete across devices); hardlink/reflink fall back to copy2 per
+    file wherever the filesystem refuses. Files are copied by `workers` threads.
+    """
     if not src.exists():
         return
     if dest.exists():
         shutil.rmtree(dest)
-    shutil.copytree(src, dest, copy_function=shutil.copy2)
+    stats = stats if stats is not None else TransferStats()
+
+    files, dirs = _tree_files(src, dest)
+    if mode == "move":
+        try:
+            os.rename(src, dest)
+            stats.record("rename", sum(size for _, _, size in files), files=len(files))
+            return
+        except OSError as exc:
+            if exc.errno not in FALLBACK_ERRNOS:
+                raise
+
+    for directory in dirs:
+        directory.mkdir(parents=True, exist_ok=True)
+    file_mode = "copy" if mode == "move" else mode
+
+    def transfer(item: Tuple[Path, Path, int]) -> None:
+        file_src, file_dest, size = item
+        stats.record(transfer_file(file_src, file_dest, file_mode), size)
+
+    if workers > 1 and len(files) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for _ in pool.map(transfer, files):
+                pass
+    else:
+        for item in files:
+            transfer(item)
+    shutil.copystat(src, dest)
+    if mode == "move":
+        shutil.rmtree(src)
+
+
+def resolve_transfer_mode(mode: str, src: Path, dest_parent: Path, remove_source: bool) -> str:
+    """Pick the concrete mode for `auto`: rename when the source is going away anyway, else reflink."""
+    if mode != "auto":
+        return mode
+    if remove_source and same_filesystem(src, dest_parent):
+        return "move"
+    return "reflink"
 
 
 def remove_subdir(path: Path) -> None:
@@ -79,11 +324,31 @@ def collect(
     timestamp: str,
     log_path: str | None,
     remove_source: bool,
+    index: bool = True,
+    mode: str = "auto",
+    workers: int = DEFAULT_COPY_WORKERS,
+    output_format: str = "dir",
+    scan_workers: int = 1,
+    run_info: dict | None = None,
+    shard_roots: List[Path] | None = None,
 ) -> Path:
-    """Collect artifacts for all modules and return the collection directory."""
+    """
+    Collect artifacts for all modules and return the collection directory.
+
+    shard_roots are further workspaces of the same run (shards 2..N); their
+    modules are collected under shard-<n>/ next to those of root (shard 1).
+
+    With an archive output_format the directory is only a staging area: it is
+    packed into DEST-{timestamp}.<suffix> (manifest included, testcase index as a
+    NAME.testcases.idx sidecar) and removed, and the archive path is returned.
+    """
     archive_dir = Path(f"{dest_base}-{timestamp}")
+    archive_file = archive_path_for(archive_dir, output_format) if output_format != "dir" else None
     print(f"Collecting test results from: {root}")
-    print(f"Destination: {archive_dir}")
+    print(f"Destination: {archive_file or archive_dir}")
+    if archive_file is not None and archive_file.exists():
+        print(f"ERROR: Destination already exists: {archive_file}", file=sys.stderr)
+        raise FileExistsError(str(archive_file))
 
     try:
         archive_dir.mkdir(parents=True, exist_ok=False)
@@ -91,26 +356,36 @@ def collect(
         print(f"ERROR: Destination already exists: {archive_dir}", file=sys.stderr)
         raise
 
-    modules = find_modules(root)
-    if not modules:
+    # (source root, destination prefix, modules found there); shard 1 is root itself
+    sources = [(root, archive_dir, find_modules(root, workers=scan_workers))]
+    for number, shard_root in enumerate(shard_roots or [], start=2):
+        print(f"Collecting shard {number} from: {shard_root}")
+        sources.append((shard_root, archive_dir / f"shard-{number}", find_modules(shard_root, workers=scan_workers)))
+    modules = sources[0][2]
+    if not any(found for _, _, found in sources):
         print("ERROR: No test results were found under the workspace.", file=sys.stderr)
         archive_dir.rmdir()
         raise RuntimeError("no test results to collect")
 
     copied = 0
-    for module_path in sorted(modules):
-        module_name = module_path.name
-        target_dir = module_path / "target"
-        for subdir in ("test-results", "reports"):
-            src = target_dir / subdir
-            if not src.exists():
-                continue
-            dest = archive_dir / module_name / "target" / subdir
-            dest.parent.mkdir(parents=True, exist_ok=True)
-            copy_subdir(src, dest)
-            copied += 1
-            if remove_source:
-                remove_subdir(src)
+    stats = TransferStats()
+    started = time.monotonic()
+    for _, dest_prefix, found in sources:
+        for module_path in sorted(found):
+            module_name = module_path.name
+            target_dir = module_path / "target"
+            for subdir in ("test-results", "reports"):
+                src = target_dir / subdir
+                if not src.exists():
+                    continue
+                dest = dest_prefix / module_name / "target" / subdir
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                subdir_mode = resolve_transfer_mode(mode, src, dest.parent, remove_source)
+                copy_subdir(src, dest, mode=subdir_mode, workers=workers, stats=stats)
+                copied += 1
+                if remove_source:
+                    remove_subdir(src)
+    stats.seconds = time.monotonic() - started
 
     if copied == 0:
         print("ERROR: Located modules, but no test-results/reports directories.", file=sys.stderr)
@@ -129,19 +404,62 @@ def collect(
         else:
             print(f"WARNING: Log file not found: {resolved_log}", file=sys.stderr)
 
+    transfer = stats.to_manifest(mode)
+    throughput = transfer["throughput_mb_s"]
+    print(
+        f"Transferred {stats.files} files ({stats.bytes / (1024 * 1024):.1f} MB) in {stats.seconds:.2f}s"
+        + (f" ({throughput} MB/s)" if throughput is not None else "")
+        + f" via {', '.join(f'{name}={count}' for name, count in transfer['methods'].items()) or 'nothing'}"
+    )
+
+    testcase_index = None
+    if index:
+        index_dest = sidecar_path(archive_file, INDEX_FILENAME) if archive_file else archive_dir / INDEX_FILENAME
+        index_path, rows = build_index(archive_dir, index_dest)
+        testcase_index = {"path": index_path.name, "rows": rows}
+        print(f"Indexed {rows} testcases into: {index_path}")
+
     manifest = {
         "timestamp": timestamp,
         "source_root": str(root),
-        "collection_dir": str(archive_dir),
+        "collection_dir": str(archive_file or archive_dir),
+        "format": output_format,
         "log_copy": str(log_copy) if log_copy else None,
         "modules": sorted(str(module.relative_to(root)) for module in modules),
+        "testcase_index": testcase_index,
+        "transfer": transfer,
     }
+    if shard_roots:
+        manifest["shards"] = [
+            {
+                "shard": number,
+                "source_root": str(source_root),
+                "path": dest_prefix.relative_to(archive_dir).as_posix(),
+                "modules": sorted(str(module.relative_to(source_root)) for module in found),
+            }
+            for number, (source_root, dest_prefix, found) in enumerate(sources, start=1)
+        ]
+    if run_info is not None:
+        manifest["run"] = run_info
+    if archive_file is not None and log_copy is not None:
+        manifest["log_copy"] = log_copy.relative_to(archive_dir).as_posix()
     manifest_path = archive_dir / "collection.json"
     with open(manifest_path, "w", encoding="utf-8") as mf:
         json.dump(manifest, mf, indent=2)
     print(f"Wrote manifest: {manifest_path}")
 
-    return archive_dir
+    if archive_file is None:
+        return archive_dir
+
+    started = time.monotonic()
+    members = write_archive(archive_dir, archive_file, output_format)
+    shutil.rmtree(archive_dir)
+    size_mb = archive_file.stat().st_size / (1024 * 1024)
+    print(
+        f"Packed {members} files into {archive_file} ({size_mb:.1f} MB) "
+        f"in {time.monotonic() - started:.2f}s"
+    )
+    return archive_file
 
 
 def parse_args() -> argparse.Namespace:
@@ -171,6 +489,52 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Delete source test-results/reports directories after successful copy.",
     )
+    ap.add_argument(
+        "--mode",
+        choices=TRANSFER_MODES,
+        default="auto",
+        help="How artifacts enter the collection: copy, hardlink, reflink (copy-on-write clone), "
+             "move (rename; removes the source), or auto = move with --remove-source on the same "
+             "filesystem, otherwise reflink. Unsupported links fall back to copying (default: auto).",
+    )
+    ap.add_argument(
+        "--copy-workers",
+        type=int,
+        default=DEFAULT_COPY_WORKERS,
+        help=f"Threads used when files have to be copied (default: {DEFAULT_COPY_WORKERS}).",
+    )
+    ap.add_argument(
+        "--scan-workers",
+        type=int,
+        default=1,
+        help="Threads used to discover modules, one top-level directory each (default: 1).",
+    )
+    ap.add_argument(
+        "--format",
+        dest="output_format",
+        choices=OUTPUT_FORMATS,
+        default="dir",
+        help="Write a loose directory (default) or a single compressed archive that "
+             "junit_local_summary.py, repro_test.py and junit_testcase_index.py read in place.",
+    )
+    ap.add_argument(
+        "--run-info",
+        help="JSON file describing the run (e.g. run_comparison.py's runner allocation), "
+             "stored in collection.json under \"run\".",
+    )
+    ap.add_argument(
+        "--shard-root",
+        dest="shard_roots",
+        action="append",
+        default=[],
+        help="Additional workspace of the same sharded run (repeatable, in shard order 2..N); "
+             "collected under shard-<n>/.",
+    )
+    ap.add_argument(
+        "--no-index",
+        action="store_true",
+        help=f"Skip writing the per-testcase {INDEX_FILENAME} (see junit_testcase_index.py).",
+    )
     return ap.parse_args()
 
 
@@ -196,7 +560,7 @@ def run(args: argparse.Namespace) -> Path:
         args: Parsed CLI arguments from parse_args().
 
     Returns:
-        Path to the archive directory that was created.
+        Path to the archive directory (or archive file, with --format) that was created.
     """
     root = Path(args.root).resolve()
     if not root.exists():
@@ -207,6 +571,13 @@ def run(args: argparse.Namespace) -> Path:
         dest_base = (SCRIPT_DIR / dest_base).resolve()
 
     timestamp = args.timestamp or dt.datetime.now().strftime("%Y%m%d-%H%M%S")
+    run_info = None
+    if getattr(args, "run_info", None):
+        run_info = json.loads(Path(args.run_info).read_text(encoding="utf-8"))
+    shard_roots = [Path(shard_root).resolve() for shard_root in getattr(args, "shard_roots", None) or []]
+    for shard_root in shard_roots:
+        if not shard_root.exists():
+            raise FileNotFoundError(f"shard root not found: {shard_root}")
 
     return collect(
         root=root,
@@ -214,6 +585,13 @@ def run(args: argparse.Namespace) -> Path:
         timestamp=timestamp,
         log_path=args.log,
         remove_source=args.remove_source,
+        index=not getattr(args, "no_index", False),
+        mode=getattr(args, "mode", "auto"),
+        workers=getattr(args, "copy_workers", DEFAULT_COPY_WORKERS),
+        output_format=getattr(args, "output_format", "dir"),
+        scan_workers=getattr(args, "scan_workers", 1),
+        run_info=run_info,
+        shard_roots=shard_roots,
     )
 
 
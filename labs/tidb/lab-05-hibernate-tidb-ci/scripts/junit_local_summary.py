@@ -9,6 +9,9 @@ pipeline output.
 Usage examples:
   ./junit_local_summary.py --root tmp/mysql-results-20251103-143022
   ./junit_local_summary.py --root tmp/mysql-results-20251103-143022 --json-out tmp/mysql-summary
+  ./junit_local_summary.py --root tmp/mysql-results-20251103-143022 --full-parse
+  ./junit_local_summary.py --root tmp/mysql-results-20251103-143022 --jobs 0
+  ./junit_local_summary.py --root tmp/mysql-results-20251103-143022 --verify-cache
 """
 
 import argparse
@@ -18,10 +21,11 @@ import os
 import sys
 from collections import defaultdict
 from pathlib import Path
-from typing import Dict, Iterable, Optional, Tuple
-from xml.etree import ElementTree
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from env_utils import load_lab_env, require_path
+from junit_archive import is_archive, is_junit_member, read_member
+from junit_scan import module_name_for, read_suite_attributes, read_suite_attributes_full, scan, scan_members
 
 
 def friendly_duration(seconds: float) -> str:
@@ -41,34 +45,148 @@ def friendly_duration(seconds: float) -> str:
     return " ".join(chunks)
 
 
-def find_test_suites(root: Path) -> Iterable[Tuple[Path, ElementTree.Element]]:
-    """Yield (path, testsuite_element) for every JUnit XML file under root."""
+def find_test_suites(
+    root: Path,
+    streaming: bool = True,
+    jobs: Optional[int] = 1,
+    cache: Optional["SummaryCache"] = None,
+) -> Iterable[Tuple[Path, Dict[str, str]]]:
+    """
+    Yield (path, testsuite_attributes) for every JUnit XML file under root.
+
+    streaming=True only reads each file up to the root element; streaming=False
+    falls back to a full ElementTree parse, which also rejects files that are
+    malformed after the root element. Paths are sorted and parsed via
+    junit_scan.scan, so the yield order is the same for any `jobs` value.
+    With a cache, only files whose size or mtime changed are parsed. When root is
+    a collection archive, XML members are streamed out of it instead.
+    """
+    reader = read_suite_attributes if streaming else read_suite_attributes_full
+    if is_archive(root):
+        for name, attrs in scan_members(root, is_junit_member, reader):
+            if attrs is not None:
+                yield root / name, attrs
+        return
     pattern = "**/test-results/**/*.xml"
-    for xml_path in root.glob(pattern):
-        try:
-            tree = ElementTree.parse(xml_path)
-        except ElementTree.ParseError:
-            continue
-        suite = tree.getroot()
-        if suite.tag == "testsuite":
-            yield xml_path, suite
+    paths = sorted(root.glob(pattern))
+    if cache is not None:
+        results = cache.resolve(root, paths, reader, jobs)
+    else:
+        results = scan(paths, reader, jobs=jobs)
+    for xml_path, attrs in results:
+        if attrs is not None:
+            yield xml_path, attrs
+
+
+CACHE_FILENAME = "summary-cache.json"
+CACHE_VERSION = 1
+SUITE_COUNTER_KEYS = ("tests", "failures", "errors", "skipped", "time")
+
+
+def suite_counters(attrs: Optional[Dict[str, str]]) -> Optional[Dict[str, str]]:
+    """Keep only the testsuite attributes aggregate() needs (None stays None)."""
+    if attrs is None:
+        return None
+    return {key: attrs[key] for key in SUITE_COUNTER_KEYS if key in attrs}
 
 
-def module_name_for(path: Path, root: Path) -> str:
+class SummaryCache:
     """
-    Derive a module identifier from an XML path.
+    Per-file suite counters stored next to collection.json.
 
-    We take the first path segment leading up to 'target/' so that
-    'hibernate-core/target/test-results/test/...' becomes 'hibernate-core'.
+    Entries are keyed by the XML path relative to the collection root and reused
+    while the file's size and mtime_ns are unchanged. The parse mode is part of
+    the header because full parses reject files that streaming accepts.
     """
-    rel = path.relative_to(root)
-    parts = rel.parts
-    try:
-        idx = parts.index("target")
-    except ValueError:
-        idx = 1 if len(parts) else 0
-    module = parts[idx - 1] if idx > 0 else parts[0] if parts else "unknown"
-    return module
+
+    def __init__(self, path: Path, mode: str, rebuild: bool = False, verify: bool = False) -> None:
+        self.path = path
+        self.mode = mode
+        self.verify = verify
+        self.entries: Dict[str, dict] = {} if rebuild else self._load()
+        self.dirty = rebuild
+        self.hits = 0
+        self.misses = 0
+        self.mismatches: List[str] = []
+
+    def _load(self) -> Dict[str, dict]:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict):
+            return {}
+        if data.get("version") != CACHE_VERSION or data.get("mode") != self.mode:
+            return {}
+        entries = data.get("files")
+        return entries if isinstance(entries, dict) else {}
+
+    def resolve(
+        self, root: Path, paths: List[Path], reader, jobs: Optional[int] = 1
+    ) -> List[Tuple[Path, Optional[Dict[str, str]]]]:
+        """Return (path, counters) for paths, parsing only misses (or everything in verify mode)."""
+        resolved: Dict[Path, Optional[Dict[str, str]]] = {}
+        pending = []
+        seen = set()
+        for xml_path in paths:
+            key = xml_path.relative_to(root).as_posix()
+            seen.add(key)
+            stat = xml_path.stat()
+            entry = self.entries.get(key)
+            hit = (
+                entry is not None
+                and entry.get("size") == stat.st_size
+                and entry.get("mtime_ns") == stat.st_mtime_ns
+            )
+            if hit and not self.verify:
+                self.hits += 1
+                resolved[xml_path] = entry.get("attrs")
+                continue
+            pending.append((xml_path, key, stat, entry if hit else None))
+
+        parsed = dict(scan([item[0] for item in pending], reader, jobs=jobs))
+        for xml_path, key, stat, entry in pending:
+            attrs = suite_counters(parsed[xml_path])
+            if entry is not None:
+                self.hits += 1
+                if entry.get("attrs") != attrs:
+                    self.mismatches.append(key)
+            else:
+                self.misses += 1
+            if entry is None or entry.get("attrs") != attrs:
+                self.entries[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "attrs": attrs}
+                self.dirty = True
+            resolved[xml_path] = attrs
+
+        for stale in set(self.entries) - seen:
+            del self.entries[stale]
+            self.dirty = True
+        return [(xml_path, resolved[xml_path]) for xml_path in paths]
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def save(self) -> None:
+        """Write the cache atomically if anything changed."""
+        if not self.dirty:
+            return
+        payload = {"version": CACHE_VERSION, "mode": self.mode, "files": self.entries}
+        tmp_path = self.path.with_name(f"{self.path.name}.tmp")
+        tmp_path.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+    def stats(self) -> dict:
+        return {
+            "path": str(self.path),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate, 4),
+            "verified": self.verify,
+            "mismatches": list(self.mismatches),
+        }
 
 
 def extract_db_hint(env_lines: Iterable[str]) -> str:
@@ -91,6 +209,10 @@ def tail_log_for_env(log_path: Path, limit: int = 256) -> str:
         text = log_path.read_text(encoding="utf-8", errors="ignore")
     except OSError:
         return "unknown"
+    return tail_text_for_env(text, limit)
+
+
+def tail_text_for_env(text: str, limit: int = 256) -> str:
     lines = text.splitlines()[-limit:]
     return extract_db_hint(reversed(lines))
 
@@ -146,6 +268,24 @@ def load_manifest(path: Path) -> Optional[dict]:
         return None
 
 
+def load_archive_manifest(archive: Path) -> Optional[dict]:
+    """Load collection.json from inside a collection archive."""
+    try:
+        data = read_member(archive, "collection.json")
+        return json.loads(data) if data is not None else None
+    except (OSError, ValueError) as exc:
+        print(f"WARNING: Failed to read manifest from {archive}: {exc}", file=sys.stderr)
+        return None
+
+
+def archive_member_for(archive: Path, log_path: Path) -> Optional[str]:
+    """Return the member name when log_path points inside the archive (ARCHIVE/logs/...)."""
+    try:
+        return log_path.relative_to(archive).as_posix()
+    except ValueError:
+        return None
+
+
 def discover_log_in_collection(root: Path) -> Optional[Path]:
     """Return the newest log file under root/logs if present."""
     logs_dir = root / "logs"
@@ -190,7 +330,12 @@ def resolve_log_path(log_arg: Optional[str], root: Path, manifest: Optional[dict
     return guess_log_path()
 
 
-def aggregate(root: Path) -> Tuple[dict, Dict[str, dict]]:
+def aggregate(
+    root: Path,
+    streaming: bool = True,
+    jobs: Optional[int] = 1,
+    cache: Optional[SummaryCache] = None,
+) -> Tuple[dict, Dict[str, dict]]:
     overall = {
         "files": 0,
         "tests": 0,
@@ -208,17 +353,17 @@ def aggregate(root: Path) -> Tuple[dict, Dict[str, dict]]:
         "files": 0,
     })
 
-    for xml_path, suite in find_test_suites(root):
+    for xml_path, attrs in find_test_suites(root, streaming=streaming, jobs=jobs, cache=cache):
         overall["files"] += 1
         module = module_name_for(xml_path, root)
         bucket = per_module[module]
         bucket["files"] += 1
 
-        tests = int(suite.attrib.get("tests", 0))
-        failures = int(suite.attrib.get("failures", 0))
-        errors = int(suite.attrib.get("errors", 0))
-        skipped = int(suite.attrib.get("skipped", 0))
-        time = float(suite.attrib.get("time", 0.0))
+        tests = int(attrs.get("tests", 0))
+        failures = int(attrs.get("failures", 0))
+        errors = int(attrs.get("errors", 0))
+        skipped = int(attrs.get("skipped", 0))
+        time = float(attrs.get("time", 0.0))
 
         for key, value in (
             ("tests", tests),
@@ -297,6 +442,34 @@ def parse_args(argv: Optional[Iterable[str]] = None) -> argparse.Namespace:
         "--timestamp",
         help="Override timestamp used for archive/JSON naming (format: YYYYMMDD-HHMMSS)",
     )
+    ap.add_argument(
+        "--full-parse",
+        action="store_true",
+        help="Parse every XML document completely instead of streaming only the root "
+             "<testsuite> element (slower; also skips files malformed past the root).",
+    )
+    ap.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Worker processes used to parse XML files (default: 1; 0 = one per CPU).",
+    )
+    cache_group = ap.add_mutually_exclusive_group()
+    cache_group.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=f"Do not read or write ROOT/{CACHE_FILENAME} (the cache is only used for collection directories).",
+    )
+    cache_group.add_argument(
+        "--rebuild-cache",
+        action="store_true",
+        help="Discard the cached per-file counters and re-parse every XML file.",
+    )
+    cache_group.add_argument(
+        "--verify-cache",
+        action="store_true",
+        help="Re-parse every XML file, report cached entries that disagree, and repair them.",
+    )
     return ap.parse_args(argv)
 
 
@@ -310,15 +483,20 @@ def run(args: argparse.Namespace) -> dict:
     if not root.exists():
         raise FileNotFoundError(f"root path not found: {root}")
 
+    archived = is_archive(root)
     if args.manifest:
         manifest_path = Path(args.manifest)
         if not manifest_path.is_absolute():
             manifest_path = (SCRIPT_DIR / manifest_path).resolve()
     else:
-        manifest_path = (root / "collection.json").resolve()
+        manifest_path = root / "collection.json" if archived else (root / "collection.json").resolve()
 
-    manifest_ref = manifest_path if manifest_path.exists() else None
-    manifest = load_manifest(manifest_path)
+    if archived and not args.manifest:
+        manifest = load_archive_manifest(root)
+        manifest_ref = manifest_path if manifest is not None else None
+    else:
+        manifest_ref = manifest_path if manifest_path.exists() else None
+        manifest = load_manifest(manifest_path)
 
     timestamp = args.timestamp
     if not timestamp and manifest:
@@ -326,12 +504,42 @@ def run(args: argparse.Namespace) -> dict:
     if not timestamp:
         timestamp = dt.datetime.now().strftime("%Y%m%d-%H%M%S")
 
-    overall, per_module = aggregate(root)
+    streaming = not getattr(args, "full_parse", False)
+    cache: Optional[SummaryCache] = None
+    if (root / "collection.json").exists() and not getattr(args, "no_cache", False):
+        cache = SummaryCache(
+            root / CACHE_FILENAME,
+            mode="streaming" if streaming else "full",
+            rebuild=getattr(args, "rebuild_cache", False),
+            verify=getattr(args, "verify_cache", False),
+        )
+
+    overall, per_module = aggregate(
+        root,
+        streaming=streaming,
+        jobs=getattr(args, "jobs", 1),
+        cache=cache,
+    )
+    if cache is not None:
+        try:
+            cache.save()
+        except OSError as exc:
+            print(f"WARNING: could not write summary cache {cache.path}: {exc}", file=sys.stderr)
     log_path = resolve_log_path(args.log, root, manifest)
 
     db_hint = "unknown"
     log_hint = ""
-    if log_path:
+    archived_log = archive_member_for(root, log_path) if archived and log_path else None
+    if archived_log is not None:
+        data = read_member(root, archived_log)
+        if data is not None:
+            db_hint = tail_text_for_env(data.decode("utf-8", errors="ignore"))
+            if db_hint == "unknown":
+                db_hint = infer_from_filename(log_path)
+            log_hint = f"log: {archived_log} (in archive)"
+        else:
+            log_hint = f"log: {archived_log} (missing from archive)"
+    elif log_path:
         if log_path.exists():
             inferred = tail_log_for_env(log_path)
             if inferred == "unknown":
@@ -349,6 +557,13 @@ def run(args: argparse.Namespace) -> dict:
         log_hint = "log: auto-detect failed"
 
     print_report(root, overall, per_module, db_hint, log_hint)
+    if cache is not None:
+        print(
+            f"\nSummary cache: {cache.hits}/{cache.hits + cache.misses} hits "
+            f"({cache.hit_rate:.1%}) — {cache.path.name}"
+        )
+        for key in cache.mismatches:
+            print(f"WARNING: cached counters were stale for {key} (repaired)", file=sys.stderr)
 
     json_path: Optional[Path] = None
     if args.json_out:
@@ -365,6 +580,8 @@ def run(args: argparse.Namespace) -> dict:
             "overall": overall,
             "modules": per_module,
         }
+        if cache is not None:
+            payload["cache"] = cache.stats()
         if log_path:
             payload["log"] = str(log_path)
 
@@ -383,6 +600,7 @@ def run(args: argparse.Namespace) -> dict:
         "db_hint": db_hint,
         "timestamp": timestamp,
         "json_path": str(json_path) if json_path else None,
+        "cache": cache.stats() if cache is not None else None,
     }
 
 
@@ -10,6 +10,20 @@ Flow:
 3) Fetch trimmed JUnit report (duration, suites[], cases[].status, enclosingBlockNames)
 4) Aggregate by pipeline label and print summary/table (+ optional JSON)
 5) [Optional with --with-gradle-tasks] Use WFAPI to correlate suites with Gradle tasks
+
+With --follow, a running build is polled instead: each poll fetches only the
+suites published since the previous one (`suites[...]{N,}`) plus the new bytes
+of the node logs involved (progressiveText), updates the per-label totals
+incrementally and prints a running-totals line. The usual summary is printed
+once the build finishes (or after --max-polls).
+
+With --page-size N the report is requested in `suites[...]{start,end}` pages,
+--page-concurrency at a time, and each page is aggregated as soon as it
+arrives, so no single response has to carry (or buffer) the whole report.
+
+Responses are cached on disk (TEMP_DIR/jenkins-http-cache, see jenkins_http.py);
+once the build is known to be finished, its test report and logs are served
+from the cache on repeat runs. Use --no-cache to bypass it.
 """
 
 import argparse
@@ -17,23 +31,29 @@ import datetime as dt
 import json
 import re
 import sys
+import time
 import urllib.error
-import urllib.request
-from typing import Dict, Tuple, Optional, List, Set
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Deque, Dict, Iterable, Iterator, Tuple, Optional, List, Set
+
+import jenkins_http
 
-UA = "jenkins-junit-pipeline-label-summary/1.5"
+UA = "jenkins-junit-pipeline-label-summary/1.8"
 TIMEOUT = 30
 ALL_STATUSES = ["PASSED", "SKIPPED", "FAILED", "FIXED", "REGRESSION"]
 VERBOSE = False
+POLL_INTERVAL = 60
+PAGE_SIZE = 500
+PAGE_CONCURRENCY = 4
+SUITE_TREE = "suites[duration,cases[status],enclosingBlockNames,nodeId]"
 
 # Match Gradle task lines (from jenkins_pipeline_tasks_summary.py)
 TASK_RE = re.compile(r'^(?:&gt;|>)(?:<b[^>]*>)?\s*Task\s+(:[A-Za-z0-9_-]+(?::[A-Za-z0-9_-]+)*:test)\b')
 
 # --- HTTP ---
 def http_get(url: str, expect_json: bool = False):
-    req = urllib.request.Request(url, headers={"User-Agent": UA})
-    with urllib.request.urlopen(req, timeout=TIMEOUT) as r:
-        data = r.read()
+    data = jenkins_http.fetch(url, headers={"User-Agent": UA}, timeout=TIMEOUT)
     if expect_json:
         try:
             return json.loads(data.decode("utf-8", "replace"))
@@ -46,10 +66,8 @@ def http_get_json(url: str, ignore_404: bool = False) -> Optional[dict]:
     Fetch JSON from a URL. Returns None on error.
     If ignore_404=True, will log and return None on 404 instead of raising.
     """
-    req = urllib.request.Request(url, headers={"User-Agent": UA})
     try:
-        with urllib.request.urlopen(req, timeout=TIMEOUT) as r:
-            data = r.read()
+        data = jenkins_http.fetch(url, headers={"User-Agent": UA}, timeout=TIMEOUT)
         return json.loads(data.decode("utf-8", "replace"))
     except urllib.error.HTTPError as e:
         if e.code == 404:
@@ -83,7 +101,7 @@ def pin_build(url: str, build_spec: str) -> str:
 
 # --- Jenkins fetches ---
 def fetch_build_info(build_url: str) -> Optional[dict]:
-    url = f"{build_url.rstrip('/')}/api/json?tree=timestamp,result,number,url,displayName"
+    url = f"{build_url.rstrip('/')}/api/json?tree=timestamp,result,number,url,displayName,building"
     return http_get(url, expect_json=True)
 
 def fetch_test_report(build_url: str) -> Optional[dict]:
@@ -93,79 +111,180 @@ def fetch_test_report(build_url: str) -> Optional[dict]:
     )
     return http_get(url, expect_json=True)
 
-# --- Parsing & aggregation ---
-def parse_test_report(report: dict, label_index: int) -> Tuple[dict, Dict[str, dict]]:
-    overall = {"suites": 0, "cases": 0, "duration": 0.0}
-    labels: Dict[str, dict] = {}
-
-    if not report or "suites" not in report:
-        return overall, labels
+def fetch_test_report_suites(build_url: str, start: int = 0) -> Optional[dict]:
+    """Fetch the report duration plus suites[start:] only (Jenkins `{start,}` range); None before any publish."""
+    url = (
+        f"{build_url.rstrip('/')}/testReport/api/json"
+        f"?tree=duration,suites[duration,cases[status],enclosingBlockNames,nodeId]%7B{start},%7D"
+    )
+    return http_get_json(url, ignore_404=True)
 
-    overall["duration"] = float(report.get("duration", 0.0))
-    suites = report.get("suites", [])
-    overall["suites"] = len(suites)
+def fetch_test_report_page(build_url: str, start: int, end: int) -> Optional[dict]:
+    """Fetch the report duration plus suites[start:end]; None when the build has no report."""
+    url = f"{build_url.rstrip('/')}/testReport/api/json?tree=duration,{SUITE_TREE}%7B{start},{end}%7D"
+    try:
+        page = http_get(url, expect_json=True)
+    except urllib.error.HTTPError as e:
+        if e.code == 404:
+            return None
+        raise
+    if page is None:
+        raise RuntimeError(f"invalid JSON in test report page {start}-{end}: {url}")
+    return page
 
-    for suite in suites:
-        blocks = suite.get("enclosingBlockNames", []) or []
+# --- Parsing & aggregation ---
+class LabelAggregator:
+    """Per-label totals that can be extended suite batch by suite batch."""
+
+    def __init__(self, label_index: int):
+        self.label_index = label_index
+        self.overall = {"suites": 0, "cases": 0, "duration": 0.0}
+        self.labels: Dict[str, dict] = {}
+
+    def add_suites(self, suites: Iterable[dict]) -> None:
+        overall = self.overall
+        for suite in suites:
+            overall["suites"] += 1
+            blocks = suite.get("enclosingBlockNames", []) or []
+            try:
+                label = blocks[self.label_index]
+            except Exception:
+                continue
+
+            bucket = self.labels.setdefault(label, {"cases": 0, "duration": 0.0, "suites": 0})
+            bucket["duration"] += float(suite.get("duration", 0.0))
+            bucket["suites"] += 1
+
+            for case in suite.get("cases", []) or []:
+                overall["cases"] += 1
+                bucket["cases"] += 1
+                status = case.get("status")
+                if status not in ALL_STATUSES:
+                    bucket["UNKNOWN"] = bucket.get("UNKNOWN", 0) + 1
+                else:
+                    bucket[status] = bucket.get(status, 0) + 1
+
+    def status_total(self, status: str) -> int:
+        return sum(bucket.get(status, 0) for bucket in self.labels.values())
+
+def fetch_test_report_paged(
+    build_url: str,
+    label_index: int,
+    page_size: int = PAGE_SIZE,
+    concurrency: int = PAGE_CONCURRENCY,
+    keep_suites: bool = False,
+) -> Tuple[Optional["LabelAggregator"], List[dict]]:
+    """
+    Aggregate the test report page by page; returns (aggregator or None without a report, kept suites).
+
+    The total suite count is unknown up front, so `concurrency` consecutive
+    pages are kept in flight and the walk stops at the first short page.
+    Pages are consumed in order and dropped after aggregation unless
+    keep_suites is set (needed to correlate suites with Gradle tasks), so
+    memory is bounded by page_size x concurrency. page_size must be positive;
+    use fetch_test_report() for the whole report in one request.
+    """
+    if page_size < 1:
+        raise ValueError(f"page_size must be at least 1 (got {page_size})")
+    aggregator: Optional[LabelAggregator] = None
+    kept: List[dict] = []
+    window: Deque[Future] = deque()
+    next_start = 0
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        def submit() -> None:
+            nonlocal next_start
+            window.append(pool.submit(fetch_test_report_page, build_url, next_start, next_start + page_size))
+            next_start += page_size
+
+        for _ in range(max(1, concurrency)):
+            submit()
         try:
-            label = blocks[label_index]
-        except Exception:
-            continue
-
-        bucket = labels.setdefault(label, {"cases": 0, "duration": 0.0, "suites": 0})
-        bucket["duration"] += float(suite.get("duration", 0.0))
-        bucket["suites"] += 1
-
-        for case in suite.get("cases", []) or []:
-            overall["cases"] += 1
-            bucket["cases"] += 1
-            status = case.get("status")
-            if status not in ALL_STATUSES:
-                bucket["UNKNOWN"] = bucket.get("UNKNOWN", 0) + 1
-            else:
-                bucket[status] = bucket.get(status, 0) + 1
+            while window:
+                page = window.popleft().result()
+                if page is None:
+                    break
+                suites = page.get("suites") or []
+                if aggregator is None:
+                    aggregator = LabelAggregator(label_index)
+                    aggregator.overall["duration"] = float(page.get("duration", 0.0))
+                aggregator.add_suites(suites)
+                if keep_suites:
+                    kept.extend(suites)
+                if len(suites) < page_size:
+                    break
+                submit()
+        finally:
+            for future in window:
+                future.cancel()
+    return aggregator, kept
 
-    return overall, labels
+def parse_test_report(report: dict, label_index: int) -> Tuple[dict, Dict[str, dict]]:
+    aggregator = LabelAggregator(label_index)
+    if not report or "suites" not in report:
+        return aggregator.overall, aggregator.labels
+
+    aggregator.overall["duration"] = float(report.get("duration", 0.0))
+    aggregator.add_suites(report.get("suites", []))
+    return aggregator.overall, aggregator.labels
 
 # --- WFAPI helpers (for --with-gradle-tasks) ---
-def wfapi_log_lines(build_url: str, node_id: str) -> List[str]:
+def wfapi_log_lines(build_url: str, node_id: str, start: Optional[int] = None) -> Iterator[str]:
     """
-    Get log lines for a node. Returns empty list if endpoint fails.
-    Uses the console log endpoint to get complete logs.
+    Stream log lines for a node; stops quietly if the endpoint fails before the first
+    line, and warns on stderr if the log breaks off after some lines were read.
+    Uses the console log endpoint to get complete logs, decoding it
+    chunk by chunk so memory stays bounded however large the log is.
+    With `start`, reads log/progressiveText from that byte offset instead.
     """
     url = build_url.rstrip("/") + f"/execution/node/{node_id}/log"
     if VERBOSE:
         print(f"  Fetching logs for node {node_id}: {url}", file=sys.stderr)
 
-    req = urllib.request.Request(url, headers={"User-Agent": UA})
+    headers = {"User-Agent": UA}
+    if start is None:
+        chunks = jenkins_http.stream(url, headers=headers, timeout=TIMEOUT)
+    else:
+        chunks = jenkins_http.ProgressiveText(url, start, headers=headers, timeout=TIMEOUT)
+    read = 0
     try:
-        with urllib.request.urlopen(req, timeout=TIMEOUT) as r:
-            data = r.read()
-        text = data.decode("utf-8", "replace")
-        return text.splitlines()
+        for line in jenkins_http.iter_lines(chunks):
+            read += 1
+            yield line
     except urllib.error.HTTPError as e:
-        if e.code == 404:
+        if read:
+            _warn_truncated_log(node_id, read, f"HTTP {e.code}")
+        elif e.code == 404:
             if VERBOSE:
                 print(f"  [404] {url}", file=sys.stderr)
-            return []
-        if VERBOSE:
+        elif VERBOSE:
             print(f"  [HTTP {e.code}] {url}", file=sys.stderr)
-        return []
     except Exception as e:
-        if VERBOSE:
+        if read:
+            _warn_truncated_log(node_id, read, str(e))
+        elif VERBOSE:
             print(f"  [ERROR] {url}: {e}", file=sys.stderr)
-        return []
 
-def extract_gradle_tasks_from_logs(lines: List[str]) -> List[str]:
+def _warn_truncated_log(node_id: str, lines: int, reason: str) -> None:
+    """A log that broke off mid-stream is still scanned, so say its node may be undercounted."""
+    print(
+        f"WARNING: log of node {node_id} truncated after {lines} lines ({reason}); its Gradle tasks may be undercounted",
+        file=sys.stderr,
+    )
+
+def extract_gradle_tasks_from_logs(lines: Iterable[str]) -> List[str]:
     """
-    Extract Gradle :*:test tasks from log lines.
+    Extract Gradle :*:test tasks from log lines (a list or a single-pass stream).
     Returns a list of unique task paths found.
     """
     tasks: Set[str] = set()
+    task_match = TASK_RE.match
     for ln in lines:
-        m = TASK_RE.match(ln)
-        if m:
-            tasks.add(m.group(1))
+        # Cheap pre-filter: only task headers are worth a regex
+        if ln.startswith((">", "&gt;")) and ":test" in ln:
+            m = task_match(ln)
+            if m:
+                tasks.add(m.group(1))
     return sorted(tasks)
 
 def correlate_suites_with_gradle_tasks(build_url: str, report: dict) -> Dict[int, List[str]]:
@@ -233,6 +352,97 @@ def correlate_suites_with_gradle_tasks(build_url: str, report: dict) -> Dict[int
 
     return suite_tasks
 
+def _node_log(build_url: str, node_id: str) -> jenkins_http.ProgressiveText:
+    url = build_url.rstrip("/") + f"/execution/node/{node_id}/log"
+    return jenkins_http.ProgressiveText(url, headers={"User-Agent": UA}, timeout=TIMEOUT, whole_lines=True)
+
+def format_running_totals(poll: int, building: bool, aggregator: LabelAggregator, added: int) -> str:
+    overall = aggregator.overall
+    failing = "  ".join(f"{status}={aggregator.status_total(status)}" for status in ("FAILED", "REGRESSION"))
+    state = "RUNNING " if building else "FINISHED"
+    return (
+        f"[poll {poll} {dt.datetime.now().strftime('%H:%M:%S')}] {state} "
+        f"suites={overall['suites']} (+{added})  cases={overall['cases']}  {failing}  "
+        f"labels={len(aggregator.labels)}  duration={format_duration(overall['duration'])}"
+    )
+
+def follow_build(
+    build_url: str,
+    label_index: int,
+    with_gradle_tasks: bool = False,
+    interval: float = POLL_INTERVAL,
+    max_polls: int = 0,
+) -> Tuple[dict, Dict[int, List[str]], int]:
+    """
+    Poll a (possibly running) build until it finishes or max_polls is reached.
+
+    Each poll requests only the suites past those already seen and, with
+    with_gradle_tasks, only the log bytes appended since the previous read
+    for nodes that published suites or were still logging. Returns the
+    accumulated report, the suite -> Gradle tasks map and the number of polls.
+    """
+    aggregator = LabelAggregator(label_index)
+    suites: List[dict] = []
+    node_logs: Dict[str, jenkins_http.ProgressiveText] = {}
+    node_tasks: Dict[str, Set[str]] = {}
+    polls = 0
+
+    while True:
+        polls += 1
+        try:
+            info = fetch_build_info(build_url) or {}
+        except urllib.error.HTTPError as e:
+            if e.code < 500:
+                raise
+            print(f"WARNING: poll {polls}: HTTP {e.code} fetching the build state; retrying", file=sys.stderr)
+            info = {}
+        except OSError as e:
+            print(f"WARNING: poll {polls}: error fetching the build state ({e}); retrying", file=sys.stderr)
+            info = {}
+        # Unknown state (transient error) counts as still building
+        building = info.get("building") is not False
+
+        try:
+            chunk = fetch_test_report_suites(build_url, len(suites)) or {}
+        except urllib.error.HTTPError as e:
+            if e.code < 500:
+                raise
+            print(f"WARNING: poll {polls}: HTTP {e.code} fetching the test report; retrying", file=sys.stderr)
+            chunk = {}
+        new_suites = chunk.get("suites") or []
+        suites.extend(new_suites)
+        aggregator.add_suites(new_suites)
+        if "duration" in chunk:
+            aggregator.overall["duration"] = float(chunk.get("duration") or 0.0)
+
+        if with_gradle_tasks:
+            refresh = {str(s["nodeId"]) for s in new_suites if s.get("nodeId")}
+            refresh.update(node_id for node_id, log in node_logs.items() if log.more)
+            for node_id in sorted(refresh):
+                log = node_logs.setdefault(node_id, _node_log(build_url, node_id))
+                try:
+                    found = extract_gradle_tasks_from_logs(jenkins_http.iter_lines(log))
+                except Exception as e:
+                    if VERBOSE:
+                        print(f"  Node {node_id}: error fetching logs: {e}", file=sys.stderr)
+                    continue
+                node_tasks.setdefault(node_id, set()).update(found)
+
+        print(format_running_totals(polls, building, aggregator, len(new_suites)), flush=True)
+        if not building:
+            jenkins_http.register_finished_build(build_url, info.get("number"))
+            break
+        if max_polls and polls >= max_polls:
+            break
+        time.sleep(interval)
+
+    suite_tasks: Dict[int, List[str]] = {}
+    for idx, suite in enumerate(suites):
+        tasks = node_tasks.get(str(suite.get("nodeId")))
+        if tasks:
+            suite_tasks[idx] = sorted(tasks)
+    return {"duration": aggregator.overall["duration"], "suites": suites}, suite_tasks, polls
+
 # --- Formatting ---
 def format_duration(seconds: float) -> str:
     if seconds <= 0:
@@ -263,6 +473,18 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     ap.add_argument("--with-gradle-tasks", action="store_true",
                     help="Use WFAPI to correlate JUnit suites with their originating Gradle tasks")
     ap.add_argument("--json-out", help="Write JSON summary to this path")
+    ap.add_argument("--page-size", type=int, default=PAGE_SIZE,
+                    help=f"Suites per testReport request (default: {PAGE_SIZE}; 0 = whole report in one request)")
+    ap.add_argument("--page-concurrency", type=int, default=PAGE_CONCURRENCY,
+                    help=f"testReport pages fetched in parallel (default: {PAGE_CONCURRENCY})")
+    ap.add_argument("--follow", action="store_true",
+                    help="Poll a running build, fetching only new suites/log bytes, until it finishes")
+    ap.add_argument("--poll-interval", type=float, default=POLL_INTERVAL,
+                    help=f"Seconds between --follow polls (default: {POLL_INTERVAL})")
+    ap.add_argument("--max-polls", type=int, default=0,
+                    help="Stop following after N polls (default: 0 = until the build finishes)")
+    ap.add_argument("--no-cache", action="store_true", help="Bypass the on-disk HTTP response cache")
+    ap.add_argument("--cache-dir", help="HTTP cache directory (default: $TEMP_DIR/jenkins-http-cache)")
     ap.add_argument("--verbose", "-v", action="store_true", help="Enable verbose output for debugging")
     return ap.parse_args(argv)
 
@@ -272,138 +494,194 @@ def run(args: argparse.Namespace) -> dict:
     global VERBOSE
 
     VERBOSE = args.verbose
-    base = normalize_job_or_build_url(args.url)
-    parts = base.split("/")
-    # Determine if URL is already pinned
-    if parts and (parts[-1].isdigit() or parts[-1] in ("lastBuild", "lastSuccessfulBuild")):
-        build_url = base
-        if parts[-1].isdigit():
-            pin_spec = "(pinned build number)"
+    prev_cache = jenkins_http.configure_cache(
+        jenkins_http.resolve_cache_dir(getattr(args, "no_cache", False), getattr(args, "cache_dir", None))
+    )
+    prev_trace = jenkins_http.configure_trace(args.verbose)
+    jenkins_http.reset_request_stats()
+    try:
+        base = normalize_job_or_build_url(args.url)
+        parts = base.split("/")
+        # Determine if URL is already pinned
+        if parts and (parts[-1].isdigit() or parts[-1] in ("lastBuild", "lastSuccessfulBuild")):
+            build_url = base
+            if parts[-1].isdigit():
+                pin_spec = "(pinned build number)"
+            else:
+                pin_spec = f"({parts[-1]})"
         else:
-            pin_spec = f"({parts[-1]})"
-    else:
-        spec = "lastBuild"
-        if args.last_success: spec = "lastSuccessfulBuild"
-        if args.build: spec = args.build
-        build_url = pin_build(base, spec)
-        pin_spec = spec
-
-    # 1) Start banner
-    print("Starting JUnit pipeline-label summary…")
-    print(f"  Input URL:        {args.url}")
-    print(f"  Resolved build:   {build_url}  [{pin_spec}]")
-    print(f"  Label index:      {args.label_index}")
-    if args.with_gradle_tasks:
-        print(f"  Gradle tasks:     Enabled (via WFAPI)")
-    if args.json_out:
-        print(f"  JSON output:      {args.json_out}")
-    print(f"  User-Agent:       {UA}")
-
-    # 2) Build metadata
-    info = fetch_build_info(build_url)
-    if info:
-        print("\nBuild metadata:")
-        print(f"  Build:   {info.get('displayName')}")
-        ts_ms = info.get("timestamp")
-        if isinstance(ts_ms, (int, float)):
-            ts = dt.datetime.fromtimestamp(ts_ms / 1000, tz=dt.timezone.utc)
-            print(f"  Time:    {ts.isoformat()}")
-        print(f"  Result:  {info.get('result')}")
-        print(f"  URL:     {info.get('url')}")
-    else:
-        print("\nBuild metadata: (unavailable)")
+            spec = "lastBuild"
+            if args.last_success: spec = "lastSuccessfulBuild"
+            if args.build: spec = args.build
+            build_url = pin_build(base, spec)
+            pin_spec = spec
+
+        # 1) Start banner
+        print("Starting JUnit pipeline-label summary…")
+        print(f"  Input URL:        {args.url}")
+        print(f"  Resolved build:   {build_url}  [{pin_spec}]")
+        print(f"  Label index:      {args.label_index}")
+        if args.with_gradle_tasks:
+            print(f"  Gradle tasks:     Enabled (via WFAPI)")
+        if args.json_out:
+            print(f"  JSON output:      {args.json_out}")
+        if getattr(args, "follow", False):
+            print(f"  Follow:           every {args.poll_interval:g}s" + (f", at most {args.max_polls} polls" if args.max_polls else ""))
+        print(f"  User-Agent:       {UA}")
+
+        # 2) Build metadata
+        info = fetch_build_info(build_url)
+        if info:
+            print("\nBuild metadata:")
+            print(f"  Build:   {info.get('displayName')}")
+            ts_ms = info.get("timestamp")
+            if isinstance(ts_ms, (int, float)):
+                ts = dt.datetime.fromtimestamp(ts_ms / 1000, tz=dt.timezone.utc)
+                print(f"  Time:    {ts.isoformat()}")
+            print(f"  Result:  {info.get('result')}")
+            print(f"  URL:     {info.get('url')}")
+            if info.get("building") is False:
+                # Finished builds never change: cache their report and logs permanently
+                jenkins_http.register_finished_build(build_url, info.get("number"))
+        else:
+            print("\nBuild metadata: (unavailable)")
+
+        # JUnit
+        following = getattr(args, "follow", False)
+        page_size = getattr(args, "page_size", 0) or 0
+        suite_tasks: Dict[int, List[str]] = {}
+        aggregator: Optional[LabelAggregator] = None
+        report: Optional[dict] = None
+        polls = 0
+        if following:
+            print(f"\nFollowing build (poll every {args.poll_interval:g}s)…")
+            report, suite_tasks, polls = follow_build(
+                build_url,
+                args.label_index,
+                with_gradle_tasks=args.with_gradle_tasks,
+                interval=args.poll_interval,
+                max_polls=args.max_polls,
+            )
+            if not report["suites"]:
+                report = None
+        elif page_size > 0:
+            aggregator, kept = fetch_test_report_paged(
+                build_url,
+                args.label_index,
+                page_size=page_size,
+                concurrency=getattr(args, "page_concurrency", PAGE_CONCURRENCY),
+                keep_suites=args.with_gradle_tasks,
+            )
+            if aggregator is not None:
+                report = {"duration": aggregator.overall["duration"], "suites": kept}
+        else:
+            report = fetch_test_report(build_url)
+        if not report:
+            raise RuntimeError(f"No test report found for build: {build_url}")
 
-    # JUnit
-    report = fetch_test_report(build_url)
-    if not report:
-        raise RuntimeError(f"No test report found for build: {build_url}")
+        # Correlate with Gradle tasks if requested (--follow correlates as it polls)
+        if args.with_gradle_tasks and not following:
+            suites = report.get("suites", [])
+            # Quick pre-scan to count unique nodes
+            unique_nodes = len(set(str(s.get("nodeId")) for s in suites if s.get("nodeId")))
+            print(f"\nFetching WFAPI logs to correlate suites with Gradle tasks...", file=sys.stderr)
+            print(f"  ({len(suites)} suites across ~{unique_nodes} unique pipeline nodes)", file=sys.stderr)
+            suite_tasks = correlate_suites_with_gradle_tasks(build_url, report)
+            if suite_tasks:
+                print(f"✓ Successfully correlated {len(suite_tasks)} suite(s) with Gradle tasks", file=sys.stderr)
+            else:
+                print("⚠ No Gradle tasks found in suite logs", file=sys.stderr)
 
-    # Correlate with Gradle tasks if requested
-    suite_tasks: Dict[int, List[str]] = {}
-    if args.with_gradle_tasks:
-        suites = report.get("suites", [])
-        # Quick pre-scan to count unique nodes
-        unique_nodes = len(set(str(s.get("nodeId")) for s in suites if s.get("nodeId")))
-        print(f"\nFetching WFAPI logs to correlate suites with Gradle tasks...", file=sys.stderr)
-        print(f"  ({len(suites)} suites across ~{unique_nodes} unique pipeline nodes)", file=sys.stderr)
-        suite_tasks = correlate_suites_with_gradle_tasks(build_url, report)
-        if suite_tasks:
-            print(f"✓ Successfully correlated {len(suite_tasks)} suite(s) with Gradle tasks", file=sys.stderr)
+        # 3) Aggregated totals
+        if aggregator is not None:
+            overall, label_totals = aggregator.overall, aggregator.labels
         else:
-            print("⚠ No Gradle tasks found in suite logs", file=sys.stderr)
-
-    # 3) Aggregated totals
-    overall, label_totals = parse_test_report(report, args.label_index)
-    print("\nAggregated totals (all pipeline labels):")
-    print(f"  Suites:   {overall['suites']}")
-    print(f"  Cases:    {overall['cases']}")
-    print(f"  Duration: {format_duration(overall['duration'])}")
-    if label_totals:
-        print(f"  Labels using index {args.label_index}: {', '.join(sorted(label_totals.keys()))}")
-
-    # 4) Per-label table
-    cols = ALL_STATUSES + ["UNKNOWN"]
-    header = f"\n{'Pipeline label':25} {'Duration':>12} {'Suites':>8} {'Cases':>10}" + "".join(f" {c:>10}" for c in cols)
-    print(header)
-    for label in sorted(label_totals.keys()):
-        t = label_totals[label]
-        line = f"{label:25} {format_duration(t.get('duration', 0.0)):>12} {t.get('suites', 0):8d} {t.get('cases', 0):10d}"
-        for c in cols:
-            line += f" {t.get(c, 0):10d}"
-        print(line)
-
-    # 5) Gradle tasks per suite (if enabled)
-    if args.with_gradle_tasks and suite_tasks:
-        print("\nGradle tasks by suite (from WFAPI logs):")
-        suites = report.get("suites", [])
-        for idx, tasks in sorted(suite_tasks.items()):
-            suite = suites[idx] if idx < len(suites) else {}
-            blocks = suite.get("enclosingBlockNames", []) or []
-            context = " > ".join(blocks) if blocks else f"Suite {idx}"
-            tasks_str = ", ".join(tasks)
-            print(f"  [{idx}] {context}")
-            print(f"      Tasks: {tasks_str}")
-
-    json_path = None
-    # Optional JSON
-    if args.json_out:
-        payload = {
+            overall, label_totals = parse_test_report(report, args.label_index)
+        print("\nAggregated totals (all pipeline labels):")
+        print(f"  Suites:   {overall['suites']}")
+        print(f"  Cases:    {overall['cases']}")
+        print(f"  Duration: {format_duration(overall['duration'])}")
+        if label_totals:
+            print(f"  Labels using index {args.label_index}: {', '.join(sorted(label_totals.keys()))}")
+
+        # 4) Per-label table
+        cols = ALL_STATUSES + ["UNKNOWN"]
+        header = f"\n{'Pipeline label':25} {'Duration':>12} {'Suites':>8} {'Cases':>10}" + "".join(f" {c:>10}" for c in cols)
+        print(header)
+        for label in sorted(label_totals.keys()):
+            t = label_totals[label]
+            line = f"{label:25} {format_duration(t.get('duration', 0.0)):>12} {t.get('suites', 0):8d} {t.get('cases', 0):10d}"
+            for c in cols:
+                line += f" {t.get(c, 0):10d}"
+            print(line)
+
+        # 5) Gradle tasks per suite (if enabled)
+        if args.with_gradle_tasks and suite_tasks:
+            print("\nGradle tasks by suite (from WFAPI logs):")
+            suites = report.get("suites", [])
+            for idx, tasks in sorted(suite_tasks.items()):
+                suite = suites[idx] if idx < len(suites) else {}
+                blocks = suite.get("enclosingBlockNames", []) or []
+                context = " > ".join(blocks) if blocks else f"Suite {idx}"
+                tasks_str = ", ".join(tasks)
+                print(f"  [{idx}] {context}")
+                print(f"      Tasks: {tasks_str}")
+
+        json_path = None
+        # Optional JSON
+        if args.json_out:
+            payload = {
+                "build_url": build_url,
+                "label_index": args.label_index,
+                "overall": overall,
+                "pipeline_labels": label_totals,
+                "statuses": cols,
+            }
+            if following:
+                payload["follow"] = {"polls": polls}
+            if args.with_gradle_tasks:
+                # Add suite-to-task mapping to JSON output
+                suites = report.get("suites", [])
+                suite_details = []
+                for idx, suite in enumerate(suites):
+                    detail = {
+                        "index": idx,
+                        "enclosingBlockNames": suite.get("enclosingBlockNames", []),
+                        "nodeId": suite.get("nodeId"),
+                        "duration": suite.get("duration", 0.0),
+                    }
+                    if idx in suite_tasks:
+                        detail["gradle_tasks"] = suite_tasks[idx]
+                    suite_details.append(detail)
+                payload["suite_gradle_tasks"] = suite_details
+
+            with open(args.json_out, "w", encoding="utf-8") as f:
+                json.dump(payload, f, indent=2)
+            print(f"\nWrote JSON summary to: {args.json_out}")
+            json_path = args.json_out
+
+        return {
             "build_url": build_url,
-            "label_index": args.label_index,
+            "pin_spec": pin_spec,
             "overall": overall,
-            "pipeline_labels": label_totals,
-            "statuses": cols,
+            "labels": label_totals,
+            "suite_tasks": suite_tasks,
+            "json_path": json_path,
+            "report": report,
+            "polls": polls,
         }
-        if args.with_gradle_tasks:
-            # Add suite-to-task mapping to JSON output
-            suites = report.get("suites", [])
-            suite_details = []
-            for idx, suite in enumerate(suites):
-                detail = {
-                    "index": idx,
-                    "enclosingBlockNames": suite.get("enclosingBlockNames", []),
-                    "nodeId": suite.get("nodeId"),
-                    "duration": suite.get("duration", 0.0),
-                }
-                if idx in suite_tasks:
-                    detail["gradle_tasks"] = suite_tasks[idx]
-                suite_details.append(detail)
-            payload["suite_gradle_tasks"] = suite_details
-
-        with open(args.json_out, "w", encoding="utf-8") as f:
-            json.dump(payload, f, indent=2)
-        print(f"\nWrote JSON summary to: {args.json_out}")
-        json_path = args.json_out
-
-    return {
-        "build_url": build_url,
-        "pin_spec": pin_spec,
-        "overall": overall,
-        "labels": label_totals,
-        "suite_tasks": suite_tasks,
-        "json_path": json_path,
-        "report": report,
-    }
+    finally:
+        stats = jenkins_http.cache_stats()
+        if stats and VERBOSE:
+            print(
+                f"HTTP cache: {stats['hits']} hit(s), {stats['revalidated']} revalidated, {stats['misses']} fetched",
+                file=sys.stderr,
+            )
+        timing = jenkins_http.request_summary()
+        if timing and VERBOSE:
+            print(timing, file=sys.stderr)
+        jenkins_http.configure_trace(prev_trace)
+        jenkins_http.restore_cache(prev_cache)
 
 
 def main() -> None:
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Shared JUnit XML scanning engine for junit_local_summary.py and repro_test.py.
+
+Readers are plain module-level functions (so they can be pickled into worker
+processes). `scan()` fans them out over a process pool in fixed-size chunks and
+returns results in input order, which lets callers merge per-module buckets
+deterministically regardless of how many workers ran.
+"""
+
+from __future__ import annotations
+
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from pathlib import Path, PurePosixPath
+from typing import IO, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar, Union
+from xml.etree import ElementTree
+
+from junit_archive import iter_members
+
+STREAM_CHUNK_SIZE = 8 * 1024
+DEFAULT_CHUNK_SIZE = 64
+
+T = TypeVar("T")
+# Readers accept a filesystem path or an already-open binary stream (archive member).
+Source = Union[Path, IO[bytes]]
+
+
+def module_name_for(path: Path, root: Path) -> str:
+    """
+    Derive a module identifier from an XML path (shared by the summaries, the
+    testcase index and the per-class history so they bucket tests alike).
+
+    We take the first path segment leading up to 'target/' so that
+    'hibernate-core/target/test-results/test/...' becomes 'hibernate-core'.
+    """
+    rel = path.relative_to(root)
+    parts = rel.parts
+    try:
+        idx = parts.index("target")
+    except ValueError:
+        idx = 1 if len(parts) else 0
+    module = parts[idx - 1] if idx > 0 else parts[0] if parts else "unknown"
+    return module
+
+
+def _open_binary(source: Source):
+    return nullcontext(source) if hasattr(source, "read") else open(source, "rb")
+
+
+def resolve_jobs(jobs: Optional[int]) -> int:
+    """Translate a --jobs value into a worker count (0/None means one per CPU)."""
+    if not jobs or jobs < 0:
+        return os.cpu_count() or 1
+    return jobs
+
+
+def read_suite_attributes(xml_path: Source) -> Optional[Dict[str, str]]:
+    """
+    Return the root <testsuite> attributes without parsing the rest of the document.
+
+    The file is fed to a pull parser in small chunks and reading stops at the first
+    start event, so large <system-out>/<system-err> payloads are never materialized.
+    Returns None when the root element is not a testsuite or the header is malformed.
+    """
+    parser = ElementTree.XMLPullParser(events=("start",))
+    try:
+        with _open_binary(xml_path) as fh:
+            while True:
+                chunk = fh.read(STREAM_CHUNK_SIZE)
+                if not chunk:
+                    return None
+                parser.feed(chunk)
+                for _event, elem in parser.read_events():
+                    if elem.tag != "testsuite":
+                        return None
+                    return dict(elem.attrib)
+    except (OSError, ElementTree.ParseError):
+        return None
+
+
+def read_suite_attributes_full(xml_path: Source) -> Optional[Dict[str, str]]:
+    """Parse the whole document with ElementTree.parse (legacy path) and return root attributes."""
+    try:
+        tree = ElementTree.parse(xml_path)
+    except ElementTree.ParseError:
+        return None
+    suite = tree.getroot()
+    if suite.tag != "testsuite":
+        return None
+    return dict(suite.attrib)
+
+
+def read_failure_cases(xml_path: Source) -> Optional[List[Tuple[str, str, str]]]:
+    """
+    Return (classname, name, message) for every failed <testcase> directly under the root.
+
+    Testcases are cleared as soon as they are inspected so captured output does not
+    accumulate. Returns None for unparseable files (partial results are discarded).
+    """
+    failures: List[Tuple[str, str, str]] = []
+    depth = 0
+    try:
+        for event, elem in ElementTree.iterparse(xml_path, events=("start", "end")):
+            if event == "start":
+                depth += 1
+                continue
+            depth -= 1
+            if depth != 1 or elem.tag != "testcase":
+                continue
+            failure = elem.find("failure")
+            if failure is not None:
+                classname = elem.get("classname") or "unknown"
+                raw_name = elem.get("name") or ""
+                message = failure.get("message") or failure.text or ""
+                failures.append((classname, raw_name, message.strip()))
+            elem.clear()
+    except ElementTree.ParseError:
+        return None
+    return failures
+
+
+TESTCASE_OUTCOMES = ("failure", "error", "skipped")
+
+
+def read_testcases(xml_path: Source) -> Optional[List[Tuple[str, str, str, float, str]]]:
+    """
+    Return (classname, name, status, time, message) for every <testcase> directly under the root.
+
+    status is "passed", "failed", "error" or "skipped"; message is the failure/error
+    message attribute (falling back to its text) and empty otherwise. Returns None for
+    unparseable files.
+    """
+    cases: List[Tuple[str, str, str, float, str]] = []
+    depth = 0
+    try:
+        for event, elem in ElementTree.iterparse(xml_path, events=("start", "end")):
+            if event == "start":
+                depth += 1
+                continue
+            depth -= 1
+            if depth != 1 or elem.tag != "testcase":
+                continue
+            status = "passed"
+            message = ""
+            for outcome in TESTCASE_OUTCOMES:
+                child = elem.find(outcome)
+                if child is None:
+                    continue
+                status = "failed" if outcome == "failure" else outcome
+                if outcome != "skipped":
+                    message = (child.get("message") or child.text or "").strip()
+                break
+            try:
+                duration = float(elem.get("time") or 0.0)
+            except ValueError:
+                duration = 0.0
+            cases.append((elem.get("classname") or "unknown", elem.get("name") or "", status, duration, message))
+            elem.clear()
+    except ElementTree.ParseError:
+        return None
+    return cases
+
+
+def _scan_chunk(reader: Callable[[Path], T], paths: Sequence[Path]) -> List[T]:
+    return [reader(path) for path in paths]
+
+
+def scan(
+    paths: Sequence[Path],
+    reader: Callable[[Path], T],
+    jobs: Optional[int] = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> List[Tuple[Path, T]]:
+    """
+    Apply `reader` to every path and return (path, result) pairs in input order.
+
+    With jobs > 1 the paths are split into chunks of `chunk_size` and parsed in a
+    process pool; small inputs stay in-process to avoid the pool start-up cost.
+    """
+    paths = list(paths)
+    workers = resolve_jobs(jobs)
+    if workers <= 1 or len(paths) <= chunk_size:
+        return [(path, reader(path)) for path in paths]
+
+    chunks = [paths[idx : idx + chunk_size] for idx in range(0, len(paths), chunk_size)]
+    results: List[Tuple[Path, T]] = []
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+        for chunk, parsed in zip(chunks, pool.map(_scan_chunk, itertools.repeat(reader), chunks)):
+            results.extend(zip(chunk, parsed))
+    return results
+
+
+def scan_members(
+    archive: Path,
+    predicate: Callable[[PurePosixPath], bool],
+    reader: Callable[[Source], T],
+) -> List[Tuple[PurePosixPath, T]]:
+    """
+    Apply `reader` to archive members accepted by `predicate`, in archive order.
+
+    Members are streamed one at a time in-process: a tar stream cannot be shared
+    between workers, and decompression rather than parsing dominates here.
+    """
+    return [(name, reader(fh)) for name, fh in iter_members(archive, predicate)]
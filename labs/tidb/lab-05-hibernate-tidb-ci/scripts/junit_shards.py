@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Split the Hibernate test classes into duration-balanced shards.
+
+Per-class durations come from the testcases.idx of a previous collection
+(junit_local_collect.py output, directory or archive). Classes are assigned
+longest-first to the least loaded shard. Shard 1 is the catch-all: it runs
+everything *except* the classes assigned to the other shards, so test classes
+added since the reference run are never lost.
+
+Each shard is written as a filter file for templates/test-shard.init.gradle:
+the first line is `include` or `exclude`, followed by one
+`<module>\\t<class>` line per test class (module = Gradle project name, i.e.
+the directory before target/).
+
+Usage examples:
+  python scripts/junit_shards.py --root tmp/tidb-tidbdialect-results-20251103-143022 --shards 4
+  python scripts/junit_shards.py --root tmp/mysql-results-20251103-143022 --shards 3 --out-dir tmp/shards
+"""
+
+from __future__ import annotations
+
+import argparse
+import heapq
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from junit_testcase_index import TestcaseIndex, index_path_for
+
+TestClass = Tuple[str, str]  # (module, class name)
+
+
+@dataclass
+class Shard:
+    number: int  # 1-based; shard 1 is the catch-all
+    classes: List[TestClass] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def mode(self) -> str:
+        return "exclude" if self.number == 1 else "include"
+
+
+def class_durations(index_path: Path) -> Dict[TestClass, float]:
+    """Sum testcase times per (module, class) from a testcases.idx file."""
+    durations: Dict[TestClass, float] = {}
+    with TestcaseIndex(index_path) as index:
+        strings = index.strings
+        for row in range(len(index)):
+            key = (strings[index.module_ids[row]], strings[index.class_ids[row]])
+            durations[key] = durations.get(key, 0.0) + index.time[row]
+    return durations
+
+
+def latest_index(results_dir: Path, identifier: str) -> Optional[Path]:
+    """Return the testcases.idx of the newest `<identifier>-results-*` collection that has one."""
+    for collection in sorted(results_dir.glob(f"{identifier}-results-*"), reverse=True):
+        if collection.name.endswith(".testcases.idx"):
+            continue
+        index_path = index_path_for(collection)
+        if index_path.exists():
+            return index_path
+    return None
+
+
+def plan_shards(durations: Dict[TestClass, float], shards: int) -> List[Shard]:
+    """Assign classes longest-first to the least loaded shard (LPT); ties go to the lower shard."""
+    plan = [Shard(number) for number in range(1, max(1, shards) + 1)]
+    heap = [(0.0, shard.number) for shard in plan]
+    for key, seconds in sorted(durations.items(), key=lambda item: (-item[1], item[0])):
+        load, number = heapq.heappop(heap)
+        shard = plan[number - 1]
+        shard.classes.append(key)
+        shard.seconds += seconds
+        heapq.heappush(heap, (load + seconds, number))
+    return plan
+
+
+def filter_lines(shard: Shard, plan: Iterable[Shard], also_exclude: Iterable[TestClass] = ()) -> List[str]:
+    """Filter file content: shard 1 excludes every class owned by another shard (and also_exclude)."""
+    if shard.mode == "exclude":
+        owned = [key for other in plan if other.number != 1 for key in other.classes]
+        return class_filter_lines("exclude", set(owned) | set(also_exclude))
+    return class_filter_lines("include", shard.classes)
+
+
+def write_filter(path: Path, lines: List[str]) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return path
+
+
+def class_filter_lines(mode: str, classes: Iterable[TestClass]) -> List[str]:
+    """Filter file content for an arbitrary class list (`include` or `exclude`)."""
+    return [mode] + [f"{module}\t{classname}" for module, classname in sorted(classes)]
+
+
+def write_filters(plan: List[Shard], out_dir: Path, also_exclude: Iterable[TestClass] = ()) -> List[Path]:
+    """Write shard-<n>.txt filter files and return their paths in shard order."""
+    also_exclude = list(also_exclude)
+    return [
+        write_filter(out_dir / f"shard-{shard.number}.txt", filter_lines(shard, plan, also_exclude))
+        for shard in plan
+    ]
+
+
+def format_plan(plan: List[Shard]) -> List[str]:
+    total = sum(shard.seconds for shard in plan) or 1.0
+    lines = []
+    for shard in plan:
+        note = " + classes without history" if shard.mode == "exclude" else ""
+        lines.append(
+            f"  shard {shard.number}: {len(shard.classes):5} classes  {shard.seconds / 60:8.1f} min "
+            f"({100 * shard.seconds / total:4.1f}%){note}"
+        )
+    return lines
+
+
+def parse_args(argv: Optional[Iterable[str]] = None) -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="Split test classes into duration-balanced shards.")
+    ap.add_argument("--root", required=True, help="Reference collection directory or archive (with testcases.idx)")
+    ap.add_argument("--shards", type=int, default=2, help="Number of shards (default: 2)")
+    ap.add_argument("--out-dir", help="Write shard-<n>.txt Gradle filter files here")
+    return ap.parse_args(argv)
+
+
+def run(args: argparse.Namespace) -> List[Shard]:
+    index_path = index_path_for(Path(args.root).resolve())
+    if not index_path.exists():
+        raise FileNotFoundError(f"testcase index not found: {index_path}")
+    plan = plan_shards(class_durations(index_path), args.shards)
+    print(f"Reference: {index_path}")
+    for line in format_plan(plan):
+        print(line)
+    if args.out_dir:
+        for path in write_filters(plan, Path(args.out_dir)):
+            print(f"Wrote {path}")
+    return plan
+
+
+def main() -> None:
+    args = parse_args()
+    try:
+        run(args)
+    except FileNotFoundError as exc:
+        print(f"ERROR: {exc}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
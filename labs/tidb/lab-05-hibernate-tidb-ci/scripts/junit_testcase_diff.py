@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Diff two collected runs at testcase granularity using their testcases.idx files.
+
+Rows are joined on (module, class, method) through a hash index built over the
+left run, so comparing 100k+ testcases stays well under a second. Repeated keys
+(parameterized tests reported with the same name) are paired in file order.
+
+Reported buckets:
+  newly failing   passed/skipped on the left, failed/error on the right
+  newly passing   failed/error on the left, passed on the right
+  missing         present on the left only
+  new             present on the right only
+  slower          passed on both sides and at least --ratio times (and
+                  --min-delta seconds) slower on the right
+
+Usage examples:
+  ./junit_testcase_diff.py --left tmp/mysql-results-20251103-143022 --right tmp/tidb-tidbdialect-results-20251103-150000
+  ./junit_testcase_diff.py --left mysql.idx --right tidb.idx --limit 0 --json-out tmp/diff.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from junit_archive import is_archive
+from junit_testcase_index import INDEX_FILENAME, STATUS_CODES, TestcaseIndex, index_path_for
+
+FAILING_CODES = frozenset((STATUS_CODES["failed"], STATUS_CODES["error"]))
+PASSED_CODE = STATUS_CODES["passed"]
+DEFAULT_SLOWDOWN_RATIO = 2.0
+DEFAULT_MIN_DELTA = 1.0
+
+TestKey = Tuple[str, str, str]
+
+
+@dataclass
+class TestcaseDiff:
+    left_total: int = 0
+    right_total: int = 0
+    newly_failing: List[TestKey] = field(default_factory=list)
+    newly_passing: List[TestKey] = field(default_factory=list)
+    missing: List[TestKey] = field(default_factory=list)
+    new: List[TestKey] = field(default_factory=list)
+    slower: List[Tuple[TestKey, float, float]] = field(default_factory=list)
+
+    def counts(self) -> Dict[str, int]:
+        return {
+            "left": self.left_total,
+            "right": self.right_total,
+            "newly_failing": len(self.newly_failing),
+            "newly_passing": len(self.newly_passing),
+            "missing": len(self.missing),
+            "new": len(self.new),
+            "slower": len(self.slower),
+        }
+
+    def to_dict(self) -> dict:
+        def names(keys: Iterable[TestKey]) -> List[str]:
+            return [format_key(key) for key in keys]
+
+        return {
+            "counts": self.counts(),
+            "newly_failing": names(self.newly_failing),
+            "newly_passing": names(self.newly_passing),
+            "missing": names(self.missing),
+            "new": names(self.new),
+            "slower": [
+                {"test": format_key(key), "left": left, "right": right} for key, left, right in self.slower
+            ],
+        }
+
+
+def format_key(key: TestKey) -> str:
+    module, classname, method = key
+    return f"{module}:{classname}#{method}"
+
+
+def resolve_index_path(path: Path) -> Path:
+    """Accept a collection directory, a collection archive or the index file itself."""
+    return index_path_for(path) if path.is_dir() or is_archive(path) else path
+
+
+def _row_keys(index: TestcaseIndex, ids: List[int], width: int) -> List[int]:
+    """Pack (module, class, method) string ids into one int per row."""
+    return [
+        (ids[module_id] * width + ids[class_id]) * width + ids[method_id]
+        for module_id, class_id, method_id in zip(index.module_ids, index.class_ids, index.method_ids)
+    ]
+
+
+def _first_rows(keys: List[int]) -> Tuple[Dict[int, int], Dict[int, List[int]]]:
+    """
+    Return key -> first row, plus key -> all rows for keys that repeat.
+
+    Building the dict from the reversed sequence lets the first occurrence win
+    without a Python-level loop; the slow path only runs when duplicates exist.
+    """
+    first = dict(zip(reversed(keys), range(len(keys) - 1, -1, -1)))
+    repeated: Dict[int, List[int]] = {}
+    if len(first) != len(keys):
+        for row, key in enumerate(keys):
+            repeated.setdefault(key, []).append(row)
+        repeated = {key: rows for key, rows in repeated.items() if len(rows) > 1}
+    return first, repeated
+
+
+def diff_indexes(
+    left: TestcaseIndex,
+    right: TestcaseIndex,
+    ratio: float = DEFAULT_SLOWDOWN_RATIO,
+    min_delta: float = DEFAULT_MIN_DELTA,
+) -> TestcaseDiff:
+    """Join two indexes on (module, class, method) and classify every testcase."""
+    diff = TestcaseDiff(left_total=len(left), right_total=len(right))
+
+    # Map both string tables into one id space (right-only strings get fresh ids)
+    # so each join key is a single packed int rather than a tuple of strings.
+    left_ids = {value: idx for idx, value in enumerate(left.strings)}
+    width = len(left.strings) + len(right.strings) + 1
+    right_ids = [left_ids.get(value, len(left.strings) + idx) for idx, value in enumerate(right.strings)]
+    left_keys = _row_keys(left, list(range(len(left.strings))), width)
+    right_keys = _row_keys(right, right_ids, width)
+
+    left_rows, repeated = _first_rows(left_keys)
+    occurrences: Dict[int, int] = {}
+    matched = bytearray(len(left))
+    l_status, r_status = left.status_codes, right.status_codes
+    l_time, r_time = left.time, right.time
+
+    for r_row, key in enumerate(right_keys):
+        if key in repeated:
+            occurrence = occurrences.get(key, 0)
+            occurrences[key] = occurrence + 1
+            rows = repeated[key]
+            l_row = rows[occurrence] if occurrence < len(rows) else None
+        else:
+            l_row = left_rows.get(key)
+            if l_row is not None and matched[l_row]:
+                l_row = None
+        if l_row is None:
+            diff.new.append(right.key(r_row))
+            continue
+        matched[l_row] = 1
+        before, after = l_status[l_row], r_status[r_row]
+        if after in FAILING_CODES:
+            if before not in FAILING_CODES:
+                diff.newly_failing.append(right.key(r_row))
+        elif before in FAILING_CODES:
+            if after == PASSED_CODE:
+                diff.newly_passing.append(right.key(r_row))
+        elif before == PASSED_CODE and after == PASSED_CODE:
+            slow, fast = r_time[r_row], l_time[l_row]
+            if slow - fast >= min_delta and slow >= fast * ratio:
+                diff.slower.append((right.key(r_row), fast, slow))
+
+    if matched.count(0):
+        diff.missing = [left.key(row) for row, seen in enumerate(matched) if not seen]
+    diff.slower.sort(key=lambda item: item[2] - item[1], reverse=True)
+    return diff
+
+
+def diff_paths(
+    left: Path,
+    right: Path,
+    ratio: float = DEFAULT_SLOWDOWN_RATIO,
+    min_delta: float = DEFAULT_MIN_DELTA,
+) -> TestcaseDiff:
+    with TestcaseIndex(resolve_index_path(left)) as left_index, TestcaseIndex(resolve_index_path(right)) as right_index:
+        return diff_indexes(left_index, right_index, ratio=ratio, min_delta=min_delta)
+
+
+def format_diff(diff: TestcaseDiff, limit: int = 10) -> List[str]:
+    """Render the diff as console lines (at most `limit` entries per bucket; 0 = all)."""
+    counts = diff.counts()
+    lines = [
+        f"Testcases: {counts['left']} -> {counts['right']}  "
+        f"newly failing={counts['newly_failing']}  newly passing={counts['newly_passing']}  "
+        f"missing={counts['missing']}  new={counts['new']}  slower={counts['slower']}"
+    ]
+    for title, keys in (
+        ("Newly failing", diff.newly_failing),
+        ("Newly passing", diff.newly_passing),
+        ("Missing", diff.missing),
+        ("New", diff.new),
+    ):
+        if not keys:
+            continue
+        shown = keys[:limit] if limit else keys
+        lines.append(f"  {title}:")
+        lines.extend(f"    {format_key(key)}" for key in shown)
+        if len(shown) < len(keys):
+            lines.append(f"    … {len(keys) - len(shown)} more")
+    if diff.slower:
+        shown_slow = diff.slower[:limit] if limit else diff.slower
+        lines.append("  Slower:")
+        lines.extend(f"    {format_key(key)}  {left:.2f}s -> {right:.2f}s" for key, left, right in shown_slow)
+        if len(shown_slow) < len(diff.slower):
+            lines.append(f"    … {len(diff.slower) - len(shown_slow)} more")
+    return lines
+
+
+def parse_args(argv: Optional[Iterable[str]] = None) -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="Diff two collected runs at testcase granularity.")
+    ap.add_argument("--left", required=True, help=f"Baseline collection directory, archive or {INDEX_FILENAME} path.")
+    ap.add_argument("--right", required=True, help=f"Candidate collection directory, archive or {INDEX_FILENAME} path.")
+    ap.add_argument("--limit", type=int, default=20, help="Entries listed per bucket (default: 20; 0 = all).")
+    ap.add_argument(
+        "--ratio",
+        type=float,
+        default=DEFAULT_SLOWDOWN_RATIO,
+        help=f"Slowdown factor reported as a duration regression (default: {DEFAULT_SLOWDOWN_RATIO}).",
+    )
+    ap.add_argument(
+        "--min-delta",
+        type=float,
+        default=DEFAULT_MIN_DELTA,
+        help=f"Minimum slowdown in seconds reported as a regression (default: {DEFAULT_MIN_DELTA}).",
+    )
+    ap.add_argument("--json-out", help="Optional path to write the full diff as JSON.")
+    return ap.parse_args(argv)
+
+
+def run(args: argparse.Namespace) -> TestcaseDiff:
+    left = resolve_index_path(Path(args.left).resolve())
+    right = resolve_index_path(Path(args.right).resolve())
+    for path in (left, right):
+        if not path.exists():
+            raise FileNotFoundError(f"testcase index not found: {path} (run junit_testcase_index.py --root ...)")
+
+    diff = diff_paths(left, right, ratio=args.ratio, min_delta=args.min_delta)
+    print(f"Left:  {left}")
+    print(f"Right: {right}")
+    for line in format_diff(diff, limit=args.limit):
+        print(line)
+
+    if args.json_out:
+        json_path = Path(args.json_out).resolve()
+        json_path.write_text(json.dumps(diff.to_dict(), indent=2), encoding="utf-8")
+        print(f"\nWrote JSON diff to: {json_path}")
+    return diff
+
+
+def main() -> None:
+    args = parse_args()
+    try:
+        run(args)
+    except FileNotFoundError as exc:
+        print(f"ERROR: {exc}", file=sys.stderr)
+        sys.exit(1)
+    except Exception as exc:  # pylint: disable=broad-except
+        print(f"ERROR: testcase diff failed: {exc}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
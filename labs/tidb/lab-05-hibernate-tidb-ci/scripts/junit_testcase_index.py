@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Build and query a per-testcase columnar index for a collected JUnit run.
+
+junit_local_collect.py writes `testcases.idx` into every collection directory.
+The file is a struct-packed, column-oriented table (module, class, method,
+status, time, failure-message hash) that can be memory-mapped and filtered
+without re-parsing the raw XML.
+
+File layout (little-endian):
+  header   8s magic, u32 version, u32 rows, u32 strings, u32 blob bytes
+  time     f64[rows]
+  msg_hash u64[rows]   (first 8 bytes of blake2b(message); 0 when no message)
+  module   u32[rows]   (string ids)
+  class    u32[rows]
+  method   u32[rows]
+  offsets  u32[strings + 1] into the UTF-8 string blob
+  status   u8[rows]    (index into STATUSES)
+  blob     UTF-8 bytes
+
+Usage examples:
+  ./junit_testcase_index.py --root tmp/tidb-tidbdialect-results-20251103-143022
+  ./junit_testcase_index.py --root tmp/tidb-tidbdialect-results-20251103-143022 --status failed --status error
+  ./junit_testcase_index.py --root tmp/mysql-results-20251103-143022 --rebuild --jobs 0
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from junit_archive import is_archive, is_junit_member, sidecar_path
+from junit_scan import module_name_for, read_testcases, scan, scan_members
+
+INDEX_FILENAME = "testcases.idx"
+INDEX_MAGIC = b"JTCIDX\x00\x01"
+INDEX_VERSION = 1
+HEADER = struct.Struct("<8sIIII")
+STATUSES = ("passed", "failed", "error", "skipped")
+STATUS_CODES = {name: code for code, name in enumerate(STATUSES)}
+
+
+class TestcaseRecord(NamedTuple):
+    module: str
+    classname: str
+    method: str
+    status: str
+    time: float
+    message_hash: int
+
+
+def message_hash(message: str) -> int:
+    """Return a stable 64-bit hash of a failure message (0 for empty messages)."""
+    if not message:
+        return 0
+    return int.from_bytes(hashlib.blake2b(message.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def write_index(path: Path, records: Iterable[Tuple[str, str, str, str, float, str]]) -> int:
+    """
+    Write (module, classname, method, status, time, message) rows to `path`.
+
+    Strings are interned into a shared table so repeated module/class names cost
+    one u32 per row. Returns the number of rows written.
+    """
+    string_ids: Dict[str, int] = {}
+
+    def intern(value: str) -> int:
+        idx = string_ids.get(value)
+        if idx is None:
+            idx = string_ids[value] = len(string_ids)
+        return idx
+
+    times = array("d")
+    hashes = array("Q")
+    modules = array("I")
+    classes = array("I")
+    methods = array("I")
+    statuses = array("B")
+    for module, classname, method, status, duration, message in records:
+        times.append(float(duration))
+        hashes.append(message_hash(message))
+        modules.append(intern(module))
+        classes.append(intern(classname))
+        methods.append(intern(method))
+        statuses.append(STATUS_CODES[status])
+
+    encoded = [value.encode("utf-8") for value in string_ids]
+    offsets = array("I", [0])
+    for item in encoded:
+        offsets.append(offsets[-1] + len(item))
+    blob = b"".join(encoded)
+
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    with open(tmp_path, "wb") as fh:
+        fh.write(HEADER.pack(INDEX_MAGIC, INDEX_VERSION, len(times), len(encoded), len(blob)))
+        for column in (times, hashes, modules, classes, methods, offsets, statuses):
+            fh.write(_little_endian(column))
+        fh.write(blob)
+    os.replace(tmp_path, path)
+    return len(times)
+
+
+def index_path_for(root: Path) -> Path:
+    """Return ROOT/testcases.idx for directories and the NAME.testcases.idx sidecar for archives."""
+    return sidecar_path(root, INDEX_FILENAME) if is_archive(root) else root / INDEX_FILENAME
+
+
+def build_index(root: Path, dest: Optional[Path] = None, jobs: Optional[int] = 1) -> Tuple[Path, int]:
+    """Parse every JUnit XML file under root (directory or archive) and write the index."""
+    dest = dest or index_path_for(root)
+    if is_archive(root):
+        results = [(root / name, cases) for name, cases in scan_members(root, is_junit_member, read_testcases)]
+    else:
+        results = scan(sorted(root.glob("**/test-results/**/*.xml")), read_testcases, jobs=jobs)
+
+    def rows() -> Iterator[Tuple[str, str, str, str, float, str]]:
+        for xml_path, cases in results:
+            if not cases:
+                continue
+            module = module_name_for(xml_path, root)
+            for classname, method, status, duration, message in cases:
+                yield module, classname, method, status, duration, message
+
+    return dest, write_index(dest, rows())
+
+
+class TestcaseIndex:
+    """Read-only, memory-mapped view over a testcases.idx file."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._mmap: Optional[mmap.mmap] = None
+        self._views: List[memoryview] = []
+        with open(path, "rb") as fh:
+            if os.fstat(fh.fileno()).st_size < HEADER.size:
+                raise ValueError(f"not a testcase index: {path}")
+            self._mmap = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, rows, strings, blob_len = HEADER.unpack_from(self._mmap, 0)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            self.close()
+            raise ValueError(f"unsupported testcase index: {path}")
+        self.rows = rows
+
+        layout = (
+            ("time", "d", rows),
+            ("message_hash", "Q", rows),
+            ("module", "I", rows),
+            ("classname", "I", rows),
+            ("method", "I", rows),
+            ("offsets", "I", strings + 1),
+            ("status", "B", rows),
+        )
+        expected = HEADER.size + blob_len + sum(struct.calcsize(code) * count for _, code, count in layout)
+        if expected != len(self._mmap):
+            self.close()
+            raise ValueError(f"truncated testcase index: {path}")
+
+        view = self._track(memoryview(self._mmap))
+        offset = HEADER.size
+        columns = {}
+        for name, code, count in layout:
+            size = struct.calcsize(code) * count
+            columns[name] = self._column(view[offset : offset + size], code)
+            offset += size
+
+        self.time = columns["time"]
+        self.message_hash = columns["message_hash"]
+        self.module_ids = columns["module"]
+        self.class_ids = columns["classname"]
+        self.method_ids = columns["method"]
+        self.status_codes = columns["status"]
+        offsets = columns["offsets"]
+        blob = bytes(view[offset : offset + blob_len])
+        self.strings: List[str] = [blob[offsets[i] : offsets[i + 1]].decode("utf-8") for i in range(strings)]
+        self._string_ids = {value: idx for idx, value in enumerate(self.strings)}
+
+    def _track(self, view: memoryview) -> memoryview:
+        self._views.append(view)
+        return view
+
+    def _column(self, raw: memoryview, code: str):
+        self._track(raw)
+        if sys.byteorder == "little":
+            return self._track(raw.cast(code))
+        values = array(code, raw.tobytes())
+        values.byteswap()
+        return values
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __enter__(self) -> "TestcaseIndex":
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Release the column views and unmap the file (records already returned stay valid)."""
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def record(self, row: int) -> TestcaseRecord:
+        return TestcaseRecord(
+            module=self.strings[self.module_ids[row]],
+            classname=self.strings[self.class_ids[row]],
+            method=self.strings[self.method_ids[row]],
+            status=STATUSES[self.status_codes[row]],
+            time=self.time[row],
+            message_hash=self.message_hash[row],
+        )
+
+    def __iter__(self) -> Iterator[TestcaseRecord]:
+        return (self.record(row) for row in range(self.rows))
+
+    def key(self, row: int) -> Tuple[str, str, str]:
+        return (
+            self.strings[self.module_ids[row]],
+            self.strings[self.class_ids[row]],
+            self.strings[self.method_ids[row]],
+        )
+
+    def filter(self, statuses: Optional[Sequence[str]] = None, module: Optional[str] = None) -> List[int]:
+        """Return row numbers matching any of `statuses` and (optionally) a module name."""
+        rows: Iterable[int] = range(self.rows)
+        if statuses:
+            wanted = {STATUS_CODES[status] for status in statuses}
+            codes = self.status_codes
+            rows = [row for row in rows if codes[row] in wanted]
+        if module is not None:
+            module_id = self._string_ids.get(module)
+            if module_id is None:
+                return []
+            ids = self.module_ids
+            rows = [row for row in rows if ids[row] == module_id]
+        return list(rows)
+
+    def status_counts(self) -> Dict[str, int]:
+        counts = {status: 0 for status in STATUSES}
+        for code in self.status_codes:
+            counts[STATUSES[code]] += 1
+        return counts
+
+
+def parse_args(argv: Optional[Iterable[str]] = None) -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="Build or query the per-testcase index of a collected run.")
+    ap.add_argument("--root", required=True, help="Collection directory or archive (output of junit_local_collect.py).")
+    ap.add_argument("--index", help=f"Index path (default: ROOT/{INDEX_FILENAME}, or the NAME.{INDEX_FILENAME} sidecar of an archive).")
+    ap.add_argument("--rebuild", action="store_true", help="Re-parse the XML files even if the index exists.")
+    ap.add_argument(
+        "--status",
+        action="append",
+        choices=STATUSES,
+        help="List testcases with this status (repeatable).",
+    )
+    ap.add_argument("--module", help="Restrict the listing to one module (e.g., hibernate-core).")
+    ap.add_argument("--limit", type=int, default=50, help="Maximum rows to list (default: 50; 0 = all).")
+    ap.add_argument("--jobs", type=int, default=1, help="Worker processes used when building (0 = one per CPU).")
+    return ap.parse_args(argv)
+
+
+def run(args: argparse.Namespace) -> dict:
+    """Build the index if needed, print status counts and any requested rows."""
+    root = Path(args.root).resolve()
+    if not root.exists():
+        raise FileNotFoundError(f"root path not found: {root}")
+    index_path = Path(args.index).resolve() if args.index else index_path_for(root)
+
+    if args.rebuild or not index_path.exists():
+        _, rows = build_index(root, index_path, jobs=args.jobs)
+        print(f"Indexed {rows} testcases into {index_path}")
+
+    with TestcaseIndex(index_path) as index:
+        counts = index.status_counts()
+        print(f"Testcases: {len(index)}  " + "  ".join(f"{name}={counts[name]}" for name in STATUSES))
+        matches: List[TestcaseRecord] = []
+        if args.status or args.module:
+            rows = index.filter(args.status, args.module)
+            limit = args.limit or len(rows)
+            matches = [index.record(row) for row in rows[:limit]]
+            print(f"\nMatching testcases: {len(rows)}" + (f" (showing {len(matches)})" if len(matches) < len(rows) else ""))
+            for record in matches:
+                print(f"  {record.status:8} {record.time:8.3f}s  {record.module}  {record.classname}#{record.method}")
+
+    return {"index": index_path, "counts": counts, "matches": matches}
+
+
+def main() -> None:
+    args = parse_args()
+    try:
+        run(args)
+    except FileNotFoundError as exc:
+        print(f"ERROR: {exc}", file=sys.stderr)
+        sys.exit(1)
+    except Exception as exc:  # pylint: disable=broad-except
+        print(f"ERROR: testcase index failed: {exc}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
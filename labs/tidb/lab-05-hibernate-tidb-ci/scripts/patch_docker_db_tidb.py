@@ -21,6 +21,8 @@ from typing import Dict, Optional
 
 from env_utils import load_lab_env, resolve_workspace_dir
 
+READY_SCRIPT = Path(__file__).resolve().parent / "tidb_ready.py"
+
 
 def replace_function(text: str, func_name: str, replacement: str) -> str:
     signature = f"{func_name}()"
@@ -66,6 +68,12 @@ def build_env_block(tmp_dir: Path, bootstrap_sql_file: Optional[Path]) -> str:
     lines = [
         f'TMP_DIR="${{PATCH_TIDB_TMP_DIR:-{tmp_dir_path}}}"',
         'mkdir -p "$TMP_DIR"',
+        '# Overridable so run_comparison.py --parallel can run several TiDB containers side by side',
+        'TIDB_CONTAINER="${TIDB_CONTAINER_NAME:-tidb}"',
+        'TIDB_PORT="${TIDB_HOST_PORT:-4000}"',
+        "# Wall-clock marks for the timing summary (python3 is already needed by tidb_ready.py)",
+        "tidb_now() { python3 -c 'import time; print(f\"{time.time():.3f}\")'; }",
+        "tidb_span() { python3 -c 'import sys; print(f\"{float(sys.argv[2]) - float(sys.argv[1]):.1f}s\")' \"$1\" \"$2\"; }",
     ]
     if bootstrap_sql_file:
         bootstrap_path = bootstrap_sql_file.as_posix()
@@ -87,52 +95,30 @@ def build_env_block(tmp_dir: Path, bootstrap_sql_file: Optional[Path]) -> str:
 def build_start_block() -> str:
     return format_block(
         """
-        $CONTAINER_CLI rm -f tidb || true
-        $CONTAINER_CLI run --name tidb -p4000:4000 -d ${DB_IMAGE_TIDB:-docker.io/pingcap/tidb:v8.5.3}
-        """
-    )
-
-
-def build_log_wait_block() -> str:
-    return format_block(
-        """
-        echo "Waiting for TiDB logs to report readiness..."
-        OUTPUT=
-        n=0
-        until [ "$n" -ge 15 ]
-        do
-            OUTPUT=$($CONTAINER_CLI logs tidb 2>&1)
-            if [[ $OUTPUT == *"server is running"* ]]; then
-              break
-            fi
-            n=$((n+1))
-            echo "  TiDB not ready yet (log probe $n/15)..."
-            sleep 5
-        done
+        tidb_t0=$(tidb_now)
+        $CONTAINER_CLI rm -f "$TIDB_CONTAINER" || true
+        $CONTAINER_CLI run --name "$TIDB_CONTAINER" -p"$TIDB_PORT":4000 -d ${DB_IMAGE_TIDB:-docker.io/pingcap/tidb:v8.5.3}
+        tidb_t_started=$(tidb_now)
         """
     )
 
 
-def build_ping_block() -> str:
+def build_readiness_block() -> str:
     return format_block(
         """
-        echo "Checking TiDB SQL readiness..."
-        ping_attempt=0
-        ping_success=0
-        while [ $ping_attempt -lt 15 ]; do
-          if docker run --rm --network container:tidb mysql:8.0 mysqladmin -h 127.0.0.1 -P 4000 -uroot ping --connect-timeout=5 >/dev/null 2>&1; then
-            ping_success=1
-            break
-          fi
-          ping_attempt=$((ping_attempt+1))
-          echo "  TiDB not accepting connections yet (ping $ping_attempt/15)..."
-          sleep 5
-        done
-
-        if [ "$ping_success" -ne 1 ]; then
-          echo "ERROR: TiDB never accepted connections (waited ~75 seconds). Check 'docker logs tidb'."
+        # scripts/tidb_ready.py, installed next to the bootstrap files by patch_docker_db_tidb.py
+        READY_SCRIPT="${TIDB_READY_SCRIPT:-$TMP_DIR/tidb_ready.py}"
+        if [ ! -f "$READY_SCRIPT" ]; then
+          echo "ERROR: TiDB readiness helper '$READY_SCRIPT' not found."
+          echo "       Re-run scripts/patch_docker_db_tidb.py to install it."
           exit 1
         fi
+        if ! python3 "$READY_SCRIPT" --cli "${CONTAINER_CLI:-docker}" --container "$TIDB_CONTAINER" \\
+          --host "${TIDB_READY_HOST:-127.0.0.1}" --port "$TIDB_PORT" --timeout "${TIDB_READY_TIMEOUT:-75}"; then
+          echo "ERROR: TiDB never accepted connections. Check '$CONTAINER_CLI logs $TIDB_CONTAINER'."
+          exit 1
+        fi
+        tidb_t_ready=$(tidb_now)
         """
     )
 
@@ -150,11 +136,21 @@ def build_db_creation_block() -> str:
         create_cmd="CREATE DATABASE IF NOT EXISTS hibernate_orm_test;"
         create_cmd+="CREATE USER IF NOT EXISTS 'hibernate_orm_test'@'%' IDENTIFIED BY 'hibernate_orm_test';"
         create_cmd+="GRANT ALL ON hibernate_orm_test.* TO 'hibernate_orm_test'@'%';"
-
-        # Additional test databases
+        schema_list="'hibernate_orm_test'"
         for i in "${!databases[@]}"; do
-          create_cmd+="CREATE DATABASE IF NOT EXISTS ${databases[i]}; GRANT ALL ON ${databases[i]}.* TO 'hibernate_orm_test'@'%';"
+          schema_list+=",'${databases[i]}'"
         done
+        expected_schemas=$(( ${#databases[@]} + 1 ))
+
+        # Additional test databases are spread over a few concurrent connections, so TiDB's
+        # DDL queue gets several CREATE DATABASE jobs at once instead of one round-trip each.
+        ddl_connections=${TIDB_DDL_CONNECTIONS:-4}
+        if [ "$ddl_connections" -gt "${#databases[@]}" ]; then
+          ddl_connections=${#databases[@]}
+        fi
+        if [ "$ddl_connections" -lt 1 ]; then
+          ddl_connections=1
+        fi
         """
     )
 
@@ -162,13 +158,35 @@ def build_db_creation_block() -> str:
 def build_bootstrap_stage_block() -> str:
     return format_block(
         """
-        tmp_bootstrap="$TMP_DIR/tidb-bootstrap-$$.sql"
-        : > "$tmp_bootstrap"
+        bootstrap_dir="$TMP_DIR/tidb-bootstrap-$$"
+        rm -rf "$bootstrap_dir"
+        mkdir -p "$bootstrap_dir"
+        : > "$bootstrap_dir/main.sql"
         if [ -n "$BOOTSTRAP_SQL_FILE" ]; then
-          cat "$BOOTSTRAP_SQL_FILE" >> "$tmp_bootstrap"
+          cat "$BOOTSTRAP_SQL_FILE" >> "$bootstrap_dir/main.sql"
         fi
-        printf "%s\\n" "$create_cmd" >> "$tmp_bootstrap"
-        echo "FLUSH PRIVILEGES;" >> "$tmp_bootstrap"
+        printf "%s\\n" "$create_cmd" >> "$bootstrap_dir/main.sql"
+        for i in "${!databases[@]}"; do
+          printf "CREATE DATABASE IF NOT EXISTS %s; GRANT ALL ON %s.* TO 'hibernate_orm_test'@'%%';\\n" \\
+            "${databases[i]}" "${databases[i]}" >> "$bootstrap_dir/databases-$(( i % ddl_connections )).sql"
+        done
+        # Verification counts come back from the final session as a row tagged 'verify'
+        echo "FLUSH PRIVILEGES;" > "$bootstrap_dir/verify.sql"
+        echo "SELECT 'verify', (SELECT COUNT(*) FROM mysql.user WHERE user='hibernate_orm_test' AND host='%'), (SELECT COUNT(*) FROM information_schema.schemata WHERE schema_name IN (${schema_list}));" >> "$bootstrap_dir/verify.sql"
+        # Runs inside the single client container: main SQL, concurrent DDL, verification
+        printf "%s\\n" \\
+          'mysql_cli="mysql -N -B -h 127.0.0.1 -P 4000 -uroot"' \\
+          '$mysql_cli < /bootstrap/main.sql || exit 1' \\
+          'ddl_start=$(date +%s.%N)' \\
+          'pids=()' \\
+          'for chunk in /bootstrap/databases-*.sql; do' \\
+          '  [ -f "$chunk" ] || continue' \\
+          '  $mysql_cli < "$chunk" &' \\
+          '  pids+=($!)' \\
+          'done' \\
+          'for pid in "${pids[@]}"; do wait "$pid" || exit 1; done' \\
+          'echo "ddl $ddl_start $(date +%s.%N)"' \\
+          '$mysql_cli < /bootstrap/verify.sql' > "$bootstrap_dir/run.sh"
         """
     )
 
@@ -176,13 +194,14 @@ def build_bootstrap_stage_block() -> str:
 def build_bootstrap_execute_block() -> str:
     return format_block(
         """
-        echo "Bootstrapping TiDB databases..."
+        echo "Bootstrapping TiDB databases ($expected_schemas schemas, $ddl_connections DDL connections)..."
         bootstrap_attempt=0
         bootstrap_success=0
+        bootstrap_output=
         while [ $bootstrap_attempt -lt 3 ]; do
-          if docker run --rm --network container:tidb \\
-            -v "$tmp_bootstrap":/tmp/bootstrap.sql:ro \\
-            mysql:8.0 bash -lc "cat /tmp/bootstrap.sql | mysql -h 127.0.0.1 -P 4000 -uroot"; then
+          if bootstrap_output=$(docker run --rm --network "container:$TIDB_CONTAINER" \\
+            -v "$bootstrap_dir":/bootstrap:ro \\
+            mysql:8.0 bash /bootstrap/run.sh); then
             bootstrap_success=1
             break
           fi
@@ -191,12 +210,20 @@ def build_bootstrap_execute_block() -> str:
           sleep 5
         done
 
-        rm -f "$tmp_bootstrap"
+        rm -rf "$bootstrap_dir"
+        tidb_t_bootstrapped=$(tidb_now)
 
         if [ "$bootstrap_success" -ne 1 ]; then
-          echo "ERROR: TiDB bootstrap SQL failed after 3 attempts. Check 'docker logs tidb'."
+          echo "ERROR: TiDB bootstrap SQL failed after 3 attempts. Check 'docker logs $TIDB_CONTAINER'."
           exit 1
         fi
+        verify_row=$(printf "%s\\n" "$bootstrap_output" | grep '^verify' | tail -n 1)
+        ddl_row=$(printf "%s\\n" "$bootstrap_output" | grep '^ddl ' | tail -n 1)
+        if [ -n "$ddl_row" ]; then
+          # CREATE DATABASE + GRANT per test database
+          python3 -c 'import sys; n, c, t0, t1 = int(sys.argv[1]), sys.argv[2], float(sys.argv[3]), float(sys.argv[4]); s = max(t1 - t0, 1e-3); print(f"TiDB DDL: {2 * n} statements for {n} databases over {c} connections in {s:.1f}s ({2 * n / s:.1f} statements/s)")' \\
+            "${#databases[@]}" "$ddl_connections" $(printf "%s" "$ddl_row" | awk '{print $2, $3}')
+        fi
         """
     )
 
@@ -204,19 +231,20 @@ def build_bootstrap_execute_block() -> str:
 def build_verification_block() -> str:
     return format_block(
         """
-        verify_user=$(docker run --rm --network container:tidb mysql:8.0 mysql -N -B -h 127.0.0.1 -P 4000 -uroot -e "SELECT COUNT(*) FROM mysql.user WHERE user='hibernate_orm_test' AND host='%';" | tr -d '[:space:]')
+        verify_user=$(printf "%s" "$verify_row" | awk '{print $2}')
+        verify_schemas=$(printf "%s" "$verify_row" | awk '{print $3}')
         verify_user=${verify_user:-0}
+        verify_schemas=${verify_schemas:-0}
         if [ "$verify_user" -eq 0 ]; then
           echo "ERROR: TiDB bootstrap verification failed. User 'hibernate_orm_test' missing."
           exit 1
         fi
-
-        verify_schema=$(docker run --rm --network container:tidb mysql:8.0 mysql -N -B -h 127.0.0.1 -P 4000 -uroot -e "SELECT COUNT(*) FROM information_schema.schemata WHERE schema_name='hibernate_orm_test';" | tr -d '[:space:]')
-        verify_schema=${verify_schema:-0}
-        if [ "$verify_schema" -eq 0 ]; then
-          echo "ERROR: TiDB bootstrap verification failed. Schema 'hibernate_orm_test' missing."
+        if [ "$verify_schemas" -ne "$expected_schemas" ]; then
+          echo "ERROR: TiDB bootstrap verification failed. Found $verify_schemas of $expected_schemas hibernate_orm_test schemas."
           exit 1
         fi
+
+        echo "TiDB timing: container start $(tidb_span "$tidb_t0" "$tidb_t_started"), ready $(tidb_span "$tidb_t_started" "$tidb_t_ready"), bootstrap+verify $(tidb_span "$tidb_t_ready" "$tidb_t_bootstrapped"), total $(tidb_span "$tidb_t0" "$tidb_t_bootstrapped")"
         """
     )
 
@@ -246,8 +274,7 @@ def build_tidb_function(tmp_dir: Path, bootstrap_sql_file: Optional[Path], templ
     blocks: Dict[str, str] = {
         "{{ENV_BLOCK}}": build_env_block(tmp_dir, bootstrap_sql_file),
         "{{START_CONTAINER}}": build_start_block(),
-        "{{LOG_WAIT}}": build_log_wait_block(),
-        "{{PING_BLOCK}}": build_ping_block(),
+        "{{READINESS}}": build_readiness_block(),
         "{{DB_CREATION}}": build_db_creation_block(),
         "{{BOOTSTRAP_STAGE}}": build_bootstrap_stage_block(),
         "{{BOOTSTRAP_EXECUTE}}": build_bootstrap_execute_block(),
@@ -435,6 +462,12 @@ def run(args: argparse.Namespace) -> dict:
     # Stage 2: Apply patch to workspace
     apply_patch_to_workspace(docker_db_path, tidb_function, args.dry_run)
 
+    # The generated tidb_8_5() waits for TiDB through $TMP_DIR/tidb_ready.py
+    ready_script_path = tmp_dir / READY_SCRIPT.name
+    if not args.dry_run:
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(READY_SCRIPT, ready_script_path)
+
     # Write bootstrap SQL snapshot if needed
     if not args.dry_run and snapshot_sql_path and use_bootstrap_sql:
         snapshot_sql_path.parent.mkdir(parents=True, exist_ok=True)
@@ -449,6 +482,7 @@ def run(args: argparse.Namespace) -> dict:
         if snapshot_sql_path:
             print(f"  (Bootstrap SQL snapshot: {snapshot_sql_path})")
         print(f"  (Versioned patch saved to: {patch_output_path})")
+        print(f"  (Readiness helper installed at: {ready_script_path})")
     elif use_bootstrap_sql and snapshot_sql_path:
         print(f"[dry-run] Would save bootstrap SQL snapshot to {snapshot_sql_path}")
 
@@ -458,6 +492,7 @@ def run(args: argparse.Namespace) -> dict:
         "snapshot_sql_path": snapshot_sql_path,
         "bootstrap_sql": bootstrap_path,
         "patch_output_path": patch_output_path,
+        "ready_script_path": ready_script_path,
     }
 
 
@@ -1,5 +1,11 @@
 #!/usr/bin/env python3
-"""Re-run a single Hibernate ORM test against TiDB and capture supporting logs."""
+"""
+Re-run a single Hibernate ORM test against TiDB and capture supporting logs.
+
+--list also shows how often each failing class failed recently, read from the
+cell's rolling per-class history (junit_history.py, recorded by
+run_comparison.py), so known failures can be told apart from new regressions.
+"""
 
 from __future__ import annotations
 
@@ -10,12 +16,14 @@ import subprocess
 import sys
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from pathlib import Path
+from pathlib import Path, PurePosixPath
 import shlex
-from typing import Iterable, List, Optional, Sequence, Tuple
-import xml.etree.ElementTree as ET
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 
 from env_utils import load_lab_env, require_path, resolve_workspace_dir
+from junit_archive import is_archive
+from junit_history import ClassRecord, class_records, history_path, load_history
+from junit_scan import DEFAULT_CHUNK_SIZE, module_name_for, read_failure_cases, scan, scan_members
 
 
 class Logger:
@@ -169,6 +177,7 @@ class ReproOptions:
     runner: str
     docker_image: str
     dry_run: bool
+    jobs: int = 1
 
 
 @dataclass
@@ -187,7 +196,7 @@ def build_parser() -> argparse.ArgumentParser:
         description="Inspect TiDB comparison artifacts, select a failing test, and re-run it with optional TiDB general logs.",
         formatter_class=argparse.ArgumentDefaultsHelpFormatter,
     )
-    parser.add_argument("--run-root", type=Path, help="Path to a previous test results directory (tidb-*-results-YYYYMMDD-HHMMSS).")
+    parser.add_argument("--run-root", type=Path, help="Path to a previous test results directory or archive (tidb-*-results-YYYYMMDD-HHMMSS[.zip|.tar.gz]).")
     parser.add_argument(
         "--results-type",
         choices=sorted(RUN_PREFIXES.keys()),
@@ -224,6 +233,7 @@ def build_parser() -> argparse.ArgumentParser:
         help="Runner image when --runner=docker is used.",
     )
     parser.add_argument("--dry-run", action="store_true", help="Print the resolved Gradle command without executing it.")
+    parser.add_argument("--jobs", type=int, default=1, help="Worker processes used to scan JUnit XML files (0 = one per CPU).")
     return parser
 
 
@@ -251,6 +261,7 @@ def parse_options(argv: Optional[Sequence[str]] = None) -> ReproOptions:
         runner=args.runner,
         docker_image=args.docker_image,
         dry_run=args.dry_run,
+        jobs=args.jobs,
     )
 
 
@@ -278,42 +289,49 @@ def load_environment() -> ReproEnvironment:
 def find_latest_run_root(search_dir: Path, prefix: str) -> Path:
     if not search_dir.exists():
         raise SystemExit(f"ERROR: results directory not found: {search_dir}. Run scripts/run_comparison.sh first.")
-    matches = sorted(search_dir.glob(f"{prefix}-*"), key=lambda path: path.stat().st_mtime, reverse=True)
+    candidates = (path for path in search_dir.glob(f"{prefix}-*") if path.is_dir() or is_archive(path))
+    matches = sorted(candidates, key=lambda path: path.stat().st_mtime, reverse=True)
     if not matches:
         raise SystemExit(f"ERROR: No directories found matching {prefix}-* under {search_dir}.")
     return matches[0]
 
 
-def collect_failures(run_root: Path) -> List[FailureCase]:
+def is_test_result_member(name: PurePosixPath) -> bool:
+    """Archive counterpart of run_root.rglob("TEST-*.xml")."""
+    return name.name.startswith("TEST-") and name.suffix == ".xml"
+
+
+def collect_failures(
+    run_root: Path, jobs: Optional[int] = 1, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> List[FailureCase]:
     failures: List[FailureCase] = []
-    for xml_path in sorted(run_root.rglob("TEST-*.xml")):
-        rel = xml_path.relative_to(run_root)
-        module = rel.parts[0]
-        try:
-            tree = ET.parse(xml_path)
-        except ET.ParseError:
+    if is_archive(run_root):
+        members = scan_members(run_root, is_test_result_member, read_failure_cases)
+        results = [(run_root / name, cases) for name, cases in members]
+    else:
+        results = scan(sorted(run_root.rglob("TEST-*.xml")), read_failure_cases, jobs=jobs, chunk_size=chunk_size)
+    for xml_path, cases in results:
+        if cases is None:
             continue
-        suite = tree.getroot()
-        for case in suite.findall("testcase"):
-            failure = case.find("failure")
-            if failure is None:
-                continue
-            classname = case.get("classname") or "unknown"
-            raw_name = case.get("name") or ""
-            message = failure.get("message") or failure.text or ""
+        module = module_name_for(xml_path, run_root)
+        for classname, raw_name, message in cases:
             failures.append(
                 FailureCase(
                     module=module,
                     classname=classname,
                     raw_name=raw_name,
-                    message=message.strip(),
+                    message=message,
                     result_file=xml_path,
                 )
             )
     return failures
 
 
-def print_failures(logger: Logger, failures: Sequence[FailureCase]) -> None:
+def print_failures(
+    logger: Logger,
+    failures: Sequence[FailureCase],
+    history: Optional[Dict[Tuple[str, str], ClassRecord]] = None,
+) -> None:
     if not failures:
         logger.warning("No failing tests found in the selected run.")
         return
@@ -322,12 +340,23 @@ def print_failures(logger: Logger, failures: Sequence[FailureCase]) -> None:
             f"[{idx}] {failure.classname}#{failure.raw_name or '<class>'} "
             f"(module={failure.module}, file={failure.result_file.name})"
         )
+        record = (history or {}).get((failure.module, failure.classname))
+        if record is not None:
+            logger.info(f"      history: {record.describe()}")
         snippet = failure.message.replace("\n", " ")
         if len(snippet) > 200:
             snippet = snippet[:197] + "..."
         logger.info(f"      {snippet}")
 
 
+def cell_for_run_root(run_root: Path) -> Optional[str]:
+    """Map a collection name (e.g. tidb-tidbdialect-results-20251103-143022.zip) to its cell identifier."""
+    for cell, prefix in RUN_PREFIXES.items():
+        if run_root.name.startswith(f"{prefix}-"):
+            return cell
+    return None
+
+
 def parse_test_identifier(identifier: str) -> Tuple[str, Optional[str]]:
     if "#" in identifier:
         classname, method = identifier.split("#", 1)
@@ -404,6 +433,7 @@ class ReproOrchestrator:
         self.logger = logger or Logger()
         self.run_root: Optional[Path] = None
         self.failures: List[FailureCase] = []
+        self.history: Dict[Tuple[str, str], ClassRecord] = {}
         self.output_dir = env.results_repro_dir
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
@@ -412,7 +442,7 @@ class ReproOrchestrator:
         self.load_failures()
 
         if self.options.list_only:
-            print_failures(self.logger, self.failures)
+            print_failures(self.logger, self.failures, self.history)
             return 0
 
         target = self.resolve_target()
@@ -486,8 +516,18 @@ class ReproOrchestrator:
 
     def load_failures(self) -> None:
         if self.run_root and self.run_root.exists():
-            self.failures = collect_failures(self.run_root)
+            self.failures = collect_failures(self.run_root, jobs=self.options.jobs)
             self.logger.info(f"Discovered {len(self.failures)} failing test(s) under {self.run_root}")
+            self.load_history()
+
+    def load_history(self) -> None:
+        """Keep the per-class records of the run root's cell for --list (read-only; run_comparison records runs)."""
+        assert self.run_root is not None
+        cell = cell_for_run_root(self.run_root)
+        if cell is None:
+            return
+        history = load_history(history_path(self.env.results_runs_dir, cell), cell)
+        self.history = {record.key: record for record in class_records(history)}
 
     def resolve_target(self) -> SelectedTest:
         if self.options.select_index is not None:
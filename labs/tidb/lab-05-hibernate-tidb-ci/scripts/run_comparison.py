@@ -1,5 +1,53 @@
 #!/usr/bin/env python3
-"""Python orchestration for the Hibernate ORM MySQL vs TiDB comparison runs."""
+"""
+Python orchestration for the Hibernate ORM MySQL vs TiDB comparison runs.
+
+By default the matrix runs one cell at a time (MySQL baseline, then each TiDB
+dialect) in the shared workspace. With --parallel, every cell gets its own
+workspace overlay under TEMP_DIR/matrix/<cell>, its own database container
+(and TiDB host port) and its own runner container, and cells run concurrently
+as far as the Docker host's CPU/memory budget allows.
+
+Runner CPUs/memory, the Gradle heap, test maxParallelForks and DB_COUNT are
+sized together from the host by runner_resources.py (split between concurrent
+cells) and recorded in every collection.json.
+
+With --shards N, each cell's test classes are split into N shards balanced on
+the per-class durations of that cell's previous collection (junit_shards.py).
+Every shard runs in its own runner container and workspace overlay against the
+cell's database, using its own hibernate_orm_test_s<k>* schemas, and the shard
+results are collected into one collection. Cells without a previous collection
+run unsharded.
+
+Every collection is recorded in a rolling per-class duration/failure history
+(junit_history.py). With --failing-first, the classes that failed recently run
+first in a separate Gradle invocation; combined with --stop-on-failure, a cell
+whose known failures still fail stops there instead of running the full suite.
+
+Runners keep their Gradle dependency and build caches in a persistent Docker
+volume (gradle_cache.py) and only test outputs are removed between cells, so
+compiled classes carry over and each cell goes straight to the test phase.
+--gradle-cache clean restores the old `./gradlew clean` before every cell;
+--verify-cache re-runs the last cell that way and fails unless its testcases
+match the cached run.
+
+With --db-pool, database containers are kept running between cells (and
+between invocations). A cell whose container is already up resets its
+hibernate_orm_test* schemas in one SQL session instead of re-running
+docker_db.sh, and the seconds saved against the container's last cold start
+(remembered in TEMP_DIR/db-pool.json) are logged and recorded in
+collection.json.
+
+Usage examples:
+  python scripts/run_comparison.py
+  python scripts/run_comparison.py --tidb-only --tidb-dialect both
+  python scripts/run_comparison.py --parallel 0      # as many cells as the host fits
+  python scripts/run_comparison.py --parallel 3 --dry-run
+  python scripts/run_comparison.py --mysql-only --shards 4
+  python scripts/run_comparison.py --tidb-only --failing-first --stop-on-failure
+  python scripts/run_comparison.py --mysql-only --verify-cache
+  python scripts/run_comparison.py --tidb-only --db-pool
+"""
 
 from __future__ import annotations
 
@@ -9,12 +57,39 @@ import os
 import shutil
 import subprocess
 import sys
+import threading
 import time
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
 from pathlib import Path
-from typing import List, Optional, Sequence
+from typing import List, Optional, Sequence, Tuple
 
 from env_utils import load_lab_env, require_path, resolve_workspace_dir, suggest_gradle_runner_image
+from gradle_cache import (
+    CACHE_INIT_SCRIPT,
+    CACHE_MODES,
+    DEFAULT_VOLUME,
+    compare_collections,
+    invalidate_test_outputs,
+    overlay_ignore,
+    runner_args,
+    volume_name,
+)
+from junit_archive import OUTPUT_FORMATS, archive_path_for
+from junit_history import HISTORY_DIRNAME, failing_first, history_path, load_history, update_from_collection
+from junit_testcase_diff import diff_paths, format_diff, resolve_index_path
+from junit_shards import (
+    Shard,
+    TestClass,
+    class_durations,
+    class_filter_lines,
+    format_plan,
+    latest_index,
+    plan_shards,
+    write_filter,
+    write_filters,
+)
+from runner_resources import Allocation, HostResources, detect_host, max_cells, plan
 
 COLOR_BLUE = "\033[0;34m"
 COLOR_GREEN = "\033[0;32m"
@@ -22,6 +97,25 @@ COLOR_YELLOW = "\033[1;33m"
 COLOR_RED = "\033[0;31m"
 COLOR_RESET = "\033[0m"
 
+MATRIX_DIRNAME = "matrix"
+SHARDS_DIRNAME = "shards"
+FORKS_INIT_SCRIPT = Path(__file__).resolve().parent / "templates" / "test-forks.init.gradle"
+SHARD_INIT_SCRIPT = Path(__file__).resolve().parent / "templates" / "test-shard.init.gradle"
+LOCAL_DATABASES_GRADLE = Path("local-build-plugins") / "src" / "main" / "groovy" / "local.databases.gradle"
+TEST_DATABASE = "hibernate_orm_test"
+GRADLE_BUILD_FILES = ("build.gradle", "build.gradle.kts")
+DB_POOL_FILENAME = "db-pool.json"
+# Parallel cells update TEMP_DIR/db-pool.json from their own threads.
+_DB_POOL_LOCK = threading.Lock()
+
+
+def _overlay_ignore(directory: str, names: List[str]) -> List[str]:
+    """shutil.copytree filter: skip Git history, Gradle state and the build outputs of Gradle projects."""
+    skipped = [name for name in names if name in (".git", ".gradle")]
+    if any(build_file in names for build_file in GRADLE_BUILD_FILES):
+        skipped.extend(name for name in names if name in ("build", "target", "tmp"))
+    return skipped
+
 
 class Logger:
     """Basic logger that mirrors the colorized output from the original Bash script."""
@@ -58,6 +152,38 @@ class Logger:
         print(message)
 
 
+class PrefixedLogger:
+    """Tag every message with a matrix cell name so concurrent cells stay readable."""
+
+    _lock = threading.Lock()
+
+    def __init__(self, inner, prefix: str) -> None:
+        self._inner = inner
+        self._prefix = f"[{prefix}]"
+
+    def _emit(self, method: str, message: str) -> None:
+        with self._lock:
+            getattr(self._inner, method)(f"{self._prefix} {message}")
+
+    def info(self, message: str) -> None:
+        self._emit("info", message)
+
+    def success(self, message: str) -> None:
+        self._emit("success", message)
+
+    def warning(self, message: str) -> None:
+        self._emit("warning", message)
+
+    def error(self, message: str) -> None:
+        self._emit("error", message)
+
+    def section(self, title: str) -> None:
+        self._emit("info", f"── {title} ──")
+
+    def echo(self, message: str) -> None:
+        self._emit("echo", message)
+
+
 class Runner:
     """Thin wrapper around subprocess so tests can inject fakes."""
 
@@ -72,6 +198,7 @@ class Runner:
         *,
         cwd: Optional[Path] = None,
         env: Optional[dict[str, str]] = None,
+        echo: bool = True,
     ) -> None:
         kwargs = {
             "stdout": subprocess.PIPE,
@@ -87,7 +214,8 @@ class Runner:
             process = subprocess.Popen(cmd, **kwargs)  # noqa: S603
             assert process.stdout is not None
             for line in process.stdout:
-                print(line, end="")
+                if echo:
+                    print(line, end="")
                 handle.write(line)
             exit_code = process.wait()
         if exit_code != 0:
@@ -105,6 +233,13 @@ class ComparisonOptions:
     gradle_continue: bool = True
     dry_run: bool = False
     compare_only: bool = False
+    collect_format: str = "dir"
+    parallel: int = 1
+    shards: int = 1
+    failing_first: bool = False
+    gradle_cache: str = "reuse"
+    verify_cache: bool = False
+    db_pool: bool = False
 
 
 @dataclass
@@ -120,6 +255,8 @@ class ComparisonEnvironment:
     tidb_container: str
     runner_image: str
     skip_tidb_patch: bool
+    tidb_host_port: int = 4000
+    gradle_cache_volume: str = DEFAULT_VOLUME
 
 
 @dataclass
@@ -131,6 +268,22 @@ class TidbRunConfig:
     dialect_override: Optional[str] = None
 
 
+@dataclass
+class MatrixCell:
+    """One database/dialect combination of a --parallel run and the resources it owns."""
+
+    identifier: str
+    db_name: str
+    rdbms: str
+    label: str
+    summary_label: str
+    patch_arg: Optional[str] = None
+    dialect_override: Optional[str] = None
+    container: str = ""
+    host_port: Optional[int] = None
+    workspace: Optional[Path] = None
+
+
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         description="Run Hibernate ORM tests for MySQL and TiDB and summarize the results.",
@@ -144,7 +297,7 @@ def build_parser() -> argparse.ArgumentParser:
         default="both",
         help="Select which TiDB dialect(s) to execute",
     )
-    parser.add_argument("--skip-clean", action="store_true", help="Skip Gradle cache cleaning")
+    parser.add_argument("--skip-clean", action="store_true", help="Skip cleaning between cells (see --gradle-cache)")
     parser.add_argument("--skip-mysql", action="store_true", help="Skip MySQL runs")
     parser.add_argument("--skip-tidb", action="store_true", help="Skip TiDB runs")
     parser.add_argument(
@@ -158,6 +311,59 @@ def build_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="Do not run any tests; only compare the most recent summaries",
     )
+    parser.add_argument(
+        "--collect-format",
+        choices=OUTPUT_FORMATS,
+        default="dir",
+        help="Store each collection as a loose directory or a single archive (see junit_local_collect.py --format)",
+    )
+    parser.add_argument(
+        "--parallel",
+        type=int,
+        default=1,
+        metavar="N",
+        help=(
+            "Run up to N matrix cells concurrently, each with its own workspace overlay and database container "
+            "(0 = as many as the Docker host's CPUs/memory allow; 1 = sequential in the shared workspace)"
+        ),
+    )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=1,
+        metavar="N",
+        help=(
+            "Split each cell's test classes into N runner containers against the same database, balanced on the "
+            "per-class durations of the cell's previous collection"
+        ),
+    )
+    parser.add_argument(
+        "--failing-first",
+        action="store_true",
+        help="Run the classes that failed in the cell's recent history before the rest of the suite",
+    )
+    parser.add_argument(
+        "--gradle-cache",
+        choices=CACHE_MODES,
+        default="reuse",
+        help=(
+            "reuse: keep compiled classes and a persistent Gradle cache volume, invalidating only test outputs "
+            "between cells; clean: ./gradlew clean with an empty Gradle home before every cell"
+        ),
+    )
+    parser.add_argument(
+        "--verify-cache",
+        action="store_true",
+        help="Re-run the last cell from a clean build and fail unless its testcases match the cached run",
+    )
+    parser.add_argument(
+        "--db-pool",
+        action="store_true",
+        help=(
+            "Keep database containers running after each cell and reset the hibernate_orm_test* schemas of an "
+            "already running container instead of restarting it"
+        ),
+    )
     return parser
 
 
@@ -167,6 +373,12 @@ def parse_options(argv: Optional[Sequence[str]] = None) -> ComparisonOptions:
 
     if args.mysql_only and args.tidb_only:
         parser.error("Cannot combine --mysql-only and --tidb-only")
+    if args.parallel < 0:
+        parser.error("--parallel must be >= 0")
+    if args.shards < 1:
+        parser.error("--shards must be >= 1")
+    if args.verify_cache and (args.gradle_cache != "reuse" or args.parallel != 1 or args.compare_only):
+        parser.error("--verify-cache needs --gradle-cache reuse and a sequential run (--parallel 1)")
 
     skip_mysql = args.skip_mysql or args.tidb_only
     skip_tidb = args.skip_tidb or args.mysql_only
@@ -181,6 +393,13 @@ def parse_options(argv: Optional[Sequence[str]] = None) -> ComparisonOptions:
         gradle_continue=not args.stop_on_failure,
         dry_run=args.dry_run,
         compare_only=args.compare_only,
+        collect_format=args.collect_format,
+        parallel=args.parallel,
+        shards=args.shards,
+        failing_first=args.failing_first,
+        gradle_cache=args.gradle_cache,
+        verify_cache=args.verify_cache,
+        db_pool=args.db_pool,
     )
 
 
@@ -200,6 +419,7 @@ def load_environment() -> ComparisonEnvironment:
     if not runner_image:
         runner_image = suggest_gradle_runner_image(workspace)
     skip_tidb_patch = os.environ.get("SKIP_TIDB_PATCH") == "1"
+    tidb_host_port = int(os.environ.get("TIDB_HOST_PORT", "4000"))
     return ComparisonEnvironment(
         lab_home=lab_home,
         workspace_root=workspace_root,
@@ -212,6 +432,8 @@ def load_environment() -> ComparisonEnvironment:
         tidb_container=tidb_container,
         runner_image=runner_image,
         skip_tidb_patch=skip_tidb_patch,
+        tidb_host_port=tidb_host_port,
+        gradle_cache_volume=volume_name(),
     )
 
 
@@ -230,6 +452,21 @@ class ComparisonOrchestrator:
         self.logger = logger or Logger()
         self.last_log_file: Optional[Path] = None
         self.last_collection_dir: Optional[Path] = None
+        # Cells of a --parallel run share the console, so Gradle output only goes to the log file
+        self.echo_output = True
+        self.log_prefix: Optional[str] = None
+        self.host: Optional[HostResources] = None
+        self.allocation: Optional[Allocation] = None
+        # Workspaces of shards 2..N of the last run_tests, merged by collect_results
+        self.last_shard_roots: List[Path] = []
+        self.last_shard_info: Optional[dict] = None
+        # Runners of concurrent --parallel cells mount the Gradle cache volume read-only
+        self.shared_gradle_cache = False
+        # The last sequential cell and its test time, re-run by --verify-cache
+        self.last_cell: Optional[MatrixCell] = None
+        self.last_test_seconds = 0
+        # How the last start_database got its database (cold start or pool reset), for collection.json
+        self.last_database_info: Optional[dict] = None
 
     def execute(self) -> None:
         self.logger.section("Hibernate ORM Database Comparison Test Suite")
@@ -237,12 +474,21 @@ class ComparisonOrchestrator:
         self.logger.info(
             f"TiDB: {'SKIPPED' if self.options.skip_tidb else f'ENABLED (dialect: {self.options.tidb_dialect})'}"
         )
-        self.logger.info(f"Clean cache: {'NO' if self.options.skip_clean else 'YES'}")
+        self.logger.info(f"Clean between cells: {'NO' if self.options.skip_clean else 'YES'}")
+        self.logger.info(f"Gradle cache: {self.options.gradle_cache}")
+        self.logger.info(f"Database pool: {'YES' if self.options.db_pool else 'NO'}")
 
         self.verify_environment()
 
         if self.options.compare_only:
             self.compare_results()
+        elif self.options.parallel != 1:
+            self._run_parallel_matrix()
+            if not self.options.skip_mysql and not self.options.skip_tidb:
+                if self.options.dry_run:
+                    self.logger.warning("[DRY-RUN] Skipping comparison step (no new artifacts)")
+                else:
+                    self.compare_results()
         else:
             if not self.options.skip_mysql:
                 self._run_mysql_baseline()
@@ -250,6 +496,9 @@ class ComparisonOrchestrator:
             if not self.options.skip_tidb:
                 self._run_tidb_matrix()
 
+            if self.options.verify_cache:
+                self._verify_cache()
+
             if not self.options.skip_mysql and not self.options.skip_tidb:
                 if self.options.dry_run:
                     self.logger.warning("[DRY-RUN] Skipping comparison step (no new artifacts)")
@@ -274,6 +523,8 @@ class ComparisonOrchestrator:
         self.logger.info(f"MySQL container: {self.env.mysql_container}")
         self.logger.info(f"TiDB container: {self.env.tidb_container}")
         self.logger.info(f"Docker runner image: {self.env.runner_image}")
+        if self.options.gradle_cache == "reuse":
+            self.logger.info(f"Gradle cache volume: {self.env.gradle_cache_volume}")
         self.logger.info(f"Skip TiDB patch: {'YES' if self.env.skip_tidb_patch else 'NO'}")
         self.logger.info(f"DRY_RUN: {self.options.dry_run}")
 
@@ -301,11 +552,36 @@ class ComparisonOrchestrator:
 
         self.logger.success("Environment verified")
 
+    def detect_resources(self) -> HostResources:
+        if self.host is None:
+            # A dry run does not talk to Docker, so it sizes from this machine.
+            self.host = detect_host(None if self.options.dry_run else self.runner.run)
+        return self.host
+
+    def resources(self) -> Allocation:
+        """The runner allocation for this run (one cell on the whole host unless a matrix split it)."""
+        if self.allocation is None:
+            self.allocation = plan(self.detect_resources(), 1)
+            self.logger.info(f"Runner allocation: {self.allocation.describe()}")
+        return self.allocation
+
     def clean_gradle_caches(self) -> None:
         if self.options.skip_clean:
             self.logger.warning("Skipping Gradle cache cleaning (--skip-clean)")
             return
 
+        if self.options.gradle_cache == "reuse":
+            if self.options.dry_run:
+                self.logger.warning("[DRY-RUN] Would remove test outputs (compiled classes and Gradle caches kept)")
+                return
+            self.logger.section("Invalidating Test Outputs")
+            removed = invalidate_test_outputs(self.env.workspace, skip=[self.env.temp])
+            self.logger.success(
+                f"Removed {len(removed)} test output directories; "
+                f"reusing compiled classes and Gradle cache volume {self.env.gradle_cache_volume}"
+            )
+            return
+
         if self.options.dry_run:
             self.logger.warning("[DRY-RUN] Would clean Gradle caches")
             return
@@ -331,8 +607,39 @@ class ComparisonOrchestrator:
         shutil.rmtree(gradle_cache, ignore_errors=True)
         self.logger.success("Gradle caches cleaned")
 
+    def warm_gradle_cache(self) -> None:
+        """Compile the test classes once in the shared workspace so concurrent cells start from them."""
+        if self.options.gradle_cache != "reuse":
+            return
+        if self.options.dry_run:
+            self.logger.warning(f"[DRY-RUN] Would compile test classes into {self.env.gradle_cache_volume}")
+            return
+
+        self.logger.section("Warming Gradle Cache")
+        started = time.time()
+        self.runner.run(
+            [
+                "docker",
+                "run",
+                "--rm",
+                "-v",
+                f"{self.env.workspace.as_posix()}:/workspace",
+                "-v",
+                f"{self.env.temp.as_posix()}:/workspace/tmp",
+                *self._gradle_cache_args(False),
+                "-w",
+                "/workspace",
+                self.env.runner_image,
+                "./gradlew",
+                "--build-cache",
+                "testClasses",
+            ],
+            check=True,
+        )
+        self.logger.success(f"Test classes compiled in {int(time.time() - started)}s")
+
     def check_dialect(self, db_type: str) -> None:
-        config_file = self.env.workspace / "local-build-plugins" / "src" / "main" / "groovy" / "local.databases.gradle"
+        config_file = self.env.workspace / LOCAL_DATABASES_GRADLE
         if not config_file.exists():
             self.logger.error(f"Configuration file not found: {config_file}")
             raise SystemExit(1)
@@ -366,11 +673,15 @@ class ComparisonOrchestrator:
 
     def start_database(self, name: str) -> None:
         if self.options.dry_run:
-            self.logger.warning(f"[DRY-RUN] Would start {name} database (DB_COUNT=4)")
+            action = "reuse or start" if self.options.db_pool else "start"
+            self.logger.warning(f"[DRY-RUN] Would {action} {name} database (DB_COUNT={self.resources().db_count})")
             return
 
         self.logger.section(f"Starting {name} Database")
         container_name = self._container_name(name)
+        if self.options.db_pool and self._reset_pooled_database(name):
+            return
+        started = time.time()
         self.runner.run(
             ["docker", "rm", "-f", container_name],
             check=False,
@@ -379,7 +690,10 @@ class ComparisonOrchestrator:
         )
         db_function = "mysql_8_0" if name == "mysql" else name
         env = os.environ.copy()
-        env["DB_COUNT"] = "4"
+        env["DB_COUNT"] = str(self.resources().db_count)
+        if name == "tidb":
+            env["TIDB_CONTAINER_NAME"] = container_name
+            env["TIDB_HOST_PORT"] = str(self.env.tidb_host_port)
         try:
             self.runner.run(
                 ["./docker_db.sh", db_function],
@@ -391,17 +705,100 @@ class ComparisonOrchestrator:
             self.logger.error(f"{name} database script failed")
             raise
 
+        if container_name not in self._running_containers():
+            self.logger.error(f"{container_name} container is not running after docker_db.sh completed")
+            raise SystemExit(1)
+
+        seconds = time.time() - started
+        self.last_database_info = {"container": container_name, "mode": "cold-start", "seconds": round(seconds, 1)}
+        if self.options.db_pool:
+            self._update_db_pool(container_name, seconds)
+        self.logger.success(f"{name} started successfully in {seconds:.0f}s (container: {container_name})")
+
+    def _running_containers(self) -> set:
         result = self.runner.run(
             ["docker", "ps", "--format", "{{.Names}}"],
             capture_output=True,
             check=True,
         )
-        names = {line.strip() for line in result.stdout.splitlines()}
-        if container_name not in names:
-            self.logger.error(f"{container_name} container is not running after docker_db.sh completed")
-            raise SystemExit(1)
+        return {line.strip() for line in result.stdout.splitlines()}
 
-        self.logger.success(f"{name} started successfully (container: {container_name})")
+    def _db_pool_path(self) -> Path:
+        return self.env.temp / DB_POOL_FILENAME
+
+    def _load_db_pool(self) -> dict:
+        try:
+            return json.loads(self._db_pool_path().read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def _update_db_pool(self, container_name: str, cold_start_seconds: float) -> None:
+        """Remember the container's cold start time as the reference for the resets that reuse it."""
+        with _DB_POOL_LOCK:
+            pool = self._load_db_pool()
+            pool[container_name] = {"cold_start_seconds": round(cold_start_seconds, 1)}
+            self._db_pool_path().write_text(json.dumps(pool, indent=2, sort_keys=True), encoding="utf-8")
+
+    def _reset_statements(self) -> List[str]:
+        """Drop and recreate every schema a cell can use (DB_COUNT workers, plus shard schemas)."""
+        db_count = self.resources().db_count
+        bases = [TEST_DATABASE]
+        if self.options.shards > 1:
+            bases += [f"{TEST_DATABASE}_s{number}" for number in range(2, self.options.shards + 1)]
+        statements = [f"CREATE USER IF NOT EXISTS '{TEST_DATABASE}'@'%' IDENTIFIED BY '{TEST_DATABASE}'"]
+        for base in bases:
+            for schema in [base] + [f"{base}_{worker}" for worker in range(1, db_count + 1)]:
+                statements.append(f"DROP DATABASE IF EXISTS {schema}")
+                statements.append(f"CREATE DATABASE {schema}")
+                statements.append(f"GRANT ALL ON {schema}.* TO '{TEST_DATABASE}'@'%'")
+        return statements
+
+    def _reset_pooled_database(self, name: str) -> bool:
+        """Reuse the running container by resetting its schemas; False means it needs a cold start."""
+        container_name = self._container_name(name)
+        if container_name not in self._running_containers():
+            self.logger.info(f"No pooled {container_name} container running; starting a new one")
+            return False
+        statements = self._reset_statements()
+        started = time.time()
+        try:
+            self._run_sql(name, statements)
+        except subprocess.CalledProcessError as exc:
+            self.logger.warning(f"Resetting pooled {container_name} failed (exit code: {exc.returncode}); restarting it")
+            return False
+        seconds = time.time() - started
+        cold = self._load_db_pool().get(container_name, {}).get("cold_start_seconds")
+        info = {"container": container_name, "mode": "pool-reset", "seconds": round(seconds, 1)}
+        message = f"Reset {(len(statements) - 1) // 3} schemas in pooled {container_name} in {seconds:.1f}s"
+        if cold is not None:
+            info["cold_start_seconds"] = cold
+            info["saved_seconds"] = round(max(0.0, cold - seconds), 1)
+            message += f" (cold start {cold:.0f}s, saved ~{info['saved_seconds']:.0f}s)"
+        self.last_database_info = info
+        self.logger.success(message)
+        return True
+
+    def _run_sql(self, db_name: str, statements: Sequence[str]) -> None:
+        """Run `statements` as root in one mysql client session inside the database container's network."""
+        if db_name == "mysql":
+            client = ["mysql", "-h", "127.0.0.1", "-P", "3306", "-uroot", f"-p{TEST_DATABASE}"]
+        else:
+            client = ["mysql", "-h", "127.0.0.1", "-P", "4000", "-uroot"]
+        self.runner.run(
+            [
+                "docker",
+                "run",
+                "--rm",
+                "--network",
+                f"container:{self._container_name(db_name)}",
+                "mysql:8.0",
+                *client,
+                "-e",
+                "; ".join(statements) + ";",
+            ],
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
 
     def run_tests(
         self,
@@ -410,10 +807,30 @@ class ComparisonOrchestrator:
         rdbms: str,
         label: str,
         dialect_override: Optional[str] = None,
+        identifier: Optional[str] = None,
     ) -> str:
         timestamp = time.strftime("%Y%m%d-%H%M%S")
         container = f"hibernate-{db_name}-ci-runner"
-        cmd_parts = [f"RDBMS={rdbms}", "./ci/build.sh"]
+        identifier = identifier or self.log_prefix or db_name
+        self.last_shard_roots = []
+        self.last_shard_info = None
+        priority = self._failing_first_classes(identifier) if self.options.failing_first else []
+        shards = self._plan_test_shards(identifier, skip=priority) if self.options.shards > 1 else None
+        allocation = self.resources()
+        if shards:
+            # The cell's runner budget is split between its shards.
+            allocation = plan(self.detect_resources(), allocation.cells * len(shards))
+            self.last_shard_info["allocation"] = allocation.to_manifest()
+        init_script = self.env.temp / "gradle" / FORKS_INIT_SCRIPT.name
+        cmd_parts = [
+            f"RDBMS={rdbms}",
+            "./ci/build.sh",
+            f"--max-workers={allocation.runner_cpus}",
+            f"-I /workspace/tmp/gradle/{init_script.name}",
+            f"-PlabMaxParallelForks={allocation.max_parallel_forks}",
+        ]
+        if self.options.gradle_cache == "reuse":
+            cmd_parts.extend(["--build-cache", f"-I /workspace/tmp/gradle/{CACHE_INIT_SCRIPT.name}"])
         if dialect_override:
             cmd_parts.append(f"-Pdb.dialect={dialect_override}")
             suffix = dialect_override.split(".")[-1].lower()
@@ -425,41 +842,114 @@ class ComparisonOrchestrator:
             cmd_parts.append(extra_args)
         cmd = " ".join(cmd_parts)
 
-        log_file = self.env.log / f"{db_name}-ci-run-{timestamp}.log"
+        log_file = self.env.log / f"{self.log_prefix or db_name}-ci-run-{timestamp}.log"
         self.last_log_file = log_file
 
         if self.options.dry_run:
             self.logger.warning(f"[DRY-RUN] Would run tests: {label}")
-            self.logger.info(f"Container: {container}")
+            self.logger.info(f"Container: {container} ({allocation.describe()})")
             self.logger.info(f"Command: {cmd}")
+            if priority:
+                self.logger.info(f"Failing first: {len(priority)} classes in {container}-first, then the rest")
+            if shards:
+                self.logger.info(f"Shards: {len(shards)} runner containers ({container}-shard<k>)")
             return timestamp
 
         self.logger.section(f"Running Tests: {label}")
-        self.logger.info(f"Container: {container}")
+        self.logger.info(f"Container: {container} ({allocation.describe()})")
         self.logger.info(f"Command: {cmd}")
         if dialect_override:
             self.logger.info(f"Dialect override: {dialect_override}")
         self.logger.info(f"Log file: {log_file}")
 
-        network_target = self._container_name(db_name)
-        docker_cmd = [
+        init_script.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(FORKS_INIT_SCRIPT, init_script)
+        if self.options.gradle_cache == "reuse":
+            shutil.copyfile(CACHE_INIT_SCRIPT, init_script.parent / CACHE_INIT_SCRIPT.name)
+
+        start_time = time.time()
+        exit_code = 0
+        first_log: Optional[Path] = None
+        rest_cmd = cmd
+        if priority:
+            first_log = log_file.with_name(f"{log_file.stem}-first.log")
+            exit_code = self._run_failing_first(
+                priority,
+                identifier=identifier,
+                db_name=db_name,
+                rdbms=rdbms,
+                container=container,
+                cmd=cmd,
+                allocation=allocation,
+                log_file=first_log,
+            )
+            rest_filter = write_filter(
+                self.env.temp / HISTORY_DIRNAME / identifier / "rest.txt", class_filter_lines("exclude", priority)
+            )
+            rest_cmd = f"{cmd} {self._filter_args(rest_filter)}"
+        if exit_code and not self.options.gradle_continue:
+            self.logger.error(
+                "Historically failing classes failed again; skipping the rest of the suite (--stop-on-failure)"
+            )
+            log_file.write_text("", encoding="utf-8")
+        elif shards:
+            exit_code = self._run_test_shards(
+                shards,
+                identifier=identifier,
+                db_name=db_name,
+                rdbms=rdbms,
+                container=container,
+                cmd=cmd,
+                allocation=allocation,
+                log_file=log_file,
+                also_exclude=priority,
+            ) or exit_code
+        else:
+            exit_code = self._stream_runner(
+                container, db_name, rdbms, allocation, self.env.workspace, rest_cmd, log_file, self.echo_output
+            ) or exit_code
+        if first_log is not None:
+            # The collected log starts with the failing-first pass.
+            rest = log_file.read_text(encoding="utf-8", errors="replace") if log_file.exists() else ""
+            log_file.write_text(first_log.read_text(encoding="utf-8", errors="replace") + rest, encoding="utf-8")
+            first_log.unlink()
+        duration = int(time.time() - start_time)
+        self.last_test_seconds = duration
+        self.logger.info(f"Test execution completed in {duration}s")
+        if exit_code == 0:
+            self.logger.success("Tests completed: BUILD SUCCESSFUL")
+        else:
+            self.logger.warning(f"Tests completed: BUILD FAILED (exit code: {exit_code})")
+        return timestamp
+
+    def _runner_command(
+        self,
+        container: str,
+        db_name: str,
+        rdbms: str,
+        allocation: Allocation,
+        workspace: Path,
+        cmd: str,
+        shared_cache: bool = False,
+    ) -> List[str]:
+        return [
             "docker",
             "run",
             "--rm",
             "--name",
             container,
-            "--memory=16g",
-            "--cpus=6",
+            *allocation.docker_args(),
             "--network",
-            f"container:{network_target}",
+            f"container:{self._container_name(db_name)}",
             "-e",
             f"RDBMS={rdbms}",
             "-e",
-            "GRADLE_OPTS=-Xmx6g -XX:MaxMetaspaceSize=1g",
+            f"GRADLE_OPTS={allocation.gradle_opts()}",
             "-v",
-            f"{self.env.workspace.as_posix()}:/workspace",
+            f"{workspace.as_posix()}:/workspace",
             "-v",
             f"{self.env.temp.as_posix()}:/workspace/tmp",
+            *self._gradle_cache_args(shared_cache or self.shared_gradle_cache),
             "-w",
             "/workspace",
             self.env.runner_image,
@@ -468,23 +958,201 @@ class ComparisonOrchestrator:
             cmd,
         ]
 
-        start_time = time.time()
-        exit_code = 0
+    def _gradle_cache_args(self, shared: bool) -> List[str]:
+        """Mount the persistent Gradle cache volume (read-only when other runners use it concurrently)."""
+        if self.options.gradle_cache != "reuse":
+            return []
+        return runner_args(self.env.gradle_cache_volume, shared=shared)
+
+    def _stream_runner(
+        self,
+        container: str,
+        db_name: str,
+        rdbms: str,
+        allocation: Allocation,
+        workspace: Path,
+        cmd: str,
+        log_file: Path,
+        echo: bool,
+        shared_cache: bool = False,
+    ) -> int:
+        """Run one runner container into log_file and return its exit code."""
+        docker_cmd = self._runner_command(container, db_name, rdbms, allocation, workspace, cmd, shared_cache)
         try:
-            self.runner.stream_to_file(docker_cmd, log_file, cwd=self.env.workspace)
+            self.runner.stream_to_file(docker_cmd, log_file, cwd=workspace, echo=echo)
         except subprocess.CalledProcessError as exc:
-            exit_code = exc.returncode
-        duration = int(time.time() - start_time)
-        self.logger.info(f"Test execution completed in {duration}s")
-        if exit_code == 0:
-            self.logger.success("Tests completed: BUILD SUCCESSFUL")
+            return exc.returncode
+        return 0
+
+    def _filter_args(self, filter_path: Path, results_suffix: Optional[str] = None) -> str:
+        """Gradle arguments applying a class filter file (written under TEMP_DIR) inside the runner."""
+        shard_init = self.env.temp / "gradle" / SHARD_INIT_SCRIPT.name
+        shard_init.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(SHARD_INIT_SCRIPT, shard_init)
+        args = (
+            f"-I /workspace/tmp/gradle/{shard_init.name} "
+            f"-PlabTestShard=/workspace/tmp/{filter_path.relative_to(self.env.temp).as_posix()}"
+        )
+        if results_suffix:
+            args += f" -PlabTestResultsSuffix={results_suffix}"
+        return args
+
+    def _failing_first_classes(self, identifier: str) -> List[TestClass]:
+        """Classes that failed in the cell's recent history, in failing-first order."""
+        path = history_path(self.env.results_runs, identifier)
+        records = failing_first(load_history(path, identifier))
+        if not records:
+            self.logger.info(f"No recent failures in the {identifier} history; running the suite in the default order")
+            return []
+        self.logger.info(f"Failing first: {len(records)} classes from {path.name}")
+        for record in records[:5]:
+            self.logger.info(f"  {record.module}:{record.classname} ({record.describe()})")
+        return [record.key for record in records]
+
+    def _run_failing_first(
+        self,
+        classes: List[TestClass],
+        *,
+        identifier: str,
+        db_name: str,
+        rdbms: str,
+        container: str,
+        cmd: str,
+        allocation: Allocation,
+        log_file: Path,
+    ) -> int:
+        """Run only `classes` (results under test-results/<task>-first) and report how soon they finished."""
+        first_filter = write_filter(
+            self.env.temp / HISTORY_DIRNAME / identifier / "first.txt", class_filter_lines("include", classes)
+        )
+        started = time.time()
+        exit_code = self._stream_runner(
+            f"{container}-first",
+            db_name,
+            rdbms,
+            allocation,
+            self.env.workspace,
+            f"{cmd} {self._filter_args(first_filter, results_suffix='first')}",
+            log_file,
+            self.echo_output,
+        )
+        elapsed = int(time.time() - started)
+        if exit_code:
+            self.logger.warning(f"Failing-first pass: failures again after {elapsed}s (exit code: {exit_code})")
         else:
-            self.logger.warning(f"Tests completed: BUILD FAILED (exit code: {exit_code})")
-        return timestamp
+            self.logger.success(f"Failing-first pass: all {len(classes)} classes passed in {elapsed}s")
+        return exit_code
+
+    def _plan_test_shards(self, identifier: str, skip: Sequence[TestClass] = ()) -> Optional[List[Shard]]:
+        """Balance the cell's test classes over --shards runners from its previous collection, if any."""
+        index_path = latest_index(self.env.results_runs, identifier)
+        durations = class_durations(index_path) if index_path is not None else {}
+        for key in skip:
+            durations.pop(key, None)
+        if not durations:
+            self.logger.warning(f"No previous {identifier} collection with testcase timings; running unsharded")
+            return None
+        shards = plan_shards(durations, self.options.shards)
+        self.logger.info(f"Shard plan from {index_path.name} ({len(durations)} classes):")
+        for line in format_plan(shards):
+            self.logger.info(line)
+        self.last_shard_info = {
+            "reference": str(index_path),
+            "shards": [
+                {"shard": shard.number, "classes": len(shard.classes), "seconds": round(shard.seconds, 1)}
+                for shard in shards
+            ],
+        }
+        return shards
+
+    def _prepare_shard_workspace(self, workspace: Path, number: int) -> None:
+        """Copy the workspace for shard `number` and point its JDBC URLs at hibernate_orm_test_s<number>*."""
+        shutil.rmtree(workspace, ignore_errors=True)
+        workspace.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copytree(self.env.workspace, workspace, symlinks=True, ignore=self._overlay_filter())
+        config_file = workspace / LOCAL_DATABASES_GRADLE
+        if not config_file.exists():
+            return
+        lines = config_file.read_text(encoding="utf-8").splitlines(keepends=True)
+        config_file.write_text(
+            "".join(
+                line.replace(f"/{TEST_DATABASE}", f"/{TEST_DATABASE}_s{number}") if "jdbc.url" in line else line
+                for line in lines
+            ),
+            encoding="utf-8",
+        )
+
+    def _create_shard_databases(self, db_name: str, numbers: Sequence[int], forks: int) -> None:
+        """Create hibernate_orm_test_s<k> and _s<k>_1.._s<k>_<forks> for each shard in one client session."""
+        statements = []
+        for number in numbers:
+            base = f"{TEST_DATABASE}_s{number}"
+            for schema in [base] + [f"{base}_{worker}" for worker in range(1, forks + 1)]:
+                statements.append(f"CREATE DATABASE IF NOT EXISTS {schema}")
+                statements.append(f"GRANT ALL ON {schema}.* TO '{TEST_DATABASE}'@'%'")
+        self._run_sql(db_name, statements)
+        self.logger.info(f"Created {len(statements) // 2} shard schemas for shards {', '.join(map(str, numbers))}")
+
+    def _run_test_shards(
+        self,
+        shards: List[Shard],
+        *,
+        identifier: str,
+        db_name: str,
+        rdbms: str,
+        container: str,
+        cmd: str,
+        allocation: Allocation,
+        log_file: Path,
+        also_exclude: Sequence[TestClass] = (),
+    ) -> int:
+        """Run every shard in its own runner container; return the first non-zero exit code (or 0)."""
+        shard_dir = self.env.temp / SHARDS_DIRNAME / identifier
+        filters = write_filters(shards, shard_dir, also_exclude)
+        workspaces = [self.env.workspace]
+        for shard in shards[1:]:
+            workspace = shard_dir / str(shard.number) / "workspace"
+            self._prepare_shard_workspace(workspace, shard.number)
+            workspaces.append(workspace)
+        self._create_shard_databases(db_name, [shard.number for shard in shards[1:]], allocation.max_parallel_forks)
+        self.last_shard_roots = workspaces[1:]
+
+        def run_shard(position: int) -> int:
+            shard = shards[position]
+            shard_log = log_file.with_name(f"{log_file.stem}-shard{shard.number}.log")
+            self.logger.info(f"Shard {shard.number}: {len(shard.classes)} classes, log {shard_log.name}")
+            return self._stream_runner(
+                f"{container}-shard{shard.number}",
+                db_name,
+                rdbms,
+                allocation,
+                workspaces[position],
+                f"{cmd} {self._filter_args(filters[position])}",
+                shard_log,
+                False,
+                shared_cache=True,
+            )
+
+        with ThreadPoolExecutor(max_workers=len(shards)) as pool:
+            exit_codes = list(pool.map(run_shard, range(len(shards))))
+
+        with log_file.open("w", encoding="utf-8") as merged:
+            for shard, exit_code in zip(shards, exit_codes):
+                shard_log = log_file.with_name(f"{log_file.stem}-shard{shard.number}.log")
+                merged.write(f"===== shard {shard.number}/{len(shards)} (exit code: {exit_code}) =====\n")
+                if shard_log.exists():
+                    merged.write(shard_log.read_text(encoding="utf-8", errors="replace"))
+                    shard_log.unlink()
+        for shard, exit_code in zip(shards, exit_codes):
+            if exit_code:
+                self.logger.warning(f"Shard {shard.number} failed (exit code: {exit_code})")
+        return next((code for code in exit_codes if code), 0)
 
     def collect_results(self, identifier: str, log_file: Optional[Path], timestamp: str) -> None:
         dest_base = self.env.results_runs / f"{identifier}-results"
         collection_dir = Path(f"{dest_base}-{timestamp}")
+        if self.options.collect_format != "dir":
+            collection_dir = archive_path_for(collection_dir, self.options.collect_format)
         self.last_collection_dir = collection_dir
 
         if self.options.dry_run:
@@ -501,10 +1169,38 @@ class ComparisonOrchestrator:
             str(dest_base),
             "--timestamp",
             timestamp,
+            "--format",
+            self.options.collect_format,
         ]
         if log_file:
             cmd.extend(["--log", str(log_file)])
-        self.runner.run(cmd, cwd=self.env.lab_home, check=True)
+        for shard_root in self.last_shard_roots:
+            cmd.extend(["--shard-root", str(shard_root)])
+        run_info = self.env.temp / f"{identifier}-run-{timestamp}.json"
+        info = {"cell": identifier, "allocation": self.resources().to_manifest()}
+        if self.last_shard_info is not None:
+            info["sharding"] = self.last_shard_info
+        if self.last_database_info is not None:
+            info["database"] = self.last_database_info
+        run_info.write_text(json.dumps(info, indent=2), encoding="utf-8")
+        cmd.extend(["--run-info", str(run_info)])
+        try:
+            self.runner.run(cmd, cwd=self.env.lab_home, check=True)
+        finally:
+            # junit_local_collect.py copied it into collection.json under "run"
+            run_info.unlink(missing_ok=True)
+            for shard_root in self.last_shard_roots:
+                shutil.rmtree(shard_root.parent, ignore_errors=True)
+            self.last_shard_roots = []
+        self._record_history(identifier, collection_dir)
+
+    def _record_history(self, identifier: str, collection_dir: Path) -> None:
+        """Add the new collection to the cell's rolling per-class history (junit_history.py)."""
+        if not collection_dir.exists():
+            return
+        path, recorded = update_from_collection(self.env.results_runs, identifier, collection_dir, jobs=0)
+        if recorded:
+            self.logger.info(f"Recorded {recorded} test classes in history: {path}")
 
     def generate_summary(self, identifier: str, label: str, timestamp: str) -> None:
         if self.options.dry_run:
@@ -528,6 +1224,8 @@ class ComparisonOrchestrator:
             str(json_base),
             "--timestamp",
             timestamp,
+            "--jobs",
+            "0",
         ]
         if manifest.exists():
             cmd.extend(["--manifest", str(manifest)])
@@ -540,7 +1238,9 @@ class ComparisonOrchestrator:
             self.logger.warning("[DRY-RUN] Would clean test results in workspace")
             return
 
-        targets = ("test-results", "reports", "classes")
+        targets = ("test-results", "reports")
+        if self.options.gradle_cache != "reuse":
+            targets += ("classes",)
         removed: List[Path] = []
         for pattern in targets:
             for path in self.env.workspace.rglob(pattern):
@@ -550,10 +1250,13 @@ class ComparisonOrchestrator:
         self.logger.success(f"Cleaned {len(removed)} test artifact directories")
 
     def remove_container(self, name: str) -> None:
+        container_name = self._container_name(name)
+        if self.options.db_pool:
+            self.logger.info(f"Keeping {container_name} running for the next cell (--db-pool)")
+            return
         if self.options.dry_run:
             self.logger.warning(f"[DRY-RUN] Would remove {name} container")
             return
-        container_name = self._container_name(name)
         self.runner.run(
             ["docker", "rm", "-f", container_name],
             check=False,
@@ -593,37 +1296,57 @@ class ComparisonOrchestrator:
             table = self._format_comparison_table(left_label, right_label, left_metrics, right_metrics)
             for line in table:
                 self.logger.echo(line)
+            self._compare_testcases(left, right)
             self.logger.echo("")
 
         self.logger.success(f"See detailed summaries in {self.env.results_runs}")
 
+    def _compare_testcases(self, left_summary: Path, right_summary: Path) -> None:
+        left_index = self._testcase_index_for(left_summary)
+        right_index = self._testcase_index_for(right_summary)
+        if not left_index or not right_index:
+            self.logger.info("Testcase diff skipped (collection lacks testcases.idx)")
+            return
+        started = time.monotonic()
+        try:
+            diff = diff_paths(left_index, right_index)
+        except (OSError, ValueError) as exc:
+            self.logger.info(f"Testcase diff skipped (unreadable index: {exc})")
+            return
+        elapsed = time.monotonic() - started
+        self.logger.echo("")
+        for line in format_diff(diff, limit=10):
+            self.logger.echo(line)
+        self.logger.info(f"Testcase diff computed in {elapsed:.2f}s")
+
+    @staticmethod
+    def _testcase_index_for(summary_path: Path) -> Optional[Path]:
+        try:
+            data = json.loads(summary_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        root = data.get("root")
+        if not root:
+            return None
+        index_path = resolve_index_path(Path(root))
+        return index_path if index_path.exists() else None
+
     def _run_mysql_baseline(self) -> None:
         self.clean_gradle_caches()
         self.check_dialect("mysql")
         self.start_database("mysql")
-        timestamp = self.run_tests(db_name="mysql", rdbms="mysql_8_0", label="MySQL 8.0 Baseline")
+        timestamp = self.run_tests(db_name="mysql", rdbms="mysql_8_0", label="MySQL 8.0 Baseline", identifier="mysql")
         self.collect_results("mysql", self.last_log_file, timestamp)
         self.generate_summary("mysql", "MySQL 8.0", timestamp)
+        self.last_cell = MatrixCell(
+            identifier="mysql", db_name="mysql", rdbms="mysql_8_0", label="MySQL 8.0 Baseline", summary_label="MySQL 8.0"
+        )
         self.remove_container("mysql")
         if not self.options.skip_tidb:
             self.clean_test_results()
 
     def _run_tidb_matrix(self) -> None:
-        self.logger.section("Applying TiDB Patches")
-        if self.env.skip_tidb_patch:
-            self.logger.warning("Skipping patch_docker_db_tidb.py (SKIP_TIDB_PATCH=1)")
-        elif self.options.dry_run:
-            self.logger.warning("[DRY-RUN] Would run patch_docker_db_tidb.py")
-        else:
-            self.runner.run(
-                [
-                    "python3",
-                    "scripts/patch_docker_db_tidb.py",
-                    str(self.env.workspace),
-                ],
-                cwd=self.env.lab_home,
-                check=True,
-            )
+        self._apply_tidb_patch()
 
         run_plan = self._build_tidb_run_plan()
         for idx, config in enumerate(run_plan):
@@ -636,13 +1359,228 @@ class ComparisonOrchestrator:
                 rdbms="tidb",
                 label=config.label,
                 dialect_override=config.dialect_override,
+                identifier=config.identifier,
             )
             self.collect_results(config.identifier, self.last_log_file, timestamp)
             self.generate_summary(config.identifier, config.summary_label, timestamp)
+            self.last_cell = MatrixCell(
+                identifier=config.identifier,
+                db_name="tidb",
+                rdbms="tidb",
+                label=config.label,
+                summary_label=config.summary_label,
+                patch_arg=config.patch_arg,
+                dialect_override=config.dialect_override,
+            )
             self.remove_container("tidb")
             if idx < len(run_plan) - 1:
                 self.clean_test_results()
 
+    def _verify_cache(self) -> None:
+        """Re-run the last cell from a clean build and fail unless every testcase matches the cached run."""
+        cell = self.last_cell
+        if cell is None:
+            self.logger.warning("No cell ran; nothing to verify the Gradle cache against")
+            return
+        if self.options.dry_run:
+            self.logger.warning(f"[DRY-RUN] Would re-run {cell.identifier} from a clean build and compare testcases")
+            return
+
+        self.logger.section(f"Verifying Gradle Cache: {cell.identifier}")
+        cached_collection, cached_seconds = self.last_collection_dir, self.last_test_seconds
+        identifier = f"{cell.identifier}-clean"
+        options = replace(self.options, gradle_cache="clean", skip_clean=False, verify_cache=False)
+        clean = ComparisonOrchestrator(options, self.env, runner=self.runner, logger=self.logger)
+        clean.host = self.host
+        clean.allocation = self.allocation
+        clean.log_prefix = identifier
+        clean.clean_test_results()
+        clean.clean_gradle_caches()
+        if cell.patch_arg:
+            clean._patch_local_databases(cell.patch_arg)
+        clean.check_dialect(cell.db_name)
+        try:
+            clean.start_database(cell.db_name)
+            timestamp = clean.run_tests(
+                db_name=cell.db_name,
+                rdbms=cell.rdbms,
+                label=f"{cell.label} (clean build)",
+                dialect_override=cell.dialect_override,
+                identifier=identifier,
+            )
+        finally:
+            clean.remove_container(cell.db_name)
+        clean.collect_results(identifier, clean.last_log_file, timestamp)
+
+        assert cached_collection is not None and clean.last_collection_dir is not None
+        self.logger.info(f"Test run: {cached_seconds}s with the cache, {clean.last_test_seconds}s from a clean build")
+        problems = compare_collections(cached_collection, clean.last_collection_dir)
+        if problems:
+            self.logger.error(f"Cached run of {cell.identifier} differs from the clean run:")
+            for line in problems:
+                self.logger.error(f"  {line}")
+            raise SystemExit(1)
+        self.logger.success(f"Cached run of {cell.identifier} matches the clean run testcase by testcase")
+
+    def _apply_tidb_patch(self) -> None:
+        self.logger.section("Applying TiDB Patches")
+        if self.env.skip_tidb_patch:
+            self.logger.warning("Skipping patch_docker_db_tidb.py (SKIP_TIDB_PATCH=1)")
+        elif self.options.dry_run:
+            self.logger.warning("[DRY-RUN] Would run patch_docker_db_tidb.py")
+        else:
+            self.runner.run(
+                [
+                    "python3",
+                    "scripts/patch_docker_db_tidb.py",
+                    str(self.env.workspace),
+                ],
+                cwd=self.env.lab_home,
+                check=True,
+            )
+
+    def _build_matrix_cells(self) -> List[MatrixCell]:
+        """List the cells of a --parallel run with per-cell container names, ports and overlays."""
+        overlay_root = self.env.temp / MATRIX_DIRNAME
+        cells: List[MatrixCell] = []
+        if not self.options.skip_mysql:
+            cells.append(
+                MatrixCell(
+                    identifier="mysql",
+                    db_name="mysql",
+                    rdbms="mysql_8_0",
+                    label="MySQL 8.0 Baseline",
+                    summary_label="MySQL 8.0",
+                    container=self.env.mysql_container,
+                )
+            )
+        if not self.options.skip_tidb:
+            for idx, config in enumerate(self._build_tidb_run_plan()):
+                cells.append(
+                    MatrixCell(
+                        identifier=config.identifier,
+                        db_name="tidb",
+                        rdbms="tidb",
+                        label=config.label,
+                        summary_label=config.summary_label,
+                        patch_arg=config.patch_arg,
+                        dialect_override=config.dialect_override,
+                        container=f"{self.env.tidb_container}-{config.identifier}",
+                        host_port=self.env.tidb_host_port + idx,
+                    )
+                )
+        for cell in cells:
+            cell.workspace = overlay_root / cell.identifier / "workspace"
+        return cells
+
+    def _matrix_slots(self, cell_count: int) -> int:
+        """Number of cells to run at once: --parallel N, or what the host budget fits for --parallel 0."""
+        if self.options.parallel > 0:
+            return max(1, min(self.options.parallel, cell_count))
+        host = self.detect_resources()
+        fits = max_cells(host)
+        self.logger.info(f"Host budget ({host.source}): {host.cpus:g} CPUs, {host.memory_gb:.1f} GiB -> {fits} cell(s)")
+        return max(1, min(fits, cell_count))
+
+    def _prepare_overlay(self, cell: MatrixCell) -> None:
+        """Copy the workspace (without build outputs) into the cell's private overlay."""
+        assert cell.workspace is not None
+        if self.options.dry_run:
+            self.logger.warning(f"[DRY-RUN] Would copy {self.env.workspace} to {cell.workspace}")
+            return
+        shutil.rmtree(cell.workspace, ignore_errors=True)
+        cell.workspace.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copytree(
+            self.env.workspace,
+            cell.workspace,
+            symlinks=True,
+            ignore=self._overlay_filter(),
+        )
+
+    def _overlay_filter(self):
+        """copytree filter for overlays: with a reused cache, compiled outputs are copied so they stay up-to-date."""
+        return overlay_ignore if self.options.gradle_cache == "reuse" else _overlay_ignore
+
+    def _cell_orchestrator(self, cell: MatrixCell) -> "ComparisonOrchestrator":
+        assert cell.workspace is not None
+        # A dry run never creates the overlay, so it inspects the shared workspace instead.
+        workspace = self.env.workspace if self.options.dry_run else cell.workspace
+        env = replace(self.env, workspace_root=workspace, workspace=workspace)
+        if cell.db_name == "mysql":
+            env.mysql_container = cell.container
+        else:
+            env.tidb_container = cell.container
+            env.tidb_host_port = cell.host_port or self.env.tidb_host_port
+        child = ComparisonOrchestrator(
+            self.options, env, runner=self.runner, logger=PrefixedLogger(self.logger, cell.identifier)
+        )
+        child.echo_output = False
+        child.shared_gradle_cache = True
+        child.log_prefix = cell.identifier
+        child.host = self.host
+        child.allocation = self.allocation
+        return child
+
+    def _run_matrix_cell(self, cell: MatrixCell) -> None:
+        child = self._cell_orchestrator(cell)
+        child.logger.info(f"Workspace overlay: {cell.workspace}")
+        child.logger.info(f"Database container: {cell.container}" + (f" (port {cell.host_port})" if cell.host_port else ""))
+        self._prepare_overlay(cell)
+        try:
+            if cell.patch_arg:
+                child._patch_local_databases(cell.patch_arg)
+            child.check_dialect(cell.db_name)
+            try:
+                child.start_database(cell.db_name)
+                timestamp = child.run_tests(
+                    db_name=cell.db_name,
+                    rdbms=cell.rdbms,
+                    label=cell.label,
+                    dialect_override=cell.dialect_override,
+                    identifier=cell.identifier,
+                )
+            finally:
+                child.remove_container(cell.db_name)
+            child.collect_results(cell.identifier, child.last_log_file, timestamp)
+            child.generate_summary(cell.identifier, cell.summary_label, timestamp)
+        finally:
+            if not self.options.dry_run and cell.workspace is not None:
+                shutil.rmtree(cell.workspace, ignore_errors=True)
+
+    def _run_parallel_matrix(self) -> None:
+        cells = self._build_matrix_cells()
+        if not cells:
+            self.logger.warning("No matrix cells selected")
+            return
+        slots = self._matrix_slots(len(cells))
+        self.allocation = plan(self.detect_resources(), slots)
+        self.logger.section(f"Parallel Matrix: {len(cells)} cell(s), {slots} at a time")
+        self.logger.info(f"Per-cell allocation: {self.allocation.describe()}")
+        for cell in cells:
+            self.logger.info(f"  {cell.identifier}: {cell.label} (container: {cell.container})")
+
+        # Caches are cleaned once up front; overlays start without build outputs, or with
+        # the compiled outputs of a warm-up build when the Gradle cache is reused.
+        self.clean_gradle_caches()
+        self.warm_gradle_cache()
+        if not self.options.skip_tidb:
+            self._apply_tidb_patch()
+
+        failures: List[Tuple[str, BaseException]] = []
+        with ThreadPoolExecutor(max_workers=slots) as pool:
+            futures = [(cell, pool.submit(self._run_matrix_cell, cell)) for cell in cells]
+            for cell, future in futures:
+                try:
+                    future.result()
+                except (Exception, SystemExit) as exc:  # noqa: BLE001 - report every failed cell
+                    failures.append((cell.identifier, exc))
+                    self.logger.error(f"{cell.identifier} failed: {exc!r}")
+                else:
+                    self.logger.success(f"{cell.identifier} finished")
+        if failures:
+            self.logger.error(f"{len(failures)} matrix cell(s) failed: {', '.join(name for name, _ in failures)}")
+            raise SystemExit(1)
+
     def _patch_local_databases(self, dialect: str) -> None:
         if self.options.dry_run:
             self.logger.warning(f"[DRY-RUN] Would patch local.databases.gradle ({dialect})")
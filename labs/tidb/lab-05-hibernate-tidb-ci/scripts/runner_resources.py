@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Size Gradle runner containers from the resources of the Docker host.
+
+run_comparison.py used to pin every runner to --cpus=6/--memory=16g with
+GRADLE_OPTS=-Xmx6g and start databases with DB_COUNT=4, whatever the host.
+This module inspects the host and derives one consistent allocation:
+
+  - host: `docker info` (NCPU/MemTotal: the Docker Desktop VM or the daemon
+    host); without a reachable daemon, this machine with cgroup v1/v2 CPU
+    quotas, cpusets and memory limits applied;
+  - per matrix cell: the host split evenly between concurrent cells, with one
+    CPU and DB_MEMORY_GB kept back for the cell's database container;
+  - runner: --cpus/--memory, Gradle heap (3/8 of the runner memory, capped at
+    MAX_GRADLE_HEAP_GB), Gradle maxParallelForks (2/3 of the runner CPUs,
+    limited by TEST_FORK_MEMORY_GB per fork in what the heap leaves) and
+    DB_COUNT equal to the fork count, so each fork has its own
+    hibernate_orm_test_N database.
+
+A 7-CPU/18 GiB cell reproduces the old fixed values (6 CPUs, 16g, -Xmx6g,
+4 forks/databases). run_comparison.py records the allocation in each
+collection.json under "run".
+
+Usage examples:
+  python scripts/runner_resources.py
+  python scripts/runner_resources.py --cells 3
+  python scripts/runner_resources.py --local --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, List, Optional
+
+GIB = 1024**3
+CGROUP_ROOT = Path("/sys/fs/cgroup")
+# cgroup v1 reports "unlimited" memory as a page-aligned value near 2**63
+CGROUP_UNLIMITED = 1 << 60
+
+DB_CPUS = 1
+DB_MEMORY_GB = 2
+MIN_RUNNER_CPUS = 3
+MIN_RUNNER_MEMORY_GB = 8
+MAX_GRADLE_HEAP_GB = 8
+TEST_FORK_MEMORY_GB = 2
+# Smallest cell worth scheduling: a minimal runner plus its database
+MIN_CELL_CPUS = MIN_RUNNER_CPUS + DB_CPUS
+MIN_CELL_MEMORY_GB = MIN_RUNNER_MEMORY_GB + DB_MEMORY_GB
+
+RunCommand = Callable[..., subprocess.CompletedProcess]
+
+
+@dataclass
+class HostResources:
+    cpus: float
+    memory_bytes: int
+    source: str  # "docker", "cgroup" or "host"
+
+    @property
+    def memory_gb(self) -> float:
+        return self.memory_bytes / GIB
+
+
+@dataclass
+class Allocation:
+    """Resources of one matrix cell's runner container and the matching Gradle/database sizing."""
+
+    cells: int
+    runner_cpus: int
+    runner_memory_gb: int
+    gradle_heap_gb: int
+    max_parallel_forks: int
+    db_count: int
+    host: HostResources
+
+    def docker_args(self) -> List[str]:
+        return [f"--memory={self.runner_memory_gb}g", f"--cpus={self.runner_cpus}"]
+
+    def gradle_opts(self) -> str:
+        return f"-Xmx{self.gradle_heap_gb}g -XX:MaxMetaspaceSize=1g"
+
+    def to_manifest(self) -> dict:
+        data = asdict(self)
+        data["host"]["memory_gb"] = round(self.host.memory_gb, 1)
+        return data
+
+    def describe(self) -> str:
+        return (
+            f"{self.runner_cpus} CPUs, {self.runner_memory_gb} GiB (Gradle -Xmx{self.gradle_heap_gb}g), "
+            f"{self.max_parallel_forks} test forks, DB_COUNT={self.db_count}"
+        )
+
+
+def _read(path: Path) -> Optional[str]:
+    try:
+        return path.read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+
+
+def cgroup_cpu_limit(root: Path = CGROUP_ROOT) -> Optional[float]:
+    """CPU quota of the current cgroup in CPUs (v2 cpu.max or v1 CFS quota), or None if unlimited."""
+    cpu_max = _read(root / "cpu.max")
+    if cpu_max:
+        quota, _, period = cpu_max.partition(" ")
+        if quota != "max" and quota.isdigit() and period.isdigit() and int(period):
+            return int(quota) / int(period)
+        return None
+    for controller in ("cpu", "cpu,cpuacct"):
+        quota = _read(root / controller / "cpu.cfs_quota_us")
+        period = _read(root / controller / "cpu.cfs_period_us")
+        if quota and period and quota.lstrip("-").isdigit() and period.isdigit():
+            if int(quota) > 0 and int(period) > 0:
+                return int(quota) / int(period)
+            return None
+    return None
+
+
+def cgroup_memory_limit(root: Path = CGROUP_ROOT) -> Optional[int]:
+    """Memory limit of the current cgroup in bytes (v2 memory.max or v1 limit_in_bytes), or None."""
+    for path in (root / "memory.max", root / "memory" / "memory.limit_in_bytes"):
+        value = _read(path)
+        if value is None:
+            continue
+        if value.isdigit() and int(value) < CGROUP_UNLIMITED:
+            return int(value)
+        return None
+    return None
+
+
+def local_resources(cgroup_root: Path = CGROUP_ROOT) -> HostResources:
+    """Resources usable by this process: CPU affinity and physical memory, clamped by cgroup limits."""
+    try:
+        cpus: float = len(os.sched_getaffinity(0))
+    except AttributeError:  # macOS
+        cpus = os.cpu_count() or 1
+    try:
+        memory = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, ValueError, OSError):
+        memory = 0
+    source = "host"
+    cpu_limit = cgroup_cpu_limit(cgroup_root)
+    if cpu_limit is not None and cpu_limit < cpus:
+        cpus, source = cpu_limit, "cgroup"
+    memory_limit = cgroup_memory_limit(cgroup_root)
+    if memory_limit is not None and (not memory or memory_limit < memory):
+        memory, source = memory_limit, "cgroup"
+    return HostResources(cpus=cpus, memory_bytes=memory, source=source)
+
+
+def docker_resources(run: RunCommand = subprocess.run) -> Optional[HostResources]:
+    """Resources of the Docker daemon's host (`docker info`), or None when it cannot be queried."""
+    try:
+        result = run(
+            ["docker", "info", "--format", "{{.NCPU}} {{.MemTotal}}"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        cpus, memory = (result.stdout or "").split()
+        return HostResources(cpus=int(cpus), memory_bytes=int(memory), source="docker")
+    except (subprocess.CalledProcessError, OSError, ValueError):
+        return None
+
+
+def detect_host(run: Optional[RunCommand] = subprocess.run) -> HostResources:
+    """Prefer the Docker daemon's view; fall back to local (cgroup-aware) resources."""
+    host = docker_resources(run) if run is not None else None
+    return host or local_resources()
+
+
+def max_cells(host: HostResources) -> int:
+    """How many matrix cells the host fits at the minimum useful cell size (at least 1)."""
+    return max(1, min(int(host.cpus // MIN_CELL_CPUS), int(host.memory_gb // MIN_CELL_MEMORY_GB)))
+
+
+def plan(host: HostResources, cells: int = 1) -> Allocation:
+    """Split `host` between `cells` concurrent cells and size one cell's runner."""
+    cells = max(1, cells)
+    cell_cpus = int(host.cpus / cells)
+    cell_memory_gb = int(host.memory_gb / cells)
+    runner_cpus = max(1, cell_cpus - DB_CPUS)
+    runner_memory_gb = max(2, cell_memory_gb - DB_MEMORY_GB)
+    heap_gb = max(1, min(MAX_GRADLE_HEAP_GB, runner_memory_gb * 3 // 8))
+    forks = max(1, min(runner_cpus * 2 // 3, (runner_memory_gb - heap_gb) // TEST_FORK_MEMORY_GB))
+    return Allocation(
+        cells=cells,
+        runner_cpus=runner_cpus,
+        runner_memory_gb=runner_memory_gb,
+        gradle_heap_gb=heap_gb,
+        max_parallel_forks=forks,
+        db_count=forks,
+        host=host,
+    )
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="Show the runner allocation run_comparison.py would use on this host.")
+    ap.add_argument("--cells", type=int, default=1, help="Concurrent matrix cells to split the host between (default: 1)")
+    ap.add_argument("--local", action="store_true", help="Ignore `docker info`; use this machine's cgroup-aware resources")
+    ap.add_argument("--json", action="store_true", help="Print the allocation as JSON")
+    return ap.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    host = detect_host(None if args.local else subprocess.run)
+    allocation = plan(host, args.cells)
+    if args.json:
+        print(json.dumps(allocation.to_manifest(), indent=2))
+        return
+    print(f"Host ({host.source}): {host.cpus:g} CPUs, {host.memory_gb:.1f} GiB; fits up to {max_cells(host)} cell(s)")
+    print(f"Per cell ({allocation.cells}): {allocation.describe()}")
+
+
+if __name__ == "__main__":
+    main()
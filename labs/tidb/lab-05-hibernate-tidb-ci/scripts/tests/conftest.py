@@ -19,8 +19,17 @@ def _load_script_module(module_filename: str, module_name: str):
     return module
 
 
-# Ensure env_utils is available under its canonical import name
+# Ensure shared helpers are available under their canonical import names
 ENV_UTILS_MODULE = _load_script_module("env_utils", "env_utils")
+JUNIT_ARCHIVE_MODULE = _load_script_module("junit_archive", "junit_archive")
+JUNIT_SCAN_MODULE = _load_script_module("junit_scan", "junit_scan")
+JUNIT_TESTCASE_INDEX_MODULE = _load_script_module("junit_testcase_index", "junit_testcase_index")
+JUNIT_TESTCASE_DIFF_MODULE = _load_script_module("junit_testcase_diff", "junit_testcase_diff")
+JENKINS_HTTP_MODULE = _load_script_module("jenkins_http", "jenkins_http")
+JENKINS_PIPELINE_TASKS_SUMMARY_MODULE = _load_script_module(
+    "jenkins_pipeline_tasks_summary", "jenkins_pipeline_tasks_summary"
+)
+JUNIT_PIPELINE_LABEL_SUMMARY_MODULE = _load_script_module("junit_pipeline_label_summary", "junit_pipeline_label_summary")
 
 
 @pytest.fixture
@@ -34,7 +43,18 @@ def load_module():
     return _loader
 
 
-__all__ = ["SCRIPTS_DIR", "load_module", "ENV_UTILS_MODULE"]
+__all__ = [
+    "SCRIPTS_DIR",
+    "load_module",
+    "ENV_UTILS_MODULE",
+    "JUNIT_ARCHIVE_MODULE",
+    "JUNIT_SCAN_MODULE",
+    "JUNIT_TESTCASE_INDEX_MODULE",
+    "JUNIT_TESTCASE_DIFF_MODULE",
+    "JENKINS_HTTP_MODULE",
+    "JENKINS_PIPELINE_TASKS_SUMMARY_MODULE",
+    "JUNIT_PIPELINE_LABEL_SUMMARY_MODULE",
+]
 
 
 def pytest_configure(config):
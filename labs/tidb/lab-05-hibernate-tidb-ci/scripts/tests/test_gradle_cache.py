@@ -0,0 +1,94 @@
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+
+@pytest.fixture
+def cache_module(load_module):
+    return load_module("gradle_cache", alias="gradle_cache_under_test")
+
+
+def write_index(path: Path, rows) -> Path:
+    from junit_testcase_index import write_index as write
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    write(path, rows)
+    return path
+
+
+def test_runner_args_mount_the_volume_read_only_when_shared(cache_module) -> None:
+    assert cache_module.runner_args("cache") == ["-v", "cache:/gradle-home", "-e", "GRADLE_USER_HOME=/gradle-home"]
+    assert cache_module.runner_args("cache", shared=True) == [
+        "-v",
+        "cache:/gradle-ro:ro",
+        "-e",
+        "GRADLE_RO_DEP_CACHE=/gradle-ro/caches",
+    ]
+
+
+def test_invalidate_removes_test_outputs_only(cache_module, tmp_path: Path) -> None:
+    workspace = tmp_path / "workspace"
+    for relative in (
+        "hibernate-core/target/test-results/test",
+        "hibernate-core/target/reports/tests",
+        "hibernate-core/target/classes/java/main",
+        "hibernate-core/target/libs",
+        "documentation/build/test-results/test",
+        ".gradle/reports",
+        "tmp/target/test-results",
+    ):
+        (workspace / relative).mkdir(parents=True)
+
+    removed = cache_module.invalidate_test_outputs(workspace, skip=[workspace / "tmp"])
+
+    assert sorted(path.relative_to(workspace).as_posix() for path in removed) == [
+        "documentation/build/test-results",
+        "hibernate-core/target/reports",
+        "hibernate-core/target/test-results",
+    ]
+    assert (workspace / "hibernate-core" / "target" / "classes" / "java" / "main").is_dir()
+    assert (workspace / "hibernate-core" / "target" / "libs").is_dir()
+    assert (workspace / ".gradle" / "reports").is_dir()
+    assert (workspace / "tmp" / "target" / "test-results").is_dir()
+
+
+def test_overlay_ignore_keeps_compiled_outputs(cache_module) -> None:
+    assert cache_module.overlay_ignore("/ws/hibernate-core/target", ["classes", "test-results", "reports", "libs"]) == [
+        "test-results",
+        "reports",
+    ]
+    assert cache_module.overlay_ignore("/ws", ["build.gradle", "target", "tmp", ".gradle"]) == ["tmp"]
+    assert cache_module.overlay_ignore("/ws", [".git", "build.gradle", "target"]) == [".git"]
+
+
+def test_purge_volume_removes_the_docker_volume(cache_module) -> None:
+    calls = []
+    cache_module.purge_volume("cache", run=lambda cmd, **kwargs: calls.append(cmd))
+    assert calls == [["docker", "volume", "rm", "-f", "cache"]]
+
+
+def test_compare_collections_reports_any_difference(cache_module, tmp_path: Path) -> None:
+    rows = [("core", "A", "t1", "passed", 0.1, ""), ("core", "A", "t2", "failed", 0.2, "boom")]
+    clean = write_index(tmp_path / "clean" / "testcases.idx", rows)
+    same = write_index(tmp_path / "same" / "testcases.idx", [(m, c, t, s, time * 3, msg) for m, c, t, s, time, msg in rows])
+    other = write_index(
+        tmp_path / "other" / "testcases.idx",
+        [("core", "A", "t1", "failed", 0.1, "lock"), ("core", "A", "t2", "failed", 0.2, "boom")],
+    )
+
+    assert cache_module.compare_collections(same.parent, clean.parent) == []
+    problems = cache_module.compare_collections(other.parent, clean.parent)
+    assert problems[0] == "fails only with the cache: core:A#t1"
+    assert problems[-1].startswith("status counts differ")
+
+
+def test_run_compare_requires_indexes(cache_module, tmp_path: Path, capsys) -> None:
+    clean = write_index(tmp_path / "clean" / "testcases.idx", [("core", "A", "t", "passed", 0.1, "")])
+    args = SimpleNamespace(invalidate=False, purge=False, compare=[str(clean.parent), str(clean.parent)])
+    assert cache_module.run(args) == []
+    assert "matches the clean run" in capsys.readouterr().out
+
+    args.compare = [str(tmp_path / "missing"), str(clean.parent)]
+    with pytest.raises(FileNotFoundError):
+        cache_module.run(args)
@@ -0,0 +1,120 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+
+@pytest.fixture
+def trends(load_module):
+    return load_module("jenkins_build_trends", alias="jenkins_build_trends_under_test")
+
+
+def _report(mysql_duration, failed=0):
+    return {
+        "duration": mysql_duration + 5.0,
+        "suites": [
+            {
+                "duration": mysql_duration,
+                "enclosingBlockNames": ["Suite", "mysql"],
+                "cases": [{"status": "PASSED"}] * 3 + [{"status": "FAILED"}] * failed,
+            },
+            {"duration": 5.0, "enclosingBlockNames": ["Suite", "tidb"], "cases": [{"status": "PASSED"}]},
+        ],
+    }
+
+
+def _args(tmp_path, **overrides):
+    values = dict(
+        url="https://ci/job/project",
+        last=None,
+        from_build=1,
+        to_build=4,
+        label_index=1,
+        with_tasks=False,
+        stage_name="Test",
+        max_depth=3,
+        concurrency=2,
+        store=str(tmp_path / "trends.jsonl"),
+        metric="duration",
+        show=10,
+        regression_ratio=1.25,
+        json_out=None,
+        no_cache=True,
+        page_size=1,
+    )
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+def test_run_stores_builds_and_skips_them_next_time(trends, tmp_path, monkeypatch):
+    reports = {1: _report(100.0), 2: _report(110.0, failed=1), 3: _report(90.0), 4: _report(200.0)}
+    fetched = []
+
+    def fake_info(build_url):
+        number = int(build_url.rsplit("/", 1)[1])
+        fetched.append(number)
+        return {"building": number == 4 and len(fetched) <= 4, "number": number, "timestamp": number * 1000}
+
+    monkeypatch.setattr(trends.label_summary, "fetch_build_info", fake_info)
+    pages = []
+
+    def fake_page(build_url, start, end):
+        pages.append((start, end))
+        report = reports[int(build_url.rsplit("/", 1)[1])]
+        return dict(report, suites=report["suites"][start:end])
+
+    monkeypatch.setattr(trends.label_summary, "fetch_test_report_page", fake_page)
+
+    first = trends.run(_args(tmp_path))
+    # Build 4 was still running, so it is neither stored nor shown.
+    assert first["builds"] == [1, 2, 3]
+    assert first["series"]["failed"]["mysql"] == [0, 1, 0]
+    assert first["regressions"] == []
+    # Two suites per report at one suite per page: two full pages and an empty one.
+    assert sorted(pages)[:3] == [(0, 1), (0, 1), (0, 1)]
+    assert len(pages) == 3 * 3
+
+    second = trends.run(_args(tmp_path))
+    assert sorted(fetched) == [1, 2, 3, 4, 4]
+    assert second["fetched"] == [4]
+    assert second["series"]["duration"]["mysql"] == [100.0, 110.0, 90.0, 200.0]
+    assert second["regressions"] == [{"label": "mysql", "build": 4, "baseline": 100.0, "latest": 200.0}]
+
+    lines = (tmp_path / "trends.jsonl").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["build"] for line in lines] == [1, 2, 3, 4]
+
+
+
+def test_page_size_zero_fetches_the_whole_report(trends, monkeypatch):
+    monkeypatch.setattr(trends.label_summary, "fetch_build_info", lambda url: {"building": False, "number": 3})
+    monkeypatch.setattr(trends.label_summary, "fetch_test_report", lambda url: _report(90.0))
+
+    def no_pages(*args, **kwargs):
+        raise AssertionError("paged fetch used with page_size=0")
+
+    monkeypatch.setattr(trends.label_summary, "fetch_test_report_page", no_pages)
+
+    record = trends.fetch_build_record("https://ci/job/project", 3, label_index=1, page_size=0)
+
+    assert record["has_report"] is True
+    assert (record["overall"], record["labels"]) == trends.label_summary.parse_test_report(_report(90.0), 1)
+
+def test_store_prefers_latest_line_and_refetches_other_label_index(trends, tmp_path):
+    store = tmp_path / "trends.jsonl"
+    trends.append_store(store, [{"build": 7, "label_index": -2, "labels": {}}])
+    trends.append_store(store, [{"build": 7, "label_index": 1, "labels": {"a": {}}}])
+
+    records = trends.load_store(store)
+
+    assert records[7]["label_index"] == 1
+    assert not trends.needs_fetch(records[7], 1, with_tasks=False)
+    assert trends.needs_fetch(records[7], -2, with_tasks=False)
+    assert trends.needs_fetch(records[7], 1, with_tasks=True)
+
+
+def test_default_store_path_uses_job_slug(trends, monkeypatch, tmp_path):
+    monkeypatch.setenv("TEMP_DIR", str(tmp_path))
+
+    path = trends.default_store_path("https://ci.hibernate.org/job/hibernate-orm-nightly/job/main")
+
+    assert path == tmp_path / "jenkins-trends" / "hibernate-orm-nightly-main.jsonl"
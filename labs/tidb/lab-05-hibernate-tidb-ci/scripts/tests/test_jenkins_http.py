@@ -0,0 +1,278 @@
+import gzip
+import os
+import threading
+import urllib.error
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections = set()
+    paths = []
+    failures = 0
+
+    def do_GET(self):  # noqa: N802 - http.server API
+        _Handler.connections.add(self.client_address)
+        _Handler.paths.append(self.path)
+        if self.path == "/etag":
+            if self.headers.get("If-None-Match") == '"v1"':
+                self.send_response(304)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            body = b"tagged"
+            self.send_response(200)
+            self.send_header("ETag", '"v1"')
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        if self.path == "/redirect":
+            self.send_response(302)
+            self.send_header("Location", "/ok?x=1")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if self.path.startswith("/job/orm/42/log/progressiveText?start="):
+            text = b"line one\r\nline two\nline three\n"
+            body = text[int(self.path.rsplit("=", 1)[1]):]
+            self.send_response(200)
+            self.send_header("X-Text-Size", str(len(text)))
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        if self.path == "/gzip" and "gzip" in (self.headers.get("Accept-Encoding") or ""):
+            body = gzip.compress(b"compressed line\n" * 1000)
+            self.send_response(200)
+            self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        if self.path == "/flaky" and _Handler.failures:
+            _Handler.failures -= 1
+            body = b"busy"
+            self.send_response(503)
+        elif self.path == "/missing":
+            body = b"nope"
+            self.send_response(404)
+        else:
+            body = f"{self.path}|{self.headers.get('User-Agent')}".encode()
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def jenkins_http(load_module):
+    return load_module("jenkins_http", alias="jenkins_http_under_test")
+
+
+@pytest.fixture
+def server(monkeypatch, jenkins_http):
+    for var in ("http_proxy", "https_proxy", "HTTP_PROXY", "HTTPS_PROXY", "all_proxy", "ALL_PROXY"):
+        monkeypatch.delenv(var, raising=False)
+    _Handler.connections = set()
+    _Handler.paths = []
+    _Handler.failures = 0
+    jenkins_http.reset_request_stats()
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    jenkins_http.close_connections()
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_fetch_reuses_connection_and_follows_redirects(jenkins_http, server):
+    first = jenkins_http.fetch(f"{server}/a", headers={"User-Agent": "ua/1"})
+    second = jenkins_http.fetch(f"{server}/redirect", headers={"User-Agent": "ua/1"})
+
+    assert first == b"/a|ua/1"
+    assert second == b"/ok?x=1|ua/1"
+    assert len(_Handler.connections) == 1
+
+
+def test_fetch_raises_http_error(jenkins_http, server):
+    with pytest.raises(urllib.error.HTTPError) as excinfo:
+        jenkins_http.fetch(f"{server}/missing")
+    assert excinfo.value.code == 404
+
+
+def test_gzip_bodies_are_inflated_in_bounded_chunks(jenkins_http, server):
+    chunks = list(jenkins_http.stream(f"{server}/gzip", chunk_size=1024))
+
+    assert b"".join(chunks) == b"compressed line\n" * 1000
+    assert max(len(chunk) for chunk in chunks) <= 1024
+    # The wire carried the compressed body only.
+    assert jenkins_http.request_stats()["bytes"] < 1000
+
+
+def test_transient_errors_are_retried_with_backoff(jenkins_http, server, monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(jenkins_http.time, "sleep", sleeps.append)
+    _Handler.failures = 2
+
+    assert jenkins_http.fetch(f"{server}/flaky") == b"/flaky|None"
+    assert _Handler.paths == ["/flaky"] * 3
+    assert len(sleeps) == 2
+    assert sleeps[1] <= jenkins_http.BACKOFF_BASE * 2
+    stats = jenkins_http.request_stats()
+    assert (stats["requests"], stats["retries"], stats["failed"]) == (1, 2, 0)
+    assert "1 ok, 0 failed, 2 retried" in jenkins_http.request_summary()
+
+
+def test_retries_give_up_and_skip_client_errors(jenkins_http, server, monkeypatch):
+    monkeypatch.setattr(jenkins_http.time, "sleep", lambda _delay: None)
+    _Handler.failures = jenkins_http.RETRIES + 1
+
+    with pytest.raises(urllib.error.HTTPError) as excinfo:
+        jenkins_http.fetch(f"{server}/flaky")
+    assert excinfo.value.code == 503
+    with pytest.raises(urllib.error.HTTPError):
+        jenkins_http.fetch(f"{server}/missing")
+
+    assert _Handler.paths == ["/flaky"] * (jenkins_http.RETRIES + 1) + ["/missing"]
+    assert jenkins_http.request_stats()["failed"] == 2
+
+
+def test_cache_revalidates_with_etag(jenkins_http, server, tmp_path):
+    previous = jenkins_http.configure_cache(tmp_path / "cache")
+    try:
+        assert jenkins_http.fetch(f"{server}/etag") == b"tagged"
+        assert jenkins_http.fetch(f"{server}/etag") == b"tagged"
+        # Responses without validators are not stored.
+        jenkins_http.fetch(f"{server}/plain")
+        jenkins_http.fetch(f"{server}/plain")
+        stats = jenkins_http.cache_stats()
+    finally:
+        jenkins_http.restore_cache(previous)
+
+    assert _Handler.paths == ["/etag", "/etag", "/plain", "/plain"]
+    assert stats == {"hits": 0, "revalidated": 1, "misses": 3}
+
+
+def test_finished_build_is_cached_permanently(jenkins_http, server, tmp_path):
+    cache_dir = tmp_path / "cache"
+    previous = jenkins_http.configure_cache(cache_dir)
+    try:
+        numbered = jenkins_http.register_finished_build(f"{server}/job/orm/lastBuild/", 42)
+        first = jenkins_http.fetch(f"{server}/job/orm/lastBuild/execution/node/7/log")
+        # A later run addressing the build by number never reaches the server.
+        jenkins_http.restore_cache(None)
+        jenkins_http.configure_cache(cache_dir)
+        second = jenkins_http.fetch(f"{server}/job/orm/42/execution/node/7/log")
+        stats = jenkins_http.cache_stats()
+    finally:
+        jenkins_http.restore_cache(previous)
+
+    assert numbered == f"{server}/job/orm/42"
+    assert first == second == b"/job/orm/42/execution/node/7/log|None"
+    assert _Handler.paths == ["/job/orm/42/execution/node/7/log"]
+    assert stats["hits"] == 1
+    assert jenkins_http.register_finished_build(f"{server}/job/orm", 42) is None
+
+
+
+def test_cache_counters_are_thread_safe(jenkins_http, tmp_path):
+    import threading
+
+    cache = jenkins_http.ResponseCache(tmp_path / "cache")
+
+    def worker():
+        for _ in range(2000):
+            cache.record("hits")
+            cache.record("misses")
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert cache.stats() == {"hits": 16000, "revalidated": 0, "misses": 16000}
+
+def test_cache_evicts_least_recently_used(jenkins_http, tmp_path):
+    cache = jenkins_http.ResponseCache(tmp_path / "cache", max_bytes=800)
+    for idx, url in enumerate(("u1", "u2", "u3")):
+        cache.put(url, b"x" * 150, {"permanent": True})
+        path = cache._path(url)
+        os.utime(path, ns=(idx * 10**9, idx * 10**9))
+    # Touching u1 makes u2 the oldest entry.
+    assert cache.get("u1") is not None
+    cache.put("u4", b"x" * 150, {"permanent": True})
+
+    assert cache.get("u2") is None
+    assert all(cache.get(url) is not None for url in ("u1", "u3", "u4"))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 1024])
+def test_iter_lines_matches_splitlines(jenkins_http, chunk_size):
+    body = "alpha\r\nbeta\rgamma\n\nδέλτα \u2028 tail".encode("utf-8") + b"\xff end"
+    chunks = [body[idx : idx + chunk_size] for idx in range(0, len(body), chunk_size)]
+
+    assert list(jenkins_http.iter_lines(chunks)) == body.decode("utf-8", "replace").splitlines()
+
+
+def test_progressive_text_resumes_from_offset(jenkins_http, server):
+    log = jenkins_http.ProgressiveText(f"{server}/job/orm/42/log", start=10)
+
+    lines = list(jenkins_http.iter_lines(log))
+
+    assert lines == ["line two", "line three"]
+    assert log.offset == 30
+    assert log.more is False
+
+
+def test_streamed_body_is_cached_only_when_complete(jenkins_http, server, tmp_path):
+    previous = jenkins_http.configure_cache(tmp_path / "cache")
+    try:
+        jenkins_http.register_finished_build(f"{server}/job/orm/42", 42)
+        url = f"{server}/job/orm/42/log/progressiveText?start=0"
+        partial = jenkins_http.stream(url, chunk_size=4)
+        assert next(partial) == b"line"
+        partial.close()
+        assert jenkins_http._cache.lookup(url) is None
+
+        full = b"".join(jenkins_http.stream(url, chunk_size=4))
+        with jenkins_http.open_url(url) as resp:
+            replayed = resp.read()
+            headers = resp.headers
+    finally:
+        jenkins_http.restore_cache(previous)
+
+    assert full == replayed == b"line one\r\nline two\nline three\n"
+    assert headers["X-Text-Size"] == "30"
+    assert _Handler.paths.count("/job/orm/42/log/progressiveText?start=0") == 2
+
+
+def test_progressive_text_holds_partial_lines_while_growing(jenkins_http, monkeypatch):
+    responses = [
+        ({"X-Text-Size": "9", "X-More-Data": "true"}, [b"one\ntw", b"o"]),
+        ({"X-Text-Size": "14"}, [b"\nthr", b"ee"]),
+    ]
+    urls = []
+
+    def fake_open_url(url, **_kwargs):
+        urls.append(url)
+        headers, chunks = responses.pop(0)
+        return jenkins_http.Response(headers, iter(chunks))
+
+    monkeypatch.setattr(jenkins_http, "open_url", fake_open_url)
+    log = jenkins_http.ProgressiveText("https://ci/job/orm/1/execution/node/5/log", whole_lines=True)
+
+    first = list(jenkins_http.iter_lines(log))
+    assert (first, log.offset, log.more) == (["one"], 9, True)
+    second = list(jenkins_http.iter_lines(log))
+
+    assert second == ["two", "three"]
+    assert (log.offset, log.more) == (14, False)
+    assert urls[1].endswith("/log/progressiveText?start=9")
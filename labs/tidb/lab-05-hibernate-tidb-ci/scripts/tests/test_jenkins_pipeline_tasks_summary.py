@@ -140,3 +140,153 @@ def test_run_errors_when_stage_missing(load_module, monkeypatch):
 
     with pytest.raises(RuntimeError):
         module.run(args)
+
+
+def _fake_tree():
+    # root -> (a -> (a1, a2), b -> (b1 -> (b1x)))
+    return {
+        "root": ["a", "b"],
+        "a": ["a1", "a2"],
+        "b": ["b1"],
+        "b1": ["b1x"],
+    }
+
+
+def test_walk_descendants_describes_each_node_once(load_module, monkeypatch):
+    module = load_module("jenkins_pipeline_tasks_summary", alias="jenkins_pipeline_tasks_summary_test_walk")
+    tree = _fake_tree()
+    calls = []
+
+    def fake_describe(build_url, node_id):
+        calls.append(node_id)
+        return {"name": f"n-{node_id}", "stageFlowNodes": [{"id": kid} for kid in tree.get(node_id, [])]}
+
+    monkeypatch.setattr(module, "wfapi_describe_node", fake_describe)
+    monkeypatch.setattr(module, "CONCURRENCY", 4)
+
+    result = module.walk_descendants("https://ci/job/project/1", "root", max_depth=1)
+
+    assert result == [
+        ("a1", ["n-root", "n-a", "n-a1"]),
+        ("a2", ["n-root", "n-a", "n-a2"]),
+        ("b1", ["n-root", "n-b", "n-b1"]),
+    ]
+    # The depth limit stops the walk before b1's children are needed.
+    assert sorted(calls) == sorted(["root", "a", "b", "a1", "a2", "b1"])
+
+
+def test_walk_descendants_matches_sequential_order(load_module, monkeypatch):
+    module = load_module("jenkins_pipeline_tasks_summary", alias="jenkins_pipeline_tasks_summary_test_walk_order")
+    tree = _fake_tree()
+
+    def fake_describe(build_url, node_id):
+        if node_id == "a2":
+            return None
+        return {"name": f"n-{node_id}", "stageFlowNodes": [{"id": kid} for kid in tree.get(node_id, [])]}
+
+    monkeypatch.setattr(module, "wfapi_describe_node", fake_describe)
+
+    result = module.walk_descendants("https://ci/job/project/1", "root", max_depth=3)
+
+    assert result == [
+        ("a1", ["n-root", "n-a", "n-a1"]),
+        ("a2", ["n-root", "n-a", "a2"]),
+        ("b1x", ["n-root", "n-b", "n-b1", "n-b1x"]),
+    ]
+
+
+def test_scan_nodes_preserves_order_with_concurrency(load_module, monkeypatch):
+    module = load_module("jenkins_pipeline_tasks_summary", alias="jenkins_pipeline_tasks_summary_test_scan_nodes")
+    nodes = [(f"node-{idx}", ["Test", f"branch-{idx}"]) for idx in range(10)]
+
+    def fake_logs(build_url, node_id):
+        if node_id == "node-3":
+            raise RuntimeError("boom")
+        if node_id == "node-4":
+            return []
+        return ["./gradlew -Pdb=tidb", f"> Task :mod-{node_id}:test"]
+
+    monkeypatch.setattr(module, "wfapi_log_lines", fake_logs)
+    monkeypatch.setattr(module, "CONCURRENCY", 3)
+
+    results = list(module.scan_nodes("https://ci/job/project/1", nodes))
+
+    assert results[3] is None and results[4] is None
+    assert [res[1][0][0] for idx, res in enumerate(results) if idx not in (3, 4)] == [
+        f":mod-node-{idx}:test" for idx in range(10) if idx not in (3, 4)
+    ]
+
+
+def test_find_stage_ids_registers_finished_build(load_module, monkeypatch):
+    module = load_module("jenkins_pipeline_tasks_summary", alias="jenkins_pipeline_tasks_summary_test_finished")
+    describe = {"id": "42", "status": "SUCCESS", "stages": [{"name": "Test", "id": 7}]}
+    monkeypatch.setattr(module, "wfapi_describe", lambda build_url: describe)
+    registered = []
+    monkeypatch.setattr(
+        module.jenkins_http, "register_finished_build", lambda build_url, number: registered.append((build_url, number))
+    )
+
+    assert module.find_stage_ids("https://ci/job/project/lastBuild", "Test") == ["7"]
+    describe["status"] = "IN_PROGRESS"
+    module.find_stage_ids("https://ci/job/project/lastBuild", "Test")
+
+    assert registered == [("https://ci/job/project/lastBuild", "42")]
+
+
+def test_scan_logs_for_tasks_accepts_stream(load_module):
+    module = load_module("jenkins_pipeline_tasks_summary", alias="jenkins_pipeline_tasks_summary_test_stream")
+    lines = [
+        "> Task :hibernate-core:test",
+        "export RDBMS=tidb",
+        "UP-TO-DATE",
+        "./gradlew -Pdb=mysql_ci ciTests",
+    ]
+
+    assert module.scan_logs_for_tasks(iter(lines)) == module.scan_logs_for_tasks(lines)
+    assert module.scan_logs_for_tasks(iter(lines)) == ("tidb", [(":hibernate-core:test", 1, 0)])
+
+
+def test_task_log_scanner_matches_across_batches(load_module):
+    module = load_module("jenkins_pipeline_tasks_summary", alias="jenkins_pipeline_tasks_summary_test_batches")
+    lines = [
+        '&gt;<b class="gradle-task"> Task :hibernate-core:compileTestJava</b> UP-TO-DATE',
+        "export Rdbms=tidb",
+        '&gt;<b class="gradle-task"> Task :hibernate-core:test</b>',
+        "UP-TO-DATE",
+        "> Task :hibernate-envers:test",
+        "SKIPPED",
+        "SKIPPEDX",
+    ]
+
+    scanner = module.TaskLogScanner()
+    scanner.feed(lines[:4])
+    assert scanner.result() == ("tidb", [(":hibernate-core:test", 1, 0)])
+    scanner.feed(iter(lines[4:]))
+
+    assert scanner.result() == module.scan_logs_for_tasks(lines)
+    assert scanner.result() == ("tidb", [(":hibernate-core:test", 1, 0), (":hibernate-envers:test", 0, 1)])
+
+
+def test_wfapi_log_lines_warns_when_log_breaks_off(load_module, monkeypatch, capsys):
+    module = load_module("jenkins_pipeline_tasks_summary", alias="jenkins_pipeline_tasks_summary_test_truncated")
+
+    def broken_stream(url, **kwargs):
+        yield b"./gradlew -Pdb=tidb\n> Task :hibernate-core:test\n"
+        raise ConnectionResetError("connection reset")
+
+    monkeypatch.setattr(module.jenkins_http, "stream", broken_stream)
+
+    lines = list(module.wfapi_log_lines("https://ci/job/project/1", "42"))
+
+    # The line still pending at the break is dropped with the rest of the log.
+    assert lines == ["./gradlew -Pdb=tidb"]
+    err = capsys.readouterr().err
+    assert "WARNING: log of node 42 truncated after 1 lines (connection reset)" in err
+
+    def failed_stream(url, **kwargs):
+        raise ConnectionResetError("connection reset")
+        yield b""
+
+    monkeypatch.setattr(module.jenkins_http, "stream", failed_stream)
+    assert list(module.wfapi_log_lines("https://ci/job/project/1", "43")) == []
+    assert capsys.readouterr().err == ""
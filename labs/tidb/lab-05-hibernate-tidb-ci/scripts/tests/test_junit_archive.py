@@ -0,0 +1,44 @@
+from pathlib import Path, PurePosixPath
+
+import pytest
+
+
+@pytest.fixture
+def archive_module(load_module):
+    return load_module("junit_archive", alias="junit_archive_under_test")
+
+
+def make_collection(root: Path) -> None:
+    suite_dir = root / "hibernate-core" / "target" / "test-results" / "test"
+    suite_dir.mkdir(parents=True)
+    suite_dir.joinpath("TEST-a.xml").write_text('<testsuite tests="2"/>', encoding="utf-8")
+    reports = root / "hibernate-core" / "target" / "reports"
+    reports.mkdir(parents=True)
+    reports.joinpath("index.html").write_text("report", encoding="utf-8")
+    root.joinpath("collection.json").write_text('{"timestamp": "20240101-000000"}', encoding="utf-8")
+
+
+@pytest.mark.parametrize("fmt", ["zip", "tar.gz"])
+def test_write_archive_round_trips_members(archive_module, tmp_path: Path, fmt: str) -> None:
+    src = tmp_path / "collection"
+    make_collection(src)
+    dest = archive_module.archive_path_for(tmp_path / "mysql-results-20240101-000000", fmt)
+
+    assert archive_module.write_archive(src, dest, fmt) == 3
+    assert archive_module.is_archive(dest)
+    assert archive_module.archive_format(dest) == fmt
+
+    xml_members = [
+        (name, fh.read()) for name, fh in archive_module.iter_members(dest, archive_module.is_junit_member)
+    ]
+    assert xml_members == [
+        (PurePosixPath("hibernate-core/target/test-results/test/TEST-a.xml"), b'<testsuite tests="2"/>')
+    ]
+    assert archive_module.read_member(dest, "collection.json") == b'{"timestamp": "20240101-000000"}'
+    assert archive_module.read_member(dest, "missing.json") is None
+
+
+def test_sidecar_path_strips_archive_suffix(archive_module, tmp_path: Path) -> None:
+    archive = tmp_path / "mysql-results-20240101-000000.tar.gz"
+    assert archive_module.sidecar_path(archive, "testcases.idx") == tmp_path / "mysql-results-20240101-000000.testcases.idx"
+    assert archive_module.archive_format(tmp_path / "plain-dir") is None
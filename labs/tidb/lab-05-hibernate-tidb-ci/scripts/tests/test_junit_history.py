@@ -0,0 +1,110 @@
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+
+@pytest.fixture
+def history_module(load_module):
+    return load_module("junit_history", alias="junit_history_under_test")
+
+
+def write_suite(root: Path, module: str, classname: str, time: float, failures: int = 0) -> None:
+    path = root / module / "target" / "test-results" / "test" / f"TEST-{classname}.xml"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(
+        f'<testsuite name="{classname}" tests="2" failures="{failures}" errors="0" skipped="0" time="{time}"/>',
+        encoding="utf-8",
+    )
+
+
+def make_collection(root: Path, suites) -> Path:
+    for module, classname, time, failures in suites:
+        write_suite(root, module, classname, time, failures)
+    return root
+
+
+def test_suite_stats_sum_per_class(history_module, tmp_path):
+    collection = make_collection(
+        tmp_path / "mysql-results-1",
+        [("hibernate-core", "org.A", 1.5, 1), ("hibernate-envers", "org.B", 2.0, 0)],
+    )
+    write_suite(collection / "shard-2", "hibernate-core", "org.C", 4.0)
+
+    stats = history_module.suite_stats(collection)
+
+    assert stats == {
+        ("hibernate-core", "org.A"): (1.5, 2, 1),
+        ("hibernate-envers", "org.B"): (2.0, 2, 0),
+        ("hibernate-core", "org.C"): (4.0, 2, 0),
+    }
+
+
+def test_record_run_keeps_a_rolling_window(history_module):
+    history = history_module.empty_history("tidb-tidbdialect", window=2)
+    key = ("core", "org.A")
+
+    for run, failed in (("r1", 1), ("r2", 0), ("r3", 1)):
+        assert history_module.record_run(history, run, {key: (1.0, 1, failed)})
+    assert not history_module.record_run(history, "r3", {key: (1.0, 1, 0)})
+
+    assert history["runs"] == ["r2", "r3"]
+    (record,) = history_module.class_records(history)
+    assert (record.runs, record.failed_runs, record.last_failed) == (2, 1, True)
+
+
+def test_record_run_refuses_runs_older_than_the_newest(history_module):
+    history = history_module.empty_history("tidb-tidbdialect", window=2)
+    key = ("core", "org.A")
+    runs = [f"tidb-tidbdialect-results-2024010{day}-000000" for day in (1, 2, 3)]
+
+    for run, failed in zip(runs, (1, 0, 0)):
+        assert history_module.record_run(history, run, {key: (1.0, 1, failed)})
+    # runs[0] already aged out of the window; its archive form is the same run.
+    assert not history_module.record_run(history, runs[0], {key: (1.0, 1, 1)})
+    assert not history_module.record_run(history, runs[0] + ".zip", {key: (1.0, 1, 1)})
+
+    assert history["runs"] == runs[1:]
+    assert history["newest"] == "20240103-000000"
+    (record,) = history_module.class_records(history)
+    assert (record.failed_runs, record.last_failed) == (0, False)
+
+    # Histories saved without "newest" fall back to the runs they list.
+    del history["newest"]
+    assert not history_module.record_run(history, runs[0], {key: (1.0, 1, 1)})
+
+
+def test_failing_first_orders_recent_and_fast_failures_first(history_module):
+    history = history_module.empty_history("tidb-tidbdialect")
+    # (seconds, failed) per run; Flaky recovered in the last run, Ok never failed.
+    classes = {"Flaky": (1.0, [1, 0]), "Slow": (90.0, [1, 1]), "Fast": (2.0, [1, 1]), "Ok": (1.0, [0, 0])}
+    for number in range(2):
+        stats = {("core", name): (seconds, 1, failed[number]) for name, (seconds, failed) in classes.items()}
+        history_module.record_run(history, f"run-{number}", stats)
+
+    order = [record.classname for record in history_module.failing_first(history)]
+
+    assert order == ["Fast", "Slow", "Flaky"]
+
+
+def test_run_updates_history_and_writes_filter(history_module, tmp_path, monkeypatch, capsys):
+    results_runs = tmp_path / "runs"
+    monkeypatch.setenv("RESULTS_RUNS_DIR", str(results_runs))
+    collection = make_collection(tmp_path / "tidb-results-1", [("hibernate-core", "org.A", 3.0, 1)])
+    args = SimpleNamespace(
+        cell="tidb-tidbdialect",
+        update=[str(collection)],
+        window=None,
+        top=5,
+        filter_out=str(tmp_path / "first.txt"),
+        jobs=1,
+    )
+
+    records = history_module.run(args)
+    history_module.run(args)
+
+    assert [record.classname for record in records] == ["org.A"]
+    assert (tmp_path / "first.txt").read_text(encoding="utf-8").splitlines() == ["include", "hibernate-core\torg.A"]
+    assert "Skipped tidb-results-1 (already recorded" in capsys.readouterr().out
+    history = history_module.load_history(history_module.history_path(results_runs, "tidb-tidbdialect"), "tidb-tidbdialect")
+    assert history["runs"] == ["tidb-results-1"]
@@ -25,6 +25,38 @@ def test_find_modules_detects_targets(tmp_path, load_module, monkeypatch):
     assert workspace / "hibernate-core" in modules
 
 
+@pytest.mark.parametrize("workers", [1, 4])
+def test_find_modules_prunes_heavy_directories(tmp_path, load_module, workers):
+    module = load_module("junit_local_collect", alias=f"junit_local_collect_test_prune_{workers}")
+    workspace = tmp_path / "workspace"
+    layout = {
+        "hibernate-core/target/test-results/test/TEST-a.xml": "<testsuite/>",
+        "hibernate-envers/target/test-results/TEST-b.xml": "<testsuite/>",
+        "tooling/metamodel-generator/target/test-results/test/x/TEST-c.xml": "<testsuite/>",
+        "hibernate-spatial/target/reports/index.html": "no xml results",
+        "hibernate-spatial/target/test-results/test/binary/output.bin": "",
+        ".gradle/cache/target/test-results/TEST-d.xml": "<testsuite/>",
+        "hibernate-core/build/tmp/x/target/test-results/TEST-e.xml": "<testsuite/>",
+        "target/test-results/TEST-root.xml": "<testsuite/>",
+    }
+    for rel, content in layout.items():
+        path = workspace / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding="utf-8")
+
+    modules = module.find_modules(workspace, workers=workers)
+
+    assert modules == {
+        workspace / "hibernate-core",
+        workspace / "hibernate-envers",
+        workspace / "tooling" / "metamodel-generator",
+    }
+    assert module.find_modules_glob(workspace) - modules == {
+        workspace / ".gradle" / "cache",
+        workspace / "hibernate-core" / "build" / "tmp" / "x",
+    }
+
+
 def test_resolve_log_path_uses_default_log_dir(tmp_path, load_module, monkeypatch):
     module = load_module("junit_local_collect", alias="junit_local_collect_test_log")
     logs_dir = tmp_path / "logs"
@@ -70,6 +102,8 @@ def test_collect_copies_results_and_manifest(tmp_path, load_module, monkeypatch)
     assert not (module_dir / "target" / "test-results").exists()
     manifest = json.loads((archive_dir / "collection.json").read_text(encoding="utf-8"))
     assert manifest["modules"] == ["hibernate-core"]
+    assert manifest["testcase_index"] == {"path": "testcases.idx", "rows": 0}
+    assert (archive_dir / "testcases.idx").exists()
     assert (archive_dir / "logs" / log_file.name).exists()
 
 
@@ -111,3 +145,115 @@ def test_run_accepts_relative_destination(tmp_path, load_module, monkeypatch):
     expected = Path(f"{(tmp_path / 'relative' / 'output')}-20240103-000000")
     assert archive_dir == expected
     assert archive_dir.exists()
+
+
+@pytest.mark.parametrize("mode", ["copy", "hardlink", "reflink", "move"])
+def test_copy_subdir_modes_produce_identical_trees(tmp_path, load_module, mode):
+    module = load_module("junit_local_collect", alias=f"junit_local_collect_test_mode_{mode}")
+    src = tmp_path / "src" / "reports"
+    (src / "tests" / "css").mkdir(parents=True)
+    (src / "index.html").write_text("report", encoding="utf-8")
+    (src / "tests" / "css" / "style.css").write_text("body{}", encoding="utf-8")
+    dest = tmp_path / "dest" / "reports"
+    dest.parent.mkdir()
+    stats = module.TransferStats()
+
+    module.copy_subdir(src, dest, mode=mode, workers=4, stats=stats)
+
+    assert (dest / "index.html").read_text(encoding="utf-8") == "report"
+    assert (dest / "tests" / "css" / "style.css").read_text(encoding="utf-8") == "body{}"
+    assert stats.files == 2
+    assert stats.bytes == len("report") + len("body{}")
+    assert src.exists() is (mode != "move")
+    assert set(stats.methods) <= {mode, "copy", "rename"}
+
+
+def test_transfer_file_falls_back_to_copy_across_devices(tmp_path, load_module, monkeypatch):
+    module = load_module("junit_local_collect", alias="junit_local_collect_test_exdev")
+    src = tmp_path / "a.xml"
+    src.write_text("<testsuite/>", encoding="utf-8")
+
+    def cross_device(*_args):
+        raise OSError(module.errno.EXDEV, "Invalid cross-device link")
+
+    monkeypatch.setattr(module.os, "link", cross_device)
+
+    assert module.transfer_file(src, tmp_path / "b.xml", "hardlink") == "copy"
+    assert (tmp_path / "b.xml").read_text(encoding="utf-8") == "<testsuite/>"
+
+
+def test_collect_records_transfer_stats(tmp_path, load_module):
+    module = load_module("junit_local_collect", alias="junit_local_collect_test_transfer")
+    workspace = tmp_path / "workspace"
+    _create_module_tree(workspace, "hibernate-core")
+
+    archive_dir = module.collect(
+        root=workspace,
+        dest_base=tmp_path / "artifacts" / "collect",
+        timestamp="20240104-000000",
+        log_path=None,
+        remove_source=False,
+        mode="hardlink",
+    )
+
+    transfer = json.loads((archive_dir / "collection.json").read_text(encoding="utf-8"))["transfer"]
+    assert transfer["mode"] == "hardlink"
+    assert transfer["files"] == 2
+    assert transfer["methods"] == {"hardlink": 2}
+    assert (workspace / "hibernate-core" / "target" / "test-results").exists()
+
+
+def test_run_records_run_info_in_manifest(tmp_path, load_module):
+    module = load_module("junit_local_collect", alias="junit_local_collect_test_run_info")
+    workspace = tmp_path / "workspace"
+    _create_module_tree(workspace, "hibernate-core")
+    run_info = tmp_path / "run.json"
+    run_info.write_text('{"cell": "tidb-tidbdialect", "allocation": {"db_count": 4}}', encoding="utf-8")
+    args = SimpleNamespace(
+        root=str(workspace),
+        dest=str(tmp_path / "out"),
+        log=None,
+        timestamp="20240105-000000",
+        remove_source=False,
+        run_info=str(run_info),
+    )
+
+    archive_dir = module.run(args)
+
+    manifest = json.loads((archive_dir / "collection.json").read_text(encoding="utf-8"))
+    assert manifest["run"] == {"cell": "tidb-tidbdialect", "allocation": {"db_count": 4}}
+
+
+def test_collect_merges_shard_roots(tmp_path, load_module):
+    module = load_module("junit_local_collect", alias="junit_local_collect_test_shards")
+    index_module = load_module("junit_testcase_index", alias="junit_testcase_index_test_shards")
+    shard_roots = []
+    for number, classname in ((1, "org.example.ATest"), (2, "org.example.BTest")):
+        root = tmp_path / f"shard{number}"
+        results = _create_module_tree(root, "hibernate-core") / "target" / "test-results" / "test"
+        (results / "TEST-one.xml").write_text(
+            f'<testsuite name="{classname}"><testcase classname="{classname}" name="works" time="2.0"/></testsuite>',
+            encoding="utf-8",
+        )
+        shard_roots.append(root)
+
+    archive_dir = module.collect(
+        root=shard_roots[0],
+        dest_base=tmp_path / "artifacts" / "collect",
+        timestamp="20240106-000000",
+        log_path=None,
+        remove_source=False,
+        shard_roots=shard_roots[1:],
+    )
+
+    assert (archive_dir / "shard-2" / "hibernate-core" / "target" / "reports" / "index.html").exists()
+    manifest = json.loads((archive_dir / "collection.json").read_text(encoding="utf-8"))
+    assert [(shard["shard"], shard["path"], shard["modules"]) for shard in manifest["shards"]] == [
+        (1, ".", ["hibernate-core"]),
+        (2, "shard-2", ["hibernate-core"]),
+    ]
+    with index_module.TestcaseIndex(archive_dir / "testcases.idx") as index:
+        assert sorted((record.module, record.classname) for record in index) == [
+            ("hibernate-core", "org.example.ATest"),
+            ("hibernate-core", "org.example.BTest"),
+        ]
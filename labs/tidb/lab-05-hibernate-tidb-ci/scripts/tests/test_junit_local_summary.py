@@ -146,6 +146,98 @@ def test_aggregate_rolls_up_stats(tmp_path, load_module):
     assert per_module["hibernate-envers"]["errors"] == 1
 
 
+def test_read_suite_attributes_stops_at_root(tmp_path, load_module):
+    module = load_module("junit_local_summary", alias="junit_local_summary_test_streaming")
+    xml_path = tmp_path / "TEST-big.xml"
+    # Truncated document: the full parser rejects it, the streaming reader only needs the root.
+    xml_path.write_text(
+        '<testsuite tests="4" failures="1" errors="0" skipped="2" time="0.5">'
+        "<system-out><![CDATA[" + ("select 1;\n" * 5000),
+        encoding="utf-8",
+    )
+    other = tmp_path / "other.xml"
+    other.write_text("<testsuites><testsuite tests='1'/></testsuites>", encoding="utf-8")
+
+    attrs = module.read_suite_attributes(xml_path)
+
+    assert attrs["tests"] == "4"
+    assert attrs["skipped"] == "2"
+    assert module.read_suite_attributes_full(xml_path) is None
+    assert module.read_suite_attributes(other) is None
+
+
+def test_aggregate_streaming_matches_full_parse(tmp_path, load_module):
+    module = load_module("junit_local_summary", alias="junit_local_summary_test_streaming_parity")
+    root = tmp_path / "collection"
+    for idx, name in enumerate(("hibernate-core", "hibernate-envers")):
+        suite_dir = root / name / "target" / "test-results" / "test"
+        suite_dir.mkdir(parents=True)
+        suite_dir.joinpath("TEST-a.xml").write_text(
+            f'<testsuite tests="{idx + 2}" failures="{idx}" errors="0" skipped="1" time="1.25">'
+            '<testcase name="t"/><system-out>noise</system-out></testsuite>',
+            encoding="utf-8",
+        )
+
+    assert module.aggregate(root, streaming=True) == module.aggregate(root, streaming=False)
+
+
+def test_summary_cache_reuses_unchanged_files(tmp_path, load_module):
+    module = load_module("junit_local_summary", alias="junit_local_summary_test_cache")
+    root = tmp_path / "collection"
+    suite_dir = root / "hibernate-core" / "target" / "test-results" / "test"
+    suite_dir.mkdir(parents=True)
+    first = suite_dir / "TEST-one.xml"
+    second = suite_dir / "TEST-two.xml"
+    first.write_text('<testsuite tests="2" failures="0" errors="0" skipped="0" time="1.0"/>', encoding="utf-8")
+    second.write_text('<testsuite tests="3" failures="1" errors="0" skipped="0" time="2.0"/>', encoding="utf-8")
+    cache_path = root / module.CACHE_FILENAME
+
+    cold = module.SummaryCache(cache_path, mode="streaming")
+    baseline = module.aggregate(root, cache=cold)
+    cold.save()
+    assert (cold.hits, cold.misses) == (0, 2)
+
+    warm = module.SummaryCache(cache_path, mode="streaming")
+    assert module.aggregate(root, cache=warm) == baseline
+    assert (warm.hits, warm.misses) == (2, 0)
+    assert warm.dirty is False
+
+    second.write_text('<testsuite tests="30" failures="1" errors="0" skipped="0" time="2.0"/>', encoding="utf-8")
+    os.utime(second, ns=(time.time_ns(), time.time_ns() + 1_000_000_000))
+    changed = module.SummaryCache(cache_path, mode="streaming")
+    overall, _ = module.aggregate(root, cache=changed)
+    assert overall["tests"] == 32
+    assert (changed.hits, changed.misses) == (1, 1)
+
+    full_mode = module.SummaryCache(cache_path, mode="full")
+    assert full_mode.entries == {}
+
+
+def test_summary_cache_verify_repairs_stale_entries(tmp_path, load_module):
+    module = load_module("junit_local_summary", alias="junit_local_summary_test_cache_verify")
+    root = tmp_path / "collection"
+    suite_dir = root / "hibernate-core" / "target" / "test-results" / "test"
+    suite_dir.mkdir(parents=True)
+    suite_dir.joinpath("TEST-one.xml").write_text('<testsuite tests="2" time="1.0"/>', encoding="utf-8")
+    root.joinpath("collection.json").write_text(json.dumps({"timestamp": "20240101-000000"}), encoding="utf-8")
+    args = SimpleNamespace(root=str(root), json_out=None, log=None, manifest=None, timestamp=None)
+
+    module.run(args)
+    cache_path = root / module.CACHE_FILENAME
+    data = json.loads(cache_path.read_text(encoding="utf-8"))
+    data["files"]["hibernate-core/target/test-results/test/TEST-one.xml"]["attrs"]["tests"] = "99"
+    cache_path.write_text(json.dumps(data), encoding="utf-8")
+
+    trusted = module.run(args)
+    assert trusted["overall"]["tests"] == 99
+
+    args.verify_cache = True
+    verified = module.run(args)
+    assert verified["overall"]["tests"] == 2
+    assert verified["cache"]["mismatches"] == ["hibernate-core/target/test-results/test/TEST-one.xml"]
+    assert module.run(SimpleNamespace(**{**vars(args), "verify_cache": False}))["overall"]["tests"] == 2
+
+
 def test_resolve_log_path_variants(tmp_path, load_module, monkeypatch):
     module = load_module("junit_local_summary", alias="junit_local_summary_test_resolve_variants")
     root = tmp_path / "collection"
@@ -299,3 +391,41 @@ def test_collect_and_summary_integration(tmp_path, load_module):
 
     assert result["overall"]["tests"] == 3
     assert "hibernate-core" in result["per_module"]
+
+
+@pytest.mark.parametrize("fmt", ["zip", "tar.gz"])
+def test_collect_archive_and_summary_integration(tmp_path, load_module, fmt):
+    collect_module = load_module("junit_local_collect", alias=f"junit_local_collect_archive_{fmt}")
+    summary_module = load_module("junit_local_summary", alias=f"junit_local_summary_archive_{fmt}")
+    workspace = tmp_path / "workspace"
+    suite_dir = workspace / "hibernate-core" / "target" / "test-results" / "test"
+    suite_dir.mkdir(parents=True)
+    suite_dir.joinpath("TEST-one.xml").write_text(
+        '<testsuite tests="3" failures="1" errors="0" skipped="1" time="3.0">'
+        '<testcase classname="A" name="t"><failure message="boom"/></testcase></testsuite>',
+        encoding="utf-8",
+    )
+    log_file = tmp_path / "tidb-ci-run.log"
+    log_file.write_text("RDBMS=tidb\n", encoding="utf-8")
+
+    archive = collect_module.collect(
+        root=workspace,
+        dest_base=tmp_path / "archive" / "collect",
+        timestamp="20240107-030303",
+        log_path=str(log_file),
+        remove_source=False,
+        output_format=fmt,
+    )
+
+    assert archive.is_file()
+    assert not Path(str(archive)[: -len(f".{fmt}")]).exists()
+    assert (tmp_path / "archive" / "collect-20240107-030303.testcases.idx").exists()
+
+    args = SimpleNamespace(root=str(archive), json_out=None, log=None, manifest=None, timestamp=None)
+    result = summary_module.run(args)
+
+    assert result["timestamp"] == "20240107-030303"
+    assert result["overall"]["tests"] == 3
+    assert result["per_module"]["hibernate-core"]["failures"] == 1
+    assert result["db_hint"] == "tidb"
+    assert result["cache"] is None
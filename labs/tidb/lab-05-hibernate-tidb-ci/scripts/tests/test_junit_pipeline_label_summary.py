@@ -141,3 +141,156 @@ def test_correlate_suites_with_gradle_tasks(load_module, monkeypatch):
     assert tasks[0] == [":hibernate-core:test"]
     assert tasks[1] == [":hibernate-core:test"]
     assert tasks[2] == [":hibernate-orm:test"]
+
+
+class _FakeLog:
+    """Stands in for jenkins_http.ProgressiveText: each read returns the next batch of bytes."""
+
+    def __init__(self, batches):
+        self.batches = list(batches)
+        self.more = True
+        self.reads = 0
+
+    def __iter__(self):
+        self.reads += 1
+        chunk = self.batches.pop(0) if self.batches else b""
+        self.more = bool(self.batches)
+        return iter([chunk])
+
+
+def test_follow_build_fetches_only_new_suites(load_module, monkeypatch):
+    module = load_module("junit_pipeline_label_summary", alias="junit_pipeline_label_summary_test_follow")
+    suites = [
+        {"duration": 1.0, "enclosingBlockNames": ["Suite", "mysql"], "cases": [{"status": "PASSED"}], "nodeId": "1"},
+        {"duration": 2.0, "enclosingBlockNames": ["Suite", "tidb"], "cases": [{"status": "FAILED"}], "nodeId": "2"},
+        {"duration": 3.0, "enclosingBlockNames": ["Suite", "tidb"], "cases": [{"status": "PASSED"}], "nodeId": "2"},
+    ]
+    published = iter([1, 2, 3])
+    states = iter([True, True, False])
+    starts = []
+
+    def fake_suites(build_url, start):
+        starts.append(start)
+        upto = next(published)
+        return {"duration": float(upto), "suites": suites[start:upto]}
+
+    logs = {
+        "1": _FakeLog([b"> Task :hibernate-core:test\n"]),
+        "2": _FakeLog([b"> Task :hibernate-envers:test\n", b"> Task :hibernate-core:test\n"]),
+    }
+    monkeypatch.setattr(module, "fetch_build_info", lambda _: {"building": next(states), "number": 7})
+    monkeypatch.setattr(module, "fetch_test_report_suites", fake_suites)
+    monkeypatch.setattr(module, "_node_log", lambda build_url, node_id: logs[node_id])
+    monkeypatch.setattr(module.time, "sleep", lambda _: None)
+
+    report, suite_tasks, polls = module.follow_build(
+        "https://ci/job/project/7", label_index=1, with_gradle_tasks=True, interval=0
+    )
+
+    assert polls == 3
+    assert starts == [0, 1, 2]
+    assert report["suites"] == suites
+    assert module.parse_test_report(report, 1) == module.parse_test_report({"duration": 3.0, "suites": suites}, 1)
+    assert suite_tasks[0] == [":hibernate-core:test"]
+    # Node 2 kept logging after its first suite; later bytes were picked up too.
+    assert logs["2"].reads == 2
+    assert suite_tasks[2] == [":hibernate-core:test", ":hibernate-envers:test"]
+
+
+
+def test_follow_build_keeps_polling_after_build_info_5xx(load_module, monkeypatch, capsys):
+    import urllib.error
+
+    module = load_module("junit_pipeline_label_summary", alias="junit_pipeline_label_summary_test_follow_5xx")
+    suite = {"duration": 1.0, "enclosingBlockNames": ["Suite", "tidb"], "cases": [{"status": "PASSED"}]}
+    states = iter([None, False])
+
+    def fake_info(build_url):
+        state = next(states)
+        if state is None:
+            raise urllib.error.HTTPError(build_url, 503, "Service Unavailable", {}, None)
+        return {"building": state, "number": 7}
+
+    monkeypatch.setattr(module, "fetch_build_info", fake_info)
+    monkeypatch.setattr(module, "fetch_test_report_suites", lambda build_url, start: {"duration": 1.0, "suites": [suite][start:]})
+    monkeypatch.setattr(module.time, "sleep", lambda _: None)
+
+    report, _, polls = module.follow_build("https://ci/job/project/7", label_index=1, interval=0)
+
+    assert polls == 2
+    assert report["suites"] == [suite]
+    captured = capsys.readouterr()
+    assert "HTTP 503 fetching the build state" in captured.err
+    assert "[poll 1 " in captured.out and "RUNNING" in captured.out
+
+def _paged_fetch(report, fetched):
+    def fake_page(build_url, start, end):
+        fetched.append(start)
+        if report is None:
+            return None
+        return {"duration": report["duration"], "suites": report["suites"][start:end]}
+
+    return fake_page
+
+
+def test_fetch_test_report_paged_matches_single_request(load_module, monkeypatch):
+    module = load_module("junit_pipeline_label_summary", alias="junit_pipeline_label_summary_test_paged")
+    report = {
+        "duration": 42.0,
+        "suites": [
+            {"duration": float(i), "enclosingBlockNames": ["Test", f"db{i % 3}"], "cases": [{"status": "PASSED"}] * i}
+            for i in range(7)
+        ],
+    }
+    fetched = []
+    monkeypatch.setattr(module, "fetch_test_report_page", _paged_fetch(report, fetched))
+
+    aggregator, kept = module.fetch_test_report_paged("https://ci/job/p/1", 1, page_size=2, concurrency=3, keep_suites=True)
+
+    assert (aggregator.overall, aggregator.labels) == module.parse_test_report(report, 1)
+    assert kept == report["suites"]
+    # Page [6:8) is short, so the walk stops; at most `concurrency` pages were speculative.
+    assert fetched[:4] == [0, 2, 4, 6]
+    assert len(fetched) <= 4 + 2
+
+
+def test_fetch_test_report_paged_without_report(load_module, monkeypatch):
+    module = load_module("junit_pipeline_label_summary", alias="junit_pipeline_label_summary_test_paged_missing")
+    monkeypatch.setattr(module, "fetch_test_report_page", _paged_fetch(None, []))
+
+    assert module.fetch_test_report_paged("https://ci/job/p/1", 1, page_size=10, concurrency=1) == (None, [])
+
+
+
+def test_fetch_test_report_paged_rejects_empty_pages(load_module):
+    module = load_module("junit_pipeline_label_summary", alias="junit_pipeline_label_summary_test_paged_zero")
+
+    with pytest.raises(ValueError):
+        module.fetch_test_report_paged("https://ci/job/p/1", 1, page_size=0)
+
+def test_run_uses_paged_report(load_module, monkeypatch):
+    module = load_module("junit_pipeline_label_summary", alias="junit_pipeline_label_summary_test_paged_run")
+    report = {
+        "duration": 3.0,
+        "suites": [{"duration": 1.0, "enclosingBlockNames": ["Test", "tidb"], "cases": [{"status": "FAILED"}]}] * 3,
+    }
+    monkeypatch.setattr(module, "fetch_build_info", lambda _: {"building": True})
+    monkeypatch.setattr(module, "fetch_test_report_page", _paged_fetch(report, []))
+    args = SimpleNamespace(
+        url="https://ci/job/project/5",
+        last=False,
+        last_success=False,
+        build=None,
+        label_index=1,
+        with_gradle_tasks=False,
+        json_out=None,
+        verbose=False,
+        page_size=2,
+        page_concurrency=2,
+        no_cache=True,
+    )
+
+    result = module.run(args)
+
+    assert result["overall"]["suites"] == 3
+    assert result["labels"]["tidb"]["FAILED"] == 3
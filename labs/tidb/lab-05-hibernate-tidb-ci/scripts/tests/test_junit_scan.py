@@ -0,0 +1,56 @@
+from pathlib import Path
+
+import pytest
+
+
+@pytest.fixture
+def scan_module(load_module):
+    return load_module("junit_scan", alias="junit_scan_under_test")
+
+
+def write_suite(path: Path, tests: int, failing: int = 0) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    cases = "".join(
+        f'  <testcase classname="org.example.Suite" name="test{idx}">'
+        + ('<failure message="boom">trace</failure>' if idx < failing else "")
+        + "</testcase>\n"
+        for idx in range(tests)
+    )
+    path.write_text(
+        f'<testsuite tests="{tests}" failures="{failing}">\n{cases}</testsuite>\n',
+        encoding="utf-8",
+    )
+
+
+def test_resolve_jobs_zero_means_cpu_count(scan_module, monkeypatch) -> None:
+    monkeypatch.setattr(scan_module.os, "cpu_count", lambda: 6)
+    assert scan_module.resolve_jobs(0) == 6
+    assert scan_module.resolve_jobs(None) == 6
+    assert scan_module.resolve_jobs(3) == 3
+
+
+def test_read_failure_cases_ignores_nested_and_rejects_malformed(scan_module, tmp_path: Path) -> None:
+    good = tmp_path / "TEST-good.xml"
+    write_suite(good, tests=3, failing=2)
+    assert scan_module.read_failure_cases(good) == [
+        ("org.example.Suite", "test0", "boom"),
+        ("org.example.Suite", "test1", "boom"),
+    ]
+
+    broken = tmp_path / "TEST-broken.xml"
+    broken.write_text('<testsuite><testcase name="a"><failure message="x"/></testcase>', encoding="utf-8")
+    assert scan_module.read_failure_cases(broken) is None
+
+
+def test_scan_preserves_input_order_across_workers(scan_module, tmp_path: Path) -> None:
+    paths = []
+    for idx in range(12):
+        path = tmp_path / f"TEST-{idx:02d}.xml"
+        write_suite(path, tests=idx + 1)
+        paths.append(path)
+
+    serial = scan_module.scan(paths, scan_module.read_suite_attributes, jobs=1)
+    parallel = scan_module.scan(paths, scan_module.read_suite_attributes, jobs=3, chunk_size=2)
+
+    assert parallel == serial
+    assert [attrs["tests"] for _path, attrs in parallel] == [str(idx + 1) for idx in range(12)]
@@ -0,0 +1,76 @@
+from types import SimpleNamespace
+
+import pytest
+
+
+@pytest.fixture
+def shards(load_module):
+    return load_module("junit_shards", alias="junit_shards_under_test")
+
+
+def write_history(index_module, path, durations):
+    rows = [
+        (module, classname, f"test{n}", "passed", seconds / 2, "")
+        for (module, classname), seconds in durations.items()
+        for n in range(2)
+    ]
+    index_module.write_index(path, rows)
+    return path
+
+
+def test_plan_shards_balances_longest_first(shards):
+    durations = {
+        ("hibernate-core", "A"): 50.0,
+        ("hibernate-core", "B"): 40.0,
+        ("hibernate-envers", "C"): 30.0,
+        ("hibernate-core", "D"): 20.0,
+        ("hibernate-core", "E"): 10.0,
+    }
+
+    plan = shards.plan_shards(durations, 2)
+
+    assert [shard.seconds for shard in plan] == [80.0, 70.0]
+    assert sorted(shard.classes[0][1] for shard in plan) == ["A", "B"]
+    assert sum(len(shard.classes) for shard in plan) == len(durations)
+    # Asking for one shard keeps everything together.
+    assert shards.plan_shards(durations, 1)[0].seconds == 150.0
+
+
+def test_filters_make_shard_one_the_catch_all(shards, tmp_path):
+    plan = shards.plan_shards({("core", "A"): 3.0, ("core", "B"): 2.0, ("envers", "C"): 1.0}, 3)
+
+    paths = shards.write_filters(plan, tmp_path / "filters")
+
+    assert [path.name for path in paths] == ["shard-1.txt", "shard-2.txt", "shard-3.txt"]
+    assert paths[0].read_text(encoding="utf-8").splitlines() == ["exclude", "core\tB", "envers\tC"]
+    assert paths[1].read_text(encoding="utf-8").splitlines() == ["include", "core\tB"]
+    assert paths[2].read_text(encoding="utf-8").splitlines() == ["include", "envers\tC"]
+
+
+def test_class_durations_and_latest_index(shards, load_module, tmp_path):
+    index_module = load_module("junit_testcase_index", alias="junit_testcase_index_for_shards")
+    runs = tmp_path / "runs"
+    for stamp, seconds in (("20240101-000000", 4.0), ("20240102-000000", 6.0)):
+        collection = runs / f"mysql-results-{stamp}"
+        collection.mkdir(parents=True)
+        write_history(index_module, collection / "testcases.idx", {("core", "A"): seconds})
+    (runs / "mysql-results-20240103-000000").mkdir()  # no index yet
+
+    latest = shards.latest_index(runs, "mysql")
+
+    assert latest == runs / "mysql-results-20240102-000000" / "testcases.idx"
+    assert shards.class_durations(latest) == {("core", "A"): 6.0}
+    assert shards.latest_index(runs, "tidb-tidbdialect") is None
+
+
+def test_run_writes_filters(shards, load_module, tmp_path, capsys):
+    index_module = load_module("junit_testcase_index", alias="junit_testcase_index_for_shards_run")
+    collection = tmp_path / "tidb-results-20240101-000000"
+    collection.mkdir()
+    write_history(index_module, collection / "testcases.idx", {("core", "A"): 5.0, ("core", "B"): 5.0})
+
+    plan = shards.run(SimpleNamespace(root=str(collection), shards=2, out_dir=str(tmp_path / "out")))
+
+    assert [len(shard.classes) for shard in plan] == [1, 1]
+    assert (tmp_path / "out" / "shard-2.txt").exists()
+    assert "shard 2:" in capsys.readouterr().out
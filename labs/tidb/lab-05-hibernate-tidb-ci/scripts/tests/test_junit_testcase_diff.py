@@ -0,0 +1,78 @@
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+
+@pytest.fixture
+def diff_module(load_module):
+    return load_module("junit_testcase_diff", alias="junit_testcase_diff_under_test")
+
+
+def write(path: Path, rows) -> Path:
+    from junit_testcase_index import write_index
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    write_index(path, rows)
+    return path
+
+
+def test_diff_classifies_testcases(diff_module, tmp_path: Path) -> None:
+    left = write(
+        tmp_path / "mysql" / "testcases.idx",
+        [
+            ("core", "A", "stays", "passed", 0.1, ""),
+            ("core", "A", "breaks", "passed", 0.1, ""),
+            ("core", "A", "fixed", "failed", 0.1, "boom"),
+            ("core", "A", "gone", "passed", 0.1, ""),
+            ("core", "A", "slow", "passed", 0.5, ""),
+            ("core", "A", "param", "passed", 0.1, ""),
+            ("core", "A", "param", "passed", 0.1, ""),
+        ],
+    )
+    right = write(
+        tmp_path / "tidb" / "testcases.idx",
+        [
+            ("core", "A", "param", "passed", 0.1, ""),
+            ("core", "A", "param", "error", 0.1, "lock"),
+            ("core", "A", "slow", "passed", 3.0, ""),
+            ("core", "A", "fixed", "passed", 0.1, ""),
+            ("core", "A", "breaks", "failed", 0.1, "lock"),
+            ("core", "A", "stays", "passed", 0.1, ""),
+            ("envers", "B", "added", "passed", 0.1, ""),
+        ],
+    )
+
+    diff = diff_module.diff_paths(left.parent, right)
+
+    assert diff.newly_failing == [("core", "A", "param"), ("core", "A", "breaks")]
+    assert diff.newly_passing == [("core", "A", "fixed")]
+    assert diff.missing == [("core", "A", "gone")]
+    assert diff.new == [("envers", "B", "added")]
+    assert diff.slower == [(("core", "A", "slow"), 0.5, 3.0)]
+    assert diff.counts()["left"] == 7
+
+
+def test_run_writes_json_and_requires_indexes(diff_module, tmp_path: Path, capsys) -> None:
+    left = write(tmp_path / "left.idx", [("core", "A", "t", "passed", 0.1, "")])
+    right = write(tmp_path / "right.idx", [("core", "A", "t", "failed", 0.1, "x")])
+    json_out = tmp_path / "diff.json"
+    args = SimpleNamespace(
+        left=str(left),
+        right=str(right),
+        limit=20,
+        ratio=2.0,
+        min_delta=1.0,
+        json_out=str(json_out),
+    )
+
+    diff_module.run(args)
+
+    assert "core:A#t" in capsys.readouterr().out
+    payload = json.loads(json_out.read_text(encoding="utf-8"))
+    assert payload["newly_failing"] == ["core:A#t"]
+
+    args.right = str(tmp_path / "missing")
+    with pytest.raises(FileNotFoundError):
+        diff_module.run(args)
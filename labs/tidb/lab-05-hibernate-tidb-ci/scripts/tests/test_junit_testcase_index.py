@@ -0,0 +1,108 @@
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+
+@pytest.fixture
+def index_module(load_module):
+    return load_module("junit_testcase_index", alias="junit_testcase_index_under_test")
+
+
+def write_suite(root: Path, module: str, classname: str, body: str) -> None:
+    suite_dir = root / module / "target" / "test-results" / "test"
+    suite_dir.mkdir(parents=True, exist_ok=True)
+    suite_dir.joinpath(f"TEST-{classname}.xml").write_text(
+        f'<testsuite name="{classname}">{body}<system-out>noise</system-out></testsuite>',
+        encoding="utf-8",
+    )
+
+
+@pytest.fixture
+def collection(tmp_path: Path) -> Path:
+    root = tmp_path / "collection"
+    write_suite(
+        root,
+        "hibernate-core",
+        "org.example.CoreTest",
+        '<testcase classname="org.example.CoreTest" name="ok" time="0.5"/>'
+        '<testcase classname="org.example.CoreTest" name="bad" time="1.25">'
+        '<failure message="expected 1 but was 2">trace</failure></testcase>'
+        '<testcase classname="org.example.CoreTest" name="ignored"><skipped/></testcase>',
+    )
+    write_suite(
+        root,
+        "hibernate-envers",
+        "org.example.EnversTest",
+        '<testcase classname="org.example.EnversTest" name="boom" time="2"><error message="NPE"/></testcase>',
+    )
+    return root
+
+
+def test_build_index_round_trips_rows(index_module, collection: Path) -> None:
+    path, rows = index_module.build_index(collection)
+
+    assert path == collection / index_module.INDEX_FILENAME
+    assert rows == 4
+    with index_module.TestcaseIndex(path) as index:
+        records = list(index)
+        assert len(index) == 4
+        assert records[0] == index_module.TestcaseRecord(
+            module="hibernate-core",
+            classname="org.example.CoreTest",
+            method="ok",
+            status="passed",
+            time=0.5,
+            message_hash=0,
+        )
+        assert records[1].status == "failed"
+        assert records[1].message_hash == index_module.message_hash("expected 1 but was 2")
+        assert records[2].status == "skipped"
+        assert records[3].module == "hibernate-envers"
+        assert records[3].status == "error"
+        assert index.status_counts() == {"passed": 1, "failed": 1, "error": 1, "skipped": 1}
+        assert index.filter(["failed", "error"]) == [1, 3]
+        assert index.filter(["failed", "error"], module="hibernate-envers") == [3]
+        assert index.filter(module="missing") == []
+        assert index.key(1) == ("hibernate-core", "org.example.CoreTest", "bad")
+
+
+
+def test_index_buckets_modules_like_the_summary(index_module, load_module, tmp_path: Path) -> None:
+    summary_module = load_module("junit_local_summary", alias="junit_local_summary_for_index")
+    root = tmp_path / "collection"
+    write_suite(root, "tooling/metamodel-generator", "org.example.GenTest", '<testcase classname="org.example.GenTest" name="t"/>')
+    xml_path = next(root.rglob("TEST-*.xml"))
+
+    path, _ = index_module.build_index(root)
+
+    with index_module.TestcaseIndex(path) as index:
+        assert [record.module for record in index] == [summary_module.module_name_for(xml_path, root)]
+
+def test_index_rejects_truncated_files(index_module, collection: Path) -> None:
+    path, _ = index_module.build_index(collection)
+    data = path.read_bytes()
+    path.write_bytes(data[:-3])
+
+    with pytest.raises(ValueError):
+        index_module.TestcaseIndex(path)
+
+
+def test_run_lists_filtered_rows(index_module, collection: Path, capsys) -> None:
+    args = SimpleNamespace(
+        root=str(collection),
+        index=None,
+        rebuild=False,
+        status=["failed"],
+        module=None,
+        limit=50,
+        jobs=1,
+    )
+
+    result = index_module.run(args)
+
+    out = capsys.readouterr().out
+    assert "Indexed 4 testcases" in out
+    assert "org.example.CoreTest#bad" in out
+    assert result["counts"]["failed"] == 1
+    assert [record.method for record in result["matches"]] == ["bad"]
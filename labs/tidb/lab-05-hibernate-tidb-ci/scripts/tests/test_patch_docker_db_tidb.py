@@ -1,6 +1,42 @@
+import os
+import re
+import subprocess
 from pathlib import Path
 from types import SimpleNamespace
 
+TEMPLATE = Path(__file__).resolve().parents[1] / "templates" / "docker_db.sh.tidb-function"
+
+# Stand-ins for the container CLI and the mysql client. `docker run ... bash /bootstrap/run.sh` runs the
+# staged script on the host against the mounted directory; every mysql session is saved to $STUB_LOG, and
+# the verify row counts the users and schemas those sessions created.
+STUB_DOCKER = r'''#!/usr/bin/env bash
+echo "docker $*" >> "$STUB_LOG/docker.calls"
+bootstrap_dir=
+for arg in "$@"; do
+  case "$arg" in
+    *:/bootstrap:ro) bootstrap_dir="${arg%:/bootstrap:ro}" ;;
+  esac
+done
+if [ -n "$bootstrap_dir" ]; then
+  sed "s#/bootstrap/#$bootstrap_dir/#g" "$bootstrap_dir/run.sh" > "$STUB_LOG/run-$$.sh"
+  bash "$STUB_LOG/run-$$.sh"
+fi
+'''
+
+STUB_MYSQL = r'''#!/usr/bin/env bash
+sql=$(cat)
+if [[ "$sql" == *"SELECT 'verify'"* ]]; then
+  users=$(cat "$STUB_LOG"/session-*.sql | grep -c "CREATE USER")
+  schemas=$(cat "$STUB_LOG"/session-*.sql | grep -o "CREATE DATABASE IF NOT EXISTS [a-z0-9_]*" | sort -u | wc -l)
+  printf 'verify\t%s\t%s\n' "${STUB_USERS:-$users}" "$(( schemas - ${STUB_MISSING_SCHEMAS:-0} ))"
+  exit 0
+fi
+printf '%s\n' "$sql" > "$STUB_LOG/session-$$.sql"
+if [ -n "$STUB_FAIL_DATABASE" ] && [[ "$sql" == *"$STUB_FAIL_DATABASE;"* ]]; then
+  exit 1
+fi
+'''
+
 
 def test_replace_function_swaps_function_body(load_module):
     module = load_module("patch_docker_db_tidb", alias="patch_docker_db_tidb_replace")
@@ -37,9 +73,7 @@ def test_build_tidb_function_includes_all_blocks(tmp_path, load_module):
 
 {{START_CONTAINER}}
 
-{{LOG_WAIT}}
-
-{{PING_BLOCK}}
+{{READINESS}}
 
 {{DB_CREATION}}
 
@@ -60,7 +94,125 @@ def test_build_tidb_function_includes_all_blocks(tmp_path, load_module):
     assert "tidb_8_5()" in rendered
     assert tmp_path.as_posix() in rendered
     assert "Bootstrapping TiDB databases" in rendered
+    assert 'python3 "$READY_SCRIPT" --cli' in rendered
+    assert "mysqladmin" not in rendered and "log probe" not in rendered
+    # Bootstrap and verification share one client container
+    assert rendered.count("mysql:8.0") == 1
+    assert "SELECT 'verify'" in rendered and "TiDB timing:" in rendered
+    # Test databases are created over a pool of concurrent DDL connections
+    assert "TIDB_DDL_CONNECTIONS" in rendered and "TiDB DDL:" in rendered
+    assert "wait \"$pid\"" in rendered
+
+
+
+def run_tidb_function(module, tmp_path: Path, db_count: int, **env_overrides: str) -> subprocess.CompletedProcess:
+    """Source the generated tidb_8_5() and run it against the stub docker/mysql."""
+    bin_dir = tmp_path / "bin"
+    log_dir = tmp_path / "log"
+    work_dir = tmp_path / "tmp"
+    for directory in (bin_dir, log_dir, work_dir):
+        directory.mkdir(parents=True, exist_ok=True)
+    for name, body in (("docker", STUB_DOCKER), ("mysql", STUB_MYSQL), ("sleep", "#!/bin/sh\nexit 0\n")):
+        stub = bin_dir / name
+        stub.write_text(body, encoding="utf-8")
+        stub.chmod(0o755)
+    ready = tmp_path / "ready.py"
+    ready.write_text('print("ready")\n', encoding="utf-8")
+    function = tmp_path / "tidb.sh"
+    function.write_text(module.build_tidb_function(work_dir, None, TEMPLATE), encoding="utf-8")
+
+    env = dict(
+        os.environ,
+        PATH=f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}",
+        CONTAINER_CLI="docker",
+        DB_COUNT=str(db_count),
+        TIDB_READY_SCRIPT=str(ready),
+        STUB_LOG=str(log_dir),
+    )
+    env.pop("TIDB_DDL_CONNECTIONS", None)
+    env.update(env_overrides)
+    return subprocess.run(
+        ["bash", "-c", 'source "$1"; tidb_8_5', "tidb", str(function)],
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+
+
+def test_tidb_function_verifies_user_and_schemas(tmp_path, load_module):
+    module = load_module("patch_docker_db_tidb", alias="patch_docker_db_tidb_verify")
+
+    result = run_tidb_function(module, tmp_path / "ok", db_count=4)
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert "Bootstrapping TiDB databases (5 schemas" in result.stdout
+    assert "TiDB timing: container start" in result.stdout
+    assert result.stdout.rstrip().endswith("TiDB successfully started and bootstrap SQL executed")
+    assert not list((tmp_path / "ok" / "tmp").glob("tidb-bootstrap-*"))
+
+    result = run_tidb_function(module, tmp_path / "short", db_count=4, STUB_MISSING_SCHEMAS="1")
+    assert result.returncode == 1
+    assert "Found 4 of 5 hibernate_orm_test schemas" in result.stdout
+    assert "TiDB successfully started" not in result.stdout
+
+    result = run_tidb_function(module, tmp_path / "no-user", db_count=4, STUB_USERS="0")
+    assert result.returncode == 1
+    assert "User 'hibernate_orm_test' missing" in result.stdout
+
+
+def ddl_sessions(log_dir: Path):
+    """Test databases created by each concurrent DDL session (the main session creates only hibernate_orm_test)."""
+    sessions = []
+    for session in log_dir.glob("session-*.sql"):
+        names = re.findall(r"CREATE DATABASE IF NOT EXISTS (hibernate_orm_test_\d+);", session.read_text(encoding="utf-8"))
+        if names:
+            sessions.append(sorted(names))
+    return sorted(sessions)
+
+
+def test_tidb_function_spreads_ddl_round_robin(tmp_path, load_module):
+    module = load_module("patch_docker_db_tidb", alias="patch_docker_db_tidb_ddl")
+
+    result = run_tidb_function(module, tmp_path, db_count=6)
+
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert "(7 schemas, 4 DDL connections)" in result.stdout
+    assert "TiDB DDL: 12 statements for 6 databases over 4 connections" in result.stdout
+    assert ddl_sessions(tmp_path / "log") == [
+        ["hibernate_orm_test_1", "hibernate_orm_test_5"],
+        ["hibernate_orm_test_2", "hibernate_orm_test_6"],
+        ["hibernate_orm_test_3"],
+        ["hibernate_orm_test_4"],
+    ]
+
+
+def test_tidb_function_clamps_ddl_connections(tmp_path, load_module):
+    module = load_module("patch_docker_db_tidb", alias="patch_docker_db_tidb_ddl_clamp")
+
+    result = run_tidb_function(module, tmp_path / "wide", db_count=3, TIDB_DDL_CONNECTIONS="10")
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert "over 3 connections" in result.stdout
+    assert len(ddl_sessions(tmp_path / "wide" / "log")) == 3
+
+    result = run_tidb_function(module, tmp_path / "single", db_count=1)
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert ddl_sessions(tmp_path / "single" / "log") == [["hibernate_orm_test_1"]]
+
+    result = run_tidb_function(module, tmp_path / "zero", db_count=2, TIDB_DDL_CONNECTIONS="0")
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert ddl_sessions(tmp_path / "zero" / "log") == [["hibernate_orm_test_1", "hibernate_orm_test_2"]]
+
+
+def test_tidb_function_fails_when_a_ddl_session_fails(tmp_path, load_module):
+    module = load_module("patch_docker_db_tidb", alias="patch_docker_db_tidb_ddl_fail")
+
+    result = run_tidb_function(module, tmp_path, db_count=6, STUB_FAIL_DATABASE="hibernate_orm_test_3")
 
+    assert result.returncode == 1
+    assert "Bootstrap SQL failed (attempt 3/3)" in result.stdout
+    assert "TiDB bootstrap SQL failed after 3 attempts" in result.stdout
+    assert "TiDB DDL:" not in result.stdout
+    assert not list((tmp_path / "tmp").glob("tidb-bootstrap-*"))
 
 def test_apply_patch_to_workspace_preserves_tidb_5_4(tmp_path, load_module):
     """Test that tidb_5_4() is preserved unchanged from upstream."""
@@ -146,3 +298,6 @@ tidb_5_4() {
     assert "tidb_8_5" in updated
     # tidb_5_4 should be preserved (not replaced with deprecation warning)
     assert 'echo "legacy"' in updated
+    # The generated readiness call finds its helper in workspace/tmp
+    assert result["ready_script_path"] == workspace / "tmp" / "tidb_ready.py"
+    assert result["ready_script_path"].read_text(encoding="utf-8") == module.READY_SCRIPT.read_text(encoding="utf-8")
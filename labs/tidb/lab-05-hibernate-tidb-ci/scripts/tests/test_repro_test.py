@@ -124,6 +124,62 @@ def test_collect_failures_parses_junit(repro_module, tmp_path: Path) -> None:
     assert "boom" in failure.message
 
 
+
+def test_collect_failures_names_modules_of_shard_results(repro_module, tmp_path: Path) -> None:
+    run_root = tmp_path / "tidb-tidbdialect-results-000"
+    results = Path("target") / "test-results" / "test"
+    write_failure_xml(run_root / "hibernate-core" / results / "TEST-a.A.xml", "a.A", "testA", "boom")
+    write_failure_xml(run_root / "shard-2" / "hibernate-envers" / results / "TEST-a.B.xml", "a.B", "testB", "boom")
+
+    failures = repro_module.collect_failures(run_root)
+
+    assert sorted((f.module, f.classname) for f in failures) == [("hibernate-core", "a.A"), ("hibernate-envers", "a.B")]
+
+def test_collect_failures_parallel_matches_serial(repro_module, tmp_path: Path, monkeypatch) -> None:
+    import junit_scan
+
+    pools = []
+
+    class CountingPool(junit_scan.ProcessPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            pools.append(kwargs.get("max_workers"))
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(junit_scan, "ProcessPoolExecutor", CountingPool)
+    run_root = tmp_path / "tidb-tidbdialect-results-000"
+    for module in ("hibernate-core", "hibernate-envers"):
+        for idx in range(4):
+            classname = f"org.example.Test{idx}"
+            xml_path = run_root / module / "target" / "test-results" / "test" / f"TEST-{classname}.xml"
+            write_failure_xml(xml_path, classname, f"test{idx}", f"boom{idx}")
+
+    serial = repro_module.collect_failures(run_root)
+    assert pools == []
+    # Chunks of 3 split the 8 files across the pool instead of parsing them in-process.
+    parallel = repro_module.collect_failures(run_root, jobs=2, chunk_size=3)
+
+    assert pools == [2]
+    assert len(serial) == 8
+    assert [(f.module, f.classname, f.message) for f in parallel] == [
+        (f.module, f.classname, f.message) for f in serial
+    ]
+
+
+def test_collect_failures_reads_archives(repro_module, tmp_path: Path) -> None:
+    from junit_archive import write_archive
+
+    staging = tmp_path / "staging"
+    xml_path = staging / "hibernate-core" / "target" / "test-results" / "test" / "TEST-org.example.Test.xml"
+    write_failure_xml(xml_path, "org.example.Test", "testSomething(SessionFactoryScope)", "boom")
+    archive = tmp_path / "tidb-tidbdialect-results-000.zip"
+    write_archive(staging, archive, "zip")
+
+    failures = repro_module.collect_failures(archive)
+
+    assert [(f.module, f.method, f.message) for f in failures] == [("hibernate-core", "testSomething", "boom")]
+    assert repro_module.find_latest_run_root(tmp_path, "tidb-tidbdialect-results") == archive
+
+
 def test_find_latest_run_root_prefers_newer_directory(repro_module, tmp_path: Path) -> None:
     base = tmp_path
     older = base / "tidb-tidbdialect-results-1"
@@ -222,3 +278,31 @@ def test_runner_builds_docker_command(repro_module, tmp_path: Path) -> None:
     assert "custom-image" in cmd
     assert cmd[-3:-1] == ["bash", "-lc"]
     assert "env RDBMS=tidb /workspace/gradlew" in cmd[-1]
+
+
+def test_list_annotates_failures_from_history(repro_module, tmp_path: Path) -> None:
+    from junit_history import history_path, update_from_collection
+
+    env = make_env(repro_module, tmp_path)
+    logger = MemoryLogger()
+    history_file = history_path(env.results_runs_dir, "tidb-tidbdialect")
+    for stamp in ("20240101-000000", "20240102-000000"):
+        run_root = tmp_path / f"tidb-tidbdialect-results-{stamp}"
+        write_failure_xml(
+            run_root / "hibernate-core" / "target" / "test-results" / "test" / "TEST-org.example.Test.xml",
+            "org.example.Test",
+            "testSomething",
+            "boom",
+        )
+        update_from_collection(env.results_runs_dir, "tidb-tidbdialect", run_root)
+    recorded = history_file.read_bytes()
+
+    options = make_options(repro_module, run_root=run_root, list_only=True)
+    repro_module.ReproOrchestrator(options, env, runner=FakeRunner(), logger=logger).execute()
+
+    # Listing only reads the history.
+    assert history_file.read_bytes() == recorded
+    messages = [message for _level, message in logger.records]
+    assert messages[-2].strip().startswith("history: failed 2/2 runs")
+    assert repro_module.cell_for_run_root(Path("mysql-results-20240101-000000.zip")) == "mysql"
+    assert repro_module.cell_for_run_root(Path("elsewhere")) is None
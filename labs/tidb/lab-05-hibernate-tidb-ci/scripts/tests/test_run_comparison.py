@@ -1,3 +1,5 @@
+import json
+import shutil
 import subprocess
 from pathlib import Path
 
@@ -116,7 +118,7 @@ def test_clean_test_results_removes_directories(run_module, tmp_path) -> None:
     (env.workspace / "module" / "target" / "classes").mkdir(parents=True)
 
     orchestrator = run_module.ComparisonOrchestrator(
-        run_module.ComparisonOptions(), env, runner=FakeRunner(), logger=MemoryLogger()
+        run_module.ComparisonOptions(gradle_cache="clean"), env, runner=FakeRunner(), logger=MemoryLogger()
     )
     orchestrator.clean_test_results()
 
@@ -125,6 +127,24 @@ def test_clean_test_results_removes_directories(run_module, tmp_path) -> None:
     assert not (env.workspace / "module" / "target" / "classes").exists()
 
 
+def test_reused_gradle_cache_keeps_compiled_classes(run_module, tmp_path) -> None:
+    env = make_env(run_module, tmp_path)
+    (env.workspace / "module" / "target" / "test-results").mkdir(parents=True)
+    (env.workspace / "module" / "target" / "classes").mkdir(parents=True)
+    runner = FakeRunner()
+    orchestrator = run_module.ComparisonOrchestrator(
+        run_module.ComparisonOptions(), env, runner=runner, logger=MemoryLogger()
+    )
+
+    orchestrator.clean_gradle_caches()
+
+    assert runner.commands == []
+    assert not (env.workspace / "module" / "target" / "test-results").exists()
+    assert (env.workspace / "module" / "target" / "classes").is_dir()
+    orchestrator.clean_test_results()
+    assert (env.workspace / "module" / "target" / "classes").is_dir()
+
+
 def test_compare_results_outputs_tables(run_module, tmp_path) -> None:
     env = make_env(run_module, tmp_path)
     (env.results_runs / "mysql-summary-1.json").write_text(
@@ -148,6 +168,59 @@ def test_compare_results_outputs_tables(run_module, tmp_path) -> None:
     assert any("MySQL 8.0 vs TiDB with MySQLDialect" in line for line in printed)
 
 
+def test_compare_results_includes_testcase_diff(run_module, tmp_path) -> None:
+    from junit_testcase_index import write_index
+
+    env = make_env(run_module, tmp_path)
+    for name, status in (("mysql", "passed"), ("tidb", "failed")):
+        collection = tmp_path / f"{name}-collection"
+        collection.mkdir()
+        write_index(
+            collection / "testcases.idx",
+            [("hibernate-core", "org.example.LockTest", "testLock", status, 0.1, "")],
+        )
+        prefix = "mysql-summary" if name == "mysql" else "tidb-tidbdialect-summary"
+        (env.results_runs / f"{prefix}-1.json").write_text(
+            f'{{"root":"{collection}","overall":{{"tests":1,"failures":0,"skipped":0}}}}', encoding="utf-8"
+        )
+
+    logger = MemoryLogger()
+    orchestrator = run_module.ComparisonOrchestrator(
+        run_module.ComparisonOptions(), env, runner=FakeRunner(), logger=logger
+    )
+    orchestrator.compare_results()
+
+    printed = [msg for kind, msg in logger.records if kind == "echo"]
+    assert any("newly failing=1" in line for line in printed)
+    assert any("hibernate-core:org.example.LockTest#testLock" in line for line in printed)
+
+
+
+def test_compare_results_skips_unreadable_testcase_index(run_module, tmp_path) -> None:
+    from junit_testcase_index import write_index
+
+    env = make_env(run_module, tmp_path)
+    for name in ("mysql", "tidb"):
+        collection = tmp_path / f"{name}-collection"
+        collection.mkdir()
+        write_index(collection / "testcases.idx", [("hibernate-core", "org.example.LockTest", "testLock", "passed", 0.1, "")])
+        prefix = "mysql-summary" if name == "mysql" else "tidb-tidbdialect-summary"
+        (env.results_runs / f"{prefix}-1.json").write_text(
+            f'{{"root":"{collection}","overall":{{"tests":1,"failures":0,"skipped":0}}}}', encoding="utf-8"
+        )
+    # A run cut off while writing its index
+    (tmp_path / "tidb-collection" / "testcases.idx").write_bytes(b"")
+
+    logger = MemoryLogger()
+    orchestrator = run_module.ComparisonOrchestrator(
+        run_module.ComparisonOptions(), env, runner=FakeRunner(), logger=logger
+    )
+    orchestrator.compare_results()
+
+    infos = [msg for kind, msg in logger.records if kind == "info"]
+    assert any(msg.startswith("Testcase diff skipped (unreadable index:") for msg in infos)
+    assert any(kind == "success" for kind, _ in logger.records)
+
 def test_run_tests_includes_gradle_continue(run_module, tmp_path) -> None:
     env = make_env(run_module, tmp_path)
     fake_runner = FakeRunner()
@@ -172,3 +245,415 @@ def test_run_tests_respects_stop_on_failure(run_module, tmp_path) -> None:
     docker_cmd = fake_runner.commands[-1]
     gradle_cmd = docker_cmd[1][-1]
     assert "--continue" not in gradle_cmd
+
+
+DATABASES_GRADLE = """
+ext {
+    dbBundle = [
+        mysql_ci : [
+            'db.dialect' : 'org.hibernate.dialect.MySQLDialect',
+            'jdbc.driver': 'com.mysql.cj.jdbc.Driver',
+        ],
+        tidb : [
+            'db.dialect' : 'org.hibernate.community.dialect.TiDBDialect',
+            'jdbc.driver': 'com.mysql.cj.jdbc.Driver',
+        ],
+    ]
+}
+"""
+
+
+class MatrixRunner(FakeRunner):
+    """FakeRunner that plays along with start_database/collect_results for a parallel matrix."""
+
+    def __init__(self, docker_info: str = "") -> None:
+        super().__init__()
+        self.docker_info = docker_info
+        self.db_envs = []
+        self.run_infos = []
+
+    def run(self, cmd, **kwargs):
+        completed = super().run(cmd, **kwargs)
+        cmd = list(cmd)
+        if cmd[:2] == ["./docker_db.sh", "tidb"] or cmd[:2] == ["./docker_db.sh", "mysql_8_0"]:
+            self.db_envs.append((Path(kwargs["cwd"]), kwargs["env"]))
+        elif cmd[:2] == ["docker", "ps"]:
+            names = ["mysql"] + [env["TIDB_CONTAINER_NAME"] for _cwd, env in self.db_envs if "TIDB_CONTAINER_NAME" in env]
+            completed.stdout = "\n".join(names)
+        elif cmd[:2] == ["docker", "info"]:
+            completed.stdout = self.docker_info
+        elif "scripts/junit_local_collect.py" in cmd:
+            dest = cmd[cmd.index("--dest") + 1]
+            stamp = cmd[cmd.index("--timestamp") + 1]
+            Path(f"{dest}-{stamp}").mkdir(parents=True)
+            # The real collector copies --run-info into collection.json
+            run_info = Path(cmd[cmd.index("--run-info") + 1])
+            self.run_infos.append(json.loads(run_info.read_text(encoding="utf-8")))
+        return completed
+
+
+def make_matrix_env(module, tmp_path: Path):
+    env = make_env(module, tmp_path)
+    config = env.workspace / "local-build-plugins" / "src" / "main" / "groovy" / "local.databases.gradle"
+    config.parent.mkdir(parents=True)
+    config.write_text(DATABASES_GRADLE, encoding="utf-8")
+    (env.workspace / "build.gradle").write_text("// root project", encoding="utf-8")
+    (env.workspace / "hibernate-core" / "target" / "classes").mkdir(parents=True)
+    (env.workspace / "hibernate-core" / "build.gradle").write_text("// module", encoding="utf-8")
+    (env.workspace / ".git" / "objects").mkdir(parents=True)
+    return env
+
+
+def test_parse_options_parallel(run_module) -> None:
+    assert run_module.parse_options([]).parallel == 1
+    assert run_module.parse_options(["--parallel", "0"]).parallel == 0
+    with pytest.raises(SystemExit):
+        run_module.parse_options(["--parallel", "-1"])
+    assert run_module.parse_options(["--shards", "4"]).shards == 4
+    with pytest.raises(SystemExit):
+        run_module.parse_options(["--shards", "0"])
+
+
+def test_parallel_matrix_isolates_cells(run_module, tmp_path, monkeypatch) -> None:
+    env = make_matrix_env(run_module, tmp_path)
+    runner = MatrixRunner()
+    options = run_module.ComparisonOptions(parallel=3, skip_clean=True, gradle_cache="clean")
+    orchestrator = run_module.ComparisonOrchestrator(options, env, runner=runner, logger=MemoryLogger())
+    overlays_seen = {}
+
+    def record_overlay(self, dialect):
+        overlays_seen[dialect] = sorted(p.relative_to(self.env.workspace).as_posix() for p in self.env.workspace.rglob("*"))
+
+    monkeypatch.setattr(run_module.ComparisonOrchestrator, "_patch_local_databases", record_overlay)
+    orchestrator._run_parallel_matrix()
+
+    streams = [cmd for kind, cmd in runner.commands if kind == "stream"]
+    networks = sorted(cmd[cmd.index("--network") + 1] for cmd in streams)
+    mounts = {cmd[cmd.index("-v") + 1] for cmd in streams}
+    assert networks == ["container:mysql", "container:tidb-tidb-mysqldialect", "container:tidb-tidb-tidbdialect"]
+    assert len(mounts) == 3 and all("/matrix/" in mount for mount in mounts)
+
+    tidb_envs = sorted(
+        (env_vars["TIDB_CONTAINER_NAME"], env_vars["TIDB_HOST_PORT"]) for _cwd, env_vars in runner.db_envs
+        if "TIDB_CONTAINER_NAME" in env_vars
+    )
+    assert tidb_envs == [("tidb-tidb-mysqldialect", "4001"), ("tidb-tidb-tidbdialect", "4000")]
+
+    # Overlays carry sources but not build outputs, and are removed once the cell is summarized.
+    assert "hibernate-core/build.gradle" in overlays_seen["tidb-community"]
+    assert not any("target" in path for path in overlays_seen["tidb-community"])
+    assert not any(path.startswith(".git") for path in overlays_seen["tidb-community"])
+    assert not any((env.temp / "matrix").rglob("build.gradle"))
+    logs = sorted(path.name.split("-ci-run-")[0] for path in env.log.glob("*.log"))
+    assert logs == ["mysql", "tidb-mysqldialect", "tidb-tidbdialect"]
+
+    # Three cells on the local host: every cell got the same third of it, recorded for the manifest.
+    allocation = orchestrator.allocation
+    assert allocation.cells == 3
+    assert {env_vars["DB_COUNT"] for _cwd, env_vars in runner.db_envs} == {str(allocation.db_count)}
+    run_infos = runner.run_infos
+    assert sorted(info["cell"] for info in run_infos) == ["mysql", "tidb-mysqldialect", "tidb-tidbdialect"]
+    assert not list(env.temp.glob("*-run-*.json"))
+    assert all(info["allocation"]["db_count"] == allocation.db_count for info in run_infos)
+
+
+def test_matrix_slots_follow_docker_budget(run_module, tmp_path) -> None:
+    env = make_env(run_module, tmp_path)
+    runner = MatrixRunner(docker_info=f"24 {64 * 1024**3}")
+    orchestrator = run_module.ComparisonOrchestrator(
+        run_module.ComparisonOptions(parallel=0), env, runner=runner, logger=MemoryLogger()
+    )
+
+    # 24 CPUs fit six 4-CPU cells; 64 GiB fits six 10 GiB cells.
+    assert orchestrator._matrix_slots(7) == 6
+    assert orchestrator._matrix_slots(2) == 2
+    assert orchestrator.host.source == "docker"
+
+
+def test_run_tests_sizes_runner_from_allocation(run_module, tmp_path) -> None:
+    env = make_env(run_module, tmp_path)
+    runner = MatrixRunner(docker_info=f"9 {20 * 1024**3}")
+    orchestrator = run_module.ComparisonOrchestrator(
+        run_module.ComparisonOptions(), env, runner=runner, logger=MemoryLogger()
+    )
+
+    orchestrator.run_tests(db_name="mysql", rdbms="mysql_8_0", label="MySQL 8.0 Baseline")
+
+    docker_cmd = [cmd for kind, cmd in runner.commands if kind == "stream"][0]
+    assert "--cpus=8" in docker_cmd and "--memory=18g" in docker_cmd
+    assert "GRADLE_OPTS=-Xmx6g -XX:MaxMetaspaceSize=1g" in docker_cmd
+    gradle_cmd = docker_cmd[-1]
+    assert "--max-workers=8" in gradle_cmd
+    assert "-PlabMaxParallelForks=5" in gradle_cmd
+    assert (env.temp / "gradle" / "test-forks.init.gradle").exists()
+
+
+def test_run_tests_shards_classes_by_history(run_module, load_module, tmp_path) -> None:
+    env = make_matrix_env(run_module, tmp_path)
+    config = env.workspace / run_module.LOCAL_DATABASES_GRADLE
+    config.write_text(
+        DATABASES_GRADLE + "// 'jdbc.url' : 'jdbc:mysql://' + dbHost + '/hibernate_orm_test_$worker'\n",
+        encoding="utf-8",
+    )
+    index_module = load_module("junit_testcase_index", alias="junit_testcase_index_for_run_shards")
+    history = env.results_runs / "mysql-results-20240101-000000"
+    history.mkdir()
+    index_module.write_index(
+        history / "testcases.idx",
+        [("hibernate-core", name, "test", "passed", seconds, "") for name, seconds in (("A", 9.0), ("B", 5.0), ("C", 4.0))],
+    )
+    runner = MatrixRunner(docker_info=f"16 {40 * 1024**3}")
+    orchestrator = run_module.ComparisonOrchestrator(
+        run_module.ComparisonOptions(shards=2), env, runner=runner, logger=MemoryLogger()
+    )
+
+    timestamp = orchestrator.run_tests(db_name="mysql", rdbms="mysql_8_0", label="MySQL 8.0 Baseline")
+
+    streams = sorted((cmd for kind, cmd in runner.commands if kind == "stream"), key=lambda cmd: cmd[4])
+    assert [cmd[4] for cmd in streams] == ["hibernate-mysql-ci-runner-shard1", "hibernate-mysql-ci-runner-shard2"]
+    assert {cmd[cmd.index("--network") + 1] for cmd in streams} == {"container:mysql"}
+    # Two shards split the single-cell budget: 16 CPUs / 40 GiB -> 7 CPUs, 18 GiB each.
+    assert all("--cpus=7" in cmd and "--memory=18g" in cmd for cmd in streams)
+    assert streams[0][-1].endswith("-PlabTestShard=/workspace/tmp/shards/mysql/shard-1.txt")
+    shard2_workspace = env.temp / "shards" / "mysql" / "2" / "workspace"
+    assert streams[1][streams[1].index("-v") + 1] == f"{shard2_workspace.as_posix()}:/workspace"
+    assert "/hibernate_orm_test_s2_$worker" in (shard2_workspace / run_module.LOCAL_DATABASES_GRADLE).read_text()
+    assert not (shard2_workspace / ".git").exists()
+    assert (env.temp / "shards" / "mysql" / "shard-1.txt").read_text().splitlines() == ["exclude", "hibernate-core\tB", "hibernate-core\tC"]
+
+    create = next(cmd for kind, cmd in runner.commands if kind == "run" and "mysql:8.0" in cmd)
+    assert "-phibernate_orm_test" in create
+    assert "CREATE DATABASE IF NOT EXISTS hibernate_orm_test_s2_1" in create[-1]
+    merged = orchestrator.last_log_file.read_text(encoding="utf-8")
+    assert "===== shard 1/2" in merged and "===== shard 2/2" in merged
+
+    orchestrator.collect_results("mysql", orchestrator.last_log_file, timestamp)
+
+    collect_cmd = runner.commands[-1][1]
+    assert collect_cmd[collect_cmd.index("--shard-root") + 1] == str(shard2_workspace)
+    assert not shard2_workspace.exists()
+    run_info = runner.run_infos[-1]
+    assert not (env.temp / f"mysql-run-{timestamp}.json").exists()
+    assert [shard["classes"] for shard in run_info["sharding"]["shards"]] == [1, 2]
+
+
+def test_run_tests_without_history_runs_unsharded(run_module, tmp_path) -> None:
+    env = make_env(run_module, tmp_path)
+    runner = FakeRunner()
+    logger = MemoryLogger()
+    orchestrator = run_module.ComparisonOrchestrator(run_module.ComparisonOptions(shards=3), env, runner=runner, logger=logger)
+
+    orchestrator.run_tests(db_name="mysql", rdbms="mysql_8_0", label="MySQL 8.0 Baseline")
+
+    streams = [cmd for kind, cmd in runner.commands if kind == "stream"]
+    assert len(streams) == 1 and "labTestShard" not in streams[0][-1]
+    assert any("running unsharded" in message for level, message in logger.records if level == "warning")
+
+
+def test_failing_first_runs_known_failures_before_the_rest(run_module, load_module, tmp_path) -> None:
+    env = make_env(run_module, tmp_path)
+    history_module = load_module("junit_history", alias="junit_history_for_run_comparison")
+    history = history_module.empty_history("tidb-tidbdialect")
+    stats = {("hibernate-core", "org.Broken"): (3.0, 2, 1), ("hibernate-core", "org.Fine"): (9.0, 4, 0)}
+    history_module.record_run(history, "tidb-tidbdialect-results-1", stats)
+    history_module.save_history(history_module.history_path(env.results_runs, "tidb-tidbdialect"), history)
+
+    class FailingRunner(FakeRunner):
+        def stream_to_file(self, cmd, log_file: Path, **kwargs) -> None:
+            super().stream_to_file(cmd, log_file, **kwargs)
+            raise subprocess.CalledProcessError(1, cmd)
+
+    runner = FailingRunner()
+    options = run_module.ComparisonOptions(failing_first=True, gradle_continue=False)
+    orchestrator = run_module.ComparisonOrchestrator(options, env, runner=runner, logger=MemoryLogger())
+
+    orchestrator.run_tests(db_name="tidb", rdbms="tidb", label="TiDB", identifier="tidb-tidbdialect")
+
+    # --stop-on-failure: the known failure failed again, so the rest of the suite never starts.
+    streams = [cmd for kind, cmd in runner.commands if kind == "stream"]
+    assert [cmd[4] for cmd in streams] == ["hibernate-tidb-ci-runner-first"]
+    assert "-PlabTestShard=/workspace/tmp/history/tidb-tidbdialect/first.txt -PlabTestResultsSuffix=first" in streams[0][-1]
+    assert (env.temp / "history" / "tidb-tidbdialect" / "first.txt").read_text().splitlines() == [
+        "include",
+        "hibernate-core\torg.Broken",
+    ]
+
+    runner.commands.clear()
+    orchestrator.options.gradle_continue = True
+    orchestrator.run_tests(db_name="tidb", rdbms="tidb", label="TiDB", identifier="tidb-tidbdialect")
+
+    streams = [cmd for kind, cmd in runner.commands if kind == "stream"]
+    assert [cmd[4] for cmd in streams] == ["hibernate-tidb-ci-runner-first", "hibernate-tidb-ci-runner"]
+    assert streams[1][-1].endswith("-PlabTestShard=/workspace/tmp/history/tidb-tidbdialect/rest.txt")
+    assert orchestrator.last_log_file.read_text(encoding="utf-8") == "fake logfake log"
+
+
+def test_collect_results_records_history(run_module, tmp_path) -> None:
+    env = make_env(run_module, tmp_path)
+
+    class CollectingRunner(FakeRunner):
+        def run(self, cmd, **kwargs):
+            if "scripts/junit_local_collect.py" in cmd:
+                dest = Path(f"{cmd[cmd.index('--dest') + 1]}-{cmd[cmd.index('--timestamp') + 1]}")
+                xml = dest / "hibernate-core" / "target" / "test-results" / "test" / "TEST-org.A.xml"
+                xml.parent.mkdir(parents=True)
+                xml.write_text('<testsuite name="org.A" tests="1" failures="1" time="2.5"/>', encoding="utf-8")
+            return super().run(cmd, **kwargs)
+
+    orchestrator = run_module.ComparisonOrchestrator(
+        run_module.ComparisonOptions(), env, runner=CollectingRunner(), logger=MemoryLogger()
+    )
+    orchestrator.collect_results("mysql", None, "20240101-000000")
+
+    history = json.loads((env.results_runs / "history" / "mysql.json").read_text(encoding="utf-8"))
+    assert history["runs"] == ["mysql-results-20240101-000000"]
+    assert history["classes"] == {"hibernate-core": {"org.A": [[2.5, 1, 1]]}}
+
+
+def test_run_tests_mounts_persistent_gradle_cache(run_module, tmp_path) -> None:
+    env = make_env(run_module, tmp_path)
+    runner = FakeRunner()
+    orchestrator = run_module.ComparisonOrchestrator(
+        run_module.ComparisonOptions(), env, runner=runner, logger=MemoryLogger()
+    )
+
+    orchestrator.run_tests(db_name="mysql", rdbms="mysql_8_0", label="MySQL 8.0 Baseline")
+
+    docker_cmd = runner.commands[-1][1]
+    assert docker_cmd[docker_cmd.index("-v") + 1].endswith(":/workspace")
+    assert "hibernate-orm-gradle-home:/gradle-home" in docker_cmd
+    assert "GRADLE_USER_HOME=/gradle-home" in docker_cmd
+    assert "--build-cache -I /workspace/tmp/gradle/gradle-cache.init.gradle" in docker_cmd[-1]
+    assert (env.temp / "gradle" / "gradle-cache.init.gradle").exists()
+
+    runner.commands.clear()
+    orchestrator.options.gradle_cache = "clean"
+    orchestrator.run_tests(db_name="mysql", rdbms="mysql_8_0", label="MySQL 8.0 Baseline")
+    docker_cmd = runner.commands[-1][1]
+    assert not any("gradle-home" in arg for arg in docker_cmd)
+    assert "--build-cache" not in docker_cmd[-1]
+
+
+def test_parallel_matrix_reuses_compiled_classes(run_module, tmp_path, monkeypatch) -> None:
+    env = make_matrix_env(run_module, tmp_path)
+    (env.workspace / "hibernate-core" / "target" / "test-results" / "test").mkdir(parents=True)
+    runner = MatrixRunner()
+    options = run_module.ComparisonOptions(parallel=3, skip_mysql=True)
+    orchestrator = run_module.ComparisonOrchestrator(options, env, runner=runner, logger=MemoryLogger())
+    overlays_seen = {}
+
+    def record_overlay(self, dialect):
+        overlays_seen[dialect] = sorted(p.relative_to(self.env.workspace).as_posix() for p in self.env.workspace.rglob("*"))
+
+    monkeypatch.setattr(run_module.ComparisonOrchestrator, "_patch_local_databases", record_overlay)
+    orchestrator._run_parallel_matrix()
+
+    # Compiled once up front with write access to the cache volume...
+    warm = next(cmd for kind, cmd in runner.commands if kind == "run" and "testClasses" in cmd)
+    assert "hibernate-orm-gradle-home:/gradle-home" in warm
+    # ...then every cell starts from those classes and reads the dependency cache read-only.
+    assert "hibernate-core/target/classes" in overlays_seen["tidb-community"]
+    assert not any("test-results" in path for path in overlays_seen["tidb-community"])
+    streams = [cmd for kind, cmd in runner.commands if kind == "stream"]
+    assert len(streams) == 2
+    assert all("hibernate-orm-gradle-home:/gradle-ro:ro" in cmd for cmd in streams)
+
+
+def test_verify_cache_reruns_last_cell_from_clean_build(run_module, tmp_path, monkeypatch) -> None:
+    env = make_matrix_env(run_module, tmp_path)
+    runner = MatrixRunner()
+    logger = MemoryLogger()
+    orchestrator = run_module.ComparisonOrchestrator(run_module.ComparisonOptions(verify_cache=True), env, runner=runner, logger=logger)
+    orchestrator.last_cell = run_module.MatrixCell(
+        identifier="mysql", db_name="mysql", rdbms="mysql_8_0", label="MySQL 8.0 Baseline", summary_label="MySQL 8.0"
+    )
+    orchestrator.last_collection_dir = env.results_runs / "mysql-results-20240101-000000"
+    compared = []
+
+    def fake_compare(cached, clean):
+        compared.append((cached.name, clean.name))
+        return []
+
+    monkeypatch.setattr(run_module, "compare_collections", fake_compare)
+    orchestrator._verify_cache()
+
+    assert any(kind == "run" and cmd[-2:] == ["./gradlew", "clean"] for kind, cmd in runner.commands)
+    stream = next(cmd for kind, cmd in runner.commands if kind == "stream")
+    assert not any("gradle-home" in arg for arg in stream) and "--build-cache" not in stream[-1]
+    assert compared[0][0] == "mysql-results-20240101-000000"
+    assert compared[0][1].startswith("mysql-clean-results-")
+    assert logger.records[-1][0] == "success"
+
+    for collection in env.results_runs.glob("mysql-clean-results-*"):
+        shutil.rmtree(collection)
+    monkeypatch.setattr(run_module, "compare_collections", lambda cached, clean: ["fails only with the cache: core:A#t"])
+    with pytest.raises(SystemExit):
+        orchestrator._verify_cache()
+
+
+def test_parse_options_gradle_cache(run_module) -> None:
+    assert run_module.parse_options([]).gradle_cache == "reuse"
+    assert run_module.parse_options(["--gradle-cache", "clean"]).gradle_cache == "clean"
+    assert run_module.parse_options(["--verify-cache"]).verify_cache
+    with pytest.raises(SystemExit):
+        run_module.parse_options(["--verify-cache", "--parallel", "2"])
+    with pytest.raises(SystemExit):
+        run_module.parse_options(["--verify-cache", "--gradle-cache", "clean"])
+
+
+def test_db_pool_resets_running_container_instead_of_restarting(run_module, tmp_path) -> None:
+    env = make_env(run_module, tmp_path)
+    runner = MatrixRunner(docker_info=f"9 {20 * 1024**3}")
+    logger = MemoryLogger()
+    orchestrator = run_module.ComparisonOrchestrator(
+        run_module.ComparisonOptions(db_pool=True), env, runner=runner, logger=logger
+    )
+
+    # No pooled container yet: cold start through docker_db.sh, timed for later resets.
+    orchestrator.start_database("tidb")
+    assert any(cmd[:2] == ["./docker_db.sh", "tidb"] for kind, cmd in runner.commands)
+    assert orchestrator.last_database_info["mode"] == "cold-start"
+    pool = json.loads((env.temp / "db-pool.json").read_text(encoding="utf-8"))
+    assert "cold_start_seconds" in pool["tidb"]
+
+    runner.commands.clear()
+    orchestrator.remove_container("tidb")
+    assert runner.commands == []
+
+    # The container is still running: one SQL session resets its schemas.
+    orchestrator.start_database("tidb")
+    assert not any(cmd[0] == "./docker_db.sh" for kind, cmd in runner.commands)
+    reset = next(cmd for kind, cmd in runner.commands if "mysql:8.0" in cmd)
+    assert reset[reset.index("--network") + 1] == "container:tidb"
+    sql = reset[-1]
+    db_count = orchestrator.resources().db_count
+    assert "DROP DATABASE IF EXISTS hibernate_orm_test;" in sql
+    assert f"CREATE DATABASE hibernate_orm_test_{db_count};" in sql
+    assert f"hibernate_orm_test_{db_count + 1}" not in sql
+    info = orchestrator.last_database_info
+    assert info["mode"] == "pool-reset" and "saved_seconds" in info
+    assert any(level == "success" and "saved ~" in message for level, message in logger.records)
+
+    orchestrator.collect_results("tidb", None, "20240101-000000")
+    assert runner.run_infos[-1]["database"]["mode"] == "pool-reset"
+    assert not (env.temp / "tidb-run-20240101-000000.json").exists()
+
+
+def test_db_pool_restarts_when_reset_fails(run_module, tmp_path) -> None:
+    env = make_env(run_module, tmp_path)
+
+    class BrokenSqlRunner(MatrixRunner):
+        def run(self, cmd, **kwargs):
+            if "mysql:8.0" in cmd:
+                raise subprocess.CalledProcessError(1, cmd)
+            return super().run(cmd, **kwargs)
+
+    runner = BrokenSqlRunner()
+    orchestrator = run_module.ComparisonOrchestrator(
+        run_module.ComparisonOptions(db_pool=True), env, runner=runner, logger=MemoryLogger()
+    )
+
+    orchestrator.start_database("mysql")
+
+    assert any(cmd[:2] == ["./docker_db.sh", "mysql_8_0"] for kind, cmd in runner.commands)
+    assert orchestrator.last_database_info["mode"] == "cold-start"
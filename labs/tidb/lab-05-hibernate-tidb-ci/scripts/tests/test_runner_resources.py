@@ -0,0 +1,81 @@
+import subprocess
+
+import pytest
+
+
+@pytest.fixture
+def resources(load_module):
+    return load_module("runner_resources", alias="runner_resources_under_test")
+
+
+def test_plan_reproduces_previous_fixed_runner(resources):
+    host = resources.HostResources(cpus=7, memory_bytes=18 * resources.GIB, source="docker")
+
+    allocation = resources.plan(host, 1)
+
+    assert allocation.docker_args() == ["--memory=16g", "--cpus=6"]
+    assert allocation.gradle_opts() == "-Xmx6g -XX:MaxMetaspaceSize=1g"
+    assert allocation.max_parallel_forks == allocation.db_count == 4
+
+
+def test_plan_splits_host_between_cells(resources):
+    host = resources.HostResources(cpus=32, memory_bytes=64 * resources.GIB, source="docker")
+
+    whole = resources.plan(host, 1)
+    split = resources.plan(host, 3)
+
+    assert resources.max_cells(host) == 6
+    assert (whole.runner_cpus, whole.runner_memory_gb, whole.gradle_heap_gb) == (31, 62, 8)
+    assert (split.runner_cpus, split.runner_memory_gb, split.gradle_heap_gb) == (9, 19, 7)
+    assert split.db_count == 6
+    assert split.runner_cpus * 3 <= host.cpus
+    # Tiny hosts still get a runnable (if serial) allocation.
+    tiny = resources.plan(resources.HostResources(cpus=2, memory_bytes=4 * resources.GIB, source="host"), 1)
+    assert (tiny.runner_cpus, tiny.max_parallel_forks, tiny.db_count) == (1, 1, 1)
+
+
+@pytest.mark.parametrize(
+    "files, cpus, memory",
+    [
+        ({"cpu.max": "250000 100000", "memory.max": str(6 * 1024**3)}, 2.5, 6 * 1024**3),
+        ({"cpu.max": "max 100000", "memory.max": "max"}, None, None),
+        (
+            {
+                "cpu/cpu.cfs_quota_us": "400000",
+                "cpu/cpu.cfs_period_us": "100000",
+                "memory/memory.limit_in_bytes": "9223372036854771712",
+            },
+            4.0,
+            None,
+        ),
+    ],
+)
+def test_cgroup_limits(resources, tmp_path, files, cpus, memory):
+    for name, content in files.items():
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content + "\n", encoding="utf-8")
+
+    assert resources.cgroup_cpu_limit(tmp_path) == cpus
+    assert resources.cgroup_memory_limit(tmp_path) == memory
+
+
+def test_local_resources_apply_cgroup_limits(resources, tmp_path):
+    (tmp_path / "cpu.max").write_text("100000 100000", encoding="utf-8")
+    (tmp_path / "memory.max").write_text(str(2 * 1024**3), encoding="utf-8")
+
+    host = resources.local_resources(tmp_path)
+
+    assert (host.cpus, host.memory_bytes, host.source) == (1.0, 2 * 1024**3, "cgroup")
+
+
+def test_detect_host_prefers_docker(resources):
+    def fake_run(cmd, **_kwargs):
+        return subprocess.CompletedProcess(cmd, 0, stdout=f"12 {24 * 1024**3}\n")
+
+    def failing_run(cmd, **_kwargs):
+        raise FileNotFoundError("docker")
+
+    docker = resources.detect_host(fake_run)
+    assert (docker.cpus, docker.memory_gb, docker.source) == (12, 24, "docker")
+    assert resources.detect_host(failing_run).source in ("host", "cgroup")
@@ -0,0 +1,83 @@
+import socket
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+
+@pytest.fixture
+def ready_module(load_module):
+    return load_module("tidb_ready", alias="tidb_ready_under_test")
+
+
+def serve_once(payload: bytes) -> int:
+    """Accept one connection on a free port and send `payload` as a MySQL packet."""
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+
+    def handle() -> None:
+        conn, _addr = server.accept()
+        with conn:
+            conn.sendall(len(payload).to_bytes(3, "little") + b"\0" + payload)
+        server.close()
+
+    threading.Thread(target=handle, daemon=True).start()
+    return server.getsockname()[1]
+
+
+def free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_probe_reads_the_server_version_from_the_greeting(ready_module) -> None:
+    port = serve_once(b"\x0a8.0.11-TiDB-v8.5.3\0rest-of-handshake")
+    assert ready_module.probe_mysql("127.0.0.1", port) == "8.0.11-TiDB-v8.5.3"
+
+
+def test_probe_rejects_error_packets_and_closed_ports(ready_module) -> None:
+    port = serve_once(b"\xff\x10\x04Too many connections")
+    assert ready_module.probe_mysql("127.0.0.1", port) is None
+    assert ready_module.probe_mysql("127.0.0.1", free_port(), timeout=0.2) is None
+
+
+def test_wait_backs_off_below_a_second_until_ready(ready_module) -> None:
+    answers = iter([None, None, None, "8.0.11-TiDB-v8.5.3"])
+    result = ready_module.wait_until_ready(lambda: next(answers), timeout=5, initial_backoff=0.01, max_backoff=0.02)
+
+    assert result.ready and result.probes == 4
+    assert result.server_version == "8.0.11-TiDB-v8.5.3"
+    assert result.seconds < 1
+    assert result.describe().startswith("TiDB ready in")
+
+
+def test_wait_wakes_on_log_line_and_fails_fast_when_logs_end(ready_module) -> None:
+    watcher = SimpleNamespace(matched=threading.Event(), ended=threading.Event(), matched_at=None)
+    state = {"up": False}
+
+    def announce() -> None:
+        time.sleep(0.05)
+        watcher.matched_at = time.monotonic()
+        state["up"] = True
+        watcher.matched.set()
+
+    threading.Thread(target=announce, daemon=True).start()
+    # A 30s backoff would time the test out if the log line did not wake the prober.
+    result = ready_module.wait_until_ready(
+        lambda: "v" if state["up"] else None, timeout=5, watcher=watcher, initial_backoff=30, max_backoff=30
+    )
+    assert result.ready and result.seconds < 1
+    assert result.log_seconds is not None
+
+    stopped = SimpleNamespace(matched=threading.Event(), ended=threading.Event(), matched_at=None)
+    stopped.ended.set()
+    result = ready_module.wait_until_ready(lambda: None, timeout=5, watcher=stopped)
+    assert not result.ready and "log stream ended" in result.reason
+
+
+def test_wait_times_out(ready_module) -> None:
+    result = ready_module.wait_until_ready(lambda: None, timeout=0.1, initial_backoff=0.01, max_backoff=0.02)
+    assert not result.ready and "timed out" in result.reason
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Wait for a freshly started TiDB container to accept MySQL connections.
+
+Called by the tidb_8_5() function that patch_docker_db_tidb.py generates into
+docker_db.sh (installed next to it as $TMP_DIR/tidb_ready.py). It replaces the
+old readiness loops, which polled `docker logs` and started a mysql:8.0
+container for every `mysqladmin ping`, sleeping 5s between attempts:
+
+  - `docker logs -f` is followed in a background thread; the "server is
+    running" line wakes the prober immediately and an ended log stream (the
+    container stopped) fails fast;
+  - the published port is probed from this process by reading the MySQL
+    server greeting, with a backoff that starts at 50ms and stays under a
+    second. Reading the greeting (not just connecting) matters because the
+    Docker port proxy accepts connections before TiDB listens;
+  - the time to ready is printed, together with when the log line appeared.
+
+Only the standard library is used, since docker_db.sh runs it with the host's
+python3 outside the lab's environment.
+
+Usage examples:
+  python3 scripts/tidb_ready.py --container tidb --port 4000
+  python3 scripts/tidb_ready.py --container tidb-tidb-mysqldialect --port 4001 --timeout 120
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional, Sequence
+
+DEFAULT_LOG_PATTERN = "server is running"
+DEFAULT_TIMEOUT = 75.0
+INITIAL_BACKOFF = 0.05
+MAX_BACKOFF = 0.5
+MYSQL_PROTOCOL_VERSION = 10
+
+
+def probe_mysql(host: str, port: int, timeout: float = 1.0) -> Optional[str]:
+    """Return the server version from the MySQL greeting, or None if no server answers yet."""
+    try:
+        with socket.create_connection((host, port), timeout=timeout) as sock:
+            sock.settimeout(timeout)
+            header = _read_exactly(sock, 4)
+            length = int.from_bytes(header[:3], "little")
+            payload = _read_exactly(sock, length)
+    except (OSError, ValueError):
+        return None
+    # 0xff is an error packet (e.g. the server is still starting); anything else but v10 is not MySQL.
+    if not payload or payload[0] != MYSQL_PROTOCOL_VERSION:
+        return None
+    return payload[1:].split(b"\0", 1)[0].decode("utf-8", errors="replace")
+
+
+def _read_exactly(sock: socket.socket, size: int) -> bytes:
+    data = b""
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ValueError("connection closed during the MySQL greeting")
+        data += chunk
+    return data
+
+
+class LogWatcher:
+    """Follow `<cli> logs -f <container>` and signal when `pattern` appears or the stream ends."""
+
+    def __init__(self, cli: str, container: str, pattern: str = DEFAULT_LOG_PATTERN) -> None:
+        self.pattern = pattern
+        self.matched = threading.Event()
+        self.ended = threading.Event()
+        self.matched_at: Optional[float] = None
+        self._process = subprocess.Popen(
+            [cli, "logs", "-f", container],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            errors="replace",
+        )
+        self._thread = threading.Thread(target=self._follow, daemon=True)
+        self._thread.start()
+
+    def _follow(self) -> None:
+        assert self._process.stdout is not None
+        for line in self._process.stdout:
+            if not self.matched.is_set() and self.pattern in line:
+                self.matched_at = time.monotonic()
+                self.matched.set()
+        self.ended.set()
+
+    def close(self) -> None:
+        if self._process.poll() is None:
+            self._process.terminate()
+        self._process.wait()
+
+
+@dataclass
+class ReadyResult:
+    ready: bool
+    seconds: float
+    probes: int
+    server_version: Optional[str] = None
+    log_seconds: Optional[float] = None
+    reason: str = ""
+
+    def describe(self) -> str:
+        details = [f"{self.probes} probes"]
+        if self.log_seconds is not None:
+            details.insert(0, f"log ready at {self.log_seconds:.1f}s")
+        if self.server_version:
+            details.append(f"server {self.server_version}")
+        if self.ready:
+            return f"TiDB ready in {self.seconds:.1f}s ({', '.join(details)})"
+        return f"TiDB not ready after {self.seconds:.1f}s: {self.reason} ({', '.join(details)})"
+
+
+def wait_until_ready(
+    probe: Callable[[], Optional[str]],
+    timeout: float = DEFAULT_TIMEOUT,
+    watcher: Optional[LogWatcher] = None,
+    initial_backoff: float = INITIAL_BACKOFF,
+    max_backoff: float = MAX_BACKOFF,
+) -> ReadyResult:
+    """Probe with exponential backoff until `probe` returns a version, the log stream ends, or `timeout`."""
+    started = time.monotonic()
+    deadline = started + timeout
+    backoff = initial_backoff
+    probes = 0
+
+    def result(ready: bool, version: Optional[str] = None, reason: str = "") -> ReadyResult:
+        log_seconds = None
+        if watcher is not None and watcher.matched_at is not None:
+            log_seconds = max(0.0, watcher.matched_at - started)
+        return ReadyResult(ready, time.monotonic() - started, probes, version, log_seconds, reason)
+
+    while True:
+        probes += 1
+        version = probe()
+        if version:
+            return result(True, version)
+        if watcher is not None and watcher.ended.is_set():
+            return result(False, reason="the container's log stream ended (container stopped?)")
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return result(False, reason=f"timed out after {timeout:g}s")
+        pause = min(backoff, remaining)
+        if watcher is not None and not watcher.matched.is_set():
+            # Wake up as soon as the log line shows up instead of sleeping the whole backoff.
+            if watcher.matched.wait(pause):
+                backoff = initial_backoff
+                continue
+        else:
+            time.sleep(pause)
+        backoff = min(backoff * 2, max_backoff)
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="Wait until a TiDB container accepts MySQL connections.")
+    ap.add_argument("--container", default="tidb", help="Container whose log is followed (default: tidb)")
+    ap.add_argument("--host", default="127.0.0.1", help="Host the TiDB port is published on (default: 127.0.0.1)")
+    ap.add_argument("--port", type=int, default=4000, help="Published TiDB port (default: 4000)")
+    ap.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help=f"Seconds to wait (default: {DEFAULT_TIMEOUT:g})")
+    ap.add_argument("--cli", default=os.environ.get("CONTAINER_CLI", "docker"), help="Container CLI (default: docker)")
+    ap.add_argument("--log-pattern", default=DEFAULT_LOG_PATTERN, help="Log line that announces readiness")
+    ap.add_argument("--no-logs", action="store_true", help="Only probe the port; do not follow the container log")
+    return ap.parse_args(argv)
+
+
+def run(args: argparse.Namespace) -> ReadyResult:
+    print(f"Waiting for TiDB on {args.host}:{args.port} (container {args.container}, timeout {args.timeout:g}s)...")
+    watcher = None if args.no_logs else LogWatcher(args.cli, args.container, args.log_pattern)
+    try:
+        result = wait_until_ready(lambda: probe_mysql(args.host, args.port), args.timeout, watcher)
+    finally:
+        if watcher is not None:
+            watcher.close()
+    print(result.describe())
+    return result
+
+
+def main() -> None:
+    args = parse_args()
+    try:
+        result = run(args)
+    except OSError as exc:
+        print(f"ERROR: {exc}", file=sys.stderr)
+        sys.exit(1)
+    if not result.ready:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()